@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Фоновый расчёт для GUI: задача выполняется в потоке, окно не замирает.
+
+JobRunner держит не больше одной актуальной задачи: новый submit() отменяет
+предыдущую, и её результат уже не доставляется. Результат, ошибка и прогресс
+передаются в GUI-поток через post(fn) — функцию, которая ставит fn в очередь
+GUI-потока (в Tk — очередь, разбираемая по after(); в Kivy — Clock.schedule_once).
+
+Отмена кооперативная: задача получает JobToken и вызывает token.progress(),
+token.emit() или token.check() — в отменённой задаче они бросают Cancelled.
+token.emit(часть) передаёт в GUI промежуточный результат (например, готовый
+раздел отчёта), не дожидаясь конца задачи.
+"""
+
+import threading
+import traceback
+from typing import Any, Callable, Optional
+
+
+class Cancelled(Exception):
+    """Задача отменена или заменена новой."""
+
+
+class JobToken:
+    """Связь задачи с JobRunner: признак отмены, прогресс и промежуточные результаты."""
+
+    def __init__(self, job_id: int, on_progress: Optional[Callable[[int, int], None]] = None,
+                 on_partial: Optional[Callable[[Any], None]] = None):
+        self.job_id = job_id
+        self._event = threading.Event()
+        self._on_progress = on_progress
+        self._on_partial = on_partial
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    def check(self) -> None:
+        if self._event.is_set():
+            raise Cancelled()
+
+    def progress(self, done: int, total: int) -> None:
+        """Отчёт о прогрессе (вызывается из задачи); в отменённой задаче — Cancelled."""
+        self.check()
+        if self._on_progress is not None:
+            self._on_progress(done, total)
+
+    def emit(self, part: Any) -> None:
+        """Промежуточный результат (вызывается из задачи); в отменённой задаче — Cancelled."""
+        self.check()
+        if self._on_partial is not None:
+            self._on_partial(part)
+
+
+class JobRunner:
+    """Одна актуальная фоновая задача; обратные вызовы — в GUI-потоке через post."""
+
+    def __init__(self, post: Callable[[Callable[[], None]], Any]):
+        self._post = post
+        self._lock = threading.Lock()
+        self._current: Optional[JobToken] = None
+        self._seq = 0
+
+    @property
+    def busy(self) -> bool:
+        return self._current is not None
+
+    def submit(self, fn: Callable[[JobToken], Any], on_done: Callable[[Any], None],
+               on_error: Optional[Callable[[BaseException, str], None]] = None,
+               on_progress: Optional[Callable[[int, int], None]] = None,
+               on_partial: Optional[Callable[[Any], None]] = None) -> JobToken:
+        """
+        Запускает fn(token) в потоке, отменив текущую задачу.
+        on_done(результат), on_error(исключение, traceback), on_progress(done, total),
+        on_partial(часть) вызываются в GUI-потоке и только для актуальной задачи;
+        части приходят в порядке token.emit() и раньше on_done.
+        """
+        with self._lock:
+            if self._current is not None:
+                self._current.cancel()
+            self._seq += 1
+            token = JobToken(self._seq)
+            self._current = token
+        if on_progress is not None:
+            token._on_progress = lambda done, total: self._deliver(token, on_progress, (done, total), False)
+        if on_partial is not None:
+            token._on_partial = lambda part: self._deliver(token, on_partial, (part,), False)
+        threading.Thread(target=self._run, args=(token, fn, on_done, on_error),
+                         name=f"calc-job-{token.job_id}", daemon=True).start()
+        return token
+
+    def cancel(self) -> None:
+        """Отменить текущую задачу (её обратные вызовы больше не придут)."""
+        with self._lock:
+            if self._current is not None:
+                self._current.cancel()
+                self._current = None
+
+    def _run(self, token: JobToken, fn, on_done, on_error) -> None:
+        try:
+            result = fn(token)
+        except Cancelled:
+            return
+        except Exception as e:
+            if on_error is not None:
+                self._deliver(token, on_error, (e, traceback.format_exc()), True)
+            else:
+                self._deliver(token, lambda: None, (), True)
+            return
+        self._deliver(token, on_done, (result,), True)
+
+    def _deliver(self, token: JobToken, cb: Callable, args: tuple, final: bool) -> None:
+        def call():
+            with self._lock:
+                if token is not self._current or token.cancelled:
+                    return
+                if final:
+                    self._current = None
+            cb(*args)
+        self._post(call)
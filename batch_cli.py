@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+"""
+Пакетный расчёт из командной строки (без GUI).
+
+Читает описания зданий из JSONL или CSV (файл или stdin), считает их
+и построчно пишет результаты в stdout или файл. Вход читается лениво,
+в работе одновременно не больше workers*2 пачек — память не зависит
+от размера входа.
+
+Форматы входа
+  JSONL, движок desktop (metal_core.calculate), по зданию в строке:
+      {"id": "A", "gp": {"L_build": 120, ...}, "spans": [{"L_span": 24, ...}, ...]}
+  JSONL, движок logic (CalculatorLogic.calculate):
+      {"id": "A", "length": 60, "spans": [{"span_L": 24, ...}, ...]}
+  CSV — строка на пролёт; столбцы — поля gp (или length) и поля пролёта.
+      Подряд идущие строки с одинаковым id — одно здание; без столбца id
+      каждая строка — однопролётное здание.
+Для движка desktop отсутствующие поля берутся из значений по умолчанию GUI,
+а одинаковые здания (канонический ключ metal_core.case_key) считаются один
+раз — кэш результатов (--cache, --cache-ttl). С --store результаты
+сохраняются на диск: прерванный перебор при перезапуске досчитывает только
+недостающее.
+
+Примеры:
+    python batch_cli.py buildings.jsonl -o results.jsonl -j 8
+    cat spans.csv | python batch_cli.py - --input-format csv --format csv
+"""
+
+import argparse
+import csv
+import functools
+import json
+import os
+import sys
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from memo import LRUMemo
+from metal_core import RESULT_CACHE_MAX, case_key
+from result_store import ResultStore
+from sweep import DEFAULT_GP, DEFAULT_SPAN, _run_chunk, fill_case, run_cases
+
+ENGINES = ("desktop", "logic")
+FORMATS = ("jsonl", "csv")
+
+# Столбцы CSV-вывода (итоги расчёта)
+CSV_COLUMNS = {
+    "desktop": ["М1_т", "М2_т", "М1_кгм2", "М2_кгм2", "min_т", "max_т", "S_floor"],
+    "logic": ["total_kg", "area", "kg_m2"],
+}
+
+_TRUE = {"1", "true", "yes", "да", "с проходом"}
+_FALSE = {"0", "false", "no", "нет", "без прохода", ""}
+
+Record = Tuple[Any, Dict[str, Any], List[Dict[str, Any]]]  # (id, gp, spans)
+
+_MISSING = object()
+
+
+# ─── Типы полей ───────────────────────────────────────────────────────────────
+
+def _span_field_types(engine: str) -> Dict[str, type]:
+    if engine == "desktop":
+        return {k: type(v) for k, v in DEFAULT_SPAN.items()}
+    from calculator_logic import SpanParams
+    from dataclasses import fields
+    return {f.name: f.type for f in fields(SpanParams)}
+
+
+def _gp_field_types(engine: str) -> Dict[str, type]:
+    if engine == "desktop":
+        return {k: type(v) for k, v in DEFAULT_GP.items()}
+    return {"length": float}
+
+
+def _convert(value: str, typ: type) -> Any:
+    """Строка CSV -> значение нужного типа."""
+    value = value.strip()
+    if typ is bool:
+        low = value.lower()
+        if low in _TRUE:
+            return True
+        if low in _FALSE:
+            return False
+        raise ValueError(f"Не логическое значение: {value!r}")
+    if typ is int:
+        return int(float(value))
+    if typ is float:
+        return float(value.replace(",", "."))
+    return value
+
+
+# ─── Чтение входа ─────────────────────────────────────────────────────────────
+
+def _error_record(rec_id: Any, message: str) -> Record:
+    """Запись, расчёт которой вернёт ошибку (не прерывает поток)."""
+    return rec_id, {"__error__": message}, []
+
+
+def iter_jsonl(f: TextIO, engine: str = "desktop") -> Iterator[Record]:
+    """Здания из JSONL; пустые строки пропускаются, ошибка строки — запись с ошибкой."""
+    for lineno, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            rec = json.loads(line)
+            rec_id = rec.get("id", lineno)
+            spans = rec["spans"]
+            if engine == "desktop":
+                gp, spans = fill_case(rec.get("gp"), spans)
+            else:
+                gp = {"length": rec["length"]}
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            yield _error_record(lineno, f"строка {lineno}: {type(e).__name__}: {e}")
+            continue
+        yield rec_id, gp, spans
+
+
+def iter_csv(f: TextIO, engine: str = "desktop") -> Iterator[Record]:
+    """Здания из CSV: строка на пролёт, группировка подряд идущих строк по id."""
+    gp_types = _gp_field_types(engine)
+    sp_types = _span_field_types(engine)
+    reader = csv.DictReader(f)
+    has_id = "id" in (reader.fieldnames or [])
+    cur_id: Any = None
+    gp: Dict[str, Any] = {}
+    spans: List[Dict[str, Any]] = []
+    error: Optional[str] = None
+
+    def _row(row: Dict[str, str], lineno: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        g = dict(DEFAULT_GP) if engine == "desktop" else {}
+        s = dict(DEFAULT_SPAN) if engine == "desktop" else {}
+        for k, v in row.items():
+            if k is None or k == "id" or v is None:
+                continue
+            if v.strip() == "" and engine == "desktop":
+                continue
+            if k in gp_types:
+                g[k] = _convert(v, gp_types[k])
+            elif k in sp_types:
+                s[k] = _convert(v, sp_types[k])
+            else:
+                raise ValueError(f"Неизвестный столбец: {k}")
+        return g, s
+
+    for lineno, row in enumerate(reader, 2):
+        rec_id = row.get("id") if has_id else lineno
+        if spans or error:
+            if not has_id or rec_id != cur_id:
+                yield _error_record(cur_id, error) if error else (cur_id, gp, spans)
+                gp, spans, error = {}, [], None
+        cur_id = rec_id
+        if error:
+            continue
+        try:
+            g, s = _row(row, lineno)
+        except ValueError as e:
+            error = f"строка {lineno}: {e}"
+            continue
+        if not spans:
+            gp = g
+        spans.append(s)
+    if spans or error:
+        yield _error_record(cur_id, error) if error else (cur_id, gp, spans)
+
+
+# ─── Расчёт ───────────────────────────────────────────────────────────────────
+
+_logic_calc = None  # CalculatorLogic процесса: таблицы и кэш пролётов — один раз на процесс
+
+
+def _evaluate(engine: str, gp: Dict[str, Any], spans: List[Dict[str, Any]],
+              store: Optional[ResultStore] = None) -> Dict[str, Any]:
+    """Расчёт одного здания (выполняется в рабочем процессе)."""
+    if "__error__" in gp:
+        raise ValueError(gp["__error__"])
+    if engine == "desktop":
+        from metal_core import calculate
+        return calculate(gp, spans, store=store)
+    global _logic_calc
+    from calculator_logic import CalculatorLogic, InputParams, SpanParams
+    if _logic_calc is None:
+        _logic_calc = CalculatorLogic()
+    res = _logic_calc.calculate(InputParams(gp["length"], [SpanParams(**sp) for sp in spans]))
+    res.pop("_traceback", None)
+    return res
+
+
+def evaluate_records(records: Iterable[Record], engine: str = "desktop", workers: int = 1,
+                     chunksize: int = 64, cache: Optional[LRUMemo] = None,
+                     store: Optional[ResultStore] = None) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+    """
+    (id, результат) в порядке входа; ошибка здания — {"_error": ...}.
+    cache (движок desktop) — кэш результатов по metal_core.case_key: повтор
+    здания, в том числе ещё считающегося, в расчёт не уходит.
+    store (движок desktop) — дисковое хранилище результатов; рабочие процессы
+    читают и пишут его сами.
+    Вход читается не дальше окна workers*chunksize*2 записей от первой
+    невыданной: длинный ряд повторов не вычитывает вход целиком.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Неизвестный движок: {engine}")
+    if engine != "desktop":
+        cache = store = None
+    # Записи «в полёте» — не больше window: [id, ключ, результат, ушла в расчёт, gp, spans]
+    queue: Deque[list] = deque()
+    inflight: set = set()   # ключи зданий, отправленных в расчёт
+    func = functools.partial(_evaluate, engine, store=store)
+    window = (workers or os.cpu_count() or 1) * chunksize * 2
+    records = iter(records)
+    more = True
+
+    def cases():
+        """Промахи кэша для run_cases; на полном окне — конец сегмента."""
+        nonlocal more
+        while len(queue) < window:
+            rec = next(records, _MISSING)
+            if rec is _MISSING:
+                more = False
+                return
+            rec_id, gp, spans = rec
+            key = None
+            if cache is not None and "__error__" not in gp:
+                try:
+                    key = case_key(gp, spans)
+                except (KeyError, TypeError, ValueError):
+                    key = None   # неполное здание — ошибку вернёт расчёт
+            if key is not None:
+                hit = cache.get(key, _MISSING)
+                if hit is not _MISSING or key in inflight:
+                    queue.append([rec_id, key, hit, False, gp, spans])
+                    continue
+                inflight.add(key)
+            queue.append([rec_id, key, None, True, gp, spans])
+            yield gp, spans
+
+    def ready():
+        """Записи из кэша в голове очереди."""
+        while queue and not queue[0][3]:
+            rec_id, key, res, _, gp, spans = queue.popleft()
+            if res is _MISSING:   # повтор считавшегося здания
+                res = cache.get(key, _MISSING)
+                if res is _MISSING:   # оригинал с ошибкой или уже вытеснен
+                    res = _run_chunk(func, [(gp, spans)])[0]
+            yield rec_id, res
+
+    # Окно заполнили повторы — run_cases досчитывает начатое, очередь
+    # выдаётся целиком, и чтение продолжается новым сегментом.
+    while more:
+        for r in run_cases(cases(), func=func, workers=workers, chunksize=chunksize):
+            yield from ready()
+            rec_id, key = queue.popleft()[:2]
+            if key is not None:
+                inflight.discard(key)
+                if "_error" not in r.result:
+                    cache.put(key, r.result)
+            yield rec_id, r.result
+        yield from ready()
+
+
+# ─── Вывод ────────────────────────────────────────────────────────────────────
+
+def _summary(engine: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    if engine == "desktop":
+        return dict(result.get("итого", {}))
+    return {"total_kg": result.get("_total_kg"), "area": result.get("_area"), "kg_m2": result.get("_kg_m2")}
+
+
+def write_results(results: Iterable[Tuple[Any, Dict[str, Any]]], out: TextIO,
+                  fmt: str = "jsonl", engine: str = "desktop") -> int:
+    """Пишет результаты построчно (со сбросом буфера); возвращает число ошибок."""
+    errors = 0
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(out, ["id"] + CSV_COLUMNS[engine] + ["error"], extrasaction="ignore")
+        writer.writeheader()
+    for rec_id, res in results:
+        err = res.get("_error")
+        errors += err is not None
+        if writer is not None:
+            row = {"id": rec_id, "error": err or ""}
+            if err is None:
+                row.update(_summary(engine, res))
+            writer.writerow(row)
+        else:
+            rec = {"id": rec_id, "error": err} if err is not None else {"id": rec_id, "result": res}
+            out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        out.flush()
+    return errors
+
+
+# ─── CLI ──────────────────────────────────────────────────────────────────────
+
+def _input_format(path: str, explicit: Optional[str]) -> str:
+    if explicit:
+        return explicit
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="batch_cli",
+        description="Пакетный расчёт металлоёмкости зданий (JSONL/CSV -> JSONL/CSV).")
+    p.add_argument("input", nargs="?", default="-", help="файл входа или «-» для stdin (по умолчанию)")
+    p.add_argument("-o", "--output", default="-", help="файл результатов или «-» для stdout (по умолчанию)")
+    p.add_argument("--input-format", choices=FORMATS, help="формат входа (по умолчанию — по расширению, иначе jsonl)")
+    p.add_argument("-f", "--format", choices=FORMATS, default="jsonl", help="формат вывода (jsonl — полный результат, csv — итоги)")
+    p.add_argument("-e", "--engine", choices=ENGINES, default="desktop",
+                   help="desktop — metal_core.calculate, logic — CalculatorLogic.calculate")
+    p.add_argument("-j", "--workers", type=int, default=1, help="число процессов (0 — по числу ядер)")
+    p.add_argument("--chunksize", type=int, default=64, help="зданий в одной пачке для процесса")
+    p.add_argument("--cache", type=int, default=RESULT_CACHE_MAX,
+                   help="размер кэша результатов одинаковых зданий (0 — без кэша)")
+    p.add_argument("--cache-ttl", type=float, help="время жизни записи кэша, с")
+    p.add_argument("--store", help="файл sqlite с результатами: готовое берётся оттуда, новое дописывается")
+    return p
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Код возврата: 0 — все здания посчитаны, 1 — были ошибки, 2 — ошибка аргументов."""
+    args = build_parser().parse_args(argv)
+    if args.workers < 0 or args.chunksize < 1 or args.cache < 0 or (args.cache_ttl is not None and args.cache_ttl <= 0):
+        print("workers >= 0, chunksize >= 1, cache >= 0, cache-ttl > 0", file=sys.stderr)
+        return 2
+    cache = LRUMemo(args.cache, ttl=args.cache_ttl) if args.cache else None
+    store = ResultStore(args.store) if args.store else None
+    in_fmt = _input_format(args.input, args.input_format)
+    fin = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8-sig", newline="")
+    fout = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        reader = iter_csv if in_fmt == "csv" else iter_jsonl
+        records = reader(fin, args.engine)
+        results = evaluate_records(records, args.engine, workers=args.workers or None,
+                                   chunksize=args.chunksize, cache=cache, store=store)
+        errors = write_results(results, fout, args.format, args.engine)
+    finally:
+        if fin is not sys.stdin:
+            fin.close()
+        if fout is not sys.stdout:
+            fout.close()
+        if store is not None:
+            store.close()
+    if errors:
+        print(f"Ошибок: {errors}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+Локальный расчётный сервис: HTTP/JSON поверх asyncio (только stdlib).
+
+Эндпоинты:
+    GET  /health                      — состояние, число процессов, статистика пачек
+    POST /calculate                   — {"gp": {...}, "spans": [...]} -> {"result": {...}}
+    POST /batch                       — {"cases": [{"gp", "spans"}, ...]} -> {"results": [...]}
+    GET  /estakada/pipe | /elec       — конфигурации эстакад (estakada_data)
+    POST /estakada/pipe | /elec       — {"num": "3а", "length": 120} -> итого металла, т
+Недостающие поля gp и пролётов берутся из значений по умолчанию GUI.
+
+Расчёт — в заранее прогретом пуле процессов (ядро metal_core импортировано,
+таблицы поиска и кэш пролётов готовы). Одновременные мелкие запросы
+/calculate собираются в пачку (MicroBatcher) и уходят в процесс одним
+заданием — накладные расходы на передачу между процессами делятся на всю
+пачку. workers=0 — расчёт в процессе сервиса, без пула.
+
+Запуск:
+    python calc_service.py --port 8765 --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from estakada_data import ESTAKADA_CONFIGS, estakada_total_t, find_config
+from sweep import DEFAULT_GP, DEFAULT_SPAN, Case, _run_chunk, fill_case
+
+MAX_BODY = 16 * 1024 * 1024    # байт в теле запроса
+MAX_BATCH_CASES = 10000        # вариантов в одном запросе /batch
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# ─── Рабочие процессы ─────────────────────────────────────────────────────────
+
+def _warm_worker() -> None:
+    """Инициализатор процесса: импорт ядра и пробный расчёт (таблицы, кэш)."""
+    from metal_core import calculate
+    calculate(DEFAULT_GP, [DEFAULT_SPAN])
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _calc_chunk(chunk: List[Case]) -> List[Dict[str, Any]]:
+    """Пачка вариантов в рабочем процессе; ошибка варианта — {"_error": ...}."""
+    return _run_chunk(None, chunk)
+
+
+# ─── Сбор запросов в пачки ────────────────────────────────────────────────────
+
+class MicroBatcher:
+    """
+    Копит варианты от одновременных запросов и отдаёт их run() пачками
+    до max_batch. Пачка уходит в том же проходе цикла событий, в котором
+    пришли запросы (без таймера — простаивающий сервис не добавляет
+    задержки); если в работе уже max_inflight пачек, варианты ждут
+    освобождения и уходят следующей, более крупной пачкой.
+    """
+
+    def __init__(self, run, max_batch: int = 64, max_inflight: int = 1):
+        if max_batch < 1 or max_inflight < 1:
+            raise ValueError("max_batch и max_inflight должны быть >= 1")
+        self._run = run
+        self.max_batch = max_batch
+        self.max_inflight = max_inflight
+        self._pending: List[Tuple[Case, asyncio.Future]] = []
+        self._scheduled = False
+        self._tasks: set = set()
+        self.batches = 0
+        self.cases = 0
+
+    async def submit(self, case: Case) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((case, fut))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        self._scheduled = False
+        loop = asyncio.get_running_loop()
+        while self._pending and len(self._tasks) < self.max_inflight:
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            self.batches += 1
+            self.cases += len(batch)
+            task = loop.create_task(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if self._pending:
+            self._flush()
+
+    async def _dispatch(self, batch: List[Tuple[Case, asyncio.Future]]) -> None:
+        try:
+            results = await self._run([case for case, _ in batch])
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, fut), res in zip(batch, results):
+            if not fut.done():
+                fut.set_result(res)
+
+    async def drain(self) -> None:
+        """Дождаться всех накопленных и отправленных пачек."""
+        while self._pending or self._tasks:
+            self._flush()
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+# ─── Сервис ───────────────────────────────────────────────────────────────────
+
+def _parse_case(obj: Any) -> Case:
+    if not isinstance(obj, dict) or not isinstance(obj.get("spans"), list) or not obj["spans"]:
+        raise HTTPError(400, "Ожидается объект с непустым списком spans")
+    gp = obj.get("gp") or {}
+    if not isinstance(gp, dict) or not all(isinstance(sp, dict) for sp in obj["spans"]):
+        raise HTTPError(400, "gp и элементы spans должны быть объектами")
+    return fill_case(gp, obj["spans"])
+
+
+def _wrap(res: Dict[str, Any]) -> Dict[str, Any]:
+    return {"error": res["_error"]} if "_error" in res else {"result": res}
+
+
+class CalcService:
+    """HTTP-сервис расчёта; start() — запуск, close() — остановка с пулом."""
+
+    def __init__(self, workers: int = 0, max_batch: int = 64):
+        if workers < 0:
+            raise ValueError("workers должен быть >= 0")
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._conns: Dict[asyncio.Task, asyncio.StreamWriter] = {}  # открытые соединения
+        self.batcher = MicroBatcher(self._run_cases, max_batch, max_inflight=workers or 1)
+
+    async def _run_cases(self, cases: List[Case]) -> List[Dict[str, Any]]:
+        if self._pool is None:
+            return _calc_chunk(cases)
+        return await asyncio.get_running_loop().run_in_executor(self._pool, _calc_chunk, cases)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        if self.workers:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+            loop = asyncio.get_running_loop()
+            # процессы пула создаются лениво — поднимаем и прогреваем все до первого запроса
+            await asyncio.gather(*(loop.run_in_executor(self._pool, _ping) for _ in range(self.workers)))
+        else:
+            _warm_worker()
+        self._server = await asyncio.start_server(self._handle_conn, host, port)
+        return self._server
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in self._conns.values():
+                writer.close()
+            await asyncio.gather(*self._conns, return_exceptions=True)
+            await self._server.wait_closed()
+        await self.batcher.drain()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    # ── маршруты ─────────────────────────────────────────────────────────────
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        """(код, JSON-ответ) для запроса; ошибки — {"error": ...}."""
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError as e:
+            return 400, {"error": f"Некорректный JSON: {e}"}
+        try:
+            return await self._route(method, path.split("?", 1)[0].rstrip("/") or "/", payload)
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+
+    async def _route(self, method: str, path: str, payload: Any) -> Tuple[int, Dict[str, Any]]:
+        if path == "/health":
+            self._allow(method, "GET")
+            return 200, {"status": "ok", "workers": self.workers,
+                         "batches": self.batcher.batches, "cases": self.batcher.cases}
+        if path == "/calculate":
+            self._allow(method, "POST")
+            out = _wrap(await self.batcher.submit(_parse_case(payload)))
+            return (422 if "error" in out else 200), out
+        if path == "/batch":
+            self._allow(method, "POST")
+            return 200, {"results": await self._batch(payload)}
+        if path.startswith("/estakada/") and path[len("/estakada/"):] in ESTAKADA_CONFIGS:
+            kind = path[len("/estakada/"):]
+            if method == "GET":
+                return 200, {"configs": ESTAKADA_CONFIGS[kind]}
+            self._allow(method, "POST")
+            return 200, self._estakada(kind, payload)
+        raise HTTPError(404, f"Нет такого адреса: {path}")
+
+    @staticmethod
+    def _allow(method: str, expected: str) -> None:
+        if method != expected:
+            raise HTTPError(405, f"Ожидается метод {expected}")
+
+    async def _batch(self, payload: Any) -> List[Dict[str, Any]]:
+        cases = payload.get("cases") if isinstance(payload, dict) else None
+        if not isinstance(cases, list):
+            raise HTTPError(400, "Ожидается объект со списком cases")
+        if len(cases) > MAX_BATCH_CASES:
+            raise HTTPError(413, f"Больше {MAX_BATCH_CASES} вариантов в запросе")
+        parsed = [_parse_case(c) for c in cases]
+        # большой запрос режется на пачки — по процессам пула параллельно
+        n = self.batcher.max_batch
+        parts = await asyncio.gather(*(self._run_cases(parsed[i:i + n]) for i in range(0, len(parsed), n)))
+        return [_wrap(res) for part in parts for res in part]
+
+    @staticmethod
+    def _estakada(kind: str, payload: Any) -> Dict[str, Any]:
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Ожидается объект {num, length}")
+        try:
+            cfg = find_config(kind, str(payload.get("num")))
+            length = float(payload.get("length", 0))
+        except KeyError as e:
+            raise HTTPError(404, e.args[0])
+        except (TypeError, ValueError):
+            raise HTTPError(400, "length должна быть числом")
+        if length <= 0:
+            raise HTTPError(400, "Длина эстакады должна быть > 0")
+        return {"num": cfg["num"], "kg_m": cfg["kg_m"], "length": length,
+                "total_t": estakada_total_t(cfg, length)}
+
+    # ── HTTP/1.1 ─────────────────────────────────────────────────────────────
+    async def _handle_conn(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._conns[task] = writer
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    method, target, version = line.decode("latin-1").split()
+                except ValueError:
+                    self._respond(writer, 400, {"error": "Некорректная строка запроса"}, False)
+                    break
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                try:
+                    n = int(headers.get("content-length", "0"))
+                except ValueError:
+                    n = -1
+                if not 0 <= n <= MAX_BODY:
+                    self._respond(writer, 413 if n > 0 else 400, {"error": "Некорректная длина тела"}, False)
+                    break
+                body = await reader.readexactly(n) if n else b""
+                conn = headers.get("connection", "").lower()
+                keep = conn == "keep-alive" if version == "HTTP/1.0" else conn != "close"
+                try:
+                    status, payload = await self.dispatch(method, target, body)
+                except Exception as e:
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                self._respond(writer, status, payload, keep)
+                await writer.drain()
+                if not keep:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._conns.pop(task, None)
+            writer.close()
+
+    @staticmethod
+    def _respond(writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any], keep: bool) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + data)
+
+
+# ─── CLI ──────────────────────────────────────────────────────────────────────
+
+async def _serve(args: argparse.Namespace) -> None:
+    service = CalcService(args.workers, args.max_batch)
+    server = await service.start(args.host, args.port)
+    print(f"Сервис расчёта: http://{args.host}:{service.port} (процессов: {args.workers})", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(prog="calc_service", description="Локальный HTTP/JSON-сервис расчёта металлоёмкости.")
+    p.add_argument("--host", default="127.0.0.1", help="адрес (по умолчанию только localhost)")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                   help="процессов в пуле (0 — считать в процессе сервиса)")
+    p.add_argument("--max-batch", type=int, default=64, help="вариантов в пачке")
+    args = p.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,22 +5,32 @@
 Метод 2: чтение таблиц (xlsx, docx).
 """
 
+import operator
 import os
-from typing import Dict, Optional, Tuple, Any, List
-from dataclasses import dataclass
-
-# Импорт парсеров таблиц
-try:
-    from table_parsers import (
-        parse_coverage_xlsx_full,
-        read_xlsx_fachwerk,
-        read_docx_crane_beams,
-        read_docx_brake,
-        get_project_root,
-    )
-except ImportError:
-    parse_coverage_xlsx_full = read_xlsx_fachwerk = read_docx_crane_beams = read_docx_brake = None
-    get_project_root = lambda: os.path.dirname(os.path.abspath(__file__))
+from array import array
+from typing import Dict, Optional, Tuple, Any, List, Iterable, Mapping, Sequence, Callable
+from dataclasses import dataclass, fields
+
+from table_lookup import CeilLookup, cached_lookup
+from memo import LRUMemo, SPAN_MEMO_MAX
+
+
+def get_project_root() -> str:
+    """Корневая папка проекта."""
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def _table_parsers():
+    """
+    Модуль парсеров таблиц Метода 2 или None. Импортируется при первой
+    загрузке таблиц, а не при импорте calculator_logic: расчёт по Методу 1
+    и воркеры, которым таблицы не нужны, не платят за zipfile/xml.
+    """
+    try:
+        import table_parsers
+    except ImportError:
+        return None
+    return table_parsers
 
 
 @dataclass
@@ -45,6 +55,161 @@ class SpanParams:
     building_type: str     # Тип здания для опор трубопроводов
 
 
+SPAN_FIELDS = tuple(f.name for f in fields(SpanParams))
+_BOOL_FIELDS = frozenset(f.name for f in fields(SpanParams) if f.type is bool)
+_TABLE_ATTRS = ('_coverage_data', '_fachwerk_data', '_crane_beams', '_brake')
+
+
+def span_key(sp: SpanParams) -> Tuple:
+    """Канонический хэшируемый ключ пролёта (значения всех полей SpanParams по порядку)."""
+    return tuple(getattr(sp, f) for f in SPAN_FIELDS)
+
+
+# Типы столбцов SpanBatch: float -> 'd', int -> 'q', bool -> 'b', str -> коды категорий 'i'
+_BATCH_TYPECODES = {float: 'd', int: 'q', bool: 'b', str: 'i'}
+# Форматы буферов, принимаемых без копии: тип поля -> (форматы struct, размер элемента)
+_BATCH_BUFFERS = {float: ('d', 8), int: ('q', 'l', 8), bool: ('b', 'B', '?', 1)}
+
+
+def _batch_buffer_ok(mv: memoryview, ftype: type) -> bool:
+    *formats, itemsize = _BATCH_BUFFERS[ftype]
+    return mv.ndim == 1 and mv.format.lstrip('@') in formats and mv.itemsize == itemsize
+
+
+def _batch_int(name: str, v: Any) -> int:
+    """Целое значение столбца; дробное с целым значением (1.0) допускается."""
+    try:
+        return operator.index(v)
+    except TypeError:
+        fv = float(v)
+        if not fv.is_integer():
+            raise ValueError(f"{name}: нецелое значение {v!r}") from None
+        return int(fv)
+
+
+class SpanBatch:
+    """
+    Пролёты в столбцовом виде (struct-of-arrays).
+
+    Числовые поля — array/memoryview, строковые — коды категорий
+    (столбец кодов + список категорий). Одномерные буферы (array, memoryview,
+    numpy) принимаются без копирования, если элементы подходят полю: float64
+    для дробных, 8-байтовые целые для целых, 1-байтовые (bool, int8, uint8)
+    для логических. Остальное копируется в array; целые поля принимают
+    и дробные значения без дробной части (столбец pandas с NaN — float64).
+    """
+
+    def __init__(self, columns: Dict[str, Any], categories: Dict[str, List[str]]):
+        self._columns = columns
+        self.categories = categories
+        sizes = {len(c) for c in columns.values()}
+        if len(sizes) > 1:
+            raise ValueError(f"Столбцы разной длины: {sorted(sizes)}")
+        self._n = sizes.pop() if sizes else 0
+
+    # ── построение ───────────────────────────────────────────────────────────
+    @classmethod
+    def from_spans(cls, spans: Sequence[SpanParams]) -> 'SpanBatch':
+        """Из списка SpanParams."""
+        return cls.from_columns({f: [getattr(sp, f) for sp in spans] for f in SPAN_FIELDS})
+
+    @classmethod
+    def from_columns(cls, data: Mapping[str, Any]) -> 'SpanBatch':
+        """
+        Из словаря столбцов {поле: последовательность}.
+        Числовой буфер подходящего формата хранится как memoryview (без копии).
+        """
+        missing = [f for f in SPAN_FIELDS if f not in data]
+        if missing:
+            raise KeyError(f"Нет столбцов: {', '.join(missing)}")
+        columns: Dict[str, Any] = {}
+        categories: Dict[str, List[str]] = {}
+        for f in fields(SpanParams):
+            code = _BATCH_TYPECODES[f.type]
+            col = data[f.name]
+            if f.type is str:
+                cats: Dict[str, int] = {}
+                codes = array(code, (cats.setdefault(str(v), len(cats)) for v in col))
+                columns[f.name] = codes
+                categories[f.name] = list(cats)
+                continue
+            try:
+                mv = memoryview(col)
+            except TypeError:
+                mv = None
+            if mv is not None and _batch_buffer_ok(mv, f.type):
+                columns[f.name] = mv
+                continue
+            try:
+                columns[f.name] = array(code, col)
+            except TypeError:
+                if f.type is float:
+                    raise
+                columns[f.name] = array(code, (_batch_int(f.name, v) for v in col))
+        return cls(columns, categories)
+
+    @classmethod
+    def from_table(cls, table: Any) -> 'SpanBatch':
+        """
+        Из таблицы pandas (DataFrame) или Arrow (Table): столбцы по именам полей.
+        Используется to_numpy() столбца, если он есть.
+        """
+        data = {}
+        for f in SPAN_FIELDS:
+            col = table.column(f) if hasattr(table, 'column_names') else table[f]
+            if hasattr(col, 'to_numpy'):
+                col = col.to_numpy()
+            data[f] = col
+        return cls.from_columns(data)
+
+    # ── доступ ───────────────────────────────────────────────────────────────
+    def __len__(self) -> int:
+        return self._n
+
+    def column(self, name: str) -> Any:
+        """Столбец поля (для строковых полей — коды категорий)."""
+        return self._columns[name]
+
+    def values(self, name: str) -> List[Any]:
+        """Значения поля списком (строковые поля декодируются)."""
+        col = self._columns[name]
+        cats = self.categories.get(name)
+        if cats is not None:
+            return [cats[c] for c in col]
+        if name in _BOOL_FIELDS:
+            return [bool(v) for v in col]
+        return col.tolist()
+
+    def rows(self) -> List[Tuple]:
+        """Строки как кортежи в порядке SPAN_FIELDS (совпадают с span_key)."""
+        return list(zip(*(self.values(f) for f in SPAN_FIELDS)))
+
+    def __getitem__(self, i: int) -> SpanParams:
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError(i)
+        return SpanParams(*(self._item(f, i) for f in SPAN_FIELDS))
+
+    def _item(self, name: str, i: int) -> Any:
+        v = self._columns[name][i]
+        cats = self.categories.get(name)
+        if cats is not None:
+            return cats[v]
+        return bool(v) if name in _BOOL_FIELDS else v
+
+    def to_spans(self) -> List[SpanParams]:
+        """Обратно в список SpanParams."""
+        return [SpanParams(*row) for row in self.rows()]
+
+    def groups(self) -> Dict[Tuple, List[int]]:
+        """Индексы строк, сгруппированные по одинаковым значениям всех полей."""
+        out: Dict[Tuple, List[int]] = {}
+        for i, row in enumerate(self.rows()):
+            out.setdefault(row, []).append(i)
+        return out
+
+
 class InputParams:
     """Входные параметры расчета (многопролётное здание)."""
 
@@ -77,6 +242,8 @@ H_F = 0.6      # м заглубление базы
 H_CRANE = 4.0  # м высота крана от рельса
 A_GAP = 0.3    # м зазор
 
+TABLES_DIR = "Тип 1 здания с кранами"  # папка с таблицами Метода 2
+
 # Таблица αпб по грузоподъемности (7К-8К / 1К-6К)
 ALPHA_PB_TABLE = {
     10: (0.45, 0.22), 20: (0.55, 0.27), 30: (0.65, 0.32), 50: (0.7, 0.35),
@@ -94,97 +261,95 @@ PROGON_12M = [(0.15, 381.6), (0.3, 576), (0.45, 664.8), (0.65, 763.2), (0.2, 394
               (1.2, 901.2), (1.4, 986.4), (2.0, 1153.2), (0.63, 285), (0.81, 340), (1.13, 395), (1.68, 550), (1.85, 590), (3.22, 780)]
 
 
+# Скомпилированные ступенчатые таблицы (сортировка — один раз при импорте)
+_PROGON_6M_LKP = CeilLookup.from_pairs(PROGON_6M)
+_PROGON_12M_LKP = CeilLookup.from_pairs(PROGON_12M)
+_ALPHA_PB_KEYS = list(ALPHA_PB_TABLE)
+_ALPHA_PB_LKP = (  # [0] — 7К-8К, [1] — 1К-6К
+    CeilLookup(_ALPHA_PB_KEYS, [ALPHA_PB_TABLE[k][0] for k in _ALPHA_PB_KEYS]),
+    CeilLookup(_ALPHA_PB_KEYS, [ALPHA_PB_TABLE[k][1] for k in _ALPHA_PB_KEYS]),
+)
+_Q_RAIL_LKP = CeilLookup([30, 50, 80, 320], [0.461, 0.598, 0.831, 1.135], above=1.417)
+_Q_CRANE_LKP = CeilLookup.from_dict(Q_CRANE_TABLE)
+_GPR_KEYS_LKP = CeilLookup([5, 10, 20, 32, 50, 80, 100, 125, 200, 400])  # г/п в таблицах docx
+_TRUSS_SPAN_LKP = CeilLookup([18, 24, 30, 36])                            # пролёты ферм в xlsx
+
+
 def _interpolate_table(table: list, q_pr: float) -> float:
     """Подбор массы прогона по таблице (ближайший больший q)."""
-    sorted_t = sorted(table, key=lambda x: x[0])
-    for q, m in sorted_t:
-        if q_pr <= q:
-            return m
-    return sorted_t[-1][1] if sorted_t else 0
+    if not table:
+        return 0
+    return cached_lookup(CeilLookup.from_pairs, table)(q_pr)
 
 
 def _get_alpha_pb(Q: float, mode: str = '7К-8К') -> float:
     """Коэффициент αпб по грузоподъемности.
     mode='7К-8К' → индекс 0; mode='1К-6К' → индекс 1."""
     idx = 0 if '7' in mode else 1  # '7' однозначно в '7К-8К', не в '1К-6К'
-    keys = sorted(ALPHA_PB_TABLE.keys())
-    for k in keys:
-        if Q <= k:
-            return ALPHA_PB_TABLE[k][idx]
-    return ALPHA_PB_TABLE[keys[-1]][idx]
+    return _ALPHA_PB_LKP[idx](Q)
 
 
 def _get_q_rail(Q: float) -> float:
     """Вес рельса по г/п, кН/м."""
-    if Q <= 30:
-        return 0.461
-    elif Q <= 50:
-        return 0.598
-    elif Q <= 80:
-        return 0.831
-    elif Q <= 320:
-        return 1.135
-    else:
-        return 1.417
+    return _Q_RAIL_LKP(Q)
 
 
 class CalculatorLogic:
     """Класс расчета металлоемкости."""
 
-    def __init__(self, project_root: Optional[str] = None):
+    def __init__(self, project_root: Optional[str] = None, memo_size: int = SPAN_MEMO_MAX):
         self.root = project_root or get_project_root()
         self._coverage_data = None
         self._fachwerk_data = None
         self._crane_beams = None
         self._brake = None
-
-    def _load_tables(self):
-        """Загрузка таблиц Метода 2."""
+        # Кэш результатов пролётов: (span_key, длина здания, версия таблиц) -> результат
+        self.span_memo = LRUMemo(memo_size)
+        self._table_refs: Tuple = ()
+        self._table_version = 0
+
+    def table_version(self) -> int:
+        """Версия набора таблиц: растёт, когда любая таблица заменена другим объектом."""
+        refs = tuple(getattr(self, a) for a in _TABLE_ATTRS)
+        if len(refs) != len(self._table_refs) or any(a is not b for a, b in zip(refs, self._table_refs)):
+            self._table_refs = refs  # ссылки держим: id старых таблиц не переиспользуется
+            self._table_version += 1
+        return self._table_version
+
+    def _table_paths(self, filename: str) -> List[str]:
+        """Возможные расположения файла таблицы (в порядке приоритета)."""
         base = self.root
-        coverage_paths = [
-            os.path.join(base, "металлоекмсоть покрытия.xlsx"),
-            os.path.join(base, "Металлоемкость", "Тип 1 здания с кранами", "металлоекмсоть покрытия.xlsx"),
-            os.path.join(os.path.expanduser("~/Desktop"), "Металлоемкость", "Тип 1 здания с кранами", "металлоекмсоть покрытия.xlsx"),
-        ]
-        fachwerk_paths = [
-            os.path.join(base, "Металлоёмкость фахверк.xlsx"),
-            os.path.join(base, "Металлоемкость", "Тип 1 здания с кранами", "Металлоёмкость фахверк.xlsx"),
-            os.path.join(os.path.expanduser("~/Desktop"), "Металлоемкость", "Тип 1 здания с кранами", "Металлоёмкость фахверк.xlsx"),
-        ]
-        crane_paths = [
-            os.path.join(base, "Таблица металлоемкости на подкрановые конструкции.docx"),
-            os.path.join(base, "Металлоемкость", "Тип 1 здания с кранами", "Таблица металлоемкости на подкрановые конструкции.docx"),
-            os.path.join(os.path.expanduser("~/Desktop"), "Металлоемкость", "Тип 1 здания с кранами", "Таблица металлоемкости на подкрановые конструкции.docx"),
+        return [
+            os.path.join(base, filename),
+            os.path.join(base, TABLES_DIR, filename),
+            os.path.join(base, "Металлоемкость", TABLES_DIR, filename),
+            os.path.join(os.path.expanduser("~/Desktop"), "Металлоемкость", TABLES_DIR, filename),
         ]
-        brake_paths = [
-            os.path.join(base, "Таблица металлоемкости на тормозные конструкции.docx"),
-            os.path.join(base, "Металлоемкость", "Тип 1 здания с кранами", "Таблица металлоемкости на тормозные конструкции.docx"),
-            os.path.join(os.path.expanduser("~/Desktop"), "Металлоемкость", "Тип 1 здания с кранами", "Таблица металлоемкости на тормозные конструкции.docx"),
-        ]
-        for p in coverage_paths:
-            if os.path.exists(p) and parse_coverage_xlsx_full:
-                self._coverage_data = parse_coverage_xlsx_full(p)
-                break
-        for p in fachwerk_paths:
-            if os.path.exists(p) and read_xlsx_fachwerk:
-                self._fachwerk_data = read_xlsx_fachwerk(p)
-                break
-        for p in crane_paths:
-            if os.path.exists(p) and read_docx_crane_beams:
-                self._crane_beams = read_docx_crane_beams(p)
-                break
-        for p in brake_paths:
-            if os.path.exists(p) and read_docx_brake:
-                self._brake = read_docx_brake(p)
-                break
+
+    def _load_tables(self):
+        """Загрузка таблиц Метода 2 (через кэш: повторные вызовы не разбирают файлы заново)."""
+        tp = _table_parsers()
+        if tp is None:
+            return
+        from table_cache import load_table
+        sources = (
+            ("_coverage_data", "металлоекмсоть покрытия.xlsx", tp.parse_coverage_xlsx_full),
+            ("_fachwerk_data", "Металлоёмкость фахверк.xlsx", tp.read_xlsx_fachwerk),
+            ("_crane_beams", "Таблица металлоемкости на подкрановые конструкции.docx", tp.read_docx_crane_beams),
+            ("_brake", "Таблица металлоемкости на тормозные конструкции.docx", tp.read_docx_brake),
+        )
+        for attr, filename, parser in sources:
+            for p in self._table_paths(filename):
+                if os.path.exists(p):
+                    setattr(self, attr, load_table(p, parser, version=tp.PARSERS_VERSION))
+                    break
 
     def calc_progony(self, sp: SpanParams, length: float) -> Dict[str, Any]:
         """Прогоны: только Метод 1."""
         g_sv_n = 0.2 if sp.truss_step_B == 6 else 0.3
         a_pr = 3.0  # шаг прогонов, м (стандартный для обоих типов ферм)
         q_pr = (sp.Q_roof + g_sv_n * GAMMA_F + sp.Q_snow * GAMMA_F_SNOW + sp.Q_dust * GAMMA_F_DUST + 1.0 * GAMMA_C_TECH) * a_pr * sp.yc
-        table = PROGON_6M if sp.truss_step_B == 6 else PROGON_12M
-        m_pr = _interpolate_table(table, q_pr)
+        m_pr = (_PROGON_6M_LKP if sp.truss_step_B == 6 else _PROGON_12M_LKP)(q_pr)
         # Количество прогонов в одном отсеке (шаг ферм B):
         # span_L / a_pr — число пролётов между прогонами, +1 — включая оба крайних прогона
         n_pr = int(sp.span_L / a_pr) + 1
@@ -215,7 +380,7 @@ class CalculatorLogic:
         if self._coverage_data and sp.truss_type in ('Двутавры', 'Молодечно'):
             q_obsh = ((sp.Q_snow + sp.Q_dust + sp.Q_roof + g_pr) / sp.truss_step_B) * sp.yc * 1000 / 9.81
             fermy = self._coverage_data.get('fermy', {})
-            span = min([s for s in [18, 24, 30, 36] if s >= sp.span_L], default=36)
+            span = _TRUSS_SPAN_LKP(sp.span_L)
             key = (sp.truss_type, span)
             tbl = fermy.get(key, {}) if isinstance(fermy, dict) else {}
             loads = sorted([k for k in tbl.keys() if tbl.get(k) is not None])
@@ -283,15 +448,13 @@ class CalculatorLogic:
         brake_kg = 0
         if self._brake:
             row_type = 'Средний' if n_cols > 2 else 'Крайний'
-            gpr_keys = [5, 10, 20, 32, 50, 80, 100, 125, 200, 400]
-            gpr = min([k for k in gpr_keys if k >= sp.crane_capacity], default=400)
+            gpr = _GPR_KEYS_LKP(sp.crane_capacity)
             key = (int(B), row_type, sp.brake_path, gpr, sp.crane_count)
             brake_per_m_78 = self._brake.get(key, 80 if sp.brake_path == 'Без прохода' else 100)
             brake_kg = brake_per_m_78 * mode_ratio * B * n_beams * 2
         beam_total = total_1
         if self._crane_beams:
-            gpr_keys = [5, 10, 20, 32, 50, 80, 100, 125, 200, 400]
-            gpr = min([k for k in gpr_keys if k >= sp.crane_capacity], default=400)
+            gpr = _GPR_KEYS_LKP(sp.crane_capacity)
             key = (int(B), gpr, sp.crane_count)
             G_pb_1_78 = (alpha_pb_78 * B + q_r) * B * K_PB
             beam_kg_m_78 = self._crane_beams.get(key, G_pb_1_78 / B)
@@ -333,7 +496,7 @@ class CalculatorLogic:
         G_kv_kN = (sum_F_v * RHO * PSI_K_TOP * H_v / K_M_TOP) / RY
         G_kv = G_kv_kN * 100  # кН -> кг
         G_st_n = G_ST * (H_n - H_F) * 1 * B
-        q_c = Q_CRANE_TABLE.get(min([k for k in Q_CRANE_TABLE if k >= sp.crane_capacity], default=300), 320)
+        q_c = _Q_CRANE_LKP(sp.crane_capacity)
         Dmax = q_c * B * 1.1 * 0.85 * 1.0
         sum_F_n = sum_F_v + Dmax + G_pb / 100 + G_st_n + G_kv_kN
         G_kn_kN = (sum_F_n * RHO * PSI_K_BOT * H_n / K_M_BOT) / RY
@@ -387,53 +550,53 @@ class CalculatorLogic:
         return {'method': 2, 'total_kg': total_kg}
 
     def _calc_span(self, sp: SpanParams, length: float) -> Dict[str, Any]:
-        """Цепочка per-span расчётов. Возвращает dict с результатами элементов."""
-        results = {}
-
-        # 1. Прогоны
-        r_pr = self.calc_progony(sp, length)
-        results['Прогоны'] = r_pr
-        g_pr = r_pr['kg_m2']
-
-        # 2. Связи по покрытию
-        r_sv = self.calc_svyazi_pokrytiya(sp, length)
-        results['Связи по покрытию'] = r_sv
-
-        # 3. Стропильные фермы
-        r_f = self.calc_stropilnye_fermy(sp, length, g_pr)
-        results['Стропильные фермы'] = r_f
-        g_f = r_f.get('method1_kg_m2', r_f.get('method2_kg_m2', 0))
-        if 'weight_for_formulas' in r_f:
-            g_f = r_f['weight_for_formulas'] / (sp.truss_step_B * sp.span_L)
-
-        # 4. Подстропильные (g_n в кН/м²)
-        g_pr_kN = g_pr / 1000 * 9.81 if g_pr > 1 else g_pr
-        g_f_kN = g_f / 1000 * 9.81 if g_f > 1 else g_f
-        g_n = sp.Q_roof + g_pr_kN + g_f_kN + sp.Q_snow + sp.Q_dust + 1.0
-        r_pf = self.calc_podstropilnye(sp, length, g_n, g_f)
-        results['Подстропильные фермы'] = r_pf
-        g_pf = r_pf.get('method1_kg', r_pf.get('method2_kg', 0)) if sp.column_step == 12 else 0
-
-        # 5. Подкрановые балки
-        r_pb = self.calc_podkranovye_balki(sp, length)
-        results['Подкрановые балки'] = r_pb
-        G_pb = r_pb.get('method1_kg_per_beam', 2500) if r_pb else 2500
-
-        # 6. Колонны
-        r_k = self.calc_columns(sp, length, g_pr_kN, g_f_kN, g_pf, G_pb)
-        results['Колонны'] = r_k
-
-        return results
+        """Цепочка per-span расчётов (граф SPAN_STAGES). Возвращает dict с результатами элементов."""
+        out: Dict[str, Any] = {}
+        for node in SPAN_STAGES:
+            out[node.name] = node.func(self, sp, length, out)
+        return {node.title: out[node.name] for node in SPAN_STAGES if node.title}
+
+    def _calc_span_memo(self, sp: SpanParams, length: float) -> Dict[str, Any]:
+        """_calc_span через span_memo; возвращает копию (кэшированный результат не изменяется)."""
+        key = (span_key(sp), length, self.table_version())
+        res = self.span_memo.get_or_compute(key, lambda: self._calc_span(sp, length))
+        return {k: dict(v) for k, v in res.items()}
 
     def calculate(self, p: InputParams) -> Dict[str, Any]:
         """Полный расчет. Возвращает итоговую таблицу."""
         self._load_tables()
+        return self._assemble(p, self._calc_span_memo)
+
+    def calculate_many(self, params: Iterable[InputParams]) -> List[Dict[str, Any]]:
+        """
+        Пакетный расчет: результат совпадает с [calculate(p) for p in params].
+        Таблицы загружаются один раз; пролёты с одинаковыми параметрами
+        (и длиной здания) считаются один раз (span_memo).
+        """
+        self._load_tables()
+        return [self._assemble(p, self._calc_span_memo) for p in params]
+
+    def calc_span_batch(self, batch: SpanBatch, length: float) -> List[Dict[str, Any]]:
+        """
+        Per-span расчёт для всех строк SpanBatch (порядок строк сохраняется).
+        Одинаковые строки считаются один раз.
+        """
+        self._load_tables()
+        out: List[Optional[Dict[str, Any]]] = [None] * len(batch)
+        for row, idx in batch.groups().items():
+            sp = SpanParams(*row)
+            for i in idx:
+                out[i] = self._calc_span_memo(sp, length)
+        return out
+
+    def _assemble(self, p: InputParams, span_fn) -> Dict[str, Any]:
+        """Расчет здания по уже загруженным таблицам; span_fn(sp, length) — расчёт пролёта."""
         results = {}
         try:
             span_results_list = []
             for i, sp in enumerate(p.spans):
                 span_name = f"Пролёт {i + 1} (L={sp.span_L:.0f}м)"
-                span_res = self._calc_span(sp, p.length)
+                span_res = span_fn(sp, p.length)
                 span_results_list.append((span_name, span_res))
 
             results['_spans'] = span_results_list
@@ -459,3 +622,135 @@ class CalculatorLogic:
             results['_error'] = str(e)
             results['_traceback'] = traceback.format_exc()
         return results
+
+
+# ─── Граф стадий расчёта пролёта ──────────────────────────────────────────────
+# Каждый узел: какие поля SpanParams и таблицы читает, от каких узлов зависит.
+# Все узлы зависят также от длины здания.
+
+@dataclass(frozen=True)
+class StageNode:
+    name: str                       # ключ узла
+    title: Optional[str]            # ключ в результатах (None — служебный узел)
+    func: Callable[['CalculatorLogic', SpanParams, float, Dict[str, Any]], Dict[str, Any]]
+    fields: Tuple[str, ...] = ()    # читаемые поля SpanParams
+    deps: Tuple[str, ...] = ()      # узлы-предки (их выходы — в аргументе up)
+    tables: Tuple[str, ...] = ()    # атрибуты таблиц CalculatorLogic
+
+
+def _st_progony(calc, sp, length, up):
+    return calc.calc_progony(sp, length)
+
+
+def _st_svyazi(calc, sp, length, up):
+    return calc.calc_svyazi_pokrytiya(sp, length)
+
+
+def _st_fermy(calc, sp, length, up):
+    return calc.calc_stropilnye_fermy(sp, length, up['progony']['kg_m2'])
+
+
+def _st_loads(calc, sp, length, up):
+    """Погонные нагрузки для подстропильных ферм и колонн (g_n в кН/м²)."""
+    g_pr = up['progony']['kg_m2']
+    r_f = up['fermy']
+    g_f = r_f.get('method1_kg_m2', r_f.get('method2_kg_m2', 0))
+    if 'weight_for_formulas' in r_f:
+        g_f = r_f['weight_for_formulas'] / (sp.truss_step_B * sp.span_L)
+    g_pr_kN = g_pr / 1000 * 9.81 if g_pr > 1 else g_pr
+    g_f_kN = g_f / 1000 * 9.81 if g_f > 1 else g_f
+    g_n = sp.Q_roof + g_pr_kN + g_f_kN + sp.Q_snow + sp.Q_dust + 1.0
+    return {'g_f': g_f, 'g_pr_kN': g_pr_kN, 'g_f_kN': g_f_kN, 'g_n': g_n}
+
+
+def _st_podstropilnye(calc, sp, length, up):
+    return calc.calc_podstropilnye(sp, length, up['loads']['g_n'], up['loads']['g_f'])
+
+
+def _st_podkranovye(calc, sp, length, up):
+    return calc.calc_podkranovye_balki(sp, length)
+
+
+def _st_columns(calc, sp, length, up):
+    r_pf = up['podstropilnye']
+    g_pf = r_pf.get('method1_kg', r_pf.get('method2_kg', 0)) if sp.column_step == 12 else 0
+    r_pb = up['podkranovye']
+    G_pb = r_pb.get('method1_kg_per_beam', 2500) if r_pb else 2500
+    loads = up['loads']
+    return calc.calc_columns(sp, length, loads['g_pr_kN'], loads['g_f_kN'], g_pf, G_pb)
+
+
+_LOAD_FIELDS = ('Q_roof', 'Q_snow', 'Q_dust')
+
+SPAN_STAGES: Tuple[StageNode, ...] = (  # в топологическом порядке
+    StageNode('progony', 'Прогоны', _st_progony,
+              fields=('span_L', 'truss_step_B', 'yc') + _LOAD_FIELDS),
+    StageNode('svyazi', 'Связи по покрытию', _st_svyazi,
+              fields=('span_L', 'truss_step_B', 'crane_capacity'), tables=('_coverage_data',)),
+    StageNode('fermy', 'Стропильные фермы', _st_fermy,
+              fields=('span_L', 'truss_step_B', 'yc', 'truss_type') + _LOAD_FIELDS,
+              deps=('progony',), tables=('_coverage_data',)),
+    StageNode('loads', None, _st_loads,
+              fields=('span_L', 'truss_step_B') + _LOAD_FIELDS, deps=('progony', 'fermy')),
+    StageNode('podstropilnye', 'Подстропильные фермы', _st_podstropilnye,
+              fields=('span_L', 'column_step'), deps=('loads',), tables=('_coverage_data',)),
+    StageNode('podkranovye', 'Подкрановые балки', _st_podkranovye,
+              fields=('column_step', 'crane_capacity', 'crane_mode', 'crane_count', 'brake_path'),
+              tables=('_crane_beams', '_brake')),
+    StageNode('columns', 'Колонны', _st_columns,
+              fields=('span_L', 'column_step', 'rail_level', 'crane_capacity') + _LOAD_FIELDS,
+              deps=('loads', 'podstropilnye', 'podkranovye')),
+)
+
+
+class IncrementalCalculator:
+    """
+    Инкрементальный пересчёт здания по графу SPAN_STAGES.
+
+    Для каждого пролёта (по позиции) хранятся выходы узлов и отпечатки входов:
+    поля SpanParams узла, длина здания, таблицы. Узел пересчитывается, только
+    если изменился его отпечаток или пересчитан предок; last_recomputed —
+    список (пролёт, узел), пересчитанных последним вызовом calc_span/calculate.
+    """
+
+    def __init__(self, calc: Optional['CalculatorLogic'] = None):
+        self.calc = calc or CalculatorLogic()
+        self._slots: Dict[Any, Dict[str, Tuple[Tuple, Any, Tuple]]] = {}
+        self.last_recomputed: List[Tuple[Any, str]] = []
+
+    def calc_span(self, slot: Any, sp: SpanParams, length: float) -> Dict[str, Any]:
+        """Результаты пролёта slot (как CalculatorLogic._calc_span), с пересчётом только изменившегося."""
+        self.last_recomputed = []
+        return self._calc_slot(slot, sp, length)
+
+    def _calc_slot(self, slot: Any, sp: SpanParams, length: float) -> Dict[str, Any]:
+        cache = self._slots.setdefault(slot, {})
+        out: Dict[str, Any] = {}
+        dirty = set()
+        for node in SPAN_STAGES:
+            tables = tuple(getattr(self.calc, t) for t in node.tables)
+            fp = (tuple(getattr(sp, f) for f in node.fields), length, tuple(id(t) for t in tables))
+            entry = cache.get(node.name)
+            if entry is None or entry[0] != fp or any(d in dirty for d in node.deps):
+                # tables хранятся в записи, чтобы id() не мог переиспользоваться
+                entry = (fp, node.func(self.calc, sp, length, out), tables)
+                cache[node.name] = entry
+                dirty.add(node.name)
+                self.last_recomputed.append((slot, node.name))
+            out[node.name] = entry[1]
+        return {node.title: dict(out[node.name]) for node in SPAN_STAGES if node.title}
+
+    def calculate(self, p: InputParams) -> Dict[str, Any]:
+        """Полный расчёт (как CalculatorLogic.calculate); пролёты сопоставляются по позиции."""
+        self.calc._load_tables()
+        self.last_recomputed = []
+        slots = iter(range(len(p.spans)))
+        res = self.calc._assemble(p, lambda sp, length: self._calc_slot(next(slots), sp, length))
+        for slot in [k for k in self._slots if isinstance(k, int) and k >= len(p.spans)]:
+            del self._slots[slot]
+        return res
+
+    def reset(self) -> None:
+        """Сбросить кэш узлов."""
+        self._slots.clear()
+        self.last_recomputed = []
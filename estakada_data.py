@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+Данные эстакад без GUI: конфигурации трубопроводных (v3.2F) и
+электрокабельных (v4.2F) эстакад. Используются окнами estakada_pipe /
+estakada_elec и расчётным сервисом (calc_service.py).
+"""
+
+from typing import Any, Dict, List
+
+# ─────────────────────────────────────────────────────────────────────
+#  ДАННЫЕ (из mc_energfl.db 3.2F, таблица enrg_overpass)
+#  Поля: num_id, max_pipes, max_pipe_d_mm, std_load_kgm,
+#         svc_load_kgm, met_per_m_tm, pipes_low, pipes_high,
+#         factor_ind, factor_val, note
+# ─────────────────────────────────────────────────────────────────────
+PIPE_CONFIGS = [
+    {
+        "num":        "1",
+        "max_pipes":  2,
+        "max_d_mm":   500,
+        "std_load":   665.08,
+        "svc_load":   320,
+        "kg_m":       0.405,
+        "pipes_low":  1,
+        "pipes_high": 5,
+        "note":       "2 тр. от Ø159×6 до Ø530×10, шаг опор 12 м, h до низа 7 м",
+    },
+    {
+        "num":        "2",
+        "max_pipes":  2,
+        "max_d_mm":   1000,
+        "std_load":   2426.3,
+        "svc_load":   320,
+        "kg_m":       0.475,
+        "pipes_low":  1,
+        "pipes_high": 5,
+        "note":       "2 тр. от Ø530×6 до Ø1020×16, шаг опор 12 м, h до низа 7 м",
+    },
+    {
+        "num":        "3а",
+        "max_pipes":  6,
+        "max_d_mm":   500,
+        "std_load":   918.6,
+        "svc_load":   320,
+        "kg_m":       0.518,
+        "pipes_low":  6,
+        "pipes_high": 11,
+        "note":       "6 тр. от Ø159×9 до Ø325×9, шаг опор 12 м, h до низа 7 м",
+    },
+    {
+        "num":        "3б",
+        "max_pipes":  6,
+        "max_d_mm":   500,
+        "std_load":   1995.24,
+        "svc_load":   320,
+        "kg_m":       0.585,
+        "pipes_low":  6,
+        "pipes_high": 11,
+        "note":       "6 тр. от Ø325×9 и Ø530×10, шаг опор 12 м, h до низа 7 м",
+    },
+    {
+        "num":        "4",
+        "max_pipes":  6,
+        "max_d_mm":   1000,
+        "std_load":   3756.46,
+        "svc_load":   320,
+        "kg_m":       0.625,
+        "pipes_low":  6,
+        "pipes_high": 11,
+        "note":       "2 тр. Ø1020×16 + 4 тр. Ø530×10, шаг опор 12 м, h до низа 7 м",
+    },
+    {
+        "num":        "5",
+        "max_pipes":  6,
+        "max_d_mm":   2000,
+        "std_load":   5800.3,
+        "svc_load":   320,
+        "kg_m":       0.312,
+        "pipes_low":  6,
+        "pipes_high": 11,
+        "note":       "1 тр. Ø2040×20 + 5 тр. Ø530×10, шаг опор 12 м, h до низа 7 м",
+    },
+    {
+        "num":        "6",
+        "max_pipes":  6,
+        "max_d_mm":   3000,
+        "std_load":   10596.3,
+        "svc_load":   320,
+        "kg_m":       0.646,
+        "pipes_low":  6,
+        "pipes_high": 11,
+        "note":       "1 тр. Ø3050×25 + 5 тр. Ø530×10, шаг опор 12 м, h до низа 7 м",
+    },
+    {
+        "num":        "7",
+        "max_pipes":  4,
+        "max_d_mm":   500,
+        "std_load":   665.08,
+        "svc_load":   320,
+        "kg_m":       0.689,
+        "pipes_low":  4,
+        "pipes_high": 11,
+        "note":       "4 (2+2) тр. от Ø159×6 до Ø530×10, шаг опор 12 м, h до низа 7 м",
+    },
+    {
+        "num":        "8",
+        "max_pipes":  4,
+        "max_d_mm":   1000,
+        "std_load":   2426.3,
+        "svc_load":   320,
+        "kg_m":       0.829,
+        "pipes_low":  4,
+        "pipes_high": 11,
+        "note":       "4 (2+2) тр. от Ø530×6 до Ø1020×16, шаг опор 12 м, h до низа 7 м",
+    },
+    {
+        "num":        "9а",
+        "max_pipes":  6,
+        "max_d_mm":   500,
+        "std_load":   918.6,
+        "svc_load":   320,
+        "kg_m":       0.708,
+        "pipes_low":  12,
+        "pipes_high": 25,
+        "note":       "12 тр. от Ø159×9 до Ø325×9, шаг опор 12 м, h до низа 7 м",
+    },
+    {
+        "num":        "9б",
+        "max_pipes":  12,
+        "max_d_mm":   500,
+        "std_load":   1995.24,
+        "svc_load":   320,
+        "kg_m":       1.03,
+        "pipes_low":  12,
+        "pipes_high": 25,
+        "note":       "12 тр. от Ø325×9 до Ø530×10, шаг опор 12 м, h до низа 7 м",
+    },
+    {
+        "num":        "10",
+        "max_pipes":  12,
+        "max_d_mm":   1000,
+        "std_load":   3756.46,
+        "svc_load":   320,
+        "kg_m":       1.11,
+        "pipes_low":  12,
+        "pipes_high": 25,
+        "note":       "4 (2+2) тр. Ø1020×16 + 8 (4+4) тр. Ø530×10, шаг опор 12 м, h до низа 7 м",
+    },
+    {
+        "num":        "11",
+        "max_pipes":  12,
+        "max_d_mm":   2000,
+        "std_load":   5800.3,
+        "svc_load":   320,
+        "kg_m":       1.303,
+        "pipes_low":  12,
+        "pipes_high": 25,
+        "note":       "4 (2+2) тр. Ø1020×16 + 8 (4+4) тр. Ø530×10, шаг опор 12 м, h до низа 7 м",
+    },
+    {
+        "num":        "12",
+        "max_pipes":  12,
+        "max_d_mm":   3000,
+        "std_load":   10596.3,
+        "svc_load":   320,
+        "kg_m":       1.6,
+        "pipes_low":  12,
+        "pipes_high": 25,
+        "note":       "2(1+1) тр. Ø3050×25 + 10(5+5) тр. Ø530×10, шаг опор 12 м, h до низа 7 м",
+    },
+]
+
+
+# ─────────────────────────────────────────────────────────────────────
+#  ДАННЫЕ (из mc_electrica.db 4.2F, таблица electr_dict)
+#  type_id=0 — эстакада без прохода
+#  type_id=1 — галерея с проходом посередине
+# ─────────────────────────────────────────────────────────────────────
+ELEC_CONFIGS = [
+    # Эстакады без прохода (type_id=0)
+    {
+        "num":      "1",
+        "kg_m":     0.154,
+        "std_load": 150,
+        "svc_load": 0,
+        "type_id":  0,
+        "note":     "Без прохода, нагрузка до 150 кг/м, шаг опор 12 м, h до низа 5 м",
+    },
+    {
+        "num":      "2",
+        "kg_m":     0.191,
+        "std_load": 500,
+        "svc_load": 0,
+        "type_id":  0,
+        "note":     "Без прохода, нагрузка до 500 кг/м, шаг опор 12 м, h до низа 5 м",
+    },
+    {
+        "num":      "3",
+        "kg_m":     0.248,
+        "std_load": 1000,
+        "svc_load": 0,
+        "type_id":  0,
+        "note":     "Без прохода, нагрузка до 1000 кг/м, шаг опор 12 м, h до низа 5 м",
+    },
+    {
+        "num":      "4",
+        "kg_m":     0.317,
+        "std_load": 1500,
+        "svc_load": 0,
+        "type_id":  0,
+        "note":     "Без прохода, нагрузка до 1500 кг/м, шаг опор 12 м, h до низа 5 м",
+    },
+    # Галереи с проходом (type_id=1)
+    {
+        "num":      "5",
+        "kg_m":     0.379,
+        "std_load": 500,
+        "svc_load": 320,
+        "type_id":  1,
+        "note":     "С проходом посередине, нагрузка до 500 кг/м, шаг опор 12 м, h до низа 5 м",
+    },
+    {
+        "num":      "6",
+        "kg_m":     0.482,
+        "std_load": 1000,
+        "svc_load": 320,
+        "type_id":  1,
+        "note":     "С проходом посередине, нагрузка до 1000 кг/м, шаг опор 12 м, h до низа 5 м",
+    },
+    {
+        "num":      "7",
+        "kg_m":     0.493,
+        "std_load": 1500,
+        "svc_load": 320,
+        "type_id":  1,
+        "note":     "С проходом посередине, нагрузка до 1500 кг/м, шаг опор 12 м, h до низа 5 м",
+    },
+    {
+        "num":      "8",
+        "kg_m":     0.535,
+        "std_load": 2000,
+        "svc_load": 320,
+        "type_id":  1,
+        "note":     "С проходом посередине, нагрузка до 2000 кг/м, шаг опор 12 м, h до низа 5 м",
+    },
+    {
+        "num":      "9",
+        "kg_m":     0.604,
+        "std_load": 3000,
+        "svc_load": 320,
+        "type_id":  1,
+        "note":     "С проходом посередине, нагрузка до 3000 кг/м, шаг опор 12 м, h до низа 5 м",
+    },
+]
+
+ESTAKADA_CONFIGS: Dict[str, List[Dict[str, Any]]] = {"pipe": PIPE_CONFIGS, "elec": ELEC_CONFIGS}
+
+
+def find_config(kind: str, num: str) -> Dict[str, Any]:
+    """Конфигурация эстакады по виду ('pipe'/'elec') и номеру; KeyError, если нет."""
+    for c in ESTAKADA_CONFIGS[kind]:
+        if c["num"] == num:
+            return c
+    raise KeyError(f"Нет конфигурации № {num} ({kind})")
+
+
+def estakada_total_t(cfg: Dict[str, Any], length: float) -> float:
+    """Итого металла, т: металлоёмкость на 1 м.п. × длина."""
+    return cfg["kg_m"] * length
@@ -6,6 +6,7 @@
 import traceback
 import customtkinter as ctk
 from tkinter import messagebox
+from estakada_data import ELEC_CONFIGS as CONFIGS, estakada_total_t
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
@@ -16,88 +17,6 @@ FONT_RESULT = ("Courier New", 12)
 
 PAD = {"padx": 8, "pady": 4}
 
-# ─────────────────────────────────────────────────────────────────────
-#  ДАННЫЕ (из mc_electrica.db 4.2F, таблица electr_dict)
-#  type_id=0 — эстакада без прохода
-#  type_id=1 — галерея с проходом посередине
-# ─────────────────────────────────────────────────────────────────────
-CONFIGS = [
-    # Эстакады без прохода (type_id=0)
-    {
-        "num":      "1",
-        "kg_m":     0.154,
-        "std_load": 150,
-        "svc_load": 0,
-        "type_id":  0,
-        "note":     "Без прохода, нагрузка до 150 кг/м, шаг опор 12 м, h до низа 5 м",
-    },
-    {
-        "num":      "2",
-        "kg_m":     0.191,
-        "std_load": 500,
-        "svc_load": 0,
-        "type_id":  0,
-        "note":     "Без прохода, нагрузка до 500 кг/м, шаг опор 12 м, h до низа 5 м",
-    },
-    {
-        "num":      "3",
-        "kg_m":     0.248,
-        "std_load": 1000,
-        "svc_load": 0,
-        "type_id":  0,
-        "note":     "Без прохода, нагрузка до 1000 кг/м, шаг опор 12 м, h до низа 5 м",
-    },
-    {
-        "num":      "4",
-        "kg_m":     0.317,
-        "std_load": 1500,
-        "svc_load": 0,
-        "type_id":  0,
-        "note":     "Без прохода, нагрузка до 1500 кг/м, шаг опор 12 м, h до низа 5 м",
-    },
-    # Галереи с проходом (type_id=1)
-    {
-        "num":      "5",
-        "kg_m":     0.379,
-        "std_load": 500,
-        "svc_load": 320,
-        "type_id":  1,
-        "note":     "С проходом посередине, нагрузка до 500 кг/м, шаг опор 12 м, h до низа 5 м",
-    },
-    {
-        "num":      "6",
-        "kg_m":     0.482,
-        "std_load": 1000,
-        "svc_load": 320,
-        "type_id":  1,
-        "note":     "С проходом посередине, нагрузка до 1000 кг/м, шаг опор 12 м, h до низа 5 м",
-    },
-    {
-        "num":      "7",
-        "kg_m":     0.493,
-        "std_load": 1500,
-        "svc_load": 320,
-        "type_id":  1,
-        "note":     "С проходом посередине, нагрузка до 1500 кг/м, шаг опор 12 м, h до низа 5 м",
-    },
-    {
-        "num":      "8",
-        "kg_m":     0.535,
-        "std_load": 2000,
-        "svc_load": 320,
-        "type_id":  1,
-        "note":     "С проходом посередине, нагрузка до 2000 кг/м, шаг опор 12 м, h до низа 5 м",
-    },
-    {
-        "num":      "9",
-        "kg_m":     0.604,
-        "std_load": 3000,
-        "svc_load": 320,
-        "type_id":  1,
-        "note":     "С проходом посередине, нагрузка до 3000 кг/м, шаг опор 12 м, h до низа 5 м",
-    },
-]
-
 
 class FloatEntry(ctk.CTkEntry):
     def get_float(self, default=0.0):
@@ -260,7 +179,7 @@ class App(ctk.CTk):
                 messagebox.showwarning("Ошибка", "Введите длину эстакады > 0.")
                 return
             c = CONFIGS[self._selected_idx]
-            total_t = c["kg_m"] * length
+            total_t = estakada_total_t(c, length)
             type_name = (
                 "Эстакада (без прохода)"
                 if c["type_id"] == 0
@@ -6,6 +6,7 @@
 import traceback
 import customtkinter as ctk
 from tkinter import messagebox
+from estakada_data import PIPE_CONFIGS as CONFIGS, estakada_total_t
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
@@ -17,169 +18,6 @@ FONT_RESULT = ("Courier New", 12)
 
 PAD = {"padx": 8, "pady": 4}
 
-# ─────────────────────────────────────────────────────────────────────
-#  ДАННЫЕ (из mc_energfl.db 3.2F, таблица enrg_overpass)
-#  Поля: num_id, max_pipes, max_pipe_d_mm, std_load_kgm,
-#         svc_load_kgm, met_per_m_tm, pipes_low, pipes_high,
-#         factor_ind, factor_val, note
-# ─────────────────────────────────────────────────────────────────────
-CONFIGS = [
-    {
-        "num":        "1",
-        "max_pipes":  2,
-        "max_d_mm":   500,
-        "std_load":   665.08,
-        "svc_load":   320,
-        "kg_m":       0.405,
-        "pipes_low":  1,
-        "pipes_high": 5,
-        "note":       "2 тр. от Ø159×6 до Ø530×10, шаг опор 12 м, h до низа 7 м",
-    },
-    {
-        "num":        "2",
-        "max_pipes":  2,
-        "max_d_mm":   1000,
-        "std_load":   2426.3,
-        "svc_load":   320,
-        "kg_m":       0.475,
-        "pipes_low":  1,
-        "pipes_high": 5,
-        "note":       "2 тр. от Ø530×6 до Ø1020×16, шаг опор 12 м, h до низа 7 м",
-    },
-    {
-        "num":        "3а",
-        "max_pipes":  6,
-        "max_d_mm":   500,
-        "std_load":   918.6,
-        "svc_load":   320,
-        "kg_m":       0.518,
-        "pipes_low":  6,
-        "pipes_high": 11,
-        "note":       "6 тр. от Ø159×9 до Ø325×9, шаг опор 12 м, h до низа 7 м",
-    },
-    {
-        "num":        "3б",
-        "max_pipes":  6,
-        "max_d_mm":   500,
-        "std_load":   1995.24,
-        "svc_load":   320,
-        "kg_m":       0.585,
-        "pipes_low":  6,
-        "pipes_high": 11,
-        "note":       "6 тр. от Ø325×9 и Ø530×10, шаг опор 12 м, h до низа 7 м",
-    },
-    {
-        "num":        "4",
-        "max_pipes":  6,
-        "max_d_mm":   1000,
-        "std_load":   3756.46,
-        "svc_load":   320,
-        "kg_m":       0.625,
-        "pipes_low":  6,
-        "pipes_high": 11,
-        "note":       "2 тр. Ø1020×16 + 4 тр. Ø530×10, шаг опор 12 м, h до низа 7 м",
-    },
-    {
-        "num":        "5",
-        "max_pipes":  6,
-        "max_d_mm":   2000,
-        "std_load":   5800.3,
-        "svc_load":   320,
-        "kg_m":       0.312,
-        "pipes_low":  6,
-        "pipes_high": 11,
-        "note":       "1 тр. Ø2040×20 + 5 тр. Ø530×10, шаг опор 12 м, h до низа 7 м",
-    },
-    {
-        "num":        "6",
-        "max_pipes":  6,
-        "max_d_mm":   3000,
-        "std_load":   10596.3,
-        "svc_load":   320,
-        "kg_m":       0.646,
-        "pipes_low":  6,
-        "pipes_high": 11,
-        "note":       "1 тр. Ø3050×25 + 5 тр. Ø530×10, шаг опор 12 м, h до низа 7 м",
-    },
-    {
-        "num":        "7",
-        "max_pipes":  4,
-        "max_d_mm":   500,
-        "std_load":   665.08,
-        "svc_load":   320,
-        "kg_m":       0.689,
-        "pipes_low":  4,
-        "pipes_high": 11,
-        "note":       "4 (2+2) тр. от Ø159×6 до Ø530×10, шаг опор 12 м, h до низа 7 м",
-    },
-    {
-        "num":        "8",
-        "max_pipes":  4,
-        "max_d_mm":   1000,
-        "std_load":   2426.3,
-        "svc_load":   320,
-        "kg_m":       0.829,
-        "pipes_low":  4,
-        "pipes_high": 11,
-        "note":       "4 (2+2) тр. от Ø530×6 до Ø1020×16, шаг опор 12 м, h до низа 7 м",
-    },
-    {
-        "num":        "9а",
-        "max_pipes":  6,
-        "max_d_mm":   500,
-        "std_load":   918.6,
-        "svc_load":   320,
-        "kg_m":       0.708,
-        "pipes_low":  12,
-        "pipes_high": 25,
-        "note":       "12 тр. от Ø159×9 до Ø325×9, шаг опор 12 м, h до низа 7 м",
-    },
-    {
-        "num":        "9б",
-        "max_pipes":  12,
-        "max_d_mm":   500,
-        "std_load":   1995.24,
-        "svc_load":   320,
-        "kg_m":       1.03,
-        "pipes_low":  12,
-        "pipes_high": 25,
-        "note":       "12 тр. от Ø325×9 до Ø530×10, шаг опор 12 м, h до низа 7 м",
-    },
-    {
-        "num":        "10",
-        "max_pipes":  12,
-        "max_d_mm":   1000,
-        "std_load":   3756.46,
-        "svc_load":   320,
-        "kg_m":       1.11,
-        "pipes_low":  12,
-        "pipes_high": 25,
-        "note":       "4 (2+2) тр. Ø1020×16 + 8 (4+4) тр. Ø530×10, шаг опор 12 м, h до низа 7 м",
-    },
-    {
-        "num":        "11",
-        "max_pipes":  12,
-        "max_d_mm":   2000,
-        "std_load":   5800.3,
-        "svc_load":   320,
-        "kg_m":       1.303,
-        "pipes_low":  12,
-        "pipes_high": 25,
-        "note":       "4 (2+2) тр. Ø1020×16 + 8 (4+4) тр. Ø530×10, шаг опор 12 м, h до низа 7 м",
-    },
-    {
-        "num":        "12",
-        "max_pipes":  12,
-        "max_d_mm":   3000,
-        "std_load":   10596.3,
-        "svc_load":   320,
-        "kg_m":       1.6,
-        "pipes_low":  12,
-        "pipes_high": 25,
-        "note":       "2(1+1) тр. Ø3050×25 + 10(5+5) тр. Ø530×10, шаг опор 12 м, h до низа 7 м",
-    },
-]
-
 
 # ─────────────────────────────────────────────────────────────────────
 #  Вспомогательный виджет
@@ -336,7 +174,7 @@ class App(ctk.CTk):
                 messagebox.showwarning("Ошибка", "Введите длину эстакады > 0.")
                 return
             c = CONFIGS[self._selected_idx]
-            total_t = c["kg_m"] * length
+            total_t = estakada_total_t(c, length)
             sep = "─" * 68
             lines = [
                 "=" * 68,
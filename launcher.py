@@ -9,7 +9,8 @@ import customtkinter as ctk
 
 # При импорте модулей выполняется их код верхнего уровня
 # (set_appearance_mode, таблицы данных, константы) — это ожидаемо.
-from main_desktop import App as _MetalApp
+from main_desktop import App as _MetalApp, SPAN_DEFAULTS
+from span_model import SpanList
 from estakada_pipe import App as _PipeApp
 from estakada_elec import App as _ElecApp
 
@@ -33,23 +34,43 @@ FONT_SMALL = ("Segoe UI", 10)
 class MetalPanel(ctk.CTkToplevel):
     """Производственные здания с мостовыми кранами — v2.0 (многопролётная)."""
     # Все методы скопированы из v2.0 App; globals() у них остаются из main_desktop,
-    # поэтому SpanFrame, calculate(), ROOF_MATERIALS и пр. доступны автоматически.
+    # поэтому SpanFrame, calculate(), ROOF_MATERIALS и пр. доступны автоматически
+    # (расчёт и таблицы main_desktop импортирует из metal_core).
     _build_ui           = _MetalApp._build_ui
     _add_span           = _MetalApp._add_span
-    _remove_span        = _MetalApp._remove_span
     _read_global_params = _MetalApp._read_global_params
     _on_calculate       = _MetalApp._on_calculate
+    _on_calc_progress   = _MetalApp._on_calc_progress
+    _on_calc_done       = _MetalApp._on_calc_done
+    _on_calc_error      = _MetalApp._on_calc_error
+    _on_cancel          = _MetalApp._on_cancel
+    _init_jobs          = _MetalApp._init_jobs
+    _start_ui_pump      = _MetalApp._start_ui_pump
+    _pump_ui            = _MetalApp._pump_ui
+    _init_live          = _MetalApp._init_live
+    _on_input_changed   = _MetalApp._on_input_changed
+    _live_recalc        = _MetalApp._live_recalc
     _on_clear           = _MetalApp._on_clear
     _save_results       = _MetalApp._save_results
     _set_txt            = _MetalApp._set_txt
+    _format_results     = _MetalApp._format_results
+    _format_header      = _MetalApp._format_header
+    _format_summary     = _MetalApp._format_summary
+    _format_section     = _MetalApp._format_section
     _show_results       = _MetalApp._show_results
+    _begin_stream       = _MetalApp._begin_stream
+    _append_results     = _MetalApp._append_results
+    _end_stream         = _MetalApp._end_stream
 
     def __init__(self, master):
         super().__init__(master)
         self.title("Металлоёмкость производственных зданий — v2.0")
         self.geometry("1520x960")
         self.resizable(True, True)
-        self._span_frames = []
+        self._spans = SpanList(SPAN_DEFAULTS)
+        self._last_results_text = ""
+        self._init_jobs()
+        self._init_live()
         self._build_ui()
 
 
@@ -20,8 +20,12 @@ a = Analysis(
         "tkinter",
         "tkinter.messagebox",
         "main_desktop",
+        "metal_core",
+        "background",
+        "span_model",
         "estakada_pipe",
         "estakada_elec",
+        "estakada_data",
     ],
     hookspath=[],
     hooksconfig={},
@@ -2,9 +2,9 @@
 """
 Металлоёмкость производственных зданий — iOS v2.0
 Многопролётный расчёт, экспорт результатов, safe-area.
-Расчётное ядро идентично desktop v3.0 (Ry=240000, CRANE_Q_EQUIV ×2.5, коэф.режима 1.80).
+Расчётное ядро — общее с desktop v3.0 (metal_core.py).
 """
-import os, sys, math, traceback
+import os, sys, traceback
 from datetime import datetime
 
 # ── Сохранение краша ────────────────────────────────────────
@@ -27,127 +27,23 @@ def _save_crash(exc_type, exc_value, exc_tb):
 sys.excepthook = _save_crash
 
 # ════════════════════════════════════════════════════════════
-#  ДАННЫЕ — идентичны desktop v3.0
+#  ДАННЫЕ И РАСЧЁТ — общее ядро с desktop (metal_core.py)
 # ════════════════════════════════════════════════════════════
 
-# Таблица прогонов: (qp_max т/м, имя B=6, масса_кг B=6, имя B=12, масса_кг B=12)
-PURLIN_TABLE = [
-    (0.45, "Швеллер 20",   110.4, "Двутавр 20",  345.0),
-    (0.67, "Швеллер 22",   122.4, "Двутавр 24",  420.0),
-    (0.87, "Швеллер 24",   134.4, "Двутавр 27",  492.0),
-    (1.10, "Швеллер 27",   151.2, "Двутавр 30",  558.0),
-    (1.30, "Швеллер 30",   168.0, "Двутавр 33",  624.0),
-    (1.50, "Швеллер 33",   184.8, "Двутавр 36",  697.2),
-]
-
-CRANE_BEAM_ALPHA = {
-    # Источник: методика ЦНИИ, разд. 5.1.
-    # Q=20–50 т: αпб = 0.24–0.35; Q=80–200 т: αпб = 0.37–0.47 (линейная интерполяция).
-    # За пределами диапазона — линейная экстраполяция.
-    5:  0.19,   # экстраполяция ниже 20 т
-    10: 0.20,   # экстраполяция ниже 20 т
-    20: 0.24,   # нижняя граница диапазона 20–50 т
-    32: 0.28,   # интерполяция 20–50 т
-    50: 0.35,   # верхняя граница диапазона 20–50 т
-    80: 0.37,   # нижняя граница диапазона 80–200 т
-    100: 0.39,  # пример из методики (Q=100/20 т → αпб=0.39)
-    125: 0.41,  # интерполяция 80–200 т
-    200: 0.47,  # верхняя граница диапазона 80–200 т
-    320: 0.57,  # экстраполяция выше 200 т
-    400: 0.64,  # экстраполяция выше 200 т
-}
-RAIL_WEIGHT_KN = {
-    5:0.461, 10:0.461, 20:0.461, 32:0.598, 50:0.598,
-    80:0.831, 100:1.135, 125:1.135, 200:1.135, 320:1.417, 400:1.417,
-}
-# Эквивалентная нагрузка вдоль подкрановой балки (кН/м), скорр. ×2.5
-CRANE_Q_EQUIV = {
-    5:20, 10:30, 20:50, 32:70, 50:95, 80:138,
-    100:170, 125:200, 200:262, 320:362, 400:437,
-}
+from metal_core import (
+    calculate, case_key, CRANE_MODE_FACTOR_M1, PIPE_SUPPORT, TRUSS_MASSES,
+)
+from background import JobRunner
+from memo import LRUMemo
+from span_model import SpanList
 
-# Коэффициенты режима работы крана
-CRANE_MODE_FACTOR_M1 = {"Режим 1-6К": 1.00, "Режим 7-8К": 1.80}
-CRANE_MODE_FACTOR_M2 = {"Режим 1-6К": 0.65, "Режим 7-8К": 1.80}
 CRANE_MODES = list(CRANE_MODE_FACTOR_M1.keys())
-
-TRUSS_LOADS = [
-    2.0,2.5,3.0,3.5,4.0,4.5,5.0,5.5,6.0,
-    6.5,7.0,7.5,8.0,8.5,9.0,9.5,10.0,10.5,
-    11.0,11.5,12.0,12.5,
-]
-TRUSS_MASSES = {
-    "Уголки": {
-        36:[5.90,7.54,10.37,11.12,12.30,12.74,13.30,14.74,15.66,15.66,18.89,18.89,18.89,19.30,21.50,21.50,22.52,23.70,24.57,24.57,26.30,26.92],
-        30:[5.20,5.97,6.47,7.14,7.14,7.70,9.00,9.00,10.20,10.20,10.53,11.64,13.63,13.63,14.43,14.43,15.25,15.25,16.43,16.43,16.43,17.27],
-        24:[2.30,3.16,3.94,3.97,4.29,5.75,5.75,6.28,6.28,6.28,6.53,6.53,6.90,7.97,8.87,8.87,8.87,8.87,8.87,9.11,10.45,11.24],
-        18:[2.16,2.16,2.34,2.45,2.68,2.68,2.83,2.91,3.17,3.64,3.64,3.77,3.95,3.95,4.10,4.10,4.51,4.51,4.51,5.26,5.26,5.26],
-    },
-    "Двутавры": {
-        36:[9.60,10.20,10.20,11.47,12.50,13.49,15.14,15.28,15.87,17.18,18.72,21.06,21.06,21.06,22.11,22.11,25.52,25.52,30.78,31.66,31.66,31.85],
-        30:[6.27,6.38,6.38,8.07,8.23,8.90,9.84,9.93,10.35,12.99,12.99,12.99,12.99,14.89,14.89,14.89,15.35,18.68,18.68,18.68,19.69,19.69],
-        24:[4.60,4.60,5.19,5.30,5.79,5.79,6.35,6.63,7.48,8.31,8.31,8.47,8.47,8.63,9.30,9.30,11.08,11.08,11.08,11.08,11.08,12.10],
-        18:[2.92,2.92,2.92,2.92,3.37,3.92,3.92,3.92,4.34,4.34,4.34,4.72,4.72,4.72,4.72,4.72,5.42,5.42,5.49,5.49,5.86,5.86],
-    },
-    "Молодечно": {
-        36:[7.00,8.05,9.20,12.25,13.53,13.53,15.96,17.18,17.61,21.26,21.26,23.01,24.25,29.80,29.80,29.80,29.80,29.80,31.57,37.40,37.40,37.40],
-        30:[5.24,5.80,5.80,7.34,7.34,11.55,10.40,11.97,11.97,13.59,13.59,13.59,15.40,16.22,17.70,19.54,19.54,19.54,21.37,21.37,21.37,21.37],
-        24:[2.48,3.60,3.85,4.11,5.07,5.07,6.18,6.24,6.47,8.02,8.02,8.70,9.37,9.37,10.00,10.90,10.90,11.54,11.54,12.37,13.62,13.62],
-        18:[1.29,1.54,1.58,2.07,2.18,2.65,3.40,3.40,3.40,3.40,4.08,4.08,4.08,4.70,4.83,4.83,5.70,6.07,6.07,6.07,6.07,7.08],
-    },
-}
-
-SUBTRUSS_LOADS  = [18.0,36.0,54.0,72.0,81.0,108.0,126.0,144.0,162.0,180.0,198.0,216.0,234.0,255.0]
-SUBTRUSS_MASSES = [1.57,2.22,2.31,2.72,2.72,4.59,5.32,5.32,5.70,5.80,6.30,6.30,6.53,6.71]
-
-FAKHVERK_DATA = {
-    ('I',0,0):9,  ('I',0,1):10, ('I',0,2):11,
-    ('I',1,0):9,  ('I',1,1):11, ('I',1,2):11,
-    ('I',2,0):10, ('I',2,1):12, ('I',2,2):12,
-    ('II',0,0):23,('II',0,1):25,('II',0,2):25,
-    ('II',1,0):23,('II',1,1):25,('II',1,2):25,
-    ('II',2,0):26,('II',2,1):30,('II',2,2):30,
-    ('III',0,0):19,('III',0,1):28,('III',0,2):45,
-    ('III',1,0):19,('III',1,1):29,('III',1,2):46,
-    ('III',2,0):20,('III',2,1):30,('III',2,2):48,
-}
-
-_CB_Q1 = [5,10,20,32,50]; _CB_Q2 = [80,100,125,200,400]
-CRANE_BEAM_T1 = {
-    6:  [ 80, 90, 100,120, 150,185, 210,260, 270,330],
-    12: [150,170, 190,230, 270,335, 375,455, 490,595],
-}
-CRANE_BEAM_T2 = {
-    12: [290,330, 350,400, 430,490,  620, 720,  920,1080],
-    18: [460,520, 540,615, 660,750,  950,1100, 1410,1640],
-    24: [680,770, 800,910, 980,1110,1420,1640, 2100,2450],
-}
-BRAKE_T1 = {
-    (6,True,True):[100,110],   (6,True,False):[65,70],
-    (6,False,True):[120,140],  (6,False,False):[70,75],
-    (12,True,True):[100,120],  (12,True,False):[65,70],
-    (12,False,True):[100,120], (12,False,False):[70,75],
-}
-BRAKE_T2 = {
-    (12,True,True):[120,140],  (12,True,False):[80,100],
-    (12,False,True):[140,160], (12,False,False):[60,80],
-    (18,True,True):[120,140],  (18,True,False):[80,100],
-    (18,False,True):[140,160], (18,False,False):[80,100],
-    (24,True,True):[220,240],  (24,True,False):[140,160],
-    (24,False,True):[220,240], (24,False,False):[140,160],
-}
-
-PIPE_SUPPORT = {
-    "Основные производственные": (11, 22),
-    "Здания энергоносителей":    (23, 40),
-    "Вспомогательные здания":    (2,  4),
-}
-
-TRUSS_TYPES = ["Уголки", "Двутавры", "Молодечно"]
+TRUSS_TYPES = list(TRUSS_MASSES.keys())
 BLD_TYPES   = list(PIPE_SUPPORT.keys())
 
 # ── Кровельный пирог ─────────────────────────────────────
-# Удельный вес слоёв кровли, кН/м² (нормативные значения)
+# Удельный вес слоёв кровли, кН/м² (нормативные значения).
+# Веса — как в metal_core.ROOF_MATERIALS; подписи без «ρ» и «м³» для мобильных шрифтов.
 ROOF_MATERIALS = {
     "Профнастил Н-75 (t=0.7мм)":           0.078,
     "Профнастил Н-75 (t=0.8мм)":           0.089,
@@ -203,374 +99,15 @@ ROOF_PRESETS = {
 _ROOF_MAT_LIST    = list(ROOF_MATERIALS.keys())
 _ROOF_PRESET_LIST = list(ROOF_PRESETS.keys())
 
-# ════════════════════════════════════════════════════════════
-#  ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ (desktop API)
-# ════════════════════════════════════════════════════════════
-
-def _lkp(d, val):
-    for k in sorted(d):
-        if val <= k: return d[k]
-    return d[sorted(d)[-1]]
-
-def ceil_to_table(target, values):
-    for v in sorted(values):
-        if target <= v: return v
-    return sorted(values)[-1]
-
-def interp_table(loads, masses, target):
-    for i, ld in enumerate(loads):
-        if target <= ld: return masses[i]
-    return masses[-1]
-
-def select_purlin(load_tm, B_step):
-    for qmax, n6, m6, n12, m12 in PURLIN_TABLE:
-        if load_tm <= qmax:
-            return (m6, n6) if B_step <= 6 else (m12, n12)
-    _, n6, m6, n12, m12 = PURLIN_TABLE[-1]
-    n6 += "!"; n12 += "!"
-    return (m6, n6) if B_step <= 6 else (m12, n12)
-
-def get_truss_mass_m2(truss_type, span_m, load_tm):
-    spans = sorted(TRUSS_MASSES.get(truss_type, {}).keys())
-    if not spans: return None
-    sk = ceil_to_table(span_m, spans)
-    masses = TRUSS_MASSES[truss_type].get(sk)
-    if masses is None: return None
-    return interp_table(TRUSS_LOADS, masses, load_tm)
-
-def get_subtruss_mass_m2(R_t):
-    return interp_table(SUBTRUSS_LOADS, SUBTRUSS_MASSES,
-                        ceil_to_table(R_t, SUBTRUSS_LOADS))
-
-def get_bracing_kgm2(q_crane_t, step_farm_m):
-    if q_crane_t <= 120: return 15.0 if step_farm_m <= 6 else 35.0
-    return 40.0 if step_farm_m <= 6 else 55.0
-
-def get_crane_beam_kgm(q_crane_t, span_pb_m, n_cranes):
-    try:
-        if q_crane_t <= 50: table, q_ord = CRANE_BEAM_T1, _CB_Q1
-        else:               table, q_ord = CRANE_BEAM_T2, _CB_Q2
-        span_key = ceil_to_table(span_pb_m, sorted(table.keys()))
-        vals = table.get(span_key)
-        if vals is None: return None
-        qi = min(range(len(q_ord)), key=lambda i: abs(q_ord[i] - q_crane_t))
-        ci = qi * 2 + (0 if n_cranes == 1 else 1)
-        return vals[ci] if ci < len(vals) else None
-    except Exception: return None
-
-def get_brake_kgm(q_crane_t, span_pb_m, n_cranes, with_passage, is_edge):
-    try:
-        table = BRAKE_T1 if q_crane_t <= 50 else BRAKE_T2
-        span_key = ceil_to_table(span_pb_m, sorted({k[0] for k in table}))
-        vals = table.get((span_key, is_edge, with_passage))
-        if vals is None:
-            vals = next((v for k, v in table.items() if k[0] == span_key), None)
-        if vals:
-            return vals[0 if n_cranes == 1 else min(1, len(vals) - 1)]
-    except Exception: pass
-    return None
-
-def get_fakhverk_kgm2(step_col, has_post, h_bld, rig_load):
-    try:
-        if step_col <= 6 and has_post: ft = 'III'
-        elif step_col <= 6:            ft = 'I'
-        else:                          ft = 'II'
-        lc = 0 if rig_load <= 0 else (1 if rig_load <= 100 else 2)
-        hc = 0 if h_bld <= 10 else (1 if h_bld <= 20 else 2)
-        return FAKHVERK_DATA.get((ft, lc, hc))
-    except Exception: return None
-
-def get_pipe_support_kgm2(bld_type):
-    lo, hi = PIPE_SUPPORT.get(bld_type, (11, 22))
-    return (lo + hi) / 2
+# ── Кэш оформленных результатов ──────────────────────────
+# Повторный расчёт тех же исходных данных показывает готовый текст сразу.
+MARKUP_CACHE_MAX = 32
 
-# ════════════════════════════════════════════════════════════
-#  РАСЧЁТ — идентичен desktop v3.0
-# ════════════════════════════════════════════════════════════
 
-def calculate(gp: dict, spans: list) -> dict:
-    res = {}
-    log = []
-    L_build = gp["L_build"]
-    Q_snow  = gp["Q_snow"]
-    Q_dust  = gp["Q_dust"]
-    Q_tech  = gp["Q_tech"]
-    yc      = gp["yc"]
-    N = len(spans)
-    W_build = sum(sp["L_span"] for sp in spans)
-    S_floor = L_build * W_build
-    P_walls = 2 * (L_build + W_build)
-    log.append(f"Пролётов: {N}  W={W_build:.0f}м  S={S_floor:.0f}м²")
-
-    def _span_col_heights(sp):
-        h_b = sp["col_step"] / 6 if sp["q_crane_t"] <= 50 else sp["col_step"] / 7
-        if sp["q_crane_t"] <= 20:   h_r = 0.130
-        elif sp["q_crane_t"] <= 50: h_r = 0.150
-        elif sp["q_crane_t"] <= 80: h_r = 0.170
-        else:                        h_r = 0.180
-        H_full = sp["h_rail"] + 4.5
-        if sp.get("H_col_ov", 0) > 0:
-            H_full = sp["H_col_ov"]
-        H_lower = sp["h_rail"] - h_b - h_r + 0.6
-        H_upper = H_full - H_lower
-        return H_upper, H_lower, H_full
-
-    span_heights = [_span_col_heights(sp) for sp in spans]
-    for i, (Hu, Hl, Hf) in enumerate(span_heights):
-        log.append(f"Пролёт {i+1}: H_кол={Hf:.2f}м (надкр={Hu:.2f}м подкр={Hl:.2f}м)")
-    H_full_max = max(h[2] for h in span_heights)
-    S_walls = P_walls * H_full_max
-
-    # 1+2. Прогоны и фермы
-    g_links = 0.05
-    G_pur_all_t = 0.0; G_tr_m1_all = 0.0; G_tr_m2_all = 0.0
-    span_data = []
-    for i, sp in enumerate(spans):
-        L = sp["L_span"]; tt = sp["truss_type"]; B = sp["B_step"]
-        Ss = L_build * L
-        Q_load_total = sp["Q_roof"] + sp["Q_purlin"] + Q_snow + Q_dust + Q_tech + g_links
-        a_pr = 3.0
-        qp_tm = (sp["Q_roof"] + sp["Q_purlin"] + Q_snow + Q_dust + Q_tech) * a_pr * yc / 9.81
-        mp, pname = select_purlin(qp_tm, B)
-        n_pr = int(L / a_pr) + 1
-        g_pur = mp * n_pr / (L * B)
-        G_pur_t = g_pur * Ss / 1000
-        G_pur_all_t += G_pur_t
-        n_tr = L_build / B + 1
-        Q_tm = Q_load_total * B * yc / 9.81
-        G_tr1 = None
-        if tt == "Уголки":
-            Gkn = (Q_load_total * B / 1000 + 0.018) * 1.4 * L**2 / 0.85 * yc
-            G_tr1 = Gkn / 9.81 * n_tr
-            G_tr_m1_all += G_tr1
-        G_tr2 = None
-        mt = get_truss_mass_m2(tt, L, Q_tm)
-        if mt is not None:
-            G_tr2 = mt * n_tr
-            G_tr_m2_all += G_tr2
-        span_data.append({
-            "idx": i+1, "L_span": L, "S_span": Ss, "tt": tt, "B_step": B,
-            "purlin": pname, "qp_tm": round(qp_tm, 3),
-            "g_pur_kgm2": round(g_pur, 2), "G_pur_t": round(G_pur_t, 2),
-            "Q_tm": round(Q_tm, 3),
-            "G_tr_m1": round(G_tr1, 2) if G_tr1 is not None else "н/п",
-            "G_tr_m2": round(G_tr2, 2) if G_tr2 is not None else "н/п",
-            "Q_load_total": Q_load_total,
-        })
-
-    res["прогоны"] = {
-        "масса_общая_т": round(G_pur_all_t, 2),
-        "по_пролётам": [{"пролёт":d["idx"],"профиль":d["purlin"],
-            "нагрузка_тм":d["qp_tm"],"расход_кгм2":d["g_pur_kgm2"],
-            "масса_т":d["G_pur_t"]} for d in span_data],
-    }
-    res["фермы"] = {
-        "масса_общая_т_М1": round(G_tr_m1_all, 2),
-        "масса_общая_т_М2": round(G_tr_m2_all, 2),
-        "по_пролётам": [{"пролёт":d["idx"],"нагрузка_тм":d["Q_tm"],
-            "G_М1_т":d["G_tr_m1"],"G_М2_т":d["G_tr_m2"]} for d in span_data],
-    }
-
-    # 3. Связи
-    G_br_total = 0.0; br_rows = []
-    for i, sp in enumerate(spans):
-        Ss = L_build * sp["L_span"]
-        gbr = get_bracing_kgm2(sp["q_crane_t"], sp["B_step"])
-        Gbr = gbr * Ss / 1000
-        G_br_total += Gbr
-        br_rows.append({"пролёт": i+1, "расход_кгм2": gbr, "масса_т": round(Gbr, 2)})
-    res["связи_покрытия"] = {
-        "расход_кгм2": round(G_br_total * 1000 / S_floor, 2) if S_floor else 0,
-        "масса_общая_т": round(G_br_total, 2),
-        "по_пролётам": br_rows,
-    }
-
-    # 4. Подстропильные фермы
-    G_sub_m1 = 0.0; G_sub_m2 = 0.0; sub_rows = []
-    need_sub = any(sp["col_step"] == 12 and sp["B_step"] < sp["col_step"] for sp in spans)
-    if need_sub:
-        for i, sp in enumerate(spans):
-            if not (sp["col_step"] == 12 and sp["B_step"] < sp["col_step"]):
-                sub_rows.append({"пролёт": i+1, "G_М1_т": 0, "G_М2_т": "н/п", "R_кн": 0})
-                continue
-            L = sp["L_span"]; B = sp["B_step"]
-            Q_load_sp = span_data[i]["Q_load_total"]
-            n_bays = L_build / sp["col_step"]
-            R_kn = Q_load_sp * B * yc * L / 2
-            R_t  = R_kn / 9.81
-            Rf   = max(100, min(R_kn, 400))
-            apf  = (Rf - 100) * 0.0002 + 0.044
-            G1   = apf * 144 * n_bays / N
-            G_sub_m1 += G1
-            mt = get_subtruss_mass_m2(R_t)
-            G2 = mt * n_bays / N if mt else None
-            if G2: G_sub_m2 += G2
-            sub_rows.append({"пролёт": i+1, "R_кн": round(R_kn, 1),
-                "G_М1_т": round(G1, 2), "G_М2_т": round(G2, 2) if G2 else "н/п"})
-        res["подстропильные_фермы"] = {
-            "масса_общая_т_М1": round(G_sub_m1, 2),
-            "масса_общая_т_М2": round(G_sub_m2, 2),
-            "по_пролётам": sub_rows,
-        }
-    else:
-        res["подстропильные_фермы"] = {"примечание": "Не требуются"}
-
-    # 5. Подкрановые балки
-    G_pb_m1 = 0.0; G_pb_m2 = 0.0; pb_rows = []
-
-    def _pb_row(sp_obj, is_edge, label):
-        nonlocal G_pb_m1, G_pb_m2
-        q = sp_obj["q_crane_t"]; nc = sp_obj["n_cranes"]
-        wp = sp_obj["with_pass"]; mode = sp_obj["crane_mode"]
-        mf_m1 = CRANE_MODE_FACTOR_M1[mode]
-        mf_m2 = CRANE_MODE_FACTOR_M2[mode]
-        L_pb = float(sp_obj["col_step"])
-        n_bays_a = math.ceil(L_build / L_pb)
-        alp = _lkp(CRANE_BEAM_ALPHA, q)
-        qr  = _lkp(RAIL_WEIGHT_KN, q)
-        G1t = (alp * L_pb + qr) * L_pb * 1.2 / 9.81 * mf_m1  # kпб=1.2 по методике
-        G_pb_m1 += G1t * n_bays_a
-        pb_kgm = get_crane_beam_kgm(q, L_pb, nc)
-        br_kgm = get_brake_kgm(q, L_pb, nc, wp, is_edge)
-        if pb_kgm and br_kgm is not None:
-            G_pb_m2 += (pb_kgm + br_kgm) * mf_m2 * L_pb * n_bays_a / 1000
-        pb_rows.append({"ряд": label, "G_М1_т": round(G1t * n_bays_a, 2), "q": q})
-
-    _pb_row(spans[0], True, "Крайний Л")
-    for mi in range(1, N):
-        _pb_row(spans[mi-1], False, f"Средний {mi}Л")
-        _pb_row(spans[mi],   False, f"Средний {mi}П")
-    _pb_row(spans[N-1], True, "Крайний П")
-
-    res["подкрановые_балки"] = {
-        "масса_общая_т_М1": round(G_pb_m1, 2),
-        "масса_общая_т_М2": round(G_pb_m2, 2) if G_pb_m2 > 0 else "н/п",
-        "ряды_колонн": pb_rows,
-    }
-
-    # 6. Колонны
-    rho=78.5; pu=1.4; pl=2.1; kMu=0.275; kMl=0.45; gst=0.25; aw=0.15
-
-    def _col_kg(L_sp, q_cr, H_up, H_lo, cs, Q_load_sp):
-        L_pb_loc = float(cs)
-        Gwu = gst * H_up * (1 - aw) * cs
-        Gwl = gst * H_lo * (1 - aw) * cs
-        SFv = Q_load_sp * cs * L_sp / 2 + Gwu
-        Gcu = SFv * rho * pu * H_up / (kMu * 240000)
-        qeq = _lkp(CRANE_Q_EQUIV, q_cr)
-        D   = qeq * cs * 1.1 * yc
-        alp = _lkp(CRANE_BEAM_ALPHA, q_cr)
-        qrr = _lkp(RAIL_WEIGHT_KN, q_cr)
-        Gpb = (alp * L_pb_loc + qrr) * L_pb_loc * 1.2  # kпб=1.2 по методике
-        SFn = SFv + D + Gpb + Gwl + Gcu
-        Gcl = SFn * rho * pl * H_lo / (kMl * 240000)
-        return (Gcu + Gcl) / 9.81 * 1000
-
-    G_cols_t = 0.0; col_rows_detail = []
-    sp0 = spans[0]; H_up0, H_lo0, _ = span_heights[0]
-    n_col_0 = round(L_build / sp0["col_step"]) + 1
-    Gce = _col_kg(sp0["L_span"], sp0["q_crane_t"], H_up0, H_lo0, sp0["col_step"], span_data[0]["Q_load_total"])
-    G_cols_t += Gce * n_col_0 / 1000
-    col_rows_detail.append({"ряд": "Крайний Л", "масса_1_кг": round(Gce, 1), "масса_ряд_т": round(Gce * n_col_0 / 1000, 2)})
-
-    for mi in range(1, N):
-        sL = spans[mi-1]; sR = spans[mi]
-        H_upL, H_loL, _ = span_heights[mi-1]
-        cs_mid = sL["col_step"]
-        n_col_mid = round(L_build / cs_mid) + 1
-        Q_L = span_data[mi-1]["Q_load_total"]; Q_R = span_data[mi]["Q_load_total"]
-        Gwu = gst * H_upL * (1 - aw) * cs_mid
-        Gwl = gst * H_loL * (1 - aw) * cs_mid
-        SFv = (Q_L + Q_R) * cs_mid * (sL["L_span"] + sR["L_span"]) / 4 + Gwu
-        Gcu = SFv * rho * pu * H_upL / (kMu * 240000)
-        qeqL = _lkp(CRANE_Q_EQUIV, sL["q_crane_t"]); qeqR = _lkp(CRANE_Q_EQUIV, sR["q_crane_t"])
-        D = (qeqL + qeqR) * cs_mid * 1.1 * yc
-        alpL = _lkp(CRANE_BEAM_ALPHA, sL["q_crane_t"]); qrL = _lkp(RAIL_WEIGHT_KN, sL["q_crane_t"])
-        alpR = _lkp(CRANE_BEAM_ALPHA, sR["q_crane_t"]); qrR = _lkp(RAIL_WEIGHT_KN, sR["q_crane_t"])
-        Gpb = (alpL * float(sL["col_step"]) + qrL) * float(sL["col_step"]) * 1.2 + \
-              (alpR * float(sR["col_step"]) + qrR) * float(sR["col_step"]) * 1.2  # kпб=1.2
-        SFn = SFv + D + Gpb + Gwl + Gcu
-        Gcl = SFn * rho * pl * H_loL / (kMl * 240000)
-        Gcm_kg = (Gcu + Gcl) / 9.81 * 1000
-        G_cols_t += Gcm_kg * n_col_mid / 1000
-        col_rows_detail.append({"ряд": f"Средний {mi}", "масса_1_кг": round(Gcm_kg, 1), "масса_ряд_т": round(Gcm_kg * n_col_mid / 1000, 2)})
-
-    spN = spans[N-1]; H_upN, H_loN, _ = span_heights[N-1]
-    n_col_N = round(L_build / spN["col_step"]) + 1
-    Gce2 = _col_kg(spN["L_span"], spN["q_crane_t"], H_upN, H_loN, spN["col_step"], span_data[N-1]["Q_load_total"])
-    G_cols_t += Gce2 * n_col_N / 1000
-    col_rows_detail.append({"ряд": "Крайний П", "масса_1_кг": round(Gce2, 1), "масса_ряд_т": round(Gce2 * n_col_N / 1000, 2)})
-
-    res["колонны"] = {
-        "H_full_м": round(span_heights[0][2], 2),
-        "расход_кгм2": round(G_cols_t * 1000 / S_floor, 2) if S_floor else 0,
-        "масса_общая_т": round(G_cols_t, 2),
-        "по_рядам": col_rows_detail,
-        "высоты_пролётов": [{"пролёт":i+1,"H_full":round(h[2],2),"H_upper":round(h[0],2),"H_lower":round(h[1],2)} for i,h in enumerate(span_heights)],
-    }
-
-    # 7. Фахверк
-    G_fakh_total = 0.0; fakh_rows = []
-    for i, sp in enumerate(spans):
-        H_full_sp = span_heights[i][2]
-        S_walls_sp = P_walls * H_full_sp / N
-        gf = get_fakhverk_kgm2(sp["col_step"], sp["has_post"], H_full_sp, sp["rig_load"])
-        if gf:
-            Gf = gf * S_walls_sp / 1000
-            G_fakh_total += Gf
-            fakh_rows.append({"пролёт": i+1, "расход_кгм2_стены": gf, "масса_т": round(Gf, 2)})
-        else:
-            fakh_rows.append({"пролёт": i+1, "ошибка": "н/п", "масса_т": 0})
-    res["фахверк"] = {
-        "площадь_стен_м2": round(S_walls, 1),
-        "масса_общая_т": round(G_fakh_total, 2),
-        "по_пролётам": fakh_rows,
-    }
-
-    # 8. Ограждение
-    res["ограждение"] = {"стены_м2": round(S_walls, 1), "кровля_м2": round(S_floor, 1)}
-
-    # 9. Опоры трубопроводов
-    G_pipe_total = 0.0; pipe_rows = []
-    for i, sp in enumerate(spans):
-        Ss = L_build * sp["L_span"]
-        gp2 = get_pipe_support_kgm2(sp["bld_type"])
-        Gp = gp2 * Ss / 1000
-        G_pipe_total += Gp
-        pipe_rows.append({"пролёт": i+1, "расход_кгм2": gp2, "масса_т": round(Gp, 2)})
-    res["опоры_трубопроводов"] = {
-        "расход_кгм2": round(G_pipe_total * 1000 / S_floor, 2) if S_floor else 0,
-        "масса_общая_т": round(G_pipe_total, 2),
-        "по_пролётам": pipe_rows,
-    }
-
-    # Итого (гибридное суммирование)
-    def sv(d, *keys):
-        for k in keys:
-            v = d.get(k)
-            if isinstance(v, (int, float)): return float(v)
-        return 0.0
-
-    common = (sv(res["прогоны"],"масса_общая_т") + sv(res["колонны"],"масса_общая_т")
-              + sv(res["связи_покрытия"],"масса_общая_т") + sv(res["фахверк"],"масса_общая_т")
-              + sv(res["опоры_трубопроводов"],"масса_общая_т"))
-    m1_spec = (sv(res["фермы"],"масса_общая_т_М1")
-               + sv(res["подстропильные_фермы"],"масса_общая_т_М1")
-               + sv(res["подкрановые_балки"],"масса_общая_т_М1"))
-    m2_spec = (sv(res["фермы"],"масса_общая_т_М2")
-               + sv(res["подстропильные_фермы"],"масса_общая_т_М2")
-               + sv(res["подкрановые_балки"],"масса_общая_т_М2"))
-    total_m1 = common + m1_spec; total_m2 = common + m2_spec
-    res["итого"] = {
-        "М1_т":    round(total_m1, 2), "М2_т":    round(total_m2, 2),
-        "М1_кгм2": round(total_m1 * 1000 / S_floor, 2) if S_floor else 0,
-        "М2_кгм2": round(total_m2 * 1000 / S_floor, 2) if S_floor else 0,
-        "min_т":   round(min(total_m1, total_m2), 2),
-        "max_т":   round(max(total_m1, total_m2), 2),
-        "S_floor": round(S_floor, 1),
-    }
-    res["_log"] = log
-    return res
+def _markup_key(gp, spans):
+    """Ключ кэша текста: ключ расчёта плюс слои кровли (они есть только в тексте)."""
+    layers = tuple(tuple(map(tuple, sp.get("Q_roof_layers", ()))) for sp in spans)
+    return case_key(gp, spans), layers
 
 # ════════════════════════════════════════════════════════════
 #  ЭКСПОРТ РЕЗУЛЬТАТОВ
@@ -627,6 +164,35 @@ _SPAN_DEFAULTS = dict(
     bld_type="Основные производственные",
 )
 
+# Пролёт в модели SpanList — значения как у _read_params (вход calculate).
+# На форме один блок пролёта: он показывает текущий пролёт модели.
+_SPAN_MODEL_DEFAULTS = dict(
+    L_span=24.0, B_step=6, col_step=6, h_rail=8.0, H_col_ov=0.0,
+    Q_roof=0.30, Q_roof_layers=(), Q_purlin=0.25, truss_type="Уголки",
+    crane_mode="Режим 1-6К", q_crane_t=50.0, n_cranes=1, with_pass=True,
+    rig_load=0.0, has_post=False, bld_type="Основные производственные",
+)
+
+# «Во все пролёты»: подпись -> поля текущего пролёта, копируемые в остальные
+_BULK_FIELDS = {
+    "Пролёт L":             ("L_span",),
+    "Шаг ферм B":           ("B_step",),
+    "Шаг колонн":           ("col_step",),
+    "УГР":                  ("h_rail",),
+    "Высота колонны":       ("H_col_ov",),
+    "Кровля (пирог)":       ("Q_roof", "Q_roof_layers"),
+    "Прогоны":              ("Q_purlin",),
+    "Тип ферм":             ("truss_type",),
+    "Режим крана":          ("crane_mode",),
+    "Г/П крана":            ("q_crane_t",),
+    "Кол-во кранов":        ("n_cranes",),
+    "Тормозные констр.":    ("with_pass",),
+    "Нагрузка на ригель":   ("rig_load",),
+    "Стойка фахверка":      ("has_post",),
+    "Тип здания":           ("bld_type",),
+}
+_BULK_LIST = list(_BULK_FIELDS.keys())
+
 class Toolbar(BoxLayout):
     title = StringProperty("")
     back  = BooleanProperty(False)
@@ -694,6 +260,13 @@ ScreenManager:
                 spacing: dp(6)
                 size_hint_y: None
                 height: self.minimum_height
+        ProgressBar:
+            id: calc_progress
+            max: 1
+            value: 0
+            size_hint_y: None
+            height: dp(4)
+            opacity: 0
         BoxLayout:
             id: bottom_bar
             size_hint_y: None
@@ -781,6 +354,9 @@ class MetalApp(App):
             root = Builder.load_string(KV)
             self.sm = root
             self._last_result_text = ""  # plain text for export
+            # Расчёт и оформление — в фоновом потоке, результат — через Clock
+            self._jobs = JobRunner(lambda fn: Clock.schedule_once(lambda dt: fn()))
+            self._markup_cache = LRUMemo(MARKUP_CACHE_MAX)
 
             inp = root.get_screen("input")
             res = root.get_screen("result")
@@ -798,7 +374,6 @@ class MetalApp(App):
             res.ids.safe_top_r.height = _SAFE_TOP
 
             self._form = inp.ids.form
-            self._span_blocks = []   # list of dicts: {key: widget}
             self._build_form()
             return root
         except Exception:
@@ -887,8 +462,10 @@ class MetalApp(App):
     def _build_form(self):
         F = self._form
         F.clear_widgets()
-        self._span_blocks = []
         self._global_fields = {}
+        self._span_model = SpanList(_SPAN_MODEL_DEFAULTS)
+        self._span_model.append()
+        self._cur_span = 0
 
         def s(t, color="4fc3f7"): F.add_widget(self._section_label(t, color))
         def f(d, k, label, default, filt="float"):
@@ -906,35 +483,65 @@ class MetalApp(App):
         f(gf, "Q_tech",  "Тех. нагрузка на кровлю, кН/м²", 0.0)
         f(gf, "yc",      "Коэф. ответственности γc", 1.0)
 
-        # Первый пролёт
-        self._add_span_block()
+        # Навигация по пролётам: на форме всегда один блок пролёта,
+        # данные всех пролётов — в self._span_model
+        s("Пролёты здания")
+        nav = BoxLayout(size_hint_y=None, height=dp(48), spacing=dp(8), padding=(0, dp(4)))
+        self._btn_prev = Button(text="<", size_hint_x=None, width=dp(56),
+                                background_color=_GRAY, font_size=dp(18), bold=True)
+        self._btn_prev.bind(on_release=lambda *_: self._goto_span(self._cur_span - 1))
+        self._nav_lbl = Label(text="", font_size=dp(14), bold=True, color=(0.5, 0.8, 0.77, 1))
+        self._btn_next = Button(text=">", size_hint_x=None, width=dp(56),
+                                background_color=_GRAY, font_size=dp(18), bold=True)
+        self._btn_next.bind(on_release=lambda *_: self._goto_span(self._cur_span + 1))
+        nav.add_widget(self._btn_prev)
+        nav.add_widget(self._nav_lbl)
+        nav.add_widget(self._btn_next)
+        F.add_widget(nav)
+
+        self._span_block = self._build_span_block()
 
         # Кнопки управления пролётами
-        self._btn_container = BoxLayout(size_hint_y=None, height=dp(48),
-                                        spacing=dp(8), padding=(0, dp(4)))
-        btn_add = Button(text="+ Добавить пролёт", background_color=_ACCENT,
+        ops = BoxLayout(size_hint_y=None, height=dp(48), spacing=dp(8), padding=(0, dp(4)))
+        btn_add = Button(text="+ Пролёт", background_color=_ACCENT,
                          font_size=dp(13), bold=True)
-        btn_add.bind(on_release=lambda *_: self._add_span_block())
-        btn_rem = Button(text="— Убрать пролёт", background_color=(0.45,0.2,0.2,1),
-                         font_size=dp(13), size_hint_x=None, width=dp(150))
-        btn_rem.bind(on_release=lambda *_: self._remove_span_block())
-        self._btn_add = btn_add; self._btn_rem = btn_rem
-        self._btn_container.add_widget(btn_add)
-        self._btn_container.add_widget(btn_rem)
-        F.add_widget(self._btn_container)
-        self._update_span_buttons()
-
-    def _add_span_block(self):
-        if len(self._span_blocks) >= 6: return
+        btn_add.bind(on_release=lambda *_: self._add_span())
+        btn_rem = Button(text="— Убрать", background_color=(0.45,0.2,0.2,1),
+                         font_size=dp(13), size_hint_x=None, width=dp(110))
+        btn_rem.bind(on_release=lambda *_: self._remove_span())
+        self._btn_rem = btn_rem
+        ops.add_widget(btn_add)
+        ops.add_widget(btn_rem)
+        F.add_widget(ops)
+
+        dup = BoxLayout(size_hint_y=None, height=dp(48), spacing=dp(8), padding=(0, dp(4)))
+        btn_dup = Button(text="Копировать пролёт ×", background_color=_GREEN, font_size=dp(13))
+        self._dup_count = TextInput(text="1", multiline=False, input_filter="int",
+                                    size_hint_x=None, width=dp(70),
+                                    background_color=_GRAY, foreground_color=(1, 1, 1, 1),
+                                    font_size=dp(15))
+        btn_dup.bind(on_release=lambda *_: self._duplicate_span())
+        dup.add_widget(btn_dup)
+        dup.add_widget(self._dup_count)
+        F.add_widget(dup)
+
+        bulk = BoxLayout(size_hint_y=None, height=dp(48), spacing=dp(8), padding=(0, dp(4)))
+        self._bulk_sp = Spinner(text=_BULK_LIST[0], values=_BULK_LIST,
+                                background_color=_BLUE, color=(1, 1, 1, 1), font_size=dp(12))
+        btn_bulk = Button(text="Во все пролёты", size_hint_x=None, width=dp(140),
+                          background_color=(0.35, 0.35, 0.35, 1), font_size=dp(12))
+        btn_bulk.bind(on_release=lambda *_: self._apply_to_all(self._bulk_sp.text))
+        bulk.add_widget(self._bulk_sp)
+        bulk.add_widget(btn_bulk)
+        F.add_widget(bulk)
+        self._load_span_block(0)
+
+    def _build_span_block(self):
+        """Виджеты одного пролёта; заполняются из модели в _load_span_block."""
         F = self._form
-        idx = len(self._span_blocks) + 1
         d = {}           # input widgets keyed by param name
-        added = []       # all top-level widgets added to F for this span
-
-        if hasattr(self, '_btn_container'):
-            F.remove_widget(self._btn_container)
 
-        def _add(w): F.add_widget(w); added.append(w); return w
+        def _add(w): F.add_widget(w); return w
         def s(t, color="4fc3f7"): _add(self._section_label(t, color))
         def f(k, label, default, filt="float"):
             box, ti = self._field_widget(label, default, filt)
@@ -946,7 +553,6 @@ class MetalApp(App):
             box, checkbox = self._checkbox_widget(label, default)
             _add(box); d[k] = checkbox
 
-        s(f"Пролёт {idx}", "80cbc4")
         s("Геометрия пролёта")
         f("L_span",    "Пролёт L, м", 24.0)
         sp("B_step",   "Шаг ферм B, м", ["6", "12"], "6")
@@ -1037,11 +643,7 @@ class MetalApp(App):
         cb("has_post",  "Стойка фахверка (шаг 12м)")
         sp("bld_type",  "Тип здания (опоры труб)", BLD_TYPES, BLD_TYPES[0])
 
-        d["_widgets_in_F"] = added
-        self._span_blocks.append(d)
-        if hasattr(self, '_btn_container'):
-            F.add_widget(self._btn_container)
-            self._update_span_buttons()
+        return d
 
     # ── Кровельный пирог ─────────────────────────────────
 
@@ -1092,21 +694,68 @@ class MetalApp(App):
         for mat in ROOF_PRESETS.get(preset_name, []):
             self._pie_add_layer(d, mat)
 
-    def _remove_span_block(self):
-        if len(self._span_blocks) <= 1: return
-        F = self._form
-        F.remove_widget(self._btn_container)
-        d = self._span_blocks.pop()
-        for w in d.get("_widgets_in_F", []):
-            if w.parent:
-                w.parent.remove_widget(w)
-        F.add_widget(self._btn_container)
+    # ── Пролёты: модель и единственный блок формы ────────
+
+    def _store_span_block(self):
+        """Сохранить поля блока в текущий пролёт модели."""
+        self._span_model.set(self._cur_span, self._block_params(self._span_block))
+
+    def _load_span_block(self, i):
+        """Показать в блоке пролёт i модели."""
+        d, p = self._span_block, self._span_model[i]
+        self._cur_span = i
+        for k in ("L_span", "h_rail", "H_col_ov", "Q_purlin", "q_crane_t", "rig_load"):
+            d[k].text = f"{p[k]:g}"
+        for k in ("B_step", "col_step", "n_cranes", "truss_type", "crane_mode", "bld_type"):
+            d[k].text = str(p[k])
+        d["with_pass"].text = "С проходом" if p["with_pass"] else "Без прохода"
+        d["has_post"].active = p["has_post"]
+        self._pie_clear(d)
+        for name, _w in p["Q_roof_layers"]:
+            self._pie_add_layer(d, name)
+        d["Q_roof"].text = f"{p['Q_roof']:g}"   # после пирога: ручное значение сохраняется
+        self._update_span_buttons()
+
+    def _goto_span(self, i):
+        if 0 <= i < len(self._span_model) and i != self._cur_span:
+            self._store_span_block()
+            self._load_span_block(i)
+
+    def _add_span(self):
+        self._store_span_block()
+        self._load_span_block(self._span_model.append())
+
+    def _remove_span(self):
+        if len(self._span_model) <= 1: return
+        self._span_model.remove([self._cur_span])
+        self._load_span_block(min(self._cur_span, len(self._span_model) - 1))
+
+    def _duplicate_span(self):
+        try: n = int(self._dup_count.text)
+        except ValueError: return
+        if n < 1: return
+        self._store_span_block()
+        self._span_model.duplicate(self._cur_span, n)
         self._update_span_buttons()
 
+    def _apply_to_all(self, label):
+        """Скопировать поля текущего пролёта во все пролёты."""
+        self._store_span_block()
+        model = self._span_model
+        for k in _BULK_FIELDS.get(label, ()):
+            value = model.value(self._cur_span, k)
+            model.apply(range(len(model)), k, value)
+        # Стойка фахверка — только при шаге колонн 12 м (как в _block_params)
+        model.apply([i for i in range(len(model))
+                     if model.value(i, "has_post") and model.value(i, "col_step") != 12],
+                    "has_post", False)
+
     def _update_span_buttons(self):
-        n = len(self._span_blocks)
+        n = len(self._span_model)
+        self._nav_lbl.text = f"Пролёт {self._cur_span + 1} из {n}"
+        self._btn_prev.disabled = (self._cur_span <= 0)
+        self._btn_next.disabled = (self._cur_span >= n - 1)
         self._btn_rem.disabled = (n <= 1)
-        self._btn_add.disabled = (n >= 6)
 
     # ── Чтение параметров ────────────────────────────────
 
@@ -1134,28 +783,30 @@ class MetalApp(App):
             "Q_tech":  self._get_float(gf.get("Q_tech"),  0.0),
             "yc":      self._get_float(gf.get("yc"),      1.0),
         }
-        spans = []
-        for d in self._span_blocks:
-            cs = int(self._get_text(d.get("col_step"), "6"))
-            spans.append({
-                "L_span":     self._get_float(d.get("L_span"),    24.0),
-                "B_step":     int(self._get_text(d.get("B_step"), "6")),
-                "col_step":   cs,
-                "h_rail":     self._get_float(d.get("h_rail"),    8.0),
-                "H_col_ov":   self._get_float(d.get("H_col_ov"), 0.0),
-                "Q_roof":        self._get_float(d.get("Q_roof"),    0.30),
-                "Q_roof_layers": [(e["name"], e["weight"]) for e in d.get("_pie_layers", [])],
-                "Q_purlin":   self._get_float(d.get("Q_purlin"),  0.25),
-                "truss_type": self._get_text(d.get("truss_type"), "Уголки"),
-                "crane_mode": self._get_text(d.get("crane_mode"), "Режим 1-6К"),
-                "q_crane_t":  self._get_float(d.get("q_crane_t"), 50.0),
-                "n_cranes":   int(self._get_text(d.get("n_cranes"), "1")),
-                "with_pass":  self._get_text(d.get("with_pass"), "С проходом") == "С проходом",
-                "rig_load":   self._get_float(d.get("rig_load"),  0.0),
-                "has_post":   self._get_bool(d.get("has_post")) and cs == 12,
-                "bld_type":   self._get_text(d.get("bld_type"),  BLD_TYPES[0]),
-            })
-        return gp, spans
+        self._store_span_block()
+        return gp, self._span_model.to_spans()
+
+    def _block_params(self, d):
+        """Значения полей блока пролёта."""
+        cs = int(self._get_text(d.get("col_step"), "6"))
+        return {
+            "L_span":     self._get_float(d.get("L_span"),    24.0),
+            "B_step":     int(self._get_text(d.get("B_step"), "6")),
+            "col_step":   cs,
+            "h_rail":     self._get_float(d.get("h_rail"),    8.0),
+            "H_col_ov":   self._get_float(d.get("H_col_ov"), 0.0),
+            "Q_roof":        self._get_float(d.get("Q_roof"),    0.30),
+            "Q_roof_layers": tuple((e["name"], e["weight"]) for e in d.get("_pie_layers", [])),
+            "Q_purlin":   self._get_float(d.get("Q_purlin"),  0.25),
+            "truss_type": self._get_text(d.get("truss_type"), "Уголки"),
+            "crane_mode": self._get_text(d.get("crane_mode"), "Режим 1-6К"),
+            "q_crane_t":  self._get_float(d.get("q_crane_t"), 50.0),
+            "n_cranes":   int(self._get_text(d.get("n_cranes"), "1")),
+            "with_pass":  self._get_text(d.get("with_pass"), "С проходом") == "С проходом",
+            "rig_load":   self._get_float(d.get("rig_load"),  0.0),
+            "has_post":   self._get_bool(d.get("has_post")) and cs == 12,
+            "bld_type":   self._get_text(d.get("bld_type"),  BLD_TYPES[0]),
+        }
 
     # ── Навигация и действия ─────────────────────────────
 
@@ -1163,44 +814,85 @@ class MetalApp(App):
         self.sm.current = "input"
 
     def do_reset(self):
+        # Во время расчёта кнопка сброса работает как «Отмена»
+        if self._jobs.busy:
+            self._jobs.cancel()
+            self._set_busy(False)
+            return
         self._build_form()
 
     def do_calculate(self):
-        Clock.schedule_once(self._run_calc, 0.05)
-
-    def _run_calc(self, dt):
         try:
             gp, spans = self._read_params()
-            res = calculate(gp, spans)
-            txt_markup, txt_plain = self._format_results(res, gp, spans)
-            self._last_result_text = txt_plain
+        except Exception:
+            self._show_error(traceback.format_exc())
+            return
+        key = _markup_key(gp, spans)
+        cached = self._markup_cache.get(key)
+        if cached is not None:
+            self._jobs.cancel()
+            self._set_busy(False)
+            self._show_result(*cached)
+            return
+
+        def job(token):
+            res = calculate(gp, spans, progress=token.progress)
+            token.check()
+            return self._format_results(res, gp, spans)
+
+        def done(texts):
+            self._markup_cache.put(key, texts)
+            self._set_busy(False)
+            self._show_result(*texts)
+
+        self._set_busy(True)
+        self._jobs.submit(job, done, self._on_calc_error, self._on_calc_progress)
+
+    def _set_busy(self, busy):
+        inp = self.sm.get_screen("input")
+        inp.ids.calc_progress.value = 0
+        inp.ids.calc_progress.opacity = 1 if busy else 0
+        inp.ids.calc_btn.text  = "РАСЧЁТ…" if busy else "РАССЧИТАТЬ"
+        inp.ids.reset_btn.text = "ОТМЕНА" if busy else "СБРОС"
+
+    def _on_calc_progress(self, done, total):
+        inp = self.sm.get_screen("input")
+        inp.ids.calc_progress.value = done / total if total else 1
+        inp.ids.calc_btn.text = f"РАСЧЁТ… {done}/{total}"
+
+    def _on_calc_error(self, exc, tb):
+        self._set_busy(False)
+        self._show_error(tb)
+
+    def _show_result(self, txt_markup, txt_plain):
+        self._last_result_text = txt_plain
+        screen = self.sm.get_screen("result")
+        screen.ids.result_text.text = txt_markup
+        self.sm.current = "result"
+
+    def _show_error(self, tb):
+        # Escape [ ] for Kivy markup — raw brackets crash the markup parser
+        tb_safe = tb.replace("[", "[[").replace("]", "]]")
+        self._last_result_text = f"ОШИБКА РАСЧЁТА:\n\n{tb}"
+        # Write to crash log
+        try:
+            docs = os.path.expanduser("~/Documents")
+            os.makedirs(docs, exist_ok=True)
+            with open(os.path.join(docs, "metalcalc_crash.log"), "w",
+                      encoding="utf-8") as _f:
+                _f.write(tb)
+        except Exception:
+            pass
+        try:
             screen = self.sm.get_screen("result")
-            screen.ids.result_text.text = txt_markup
+            screen.ids.result_text.text = (
+                "[b][color=ff6666]ОШИБКА РАСЧЁТА[/color][/b]\n\n"
+                "[color=ffaaaa]Детали сохранены в metalcalc_crash.log[/color]\n\n"
+                + tb_safe
+            )
             self.sm.current = "result"
         except Exception:
-            tb = traceback.format_exc()
-            # Escape [ ] for Kivy markup — raw brackets crash the markup parser
-            tb_safe = tb.replace("[", "[[").replace("]", "]]")
-            self._last_result_text = f"ОШИБКА РАСЧЁТА:\n\n{tb}"
-            # Write to crash log
-            try:
-                docs = os.path.expanduser("~/Documents")
-                os.makedirs(docs, exist_ok=True)
-                with open(os.path.join(docs, "metalcalc_crash.log"), "w",
-                          encoding="utf-8") as _f:
-                    _f.write(tb)
-            except Exception:
-                pass
-            try:
-                screen = self.sm.get_screen("result")
-                screen.ids.result_text.text = (
-                    "[b][color=ff6666]ОШИБКА РАСЧЁТА[/color][/b]\n\n"
-                    "[color=ffaaaa]Детали сохранены в metalcalc_crash.log[/color]\n\n"
-                    + tb_safe
-                )
-                self.sm.current = "result"
-            except Exception:
-                pass
+            pass
 
     def do_save_results(self):
         screen = self.sm.get_screen("result")
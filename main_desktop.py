@@ -5,211 +5,135 @@
            коррекция высоты колонн, гибридное суммирование.
 БЭКАП v2.0 → main_desktop_backup_v2.py
 """
-import math
 import traceback
 import datetime
+import queue
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox, filedialog
 
-# ─────────────────────────────────────────────────────────
-#  ТАБЛИЦЫ ДАННЫХ
-# ─────────────────────────────────────────────────────────
+# Расчётное ядро (таблицы, поиски, calculate) — metal_core, без GUI.
+# Имена реэкспортируются: старый код импортирует их из main_desktop.
+from metal_core import (
+    PURLIN_TABLE, CRANE_BEAM_ALPHA, RAIL_WEIGHT_KN, BEAM_HEIGHT_RATIO, CRANE_Q_EQUIV,
+    TRUSS_LOADS, TRUSS_MASSES, SUBTRUSS_LOADS, SUBTRUSS_MASSES, FAKHVERK_DATA,
+    CRANE_BEAM_T1, CRANE_BEAM_T2, BRAKE_T1, BRAKE_T2, ROOF_MATERIALS, ROOF_PRESETS,
+    CRANE_MODE_FACTOR_M1, CRANE_MODE_FACTOR_M2, PIPE_SUPPORT, TABLES_VERSION,
+    _lkp, select_purlin, interp_table, ceil_to_table,
+    get_truss_mass_m2, get_subtruss_mass_m2, get_bracing_kgm2, get_crane_beam_kgm,
+    get_brake_kgm, get_fakhverk_kgm2, get_pipe_support_kgm2,
+    SPAN_KEYS, SPAN_MEMO, span_key, calculate, iter_sections, RESULT_SECTIONS,
+)
+
+from background import JobRunner
+from span_model import SpanList
 
-# Таблица 3 методики: подбор прогонов по нормативной нагрузке и шагу ферм.
-# Формат: (qp_max т/м, профиль_6м, масса_1пр_6м кг, профиль_12м, масса_1пр_12м кг)
-# Масса 1 прогона = масса пог.м профиля × длину пролёта (B).
-# Б=6 м → швеллеры (шарнирно-опёртые); Б=12 м → двутавры Б-серии (ГОСТ 26020).
-PURLIN_TABLE = [
-    # qp_max  name_6m           kg_6m   name_12m            kg_12m
-    (0.45, "Швеллер 20",        110.4, "Двутавр 30Б1",       370.8),
-    (0.65, "Швеллер 22",        126.0, "Двутавр 33Б1",       438.0),
-    (0.90, "Швеллер 24",        144.0, "Двутавр 36Б1",       502.8),
-    (1.25, "Швеллер 27",        166.2, "Двутавр 40Б1",       592.8),
-    (1.70, "Швеллер 30",        190.8, "Двутавр 45Б1",       681.6),
-    (2.50, "2×Швеллер 20",      220.8, "2×Двутавр 30Б1",     741.6),
-]
-
-CRANE_BEAM_ALPHA = {
-    # Источник: методика ЦНИИ, разд. 5.1.
-    # Q=20–50 т: αпб = 0.24–0.35; Q=80–200 т: αпб = 0.37–0.47 (линейная интерполяция).
-    # За пределами диапазона — линейная экстраполяция.
-    5:  0.19,   # экстраполяция ниже 20 т
-    10: 0.20,   # экстраполяция ниже 20 т
-    20: 0.24,   # нижняя граница диапазона 20–50 т
-    32: 0.28,   # интерполяция 20–50 т
-    50: 0.35,   # верхняя граница диапазона 20–50 т
-    80: 0.37,   # нижняя граница диапазона 80–200 т
-    100: 0.39,  # пример из методики (Q=100/20 т → αпб=0.39)
-    125: 0.41,  # интерполяция 80–200 т
-    200: 0.47,  # верхняя граница диапазона 80–200 т
-    320: 0.57,  # экстраполяция выше 200 т
-    400: 0.64,  # экстраполяция выше 200 т
-}
-RAIL_WEIGHT_KN = {
-    5:0.461, 10:0.461, 20:0.461, 32:0.598, 50:0.598,
-    80:0.831, 100:1.135, 125:1.135, 200:1.135, 320:1.417, 400:1.417,
-}
-BEAM_HEIGHT_RATIO = {
-    20:(1/7,1/9), 32:(1/7,1/9), 50:(1/6,1/8.5),
-    80:(1/6,1/7.5), 100:(1/6,1/7), 125:(1/6,1/7),
-    160:(1/6,1/7), 200:(1/6,1/7),
-}
-CRANE_Q_EQUIV = {
-    # kN/m вдоль подкрановой балки (скорректировано по методике ×2.5)
-    5:20, 10:30, 20:50, 32:70, 50:95, 80:138,
-    100:170, 125:200, 200:262, 320:362, 400:437,
-}
+# Для UI (список режимов в комбобоксе)
+CRANE_MODE_FACTOR = CRANE_MODE_FACTOR_M1
 
-TRUSS_LOADS = [
-    2.0,2.5,3.0,3.5,4.0,4.5,5.0,5.5,6.0,
-    6.5,7.0,7.5,8.0,8.5,9.0,9.5,10.0,10.5,
-    11.0,11.5,12.0,12.5,
-]
-TRUSS_MASSES = {
-    "Уголки": {
-        36:[5.90,7.54,10.37,11.12,12.30,12.74,13.30,14.74,15.66,15.66,18.89,18.89,18.89,19.30,21.50,21.50,22.52,23.70,24.57,24.57,26.30,26.92],
-        30:[5.20,5.97,6.47,7.14,7.14,7.70,9.00,9.00,10.20,10.20,10.53,11.64,13.63,13.63,14.43,14.43,15.25,15.25,16.43,16.43,16.43,17.27],
-        24:[2.30,3.16,3.94,3.97,4.29,5.75,5.75,6.28,6.28,6.28,6.53,6.53,6.90,7.97,8.87,8.87,8.87,8.87,8.87,9.11,10.45,11.24],
-        18:[2.16,2.16,2.34,2.45,2.68,2.68,2.83,2.91,3.17,3.64,3.64,3.77,3.95,3.95,4.10,4.10,4.51,4.51,4.51,5.26,5.26,5.26],
-    },
-    "Двутавры": {
-        36:[9.60,10.20,10.20,11.47,12.50,13.49,15.14,15.28,15.87,17.18,18.72,21.06,21.06,21.06,22.11,22.11,25.52,25.52,30.78,31.66,31.66,31.85],
-        30:[6.27,6.38,6.38,8.07,8.23,8.90,9.84,9.93,10.35,12.99,12.99,12.99,12.99,14.89,14.89,14.89,15.35,18.68,18.68,18.68,19.69,19.69],
-        24:[4.60,4.60,5.19,5.30,5.79,5.79,6.35,6.63,7.48,8.31,8.31,8.47,8.47,8.63,9.30,9.30,11.08,11.08,11.08,11.08,11.08,12.10],
-        18:[2.92,2.92,2.92,2.92,3.37,3.92,3.92,3.92,4.34,4.34,4.34,4.72,4.72,4.72,4.72,4.72,5.42,5.42,5.49,5.49,5.86,5.86],
-    },
-    "Молодечно": {
-        36:[7.00,8.05,9.20,12.25,13.53,13.53,15.96,17.18,17.61,21.26,21.26,23.01,24.25,29.80,29.80,29.80,29.80,29.80,31.57,37.40,37.40,37.40],
-        30:[5.24,5.80,5.80,7.34,7.34,11.55,10.40,11.97,11.97,13.59,13.59,13.59,15.40,16.22,17.70,19.54,19.54,19.54,21.37,21.37,21.37,21.37],
-        24:[2.48,3.60,3.85,4.11,5.07,5.07,6.18,6.24,6.47,8.02,8.02,8.70,9.37,9.37,10.00,10.90,10.90,11.54,11.54,12.37,13.62,13.62],
-        18:[1.29,1.54,1.58,2.07,2.18,2.65,3.40,3.40,3.40,3.40,4.08,4.08,4.08,4.70,4.83,4.83,5.70,6.07,6.07,6.07,6.07,7.08],
-    },
+UI_POLL_MS = 10  # период разбора очереди фонового расчёта, мс
+LIVE_DEBOUNCE_MS = 150  # пауза после последней правки до живого пересчёта, мс
+SPAN_PAGE = 3  # карточек пролётов в редакторе (остальные — строками списка)
+
+TRUSS_TYPES = ["Уголки", "Двутавры", "Молодечно"]
+BLD_TYPES   = list(PIPE_SUPPORT.keys())
+PASS_TYPES  = ["С проходом", "Без прохода"]
+
+# Пролёт по умолчанию (как в новой карточке SpanFrame); roof_layers и
+# roof_manual — состояние конструктора кровельного пирога
+_ROOF_PRESET0 = tuple(m for m in list(ROOF_PRESETS.values())[0] if m in ROOF_MATERIALS)
+SPAN_DEFAULTS = {
+    "L_span": 24.0, "B_step": 6.0, "col_step": 12.0, "h_rail": 10.0, "H_col_ov": 0.0,
+    "Q_roof": sum(ROOF_MATERIALS[m] for m in _ROOF_PRESET0) or 0.01, "Q_purlin": 0.35,
+    "truss_type": TRUSS_TYPES[0], "q_crane_t": 50.0, "n_cranes": 1, "with_pass": True,
+    "crane_mode": "Режим 1-6К", "rig_load": 0.0, "has_post": False, "bld_type": BLD_TYPES[0],
+    "roof_layers": _ROOF_PRESET0, "roof_manual": False,
 }
 
-SUBTRUSS_LOADS  = [18.0,36.0,54.0,72.0,81.0,108.0,126.0,144.0,162.0,180.0,198.0,216.0,234.0,255.0]
-SUBTRUSS_MASSES = [1.57,2.22,2.31,2.72,2.72,4.59,5.32,5.32,5.70,5.80,6.30,6.30,6.53,6.71]
-
-FAKHVERK_DATA = {
-    ('I',0,0):9,  ('I',0,1):10, ('I',0,2):11,
-    ('I',1,0):9,  ('I',1,1):11, ('I',1,2):11,
-    ('I',2,0):10, ('I',2,1):12, ('I',2,2):12,
-    ('II',0,0):23,('II',0,1):25,('II',0,2):25,
-    ('II',1,0):23,('II',1,1):25,('II',1,2):25,
-    ('II',2,0):26,('II',2,1):30,('II',2,2):30,
-    ('III',0,0):19,('III',0,1):28,('III',0,2):45,
-    ('III',1,0):19,('III',1,1):29,('III',1,2):46,
-    ('III',2,0):20,('III',2,1):30,('III',2,2):48,
-}
 
-_CB_Q1 = [5,10,20,32,50]
-_CB_Q2 = [80,100,125,200,400]
-CRANE_BEAM_T1 = {
-    # порядок: [5t_1к,5t_2к, 10t_1к,10t_2к, 20t_1к,20t_2к, 32t_1к,32t_2к, 50t_1к,50t_2к]
-    6:  [ 80,  90, 100, 120, 150, 185, 210, 260, 270, 330],
-    12: [150, 170, 190, 230, 270, 335, 375, 455, 490, 595],
-}
-CRANE_BEAM_T2 = {
-    # порядок: [80t_1к,80t_2к, 100t_1к,100t_2к, 125t_1к,125t_2к, 200t_1к,200t_2к, 400t_1к,400t_2к]
-    12: [290, 330, 350, 400, 430, 490,  620,  720,  920, 1080],
-    18: [460, 520, 540, 615, 660, 750,  950, 1100, 1410, 1640],
-    24: [680, 770, 800, 910, 980,1110, 1420, 1640, 2100, 2450],
-}
-BRAKE_T1 = {
-    (6,True,True):[100,110],(6,True,False):[65,70],
-    (6,False,True):[120,140],(6,False,False):[70,75],
-    (12,True,True):[100,120],(12,True,False):[65,70],
-    (12,False,True):[100,120],(12,False,False):[70,75],
-}
-BRAKE_T2 = {
-    (12,True,True):[120,140],(12,True,False):[80,100],
-    (12,False,True):[140,160],(12,False,False):[60,80],
-    (18,True,True):[120,140],(18,True,False):[80,100],
-    (18,False,True):[140,160],(18,False,False):[80,100],
-    (24,True,True):[220,240],(24,True,False):[140,160],
-    (24,False,True):[220,240],(24,False,False):[140,160],
+def text_patch(old: str, new: str) -> list:
+    """
+    Правки, переводящие текст old в new: список (начало, конец, вставка) —
+    заменить old[начало:конец] на вставку; по возрастанию смещений (символы),
+    применять с конца. Если число строк не изменилось, каждая серия
+    изменённых строк — отдельная правка; иначе одна правка между общими
+    начальными и конечными строками.
+    """
+    a, b = old.split("\n"), new.split("\n")
+    if len(a) != len(b):
+        n = min(len(a), len(b))
+        head = 0
+        while head < n and a[head] == b[head]:
+            head += 1
+        tail = 0
+        while tail < n - head and a[-1 - tail] == b[-1 - tail]:
+            tail += 1
+        pre = min(sum(len(line) + 1 for line in a[:head]), len(old), len(new))
+        suf = len("\n".join(a[len(a) - tail:])) if tail else 0
+        suf = min(suf, len(old) - pre, len(new) - pre)
+        return [(pre, len(old) - suf, new[pre:len(new) - suf])]
+    hunks = []
+    pos = i = 0
+    while i < len(a):
+        if a[i] == b[i]:
+            pos += len(a[i]) + 1
+            i += 1
+            continue
+        start, j = pos, i
+        while j < len(a) and a[j] != b[j]:
+            pos += len(a[j]) + 1
+            j += 1
+        hunks.append((start, pos - 1, "\n".join(b[i:j])))
+        i = j
+    return hunks
+
+
+def _parse_float(text: str) -> float:
+    return float(text.replace(",", "."))
+
+
+def _parse_choice(values, convert=str):
+    def parse(text: str):
+        text = text.strip()
+        if text not in values:
+            raise ValueError(f"допустимо: {', '.join(values)}")
+        return convert(text)
+    return parse
+
+
+def _parse_yes_no(text: str) -> bool:
+    return _parse_choice(["да", "нет"])(text.lower()) == "да"
+
+
+# Поля для «Применить к выделенным»: подпись -> (ключ пролёта, разбор текста)
+BULK_FIELDS = {
+    "Пролёт L, м":                 ("L_span",     _parse_float),
+    "Шаг ферм B, м":               ("B_step",     _parse_choice(["6", "12"], float)),
+    "Шаг колонн, м":               ("col_step",   _parse_choice(["6", "12"], float)),
+    "Уровень рельса, м":           ("h_rail",     _parse_float),
+    "H_кол, м (0=авто)":           ("H_col_ov",   _parse_float),
+    "Вес прогонов, кН/м²":         ("Q_purlin",   _parse_float),
+    "Тип фермы":                   ("truss_type", _parse_choice(TRUSS_TYPES)),
+    "Г/п крана, т":                ("q_crane_t",  _parse_float),
+    "Кранов в пролёте":            ("n_cranes",   _parse_choice(["1", "2"], int)),
+    "Тормозные пути":              ("with_pass",  _parse_choice(PASS_TYPES, lambda t: t == PASS_TYPES[0])),
+    "Режим работы крана":          ("crane_mode", _parse_choice(list(CRANE_MODE_FACTOR_M1))),
+    "Нагрузка на ригели, кг/м.п.": ("rig_load",   _parse_float),
+    "Стойка фахверка (да/нет)":    ("has_post",   _parse_yes_no),
+    "Тип здания":                  ("bld_type",   _parse_choice(BLD_TYPES)),
 }
 
-# ── П.2: Кровельный пирог ─────────────────────────────────
-# Удельный вес слоёв кровли, кН/м² (нормативные значения)
-ROOF_MATERIALS = {
-    # ── Несущий настил ──────────────────────────────────────
-    "Профнастил Н-75 (t=0.7мм)":            0.078,
-    "Профнастил Н-75 (t=0.8мм)":            0.089,
-    "Профнастил Н-60 (t=0.7мм)":            0.075,
-    "Профнастил НС-35 (t=0.7мм)":           0.070,
-    "Профнастил НС-35 (t=0.5мм)":           0.050,
-    # ── Утеплитель минеральная вата (ρ=80 кг/м³) ────────────
-    "Минвата 50мм  (ρ=80 кг/м³)":           0.039,
-    "Минвата 100мм (ρ=80 кг/м³)":           0.078,
-    "Минвата 150мм (ρ=80 кг/м³)":           0.118,
-    "Минвата 200мм (ρ=80 кг/м³)":           0.157,
-    # ── Утеплитель PIR (ρ=35 кг/м³) ────────────────────────
-    "PIR-плита 80мм  (ρ=35 кг/м³)":         0.027,
-    "PIR-плита 100мм (ρ=35 кг/м³)":         0.034,
-    "PIR-плита 150мм (ρ=35 кг/м³)":         0.051,
-    "PIR-плита 200мм (ρ=35 кг/м³)":         0.069,
-    # ── Утеплитель пенополистирол (ρ=25 кг/м³) ─────────────
-    "Пенополистирол 100мм (ρ=25 кг/м³)":    0.025,
-    "Пенополистирол 150мм (ρ=25 кг/м³)":    0.037,
-    "Пенополистирол 200мм (ρ=25 кг/м³)":    0.049,
-    # ── Пароизоляция ────────────────────────────────────────
-    "Пароизоляция п/э плёнка 200мкм":       0.003,
-    "Пароизоляция фольгированная":           0.010,
-    "Пароизоляция битумная (1 слой)":        0.025,
-    # ── Гидроизоляция ───────────────────────────────────────
-    "Мембрана ПВХ 1.5мм":                   0.018,
-    "Мембрана ТПО 1.5мм":                   0.018,
-    "Мембрана ЭПДМ 1.5мм":                  0.016,
-    "Битумный ковёр 2 слоя (рубероид)":     0.049,
-    "Наплавляемая кровля 2 слоя (СБС)":     0.070,
-    # ── Готовые системы ─────────────────────────────────────
-    "Сэндвич-панель кровельная 150мм":       0.130,
-    "Сэндвич-панель кровельная 200мм":       0.167,
-    # ── Прочие слои ─────────────────────────────────────────
-    "Стяжка цементная 20мм":                 0.420,
-    "Стяжка цементная 30мм":                 0.630,
-    "Доборные элементы (конёк, карниз)":     0.020,
-}
 
-# Предустановленные типовые пироги кровли (имя → список материалов)
-ROOF_PRESETS = {
-    "Унипрофиль (проф. + минвата 150 + ПВХ)": [
-        "Профнастил Н-75 (t=0.8мм)",
-        "Минвата 150мм (ρ=80 кг/м³)",
-        "Пароизоляция п/э плёнка 200мкм",
-        "Мембрана ПВХ 1.5мм",
-    ],
-    "Сэндвич-панель 200мм (готовая кровля)": [
-        "Сэндвич-панель кровельная 200мм",
-    ],
-    "Утеплённая PIR 150 + наплавляемая": [
-        "Профнастил Н-75 (t=0.8мм)",
-        "PIR-плита 150мм (ρ=35 кг/м³)",
-        "Пароизоляция битумная (1 слой)",
-        "Наплавляемая кровля 2 слоя (СБС)",
-    ],
-    "Холодная кровля (профнастил)": [
-        "Профнастил Н-75 (t=0.8мм)",
-    ],
-}
+def _num(v, ndigits: int):
+    """Округление для отчёта: дробное число — до ndigits знаков, прочее («н/п», целые) как есть."""
+    return round(v, ndigits) if isinstance(v, float) else v
+
+
+def span_summary(i: int, sp: dict) -> str:
+    """Строка пролёта в списке редактора."""
+    return (f"{i + 1:>4}  L={sp['L_span']:g}  B={sp['B_step']:g}  шаг={sp['col_step']:g}  "
+            f"УГР={sp['h_rail']:g}  Q={sp['q_crane_t']:g}т×{sp['n_cranes']}  {sp['truss_type']}")
 
-# ── П.4: Коэффициенты режима работы кранов ────────────────
-# М1 — аналитическая формула, калибрована под режим 1-6К:
-#   1-6К → ×1.00 (база), 7-8К → ×1.80 (тяжёлый +80 %)
-CRANE_MODE_FACTOR_M1 = {
-    "Режим 1-6К":  1.00,
-    "Режим 7-8К":  1.80,
-}
-# М2 — таблицы CRANE_BEAM_T1/T2 и BRAKE составлены под режим 7-8К:
-#   7-8К → ×1.80 (тяжёлый режим),
-#   1-6К → ×0.65 (снижение ~43 % относительно 7-8К, методика разд. 5.2)
-CRANE_MODE_FACTOR_M2 = {
-    "Режим 1-6К":  0.65,
-    "Режим 7-8К":  1.80,
-}
-# Для UI (список режимов в комбобоксе)
-CRANE_MODE_FACTOR = CRANE_MODE_FACTOR_M1
 
 # ─────────────────────────────────────────────────────────
 #  ПОДСКАЗКИ ДЛЯ ПОЛЕЙ ВВОДА
@@ -239,521 +163,6 @@ TOOLTIPS = {
 }
 
 
-# ─────────────────────────────────────────────────────────
-#  ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ
-# ─────────────────────────────────────────────────────────
-
-def _lkp(d, val):
-    """Поиск с округлением вверх по sorted dict."""
-    for k in sorted(d):
-        if val <= k: return d[k]
-    return d[sorted(d)[-1]]
-
-
-def select_purlin(load_tm, B_step):
-    """Подбор прогона по Таблице 3 методики.
-    load_tm — нормативная нагрузка на прогон, т/м;
-    B_step  — шаг стропильных ферм, м (6 или 12).
-    Возвращает (масса_1_прогона_кг, имя_профиля).
-    """
-    use_6 = (B_step <= 6)
-    for max_l, n6, m6, n12, m12 in PURLIN_TABLE:
-        if load_tm <= max_l:
-            return (m6, n6) if use_6 else (m12, n12)
-    _, n6, m6, n12, m12 = PURLIN_TABLE[-1]
-    return (m6, f"{n6}(!)") if use_6 else (m12, f"{n12}(!)")
-
-
-def interp_table(loads, masses, target):
-    for i, ld in enumerate(loads):
-        if target <= ld: return masses[i]
-    return masses[-1]
-
-
-def ceil_to_table(target, values):
-    for v in sorted(values):
-        if target <= v: return v
-    return sorted(values)[-1]
-
-
-def get_truss_mass_m2(truss_type, span_m, load_tm):
-    spans = sorted(TRUSS_MASSES.get(truss_type, {}).keys())
-    if not spans: return None
-    sk = ceil_to_table(span_m, spans)
-    ms = TRUSS_MASSES[truss_type].get(sk)
-    if ms is None: return None
-    return interp_table(TRUSS_LOADS, ms, load_tm)
-
-
-def get_subtruss_mass_m2(R_t):
-    Rc = ceil_to_table(R_t, SUBTRUSS_LOADS)
-    return interp_table(SUBTRUSS_LOADS, SUBTRUSS_MASSES, Rc)
-
-
-def get_bracing_kgm2(q_crane_t, step_farm_m):
-    if q_crane_t <= 120: return 15.0 if step_farm_m <= 6 else 35.0
-    return 40.0 if step_farm_m <= 6 else 55.0
-
-
-def get_crane_beam_kgm(q_crane_t, span_pb_m, n_cranes):
-    try:
-        table = CRANE_BEAM_T1 if q_crane_t <= 50 else CRANE_BEAM_T2
-        q_ord = _CB_Q1 if q_crane_t <= 50 else _CB_Q2
-        sk = ceil_to_table(span_pb_m, sorted(table.keys()))
-        vals = table.get(sk)
-        if vals is None: return None
-        qi = min(range(len(q_ord)), key=lambda i: abs(q_ord[i]-q_crane_t))
-        ci = qi*2 + (0 if n_cranes == 1 else 1)
-        return vals[ci] if ci < len(vals) else None
-    except: return None
-
-
-def get_brake_kgm(q_crane_t, span_pb_m, n_cranes, with_passage, is_edge):
-    try:
-        table = BRAKE_T1 if q_crane_t <= 50 else BRAKE_T2
-        sk = ceil_to_table(span_pb_m, sorted({k[0] for k in table}))
-        vals = table.get((sk, is_edge, with_passage))
-        if vals is None:
-            for k, v in table.items():
-                if k[0] == sk: vals = v; break
-        if vals:
-            return vals[0 if n_cranes == 1 else min(1, len(vals)-1)]
-    except: pass
-    return None
-
-
-def get_fakhverk_kgm2(step_col_m, has_post, h_bld, rig_load):
-    try:
-        if step_col_m <= 6 and has_post: ft = 'III'
-        elif step_col_m <= 6: ft = 'I'
-        else: ft = 'II'
-        lc = 0 if rig_load <= 0 else (1 if rig_load <= 100 else 2)
-        hc = 0 if h_bld <= 10 else (1 if h_bld <= 20 else 2)
-        return FAKHVERK_DATA.get((ft, lc, hc))
-    except: return None
-
-
-def get_pipe_support_kgm2(bld_type):
-    d = {
-        "Основные производственные": (11, 22),
-        "Здания энергоносителей":     (23, 40),
-        "Вспомогательные здания":     (2, 4),
-    }
-    lo, hi = d.get(bld_type, (11, 22))
-    return (lo + hi) / 2
-
-
-# ─────────────────────────────────────────────────────────
-#  ОСНОВНОЙ РАСЧЁТ — многопролётная версия v3.0
-# ─────────────────────────────────────────────────────────
-
-def calculate(gp: dict, spans: list) -> dict:
-    """
-    gp   — глобальные параметры здания: L_build, Q_snow, Q_dust, Q_tech, yc
-    spans — список пролётов, каждый содержит все per-span параметры:
-            L_span, B_step, col_step, h_rail, H_col_ov,
-            Q_roof, Q_purlin, truss_type, q_crane_t, n_cranes,
-            with_pass, crane_mode, rig_load, has_post, bld_type
-    Колонны: N пролётов → N+1 рядов колонн.
-    Крайние ряды (2 шт.) — несут нагрузку от 1 пролёта.
-    Средние ряды (N-1 шт.) — от 2 соседних пролётов.
-    """
-    res = {}
-    log = []
-
-    L_build = gp["L_build"]
-    Q_snow  = gp["Q_snow"]
-    Q_dust  = gp["Q_dust"]
-    Q_tech  = gp["Q_tech"]
-    yc      = gp["yc"]
-
-    N = len(spans)
-    W_build = sum(sp["L_span"] for sp in spans)
-    S_floor = L_build * W_build
-    P_walls = 2 * (L_build + W_build)
-
-    log.append(f"Пролётов: {N}  W={W_build:.0f}м  S_пола={S_floor:.0f}м²")
-
-    # ── Высота колонн — per-span ────────────────────────
-    def _span_col_heights(sp):
-        h_b = sp["col_step"] / 6 if sp["q_crane_t"] <= 50 else sp["col_step"] / 7
-        if sp["q_crane_t"] <= 20:   h_r = 0.130
-        elif sp["q_crane_t"] <= 50: h_r = 0.150
-        elif sp["q_crane_t"] <= 80: h_r = 0.170
-        else:                        h_r = 0.180
-        H_full = sp["h_rail"] + 4.5
-        if sp.get("H_col_ov", 0) > 0:
-            H_full = sp["H_col_ov"]
-        H_lower = sp["h_rail"] - h_b - h_r + 0.6
-        H_upper = H_full - H_lower
-        return H_upper, H_lower, H_full
-
-    span_heights = [_span_col_heights(sp) for sp in spans]
-
-    for i, (H_upper, H_lower, H_full) in enumerate(span_heights):
-        log.append(f"Пролёт {i+1}: H_кол={H_full:.2f}м (надкр={H_upper:.2f}м  подкр={H_lower:.2f}м)")
-
-    # Для ограждения и фахверка берём max H_full
-    H_full_max = max(h[2] for h in span_heights)
-    S_walls = P_walls * H_full_max
-
-    # ── 1+2. Прогоны и фермы — по пролётам ─────────────
-    g_links = 0.05
-
-    G_pur_all_t = 0.0
-    G_tr_m1_all = 0.0
-    G_tr_m2_all = 0.0
-    span_data   = []
-
-    for i, sp in enumerate(spans):
-        L  = sp["L_span"]
-        tt = sp["truss_type"]
-        B  = sp["B_step"]
-        Ss = L_build * L
-
-        # Per-span нагрузки
-        Q_load_total = sp["Q_roof"] + sp["Q_purlin"] + Q_snow + Q_dust + Q_tech + g_links
-        gn_total     = Q_load_total
-
-        # Прогоны
-        a_pr = 3.0
-        qp_tm = (sp["Q_roof"] + sp["Q_purlin"] + Q_snow + Q_dust + Q_tech) * a_pr * yc / 9.81
-        mp, pname = select_purlin(qp_tm, B)
-        n_pr = int(L / a_pr) + 1
-        g_pur = mp * n_pr / (L * B)
-        G_pur_t = g_pur * Ss / 1000
-        G_pur_all_t += G_pur_t
-
-        # Фермы — нагрузка
-        n_tr = L_build / B + 1
-        Q_tm = gn_total * B * yc / 9.81
-
-        # М1 (только Уголки)
-        G_tr1 = None
-        if tt == "Уголки":
-            Gkn  = (gn_total * B / 1000 + 0.018) * 1.4 * L**2 / 0.85 * yc
-            G_tr1 = Gkn / 9.81 * n_tr
-            G_tr_m1_all += G_tr1
-
-        # М2 (таблица)
-        G_tr2 = None
-        mt = get_truss_mass_m2(tt, L, Q_tm)
-        if mt is not None:
-            G_tr2 = mt * n_tr
-            G_tr_m2_all += G_tr2
-
-        span_data.append({
-            "idx": i+1, "L_span": L, "S_span": Ss, "tt": tt,
-            "B_step": B,
-            "purlin": pname, "qp_tm": round(qp_tm, 3),
-            "g_pur_kgm2": round(g_pur, 2), "G_pur_t": round(G_pur_t, 2),
-            "Q_tm": round(Q_tm, 3),
-            "G_tr_m1": round(G_tr1, 2) if G_tr1 is not None else "н/п",
-            "G_tr_m2": round(G_tr2, 2) if G_tr2 is not None else "н/п",
-            "Q_load_total": Q_load_total,
-        })
-
-    res["прогоны"] = {
-        "масса_общая_т": round(G_pur_all_t, 2),
-        "по_пролётам": [{"пролёт":d["idx"],"профиль":d["purlin"],
-            "нагрузка_тм":d["qp_tm"],"расход_кгм2":d["g_pur_kgm2"],
-            "масса_т":d["G_pur_t"]} for d in span_data],
-    }
-    res["фермы"] = {
-        "масса_общая_т_М1": round(G_tr_m1_all, 2),
-        "масса_общая_т_М2": round(G_tr_m2_all, 2),
-        "по_пролётам": [{"пролёт":d["idx"],"нагрузка_тм":d["Q_tm"],
-            "G_М1_т":d["G_tr_m1"],"G_М2_т":d["G_tr_m2"]} for d in span_data],
-    }
-
-    # ── 3. Связи покрытия — per-span, суммарно ──────────
-    G_br_total = 0.0
-    br_rows = []
-    for i, sp in enumerate(spans):
-        Ss = L_build * sp["L_span"]
-        g_br_sp = get_bracing_kgm2(sp["q_crane_t"], sp["B_step"])
-        G_br_sp = g_br_sp * Ss / 1000
-        G_br_total += G_br_sp
-        br_rows.append({"пролёт": i+1, "расход_кгм2": g_br_sp, "масса_т": round(G_br_sp, 2)})
-
-    res["связи_покрытия"] = {
-        "расход_кгм2": round(G_br_total * 1000 / S_floor, 2) if S_floor else 0,
-        "масса_общая_т": round(G_br_total, 2),
-        "по_пролётам": br_rows,
-    }
-
-    # ── 4. Подстропильные фермы — per-span ───────────────
-    G_sub_m1 = 0.0
-    G_sub_m2 = 0.0
-    sub_rows = []
-    need_sub = any(sp["col_step"] == 12 and sp["B_step"] < sp["col_step"] for sp in spans)
-    if need_sub:
-        for i, sp in enumerate(spans):
-            if not (sp["col_step"] == 12 and sp["B_step"] < sp["col_step"]):
-                sub_rows.append({"пролёт": i+1, "G_М1_т": 0, "G_М2_т": "н/п", "R_кн": 0})
-                continue
-            L = sp["L_span"]
-            B = sp["B_step"]
-            Q_load_sp = span_data[i]["Q_load_total"]
-            gn_sp = Q_load_sp
-            n_bays = L_build / sp["col_step"]
-            Q_tm_sp = gn_sp * B * yc / 9.81
-            R_kn = gn_sp * B * yc * L / 2
-            R_t  = R_kn / 9.81
-            Rf   = max(100, min(R_kn, 400))
-            apf  = (Rf - 100) * 0.0002 + 0.044
-            G1   = apf * 144 * n_bays / N
-            G_sub_m1 += G1
-            mt = get_subtruss_mass_m2(R_t)
-            G2 = mt * n_bays / N if mt else None
-            if G2: G_sub_m2 += G2
-            sub_rows.append({"пролёт": i+1, "R_кн": round(R_kn, 1),
-                "G_М1_т": round(G1, 2), "G_М2_т": round(G2, 2) if G2 else "н/п"})
-        res["подстропильные_фермы"] = {
-            "масса_общая_т_М1": round(G_sub_m1, 2),
-            "масса_общая_т_М2": round(G_sub_m2, 2),
-            "по_пролётам": sub_rows,
-        }
-    else:
-        res["подстропильные_фермы"] = {"примечание": "Не требуются"}
-
-    # ── 5. Подкрановые балки — по рядам колонн ──────────
-    # Для каждого ряда используем col_step соответствующего пролёта
-    G_pb_m1 = 0.0
-    G_pb_m2 = 0.0
-    pb_rows = []
-
-    def _pb_row(sp_obj, is_edge, label):
-        nonlocal G_pb_m1, G_pb_m2
-        q      = sp_obj["q_crane_t"]
-        nc     = sp_obj["n_cranes"]
-        wp     = sp_obj["with_pass"]
-        mode   = sp_obj["crane_mode"]
-        mf_m1  = CRANE_MODE_FACTOR_M1[mode]   # для М1: 1-6К=1.00 / 7-8К=1.15
-        mf_m2  = CRANE_MODE_FACTOR_M2[mode]   # для М2: 1-6К=0.65 / 7-8К=1.15
-        L_pb_loc = float(sp_obj["col_step"])
-        n_bays_a = math.ceil(L_build / L_pb_loc)
-        alp = _lkp(CRANE_BEAM_ALPHA, q)
-        qr  = _lkp(RAIL_WEIGHT_KN, q)
-        # М1: аналитическая формула × коэффициент режима (kпб=1.2 по методике ЦНИИ разд. 5.1)
-        G1t = (alp * L_pb_loc + qr) * L_pb_loc * 1.2 / 9.81 * mf_m1
-        G_pb_m1 += G1t * n_bays_a
-        # М2: табличные значения × коэффициент режима
-        pb_kgm = get_crane_beam_kgm(q, L_pb_loc, nc)
-        br_kgm = get_brake_kgm(q, L_pb_loc, nc, wp, is_edge)
-        if pb_kgm and br_kgm is not None:
-            G_pb_m2 += (pb_kgm + br_kgm) * mf_m2 * L_pb_loc * n_bays_a / 1000
-        pb_rows.append({"ряд": label, "G_М1_т": round(G1t * n_bays_a, 2), "q": q})
-
-    # Крайний левый (пролёт 0)
-    _pb_row(spans[0], True, "Крайний Л")
-    # Средние
-    for mi in range(1, N):
-        _pb_row(spans[mi-1], False, f"Средний {mi} (лев)")
-        _pb_row(spans[mi],   False, f"Средний {mi} (прав)")
-    # Крайний правый
-    _pb_row(spans[N-1], True, "Крайний П")
-
-    res["подкрановые_балки"] = {
-        "масса_общая_т_М1": round(G_pb_m1, 2),
-        "масса_общая_т_М2": round(G_pb_m2, 2) if G_pb_m2 > 0 else "н/п",
-        "ряды_колонн": pb_rows,
-    }
-
-    # ── 6. Колонны — с учётом топологии и per-span высот ─
-    rho=78.5; pu=1.4; pl=2.1; kMu=0.275; kMl=0.45
-    gst=0.25; aw=0.15
-
-    def _col_kg(L_sp, q_cr, H_up, H_lo, cs, Q_load_sp):
-        L_pb_loc = float(cs)
-        Gwu = gst * H_up * (1 - aw) * cs
-        Gwl = gst * H_lo * (1 - aw) * cs
-        SFv = Q_load_sp * cs * L_sp / 2 + Gwu
-        Gcu = SFv * rho * pu * H_up / (kMu * 240000)
-        qeq = _lkp(CRANE_Q_EQUIV, q_cr)
-        D   = qeq * cs * 1.1 * yc
-        alp = _lkp(CRANE_BEAM_ALPHA, q_cr)
-        qrr = _lkp(RAIL_WEIGHT_KN, q_cr)
-        Gpb = (alp * L_pb_loc + qrr) * L_pb_loc * 1.2  # kпб=1.2 по методике
-        SFn = SFv + D + Gpb + Gwl + Gcu
-        Gcl = SFn * rho * pl * H_lo / (kMl * 240000)
-        return (Gcu + Gcl) / 9.81 * 1000
-
-    G_cols_t = 0.0
-    col_rows_detail = []
-
-    # Крайний левый ряд — пролёт 0
-    sp0 = spans[0]
-    H_up0, H_lo0, H_full0 = span_heights[0]
-    n_col_along_0 = round(L_build / sp0["col_step"]) + 1
-    Q_load_0 = span_data[0]["Q_load_total"]
-    Gce = _col_kg(sp0["L_span"], sp0["q_crane_t"], H_up0, H_lo0, sp0["col_step"], Q_load_0)
-    G_cols_t += Gce * n_col_along_0 / 1000
-    col_rows_detail.append({
-        "ряд": "Крайний Л",
-        "масса_1_кг": round(Gce, 1),
-        "масса_ряд_т": round(Gce * n_col_along_0 / 1000, 2),
-    })
-
-    # Средние ряды — используем параметры левого пролёта
-    for mi in range(1, N):
-        sL = spans[mi-1]
-        sR = spans[mi]
-        H_upL, H_loL, H_fullL = span_heights[mi-1]
-        cs_mid = sL["col_step"]
-        n_col_mid = round(L_build / cs_mid) + 1
-        Q_load_L = span_data[mi-1]["Q_load_total"]
-        Q_load_R = span_data[mi]["Q_load_total"]
-        Gwu = gst * H_upL * (1 - aw) * cs_mid
-        Gwl = gst * H_loL * (1 - aw) * cs_mid
-        SFv = (Q_load_L + Q_load_R) * cs_mid * (sL["L_span"] + sR["L_span"]) / 4 + Gwu
-        Gcu = SFv * rho * pu * H_upL / (kMu * 240000)
-        qeqL = _lkp(CRANE_Q_EQUIV, sL["q_crane_t"])
-        qeqR = _lkp(CRANE_Q_EQUIV, sR["q_crane_t"])
-        D = (qeqL + qeqR) * cs_mid * 1.1 * yc
-        alpL = _lkp(CRANE_BEAM_ALPHA, sL["q_crane_t"])
-        qrL  = _lkp(RAIL_WEIGHT_KN,  sL["q_crane_t"])
-        alpR = _lkp(CRANE_BEAM_ALPHA, sR["q_crane_t"])
-        qrR  = _lkp(RAIL_WEIGHT_KN,  sR["q_crane_t"])
-        L_pb_L = float(sL["col_step"])
-        L_pb_R = float(sR["col_step"])
-        Gpb = (alpL * L_pb_L + qrL) * L_pb_L * 1.2 + (alpR * L_pb_R + qrR) * L_pb_R * 1.2  # kпб=1.2
-        SFn = SFv + D + Gpb + Gwl + Gcu
-        Gcl = SFn * rho * pl * H_loL / (kMl * 240000)
-        Gcm_kg = (Gcu + Gcl) / 9.81 * 1000
-        G_cols_t += Gcm_kg * n_col_mid / 1000
-        col_rows_detail.append({
-            "ряд": f"Средний {mi}",
-            "масса_1_кг": round(Gcm_kg, 1),
-            "масса_ряд_т": round(Gcm_kg * n_col_mid / 1000, 2),
-        })
-
-    # Крайний правый ряд — пролёт N-1
-    spN = spans[N-1]
-    H_upN, H_loN, H_fullN = span_heights[N-1]
-    n_col_along_N = round(L_build / spN["col_step"]) + 1
-    Q_load_N = span_data[N-1]["Q_load_total"]
-    Gce2 = _col_kg(spN["L_span"], spN["q_crane_t"], H_upN, H_loN, spN["col_step"], Q_load_N)
-    G_cols_t += Gce2 * n_col_along_N / 1000
-    col_rows_detail.append({
-        "ряд": "Крайний П",
-        "масса_1_кг": round(Gce2, 1),
-        "масса_ряд_т": round(Gce2 * n_col_along_N / 1000, 2),
-    })
-
-    n_col_total = n_col_along_0 * (N + 1)
-
-    # Для отображения — первый пролёт
-    H_full_disp  = span_heights[0][2]
-    H_upper_disp = span_heights[0][0]
-    H_lower_disp = span_heights[0][1]
-
-    # Сохраним все высоты по пролётам для отображения
-    span_heights_list = [
-        {"пролёт": i+1, "H_full": round(h[2], 2),
-         "H_upper": round(h[0], 2), "H_lower": round(h[1], 2)}
-        for i, h in enumerate(span_heights)
-    ]
-
-    res["колонны"] = {
-        "n_колонн": n_col_total,
-        "H_full_м":  round(H_full_disp, 2),
-        "H_upper_м": round(H_upper_disp, 2),
-        "H_lower_м": round(H_lower_disp, 2),
-        "высоты_пролётов": span_heights_list,
-        "расход_кгм2": round(G_cols_t * 1000 / S_floor, 2) if S_floor else 0,
-        "масса_общая_т": round(G_cols_t, 2),
-        "по_рядам": col_rows_detail,
-    }
-
-    # ── 7. Фахверк — per-span ──────────────────────────
-    G_fakh_total = 0.0
-    fakh_rows = []
-    for i, sp in enumerate(spans):
-        H_full_sp = span_heights[i][2]
-        # Площадь стен, приходящаяся на данный пролёт (пропорционально)
-        S_walls_sp = P_walls * H_full_sp / N
-        gf = get_fakhverk_kgm2(sp["col_step"], sp["has_post"], H_full_sp, sp["rig_load"])
-        if gf:
-            G_fakh_sp = gf * S_walls_sp / 1000
-            G_fakh_total += G_fakh_sp
-            fakh_rows.append({"пролёт": i+1, "расход_кгм2_стены": gf,
-                               "масса_т": round(G_fakh_sp, 2)})
-        else:
-            fakh_rows.append({"пролёт": i+1, "ошибка": "Не определён", "масса_т": 0})
-
-    if G_fakh_total > 0:
-        res["фахверк"] = {
-            "расход_кгм2_стены": round(G_fakh_total * 1000 / S_walls, 2) if S_walls else 0,
-            "площадь_стен_м2": round(S_walls, 1),
-            "масса_общая_т": round(G_fakh_total, 2),
-            "по_пролётам": fakh_rows,
-        }
-    else:
-        res["фахверк"] = {"ошибка": "Не определён", "масса_общая_т": 0,
-                          "по_пролётам": fakh_rows}
-
-    # ── 8. Ограждение ───────────────────────────────────
-    res["ограждение"] = {"стены_м2": round(S_walls, 1), "кровля_м2": round(S_floor, 1)}
-
-    # ── 9. Опоры трубопроводов — per-span ───────────────
-    G_pipe_total = 0.0
-    pipe_rows = []
-    for i, sp in enumerate(spans):
-        Ss = L_build * sp["L_span"]
-        gp2 = get_pipe_support_kgm2(sp["bld_type"])
-        G_pipe_sp = gp2 * Ss / 1000
-        G_pipe_total += G_pipe_sp
-        pipe_rows.append({"пролёт": i+1, "расход_кгм2": gp2, "масса_т": round(G_pipe_sp, 2)})
-
-    res["опоры_трубопроводов"] = {
-        "расход_кгм2": round(G_pipe_total * 1000 / S_floor, 2) if S_floor else 0,
-        "масса_общая_т": round(G_pipe_total, 2),
-        "по_пролётам": pipe_rows,
-    }
-
-    # ── П.6: Гибридное суммирование ─────────────────────
-    def sv(d, *keys):
-        for k in keys:
-            v = d.get(k)
-            if isinstance(v, (int, float)): return float(v)
-        return 0.0
-
-    common = (
-        sv(res["прогоны"],               "масса_общая_т")
-        + sv(res["колонны"],             "масса_общая_т")
-        + sv(res["связи_покрытия"],      "масса_общая_т")
-        + sv(res["фахверк"],             "масса_общая_т")
-        + sv(res["опоры_трубопроводов"], "масса_общая_т")
-    )
-
-    m1_spec = (
-        sv(res["фермы"],                  "масса_общая_т_М1")
-        + sv(res["подстропильные_фермы"], "масса_общая_т_М1")
-        + sv(res["подкрановые_балки"],    "масса_общая_т_М1")
-    )
-
-    m2_spec = (
-        sv(res["фермы"],                  "масса_общая_т_М2")
-        + sv(res["подстропильные_фермы"], "масса_общая_т_М2")
-        + sv(res["подкрановые_балки"],    "масса_общая_т_М2")
-    )
-
-    total_m1 = common + m1_spec
-    total_m2 = common + m2_spec
-
-    res["итого"] = {
-        "М1_т":    round(total_m1, 2),
-        "М2_т":    round(total_m2, 2),
-        "М1_кгм2": round(total_m1 * 1000 / S_floor, 2) if S_floor else 0,
-        "М2_кгм2": round(total_m2 * 1000 / S_floor, 2) if S_floor else 0,
-        "min_т":   round(min(total_m1, total_m2), 2),
-        "max_т":   round(max(total_m1, total_m2), 2),
-        "S_floor": round(S_floor, 1),
-    }
-    res["_log"] = log
-    return res
-
 
 # ─────────────────────────────────────────────────────────
 #  ВСПЛЫВАЮЩАЯ ПОДСКАЗКА
@@ -829,9 +238,10 @@ class FloatEntry(ctk.CTkEntry):
 class RoofPieWidget(ctk.CTkFrame):
     """Конструктор кровельного пирога: выбор слоёв → авторасчёт нагрузки кН/м²."""
 
-    def __init__(self, parent, **kw):
+    def __init__(self, parent, on_change=None, **kw):
         super().__init__(parent, fg_color="transparent", **kw)
         self._items: list[dict] = []   # {"name": str, "weight": float, "frame": CTkFrame}
+        self._on_change = on_change or (lambda: None)
         self._build()
 
     def _build(self):
@@ -901,6 +311,7 @@ class RoofPieWidget(ctk.CTkFrame):
         self._manual_e = FloatEntry(self._manual_fr, width=100)
         self._manual_e.insert(0, "0.30")
         self._manual_e.pack(side="left")
+        self._manual_e.bind("<KeyRelease>", lambda _e: self._on_change(), add="+")
         self._manual_fr.grid_remove()
 
         # Загрузить первый пресет по умолчанию
@@ -954,6 +365,7 @@ class RoofPieWidget(ctk.CTkFrame):
     def _update_total(self):
         total = sum(it["weight"] for it in self._items)
         self._total_lbl.configure(text=f"Итого: {total:.3f} кН/м²")
+        self._on_change()
 
     def _toggle(self):
         if self._manual_var.get():
@@ -966,6 +378,7 @@ class RoofPieWidget(ctk.CTkFrame):
         else:
             self._pie_fr.grid()
             self._manual_fr.grid_remove()
+        self._on_change()
 
     def get_total(self) -> float:
         if self._manual_var.get():
@@ -973,15 +386,45 @@ class RoofPieWidget(ctk.CTkFrame):
         total = sum(it["weight"] for it in self._items)
         return total if total > 0 else 0.01
 
+    def get_state(self) -> tuple:
+        """(слои пирога, ручной ввод) — для хранения пролёта в SpanList."""
+        return tuple(it["name"] for it in self._items), bool(self._manual_var.get())
+
+    def set_state(self, layers, manual: bool, q_roof: float):
+        """Восстановить пирог и режим ввода (q_roof — нагрузка при ручном вводе)."""
+        for it in self._items:
+            it["frame"].destroy()
+        self._items.clear()
+        for name in layers:
+            if name in ROOF_MATERIALS:
+                self._add_item(name)
+        self._manual_var.set(manual)
+        self._manual_e.delete(0, "end")
+        self._manual_e.insert(0, f"{q_roof:.3f}")
+        if manual:
+            self._pie_fr.grid_remove()
+            self._manual_fr.grid()
+        else:
+            self._pie_fr.grid()
+            self._manual_fr.grid_remove()
+
 
 class SpanFrame(ctk.CTkFrame):
     """Карточка одного пролёта — все per-span параметры."""
 
-    def __init__(self, parent, span_num: int, on_remove):
+    def __init__(self, parent, span_num: int, on_remove, on_change=None):
         super().__init__(parent, fg_color="#1e2a3a", corner_radius=8)
         self._num = span_num
+        self.index = span_num - 1       # индекс пролёта в SpanList
         self._on_remove = on_remove
+        self._on_change = on_change or (lambda sf: None)
+        self._loading = True            # заполнение полей при построении — не правка
         self._build(span_num)
+        self._loading = False
+
+    def _changed(self):
+        if not self._loading:
+            self._on_change(self)
 
     def _build(self, n):
         # Заголовок
@@ -1015,6 +458,7 @@ class SpanFrame(ctk.CTkFrame):
             e = FloatEntry(body, width=110)
             e.insert(0, str(default))
             e.grid(row=self._row, column=1, sticky="w", **PAD)
+            e.bind("<KeyRelease>", lambda _e: self._changed(), add="+")
             if tip_key and tip_key in TOOLTIPS:
                 qb = ctk.CTkButton(
                     body, text="?", width=22, height=22,
@@ -1031,6 +475,7 @@ class SpanFrame(ctk.CTkFrame):
             ctk.CTkLabel(body, text=lbl, font=FL, anchor="w").grid(
                 row=self._row, column=0, sticky="w", **PAD)
             v = ctk.StringVar(value=default or values[0])
+            v.trace_add("write", lambda *_: self._changed())
             c = ctk.CTkComboBox(body, values=values, variable=v, width=200)
             c.grid(row=self._row, column=1, sticky="w", **PAD)
             if tip_key and tip_key in TOOLTIPS:
@@ -1047,6 +492,7 @@ class SpanFrame(ctk.CTkFrame):
 
         def chk(lbl, default=False, tip_key=None):
             var = ctk.BooleanVar(value=default)
+            var.trace_add("write", lambda *_: self._changed())
             cb = ctk.CTkCheckBox(body, text=lbl, variable=var, font=FL)
             cb.grid(row=self._row, column=0, columnspan=2, sticky="w", **PAD)
             if tip_key and tip_key in TOOLTIPS:
@@ -1071,7 +517,7 @@ class SpanFrame(ctk.CTkFrame):
 
         # ── Кровля и прогоны ───────────────────────────
         sec("Кровля и прогоны")
-        self.roof_pie = RoofPieWidget(body)
+        self.roof_pie = RoofPieWidget(body, on_change=self._changed)
         self.roof_pie.grid(row=self._row, column=0, columnspan=3,
                            sticky="ew", padx=PAD["padx"], pady=(2, 4))
         self._row += 1
@@ -1079,14 +525,10 @@ class SpanFrame(ctk.CTkFrame):
 
         # ── Кран ───────────────────────────────────────
         sec("Кран")
-        self.v_tt  = cmb("Тип фермы",
-                         ["Уголки", "Двутавры", "Молодечно"],
-                         tip_key='truss_type')
+        self.v_tt  = cmb("Тип фермы", TRUSS_TYPES, tip_key='truss_type')
         self.e_q   = fe("Г/п крана, т",  50, 'q_crane')
         self.v_nc  = cmb("Кранов в пролёте", ["1", "2"])
-        self.v_wp  = cmb("Тормозные пути",
-                         ["С проходом", "Без прохода"],
-                         tip_key='with_pass')
+        self.v_wp  = cmb("Тормозные пути", PASS_TYPES, tip_key='with_pass')
         self.v_cm  = cmb("Режим работы крана",
                          list(CRANE_MODE_FACTOR.keys()),
                          "Режим 1-6К",
@@ -1096,17 +538,40 @@ class SpanFrame(ctk.CTkFrame):
         sec("Фахверк и тип здания")
         self.e_rig      = fe("Нагрузка на ригели, кг/м.п.", 0, 'rig_load')
         self.v_post_var = chk("Стойка фахверка (шаг 12м)", False, 'has_post')
-        self.v_bld      = cmb("Тип здания",
-                              ["Основные производственные",
-                               "Здания энергоносителей",
-                               "Вспомогательные здания"],
-                              tip_key='bld_type')
+        self.v_bld      = cmb("Тип здания", BLD_TYPES, tip_key='bld_type')
 
     def update_title(self, n):
         self._num = n
         self._lbl.configure(text=f"  Пролёт {n}")
 
+    def bind_span(self, index: int, params: dict):
+        """Показать в карточке пролёт index из SpanList."""
+        self.index = index
+        self.update_title(index + 1)
+        self.set_params(params)
+
+    def set_params(self, p: dict):
+        """Заполнить поля значениями пролёта (без уведомлений об изменении)."""
+        self._loading = True
+        try:
+            for e, k in ((self.e_L, "L_span"), (self.e_rail, "h_rail"), (self.e_hov, "H_col_ov"),
+                         (self.e_pur, "Q_purlin"), (self.e_q, "q_crane_t"), (self.e_rig, "rig_load")):
+                e.delete(0, "end")
+                e.insert(0, f"{p[k]:g}")
+            self.v_B.set(f"{p['B_step']:g}")
+            self.v_col.set(f"{p['col_step']:g}")
+            self.v_tt.set(p["truss_type"])
+            self.v_nc.set(str(p["n_cranes"]))
+            self.v_wp.set(PASS_TYPES[0] if p["with_pass"] else PASS_TYPES[1])
+            self.v_cm.set(p["crane_mode"])
+            self.v_post_var.set(p["has_post"])
+            self.v_bld.set(p["bld_type"])
+            self.roof_pie.set_state(p["roof_layers"], p["roof_manual"], p["Q_roof"])
+        finally:
+            self._loading = False
+
     def get_params(self) -> dict:
+        roof_layers, roof_manual = self.roof_pie.get_state()
         return {
             "L_span":     self.e_L.get_float(24),
             "B_step":     float(self.v_B.get()),
@@ -1123,19 +588,209 @@ class SpanFrame(ctk.CTkFrame):
             "rig_load":   self.e_rig.get_float(0),
             "has_post":   self.v_post_var.get(),
             "bld_type":   self.v_bld.get(),
+            "roof_layers": roof_layers,
+            "roof_manual": roof_manual,
         }
 
 
+class SpanListEditor(ctk.CTkFrame):
+    """
+    Редактор списка пролётов любой длины. Данные — в SpanList; каждый пролёт
+    виден строкой-сводкой в tk.Listbox (один виджет на весь список), а полные
+    карточки SpanFrame есть только для SPAN_PAGE пролётов, начиная с выбранного, —
+    при выборе другой строки те же карточки заполняются другими данными.
+    Массовые операции: дублирование ×N, присваивание поля выделенным, удаление.
+    on_change() — после любого изменения данных.
+    """
+
+    def __init__(self, parent, spans: SpanList, on_change):
+        super().__init__(parent, fg_color="transparent")
+        self.spans = spans
+        self._on_change = on_change
+        self._top = 0               # индекс пролёта в первой карточке
+        self._build()
+
+    def _build(self):
+        # ── Массовые операции ────────────────────────────
+        bar = ctk.CTkFrame(self, fg_color="transparent")
+        bar.pack(fill="x", padx=4, pady=(0, 2))
+        ctk.CTkButton(bar, text="Дублировать ×", font=FH, width=110, height=26,
+                      fg_color="#1b5e20", hover_color="#2e7d32",
+                      command=self._duplicate).pack(side="left")
+        self.e_dup = ctk.CTkEntry(bar, width=50)
+        self.e_dup.insert(0, "1")
+        self.e_dup.pack(side="left", padx=(4, 10))
+        ctk.CTkButton(bar, text="✕ Удалить выделенные", font=FH, width=150, height=26,
+                      fg_color="#b71c1c", hover_color="#7f0000",
+                      command=self._remove_selected).pack(side="left")
+
+        bulk = ctk.CTkFrame(self, fg_color="transparent")
+        bulk.pack(fill="x", padx=4, pady=2)
+        self.v_bulk_field = ctk.StringVar(value=next(iter(BULK_FIELDS)))
+        ctk.CTkComboBox(bulk, values=list(BULK_FIELDS), variable=self.v_bulk_field,
+                        width=210).pack(side="left")
+        self.e_bulk = ctk.CTkEntry(bulk, width=120)
+        self.e_bulk.pack(side="left", padx=4)
+        apply_btn = ctk.CTkButton(bulk, text="Применить к выделенным", font=FH, width=170,
+                                  height=26, fg_color="#37474f", hover_color="#263238",
+                                  command=self._apply_field)
+        apply_btn.pack(side="left")
+        ToolTip(apply_btn, "Присвоить поле выделенным в списке пролётам.\n"
+                           "Выделение — Shift/Ctrl+щелчок.")
+
+        # ── Список пролётов ──────────────────────────────
+        lst_fr = ctk.CTkFrame(self, fg_color="#1e2a3a", corner_radius=6)
+        lst_fr.pack(fill="x", padx=4, pady=4)
+        self.listbox = tk.Listbox(
+            lst_fr, height=8, selectmode="extended", exportselection=False,
+            bg="#1e2a3a", fg="#cfd8dc", selectbackground="#1565c0",
+            font=FRE, activestyle="none", borderwidth=0, highlightthickness=0)
+        self.listbox.pack(side="left", fill="both", expand=True, padx=(6, 0), pady=6)
+        sb = ctk.CTkScrollbar(lst_fr, command=self.listbox.yview)
+        sb.pack(side="right", fill="y")
+        self.listbox.configure(yscrollcommand=sb.set)
+        self.listbox.bind("<<ListboxSelect>>", self._on_select)
+
+        # ── Переиспользуемые карточки ────────────────────
+        self._pool = [SpanFrame(self, k + 1, self._remove_frame, self._on_frame_edited)
+                      for k in range(SPAN_PAGE)]
+        self.refresh()
+
+    # ── Отображение ──────────────────────────────────────
+
+    def refresh(self):
+        """Перестроить строки списка (выделение сохраняется) и карточки."""
+        sel = [i for i in self.listbox.curselection() if i < len(self.spans)]
+        self.listbox.delete(0, "end")
+        self.listbox.insert("end", *(span_summary(i, sp) for i, sp in enumerate(self.spans)))
+        for i in sel:
+            self.listbox.selection_set(i)
+        self._bind_pool()
+
+    def show(self, i: int):
+        """Показать в карточках пролёты начиная с i."""
+        self._top = i
+        self._bind_pool()
+        self.listbox.see(i)
+
+    def _bind_pool(self):
+        n = len(self.spans)
+        self._top = max(0, min(self._top, n - SPAN_PAGE))
+        for k, sf in enumerate(self._pool):
+            i = self._top + k
+            if i < n:
+                sf.bind_span(i, self.spans[i])
+                sf.pack(fill="x", padx=4, pady=4)
+            else:
+                sf.pack_forget()
+
+    def _on_select(self, _event=None):
+        sel = self.listbox.curselection()
+        if sel:
+            self.show(sel[0])
+
+    def _on_frame_edited(self, sf: SpanFrame):
+        """Правка в карточке — в модель и в строку списка."""
+        i = sf.index
+        if i >= len(self.spans):
+            return
+        try:
+            params = sf.get_params()
+        except ValueError:
+            return      # недопустимое значение в комбобоксе — ждём исправления
+        self.spans.set(i, params)
+        selected = i in self.listbox.curselection()
+        self.listbox.delete(i)
+        self.listbox.insert(i, span_summary(i, self.spans[i]))
+        if selected:
+            self.listbox.selection_set(i)
+        self._on_change()
+
+    # ── Операции ─────────────────────────────────────────
+
+    def add(self):
+        i = self.spans.append()
+        self._top = i
+        self.refresh()
+        self.listbox.see(i)
+        self._on_change()
+
+    def remove(self, indices):
+        drop = {i for i in indices if 0 <= i < len(self.spans)}
+        if not drop:
+            return
+        if len(drop) >= len(self.spans):
+            messagebox.showwarning("Внимание", "Должен быть хотя бы один пролёт.")
+            return
+        self.spans.remove(drop)
+        self.listbox.selection_clear(0, "end")
+        self.refresh()
+        self._on_change()
+
+    def _remove_frame(self, sf: SpanFrame):
+        self.remove([sf.index])
+
+    def _remove_selected(self):
+        self.remove(self.listbox.curselection())
+
+    def _duplicate(self):
+        """Вставить N копий первого выделенного пролёта (или первого в карточках)."""
+        sel = self.listbox.curselection()
+        i = sel[0] if sel else self._top
+        try:
+            n = int(self.e_dup.get())
+            if n < 1:
+                raise ValueError(n)
+        except ValueError:
+            messagebox.showerror("Ошибка ввода", "Число копий — целое число ≥ 1.")
+            return
+        self.spans.duplicate(i, n)
+        self.refresh()
+        self._on_change()
+
+    def _apply_field(self):
+        sel = self.listbox.curselection()
+        if not sel:
+            messagebox.showwarning("Нет выделения",
+                                   "Выделите пролёты в списке (Shift/Ctrl+щелчок).")
+            return
+        label = self.v_bulk_field.get()
+        key, parse = BULK_FIELDS[label]
+        try:
+            value = parse(self.e_bulk.get())
+        except ValueError as e:
+            messagebox.showerror("Ошибка ввода", f"{label}: {e}")
+            return
+        if self.spans.apply(sel, key, value):
+            self.refresh()
+            self._on_change()
+
+
 class App(ctk.CTk):
     def __init__(self):
         super().__init__()
         self.title("Металлоёмкость производственных зданий v3.0")
         self.geometry("1580x980")
         self.resizable(True, True)
-        self._span_frames: list[SpanFrame] = []
+        self._spans = SpanList(SPAN_DEFAULTS)
         self._last_results_text = ""
+        self._init_jobs()
+        self._init_live()
         self._build_ui()
 
+    def _init_jobs(self):
+        """Фоновый расчёт: обратные вызовы из потока — через очередь, разбираемую по after()."""
+        self._ui_calls: queue.SimpleQueue = queue.SimpleQueue()
+        self._jobs = JobRunner(self._ui_calls.put)
+        self._ui_pump_active = False
+        self._stream_prev = None    # текст до потокового вывода (для отмены), None — вывода нет
+
+    def _init_live(self):
+        """Живой пересчёт: правки полей откладываются на LIVE_DEBOUNCE_MS и считаются разом."""
+        self._live_var = ctk.BooleanVar(value=True)
+        self._live_after = None     # id отложенного пересчёта (after)
+        self._live_inputs = None    # (gp, spans) последнего живого пересчёта
+
     # ── Построение интерфейса ────────────────────────────
 
     def _build_ui(self):
@@ -1174,6 +829,7 @@ class App(ctk.CTk):
             e = FloatEntry(left, width=120)
             e.insert(0, str(default))
             e.grid(row=self._r, column=1, sticky="w", **PAD)
+            e.bind("<KeyRelease>", self._on_input_changed, add="+")
             self._r += 1
             _qbtn(tip_key)
             return e
@@ -1210,11 +866,18 @@ class App(ctk.CTk):
         ToolTip(self.btn_save,
                 "Сохранить результаты расчёта в текстовый файл (.txt).\nДоступно после нажатия «Рассчитать».")
         self._r += 1
+        ctk.CTkCheckBox(left, text="Пересчитывать при вводе", font=FL,
+                        variable=self._live_var,
+                        command=self._on_input_changed).grid(
+            row=self._r, column=0, columnspan=3, sticky="w", **PAD)
+        self._r += 1
 
         # ── Пролёты ────────────────────────────────────
         sec("─── Пролёты здания ───────────────────────────────")
-        self._spans_container = ctk.CTkFrame(left, fg_color="transparent")
-        self._spans_container.grid(row=self._r, column=0, columnspan=3, sticky="ew")
+        if not len(self._spans):
+            self._spans.append()        # 1 пролёт по умолчанию
+        self.span_editor = SpanListEditor(left, self._spans, self._on_input_changed)
+        self.span_editor.grid(row=self._r, column=0, columnspan=3, sticky="ew")
         self._r += 1
 
         add_btn_row = ctk.CTkFrame(left, fg_color="transparent")
@@ -1224,9 +887,6 @@ class App(ctk.CTk):
                       command=self._add_span).pack()
         self._r += 1
 
-        # Добавить 1 пролёт по умолчанию
-        self._add_span()
-
         # ─ Правая панель ────────────────────────────────
         right = ctk.CTkFrame(self)
         right.grid(row=0, column=1, sticky="nsew", padx=(5, 10), pady=10)
@@ -1242,23 +902,21 @@ class App(ctk.CTk):
         self.lbl_status.grid(row=1, column=0, columnspan=2, sticky="w",
                               padx=20, pady=(0, 8))
 
+        busy_fr = ctk.CTkFrame(self, fg_color="transparent")
+        busy_fr.grid(row=1, column=1, sticky="e", padx=20, pady=(0, 8))
+        self.progress = ctk.CTkProgressBar(busy_fr, width=220)
+        self.progress.set(0)
+        self.progress.pack(side="left", padx=5)
+        self.btn_cancel = ctk.CTkButton(
+            busy_fr, text="Отмена", font=FL, width=90, height=28,
+            fg_color="#6d4c41", hover_color="#4e342e", state="disabled",
+            command=self._on_cancel)
+        self.btn_cancel.pack(side="left", padx=5)
+
     # ── Управление пролётами ─────────────────────────────
 
     def _add_span(self):
-        n = len(self._span_frames) + 1
-        sf = SpanFrame(self._spans_container, n, self._remove_span)
-        sf.pack(fill="x", padx=4, pady=4)
-        self._span_frames.append(sf)
-
-    def _remove_span(self, sf: SpanFrame):
-        if len(self._span_frames) <= 1:
-            messagebox.showwarning("Внимание", "Должен быть хотя бы один пролёт.")
-            return
-        self._span_frames.remove(sf)
-        sf.pack_forget()
-        sf.destroy()
-        for i, f in enumerate(self._span_frames):
-            f.update_title(i + 1)
+        self.span_editor.add()
 
     # ── Параметры ────────────────────────────────────────
 
@@ -1274,26 +932,124 @@ class App(ctk.CTk):
     # ── Действия ─────────────────────────────────────────
 
     def _on_calculate(self):
+        """
+        Запуск расчёта в фоне; повторное нажатие заменяет текущий расчёт.
+        Отчёт выводится по мере расчёта: шапка — сразу, разделы — по одному
+        из iter_sections; по окончании дописываются H_кол и ИТОГО в шапке.
+        """
+        try:
+            gp    = self._read_global_params()
+            spans = self._spans.to_spans()
+        except Exception:
+            messagebox.showerror("Ошибка ввода", traceback.format_exc())
+            return
+        if not spans:
+            messagebox.showwarning("Нет пролётов", "Добавьте хотя бы один пролёт.")
+            return
+
+        def job(token):
+            res = {}
+            for key, value in iter_sections(gp, spans, progress=token.progress):
+                res[key] = value
+                token.emit(self._format_section(key, value, spans))
+            return self._format_results(gp, spans, res)
+
         self.lbl_status.configure(text="Расчёт…", text_color="#ffcc80")
-        self.update()
+        self.progress.set(0)
+        self.btn_cancel.configure(state="normal")
+        self._begin_stream(self._format_header(gp, spans) + "\n" + self._format_summary())
+        self._jobs.submit(job, self._on_calc_done, self._on_calc_error, self._on_calc_progress,
+                          self._append_results)
+        self._start_ui_pump()
+
+    def _on_calc_progress(self, done, total):
+        self.progress.set(done / total)
+        self.lbl_status.configure(text=f"Расчёт… пролёт {done} из {total}", text_color="#ffcc80")
+
+    def _on_calc_done(self, text):
+        self._stream_prev = None
+        self._show_results(text)
+        self.progress.set(1)
+        self.btn_cancel.configure(state="disabled")
+        self.lbl_status.configure(text="Расчёт завершён.", text_color="#80cbc4")
+        self.btn_save.configure(state="normal")
+
+    def _on_calc_error(self, exc, tb):
+        self._end_stream()
+        self.progress.set(0)
+        self.btn_cancel.configure(state="disabled")
+        messagebox.showerror("Ошибка расчёта", tb)
+        self.lbl_status.configure(text="Ошибка.", text_color="#ef9a9a")
+
+    def _on_cancel(self):
+        self._jobs.cancel()
+        self._end_stream()
+        self.progress.set(0)
+        self.btn_cancel.configure(state="disabled")
+        self.lbl_status.configure(text="Расчёт отменён.", text_color="#ef9a9a")
+
+    def _on_input_changed(self, *_):
+        """Правка любого поля: отложить живой пересчёт (повторные правки сдвигают его)."""
+        if not self._live_var.get():
+            return
+        if self._live_after is not None:
+            self.after_cancel(self._live_after)
+        self._live_after = self.after(LIVE_DEBOUNCE_MS, self._live_recalc)
+
+    def _live_recalc(self):
+        """
+        Пересчёт в потоке Tk без диалогов. Per-span величины берутся из SPAN_MEMO,
+        так что заново считаются только изменённые пролёты, а ряды колонн
+        и суммы — за один проход; в окне заменяются только изменившиеся строки.
+        """
+        self._live_after = None
         try:
             gp    = self._read_global_params()
-            spans = [sf.get_params() for sf in self._span_frames]
-            if not spans:
-                messagebox.showwarning("Нет пролётов", "Добавьте хотя бы один пролёт.")
-                return
-            res = calculate(gp, spans)
-            self._show_results(gp, spans, res)
-            self.lbl_status.configure(text="Расчёт завершён.", text_color="#80cbc4")
-            self.btn_save.configure(state="normal")
+            spans = self._spans.to_spans()
         except Exception:
-            tb = traceback.format_exc()
-            messagebox.showerror("Ошибка расчёта", tb)
-            self.lbl_status.configure(text="Ошибка.", text_color="#ef9a9a")
+            return      # поле в процессе набора — дождёмся следующей правки
+        if not spans or (gp, spans) == self._live_inputs:
+            return
+        self._jobs.cancel()     # результат ручного расчёта по старым данным уже не нужен
+        self._stream_prev = None
+        self.btn_cancel.configure(state="disabled")
+        try:
+            text = self._format_results(gp, spans, calculate(gp, spans))
+        except Exception as e:
+            self.lbl_status.configure(text=f"Ошибка: {e}", text_color="#ef9a9a")
+            return
+        self._live_inputs = (gp, spans)
+        self._show_results(text)
+        self.progress.set(1)
+        self.btn_save.configure(state="normal")
+        self.lbl_status.configure(text="Пересчитано.", text_color="#80cbc4")
+
+    def _start_ui_pump(self):
+        if not self._ui_pump_active:
+            self._ui_pump_active = True
+            self.after(UI_POLL_MS, self._pump_ui)
+
+    def _pump_ui(self):
+        """Выполняет в потоке Tk обратные вызовы фонового расчёта."""
+        while True:
+            try:
+                call = self._ui_calls.get_nowait()
+            except queue.Empty:
+                break
+            call()
+        if self._jobs.busy:
+            self.after(UI_POLL_MS, self._pump_ui)
+        else:
+            self._ui_pump_active = False
 
     def _on_clear(self):
+        self._jobs.cancel()     # разделы идущего расчёта в очищенное окно не попадут
+        self._stream_prev = None
+        self.btn_cancel.configure(state="disabled")
+        self.progress.set(0)
         self._set_txt("")
         self._last_results_text = ""
+        self._live_inputs = None
         self.btn_save.configure(state="disabled")
         self.lbl_status.configure(text="")
 
@@ -1334,17 +1090,16 @@ class App(ctk.CTk):
 
     # ── Вывод результатов ────────────────────────────────
 
-    def _show_results(self, gp, spans, res):
-        L = []
-        S = "─" * 70
-
-        def h(t):  L.append(f"\n{S}\n  {t}\n{S}")
-        def rw(lbl, *vs): L.append(f"  {lbl:<44}  {'  '.join(str(v) for v in vs)}")
-        def r2(lbl, m1, m2): L.append(f"  {lbl:<44}  М1: {str(m1):<14}  М2: {m2}")
-
-        it = res["итого"]
-        kl = res["колонны"]
+    def _format_results(self, gp, spans, res) -> str:
+        """Текст результатов (без обращения к виджетам — вызывается из фонового потока)."""
+        parts = [self._format_header(gp, spans, res["колонны"]["высоты_пролётов"]),
+                 self._format_summary(res["итого"])]
+        parts += [self._format_section(key, res.get(key), spans) for key in RESULT_SECTIONS]
+        return "\n".join(p for p in parts if p)
 
+    def _format_header(self, gp, spans, heights=()) -> str:
+        """Шапка: исходные данные; H_кол — из раздела «колонны» (без него — «?»)."""
+        L = []
         L.append("=" * 70)
         L.append("  МЕТАЛЛОЁМКОСТЬ ПРОИЗВОДСТВЕННОГО ЗДАНИЯ  v3.0")
         L.append("=" * 70)
@@ -1352,10 +1107,10 @@ class App(ctk.CTk):
         L.append(f"  Снег={gp['Q_snow']} кН/м²  |  Пыль={gp['Q_dust']} кН/м²  |  Технол.={gp['Q_tech']} кН/м²  |  γc={gp['yc']}")
         for i, sp in enumerate(spans):
             mf = CRANE_MODE_FACTOR[sp["crane_mode"]]
-            h_info = kl["высоты_пролётов"][i] if i < len(kl["высоты_пролётов"]) else {}
+            h_info = heights[i] if i < len(heights) else {}
             L.append(
                 f"  Пролёт {i+1}: L={sp['L_span']}м  B={sp['B_step']}м  кол.шаг={sp['col_step']}м"
-                f"  УГР={sp['h_rail']}м  H_кол={h_info.get('H_full','?')}м"
+                f"  УГР={sp['h_rail']}м  H_кол={_num(h_info.get('H_full','?'), 2)}м"
                 f"  Кран {sp['q_crane_t']}т×{sp['n_cranes']}  {sp['crane_mode']}(×{mf})"
                 f"  Ферма: {sp['truss_type']}"
             )
@@ -1365,131 +1120,184 @@ class App(ctk.CTk):
                 f"  Тип: {sp['bld_type']}"
             )
         L.append("=" * 70)
+        return "\n".join(L)
 
-        # ── ИТОГО (вверху) ──────────────────────────────
+    def _format_summary(self, it=None) -> str:
+        """ИТОГО вверху; it=None — заготовка того же размера, пока расчёт идёт."""
+        if it is None:
+            it = dict.fromkeys(("min_т", "max_т", "М1_т", "М1_кгм2", "М2_т", "М2_кгм2", "S_floor"), "…")
+        L = []
         L.append(f"\n{'━'*70}")
-        L.append(f"  ★ ОБЩАЯ МЕТАЛЛОЁМКОСТЬ: {it['min_т']} т  ...  {it['max_т']} т")
-        L.append(f"  ★ Метод 1: {it['М1_т']} т ({it['М1_кгм2']} кг/м²)   "
-                 f"Метод 2: {it['М2_т']} т ({it['М2_кгм2']} кг/м²)")
-        L.append(f"  ★ Площадь пола: {it['S_floor']} м²")
+        L.append(f"  ★ ОБЩАЯ МЕТАЛЛОЁМКОСТЬ: {_num(it['min_т'], 2)} т  ...  {_num(it['max_т'], 2)} т")
+        L.append(f"  ★ Метод 1: {_num(it['М1_т'], 2)} т ({_num(it['М1_кгм2'], 2)} кг/м²)   "
+                 f"Метод 2: {_num(it['М2_т'], 2)} т ({_num(it['М2_кгм2'], 2)} кг/м²)")
+        L.append(f"  ★ Площадь пола: {_num(it['S_floor'], 1)} м²")
         L.append(f"{'━'*70}")
+        return "\n".join(L)
 
-        # 1. Прогоны
-        h("1. ПРОГОНЫ  [Метод 1 — формула]")
-        pr = res["прогоны"]
-        rw("Масса ИТОГО, т:", pr["масса_общая_т"])
-        for d in pr["по_пролётам"]:
-            rw(f"  Пролёт {d['пролёт']}  {d['профиль']}",
-               f"q={d['нагрузка_тм']} т/м", f"{d['расход_кгм2']} кг/м²", f"{d['масса_т']} т")
-
-        # 2. Фермы
-        h("2. СТРОПИЛЬНЫЕ ФЕРМЫ  [М1 + М2]")
-        fm = res["фермы"]
-        r2("Масса ИТОГО, т:", fm["масса_общая_т_М1"], fm["масса_общая_т_М2"])
-        for d in fm["по_пролётам"]:
-            r2(f"  Пролёт {d['пролёт']}  (q={d['нагрузка_тм']} т/м):",
-               d["G_М1_т"], d["G_М2_т"])
-
-        # 3. Связи
-        h("3. СВЯЗИ ПОКРЫТИЯ  [Метод 2 — таблица]")
-        sv = res["связи_покрытия"]
-        rw("Расход средний, кг/м²:", sv["расход_кгм2"])
-        rw("Масса ИТОГО, т:", sv["масса_общая_т"])
-        for d in sv.get("по_пролётам", []):
-            rw(f"  Пролёт {d['пролёт']}:",
-               f"{d['расход_кгм2']} кг/м²", f"{d['масса_т']} т")
-
-        # 4. Подстропильные
-        h("4. ПОДСТРОПИЛЬНЫЕ ФЕРМЫ  [М1 + М2]")
-        psf = res["подстропильные_фермы"]
-        if "примечание" in psf:
-            L.append(f"  {psf['примечание']}")
-        else:
-            r2("Масса ИТОГО, т:", psf["масса_общая_т_М1"], psf["масса_общая_т_М2"])
-            for d in psf.get("по_пролётам", []):
-                if d.get("G_М1_т", 0) == 0 and d.get("G_М2_т") == "н/п":
-                    continue
-                r2(f"  Пролёт {d['пролёт']}  R={d['R_кн']} кН:",
-                   d["G_М1_т"], d["G_М2_т"])
-
-        # 5. Подкрановые
-        h("5. ПОДКРАНОВЫЕ БАЛКИ  [М1 + М2]")
-        pb = res["подкрановые_балки"]
-        r2("Масса ИТОГО, т:", pb["масса_общая_т_М1"], pb["масса_общая_т_М2"])
-        for d in pb["ряды_колонн"]:
-            rw(f"  {d['ряд']}  (q={d['q']} т):", f"М1={d['G_М1_т']} т")
-
-        # 6. Колонны
-        h("6. КОЛОННЫ  [Метод 1 — формула]")
-        rw("Кол-во колонн:", kl["n_колонн"])
-        # Показать высоты по пролётам
-        hts = kl.get("высоты_пролётов", [])
-        if len(hts) == 1:
-            rw("H_кол (полная), м:",
-               hts[0]["H_full"],
-               f"(надкр={hts[0]['H_upper']}м  подкр={hts[0]['H_lower']}м)")
-        else:
-            for ht in hts:
-                rw(f"  Пролёт {ht['пролёт']} H_кол, м:",
-                   ht["H_full"],
-                   f"(надкр={ht['H_upper']}м  подкр={ht['H_lower']}м)")
-        rw("Расход, кг/м²:", kl["расход_кгм2"])
-        rw("Масса ИТОГО, т:", kl["масса_общая_т"])
-        for d in kl["по_рядам"]:
-            rw(f"  {d['ряд']}: 1 кол.={d['масса_1_кг']} кг", f"ряд={d['масса_ряд_т']} т")
-
-        # 7. Фахверк
-        h("7. ФАХВЕРК  [Метод 2 — таблица]")
-        fh = res["фахверк"]
-        if "ошибка" in fh and fh["масса_общая_т"] == 0:
-            L.append(f"  Ошибка: {fh['ошибка']}")
-        else:
-            rw("Расход, кг/м² стен:", fh.get("расход_кгм2_стены", "н/п"))
-            rw("Площадь стен, м²:",   fh.get("площадь_стен_м2", "н/п"))
-            rw("Масса ИТОГО, т:",     fh.get("масса_общая_т", "н/п"))
-            for d in fh.get("по_пролётам", []):
-                if "ошибка" in d:
-                    L.append(f"  Пролёт {d['пролёт']}: {d['ошибка']}")
-                else:
-                    rw(f"  Пролёт {d['пролёт']}:", f"{d['расход_кгм2_стены']} кг/м²", f"{d['масса_т']} т")
-
-        # 8. Ограждение
-        h("8. ОГРАЖДАЮЩИЕ КОНСТРУКЦИИ (справочно)")
-        og = res["ограждение"]
-        rw("Площадь стен, м²:", og["стены_м2"])
-        rw("Площадь кровли, м²:", og["кровля_м2"])
-
-        # 9. Опоры
-        h("9. ОПОРЫ ТРУБОПРОВОДОВ  [Метод 2]")
-        op = res["опоры_трубопроводов"]
-        rw("Расход средний, кг/м²:", op["расход_кгм2"])
-        rw("Масса ИТОГО, т:", op["масса_общая_т"])
-        for d in op.get("по_пролётам", []):
-            rw(f"  Пролёт {d['пролёт']}  ({spans[d['пролёт']-1]['bld_type']}):",
-               f"{d['расход_кгм2']} кг/м²", f"{d['масса_т']} т")
-
-        # Итого (повтор внизу)
-        L.append(f"\n{'='*70}")
-        L.append("  ИТОГО ПО КАРКАСУ (гибридное суммирование)")
-        L.append("  Состав М1: прогоны(М1)+фермы(М1)+подстроп(М1)+подкран(М1)")
-        L.append("            +колонны(М1)+связи(М2)+фахверк(М2)+опоры(М2)")
-        L.append("  Состав М2: прогоны(М1)+фермы(М2)+подстроп(М2)+подкран(М2)")
-        L.append("            +колонны(М1)+связи(М2)+фахверк(М2)+опоры(М2)")
-        L.append(f"{'='*70}")
-        L.append(f"  {'Метод 1 (формулы):':<46} {it['М1_т']} т  ({it['М1_кгм2']} кг/м²)")
-        L.append(f"  {'Метод 2 (таблицы):':<46} {it['М2_т']} т  ({it['М2_кгм2']} кг/м²)")
-        L.append(f"{'━'*70}")
-        L.append(f"  ★ ДИАПАЗОН: {it['min_т']} т  ...  {it['max_т']} т")
-        L.append(f"{'━'*70}")
+    def _format_section(self, key, value, spans) -> str:
+        """Текст раздела результата key (из RESULT_SECTIONS); пустой лог — ""."""
+        L = []
+        S = "─" * 70
+
+        def h(t):  L.append(f"\n{S}\n  {t}\n{S}")
+        def rw(lbl, *vs): L.append(f"  {lbl:<44}  {'  '.join(str(v) for v in vs)}")
+        def r2(lbl, m1, m2): L.append(f"  {lbl:<44}  М1: {str(m1):<14}  М2: {m2}")
 
-        if res.get("_log"):
+        if key == "прогоны":
+            h("1. ПРОГОНЫ  [Метод 1 — формула]")
+            pr = value
+            rw("Масса ИТОГО, т:", _num(pr["масса_общая_т"], 2))
+            for d in pr["по_пролётам"]:
+                rw(f"  Пролёт {d['пролёт']}  {d['профиль']}",
+                   f"q={_num(d['нагрузка_тм'], 3)} т/м", f"{_num(d['расход_кгм2'], 2)} кг/м²", f"{_num(d['масса_т'], 2)} т")
+
+        elif key == "фермы":
+            h("2. СТРОПИЛЬНЫЕ ФЕРМЫ  [М1 + М2]")
+            fm = value
+            r2("Масса ИТОГО, т:", _num(fm["масса_общая_т_М1"], 2), _num(fm["масса_общая_т_М2"], 2))
+            for d in fm["по_пролётам"]:
+                r2(f"  Пролёт {d['пролёт']}  (q={_num(d['нагрузка_тм'], 3)} т/м):",
+                   _num(d["G_М1_т"], 2), _num(d["G_М2_т"], 2))
+
+        elif key == "связи_покрытия":
+            h("3. СВЯЗИ ПОКРЫТИЯ  [Метод 2 — таблица]")
+            sv = value
+            rw("Расход средний, кг/м²:", _num(sv["расход_кгм2"], 2))
+            rw("Масса ИТОГО, т:", _num(sv["масса_общая_т"], 2))
+            for d in sv.get("по_пролётам", []):
+                rw(f"  Пролёт {d['пролёт']}:",
+                   f"{d['расход_кгм2']} кг/м²", f"{_num(d['масса_т'], 2)} т")
+
+        elif key == "подстропильные_фермы":
+            h("4. ПОДСТРОПИЛЬНЫЕ ФЕРМЫ  [М1 + М2]")
+            psf = value
+            if "примечание" in psf:
+                L.append(f"  {psf['примечание']}")
+            else:
+                r2("Масса ИТОГО, т:", _num(psf["масса_общая_т_М1"], 2), _num(psf["масса_общая_т_М2"], 2))
+                for d in psf.get("по_пролётам", []):
+                    if d.get("G_М1_т", 0) == 0 and d.get("G_М2_т") == "н/п":
+                        continue
+                    r2(f"  Пролёт {d['пролёт']}  R={_num(d['R_кн'], 1)} кН:",
+                       _num(d["G_М1_т"], 2), _num(d["G_М2_т"], 2))
+
+        elif key == "подкрановые_балки":
+            h("5. ПОДКРАНОВЫЕ БАЛКИ  [М1 + М2]")
+            pb = value
+            r2("Масса ИТОГО, т:", _num(pb["масса_общая_т_М1"], 2), _num(pb["масса_общая_т_М2"], 2))
+            for d in pb["ряды_колонн"]:
+                rw(f"  {d['ряд']}  (q={d['q']} т):", f"М1={_num(d['G_М1_т'], 2)} т")
+
+        elif key == "колонны":
+            h("6. КОЛОННЫ  [Метод 1 — формула]")
+            kl = value
+            rw("Кол-во колонн:", kl["n_колонн"])
+            # Показать высоты по пролётам
+            hts = kl.get("высоты_пролётов", [])
+            if len(hts) == 1:
+                rw("H_кол (полная), м:",
+                   _num(hts[0]["H_full"], 2),
+                   f"(надкр={_num(hts[0]['H_upper'], 2)}м  подкр={_num(hts[0]['H_lower'], 2)}м)")
+            else:
+                for ht in hts:
+                    rw(f"  Пролёт {ht['пролёт']} H_кол, м:",
+                       _num(ht["H_full"], 2),
+                       f"(надкр={_num(ht['H_upper'], 2)}м  подкр={_num(ht['H_lower'], 2)}м)")
+            rw("Расход, кг/м²:", _num(kl["расход_кгм2"], 2))
+            rw("Масса ИТОГО, т:", _num(kl["масса_общая_т"], 2))
+            for d in kl["по_рядам"]:
+                rw(f"  {d['ряд']}: 1 кол.={_num(d['масса_1_кг'], 1)} кг", f"ряд={_num(d['масса_ряд_т'], 2)} т")
+
+        elif key == "фахверк":
+            h("7. ФАХВЕРК  [Метод 2 — таблица]")
+            fh = value
+            if "ошибка" in fh and fh["масса_общая_т"] == 0:
+                L.append(f"  Ошибка: {fh['ошибка']}")
+            else:
+                rw("Расход, кг/м² стен:", _num(fh.get("расход_кгм2_стены", "н/п"), 2))
+                rw("Площадь стен, м²:",   _num(fh.get("площадь_стен_м2", "н/п"), 1))
+                rw("Масса ИТОГО, т:",     _num(fh.get("масса_общая_т", "н/п"), 2))
+                for d in fh.get("по_пролётам", []):
+                    if "ошибка" in d:
+                        L.append(f"  Пролёт {d['пролёт']}: {d['ошибка']}")
+                    else:
+                        rw(f"  Пролёт {d['пролёт']}:", f"{d['расход_кгм2_стены']} кг/м²", f"{_num(d['масса_т'], 2)} т")
+
+        elif key == "ограждение":
+            h("8. ОГРАЖДАЮЩИЕ КОНСТРУКЦИИ (справочно)")
+            og = value
+            rw("Площадь стен, м²:", _num(og["стены_м2"], 1))
+            rw("Площадь кровли, м²:", _num(og["кровля_м2"], 1))
+
+        elif key == "опоры_трубопроводов":
+            h("9. ОПОРЫ ТРУБОПРОВОДОВ  [Метод 2]")
+            op = value
+            rw("Расход средний, кг/м²:", _num(op["расход_кгм2"], 2))
+            rw("Масса ИТОГО, т:", _num(op["масса_общая_т"], 2))
+            for d in op.get("по_пролётам", []):
+                rw(f"  Пролёт {d['пролёт']}  ({spans[d['пролёт']-1]['bld_type']}):",
+                   f"{d['расход_кгм2']} кг/м²", f"{_num(d['масса_т'], 2)} т")
+
+        elif key == "итого":
+            # Итого (повтор внизу)
+            it = value
+            L.append(f"\n{'='*70}")
+            L.append("  ИТОГО ПО КАРКАСУ (гибридное суммирование)")
+            L.append("  Состав М1: прогоны(М1)+фермы(М1)+подстроп(М1)+подкран(М1)")
+            L.append("            +колонны(М1)+связи(М2)+фахверк(М2)+опоры(М2)")
+            L.append("  Состав М2: прогоны(М1)+фермы(М2)+подстроп(М2)+подкран(М2)")
+            L.append("            +колонны(М1)+связи(М2)+фахверк(М2)+опоры(М2)")
+            L.append(f"{'='*70}")
+            L.append(f"  {'Метод 1 (формулы):':<46} {_num(it['М1_т'], 2)} т  ({_num(it['М1_кгм2'], 2)} кг/м²)")
+            L.append(f"  {'Метод 2 (таблицы):':<46} {_num(it['М2_т'], 2)} т  ({_num(it['М2_кгм2'], 2)} кг/м²)")
+            L.append(f"{'━'*70}")
+            L.append(f"  ★ ДИАПАЗОН: {_num(it['min_т'], 2)} т  ...  {_num(it['max_т'], 2)} т")
+            L.append(f"{'━'*70}")
+
+        elif key == "_log" and value:
             L.append("\n─── Лог расчёта ─────────────────────────────────────────────────────")
-            for entry in res["_log"]:
+            for entry in value:
                 L.append(f"  {entry}")
 
-        text = "\n".join(L)
-        self._last_results_text = text
-        self._set_txt(text)
+        return "\n".join(L)
+
+    def _begin_stream(self, text: str):
+        """Начать потоковый вывод: показать text (шапку), прежний текст запомнить для отмены."""
+        if self._stream_prev is None:
+            self._stream_prev = self._last_results_text
+        self.btn_save.configure(state="disabled")
+        self._show_results(text)
+
+    def _append_results(self, part: str):
+        """Дописать готовый раздел в конец окна (пустой раздел пропускается)."""
+        if not part:
+            return
+        part = "\n" + part
+        self._last_results_text += part
+        self.txt.configure(state="normal")
+        self.txt.insert("end", part)
+        self.txt.configure(state="disabled")
+
+    def _end_stream(self):
+        """Прервать потоковый вывод: вернуть текст, бывший до расчёта."""
+        if self._stream_prev is not None:
+            prev, self._stream_prev = self._stream_prev, None
+            self._show_results(prev)
+            if prev:
+                self.btn_save.configure(state="normal")
+
+    def _show_results(self, text: str):
+        old, self._last_results_text = self._last_results_text, text
+        if text == old:
+            return
+        # Заменяются только изменившиеся строки: окно не перерисовывается целиком
+        # и не теряет положение прокрутки.
+        self.txt.configure(state="normal")
+        for start, end, middle in reversed(text_patch(old, text)):
+            self.txt.delete(f"1.0 + {start} chars", f"1.0 + {end} chars")
+            self.txt.insert(f"1.0 + {start} chars", middle)
+        self.txt.configure(state="disabled")
 
 
 # ─────────────────────────────────────────────────────────
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Ограниченный LRU-кэш результатов расчёта пролётов.
+
+Здание обычно состоит из повторяющихся пролётов (например, 12 одинаковых
+по 24 м): результат пролёта зависит только от его параметров, длины
+здания и версии таблиц, поэтому считается один раз. Ключ — хэшируемый
+кортеж; при переполнении вытесняется давно не использованная запись.
+
+Тот же кэш с ttl хранит результаты зданий целиком (metal_core.RESULT_CACHE):
+запись старше ttl секунд считается отсутствующей.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple, Optional
+
+SPAN_MEMO_MAX = 4096  # размер кэша пролётов по умолчанию
+
+_MISSING = object()
+
+
+class MemoInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    evictions: int = 0   # вытеснено по LRU
+    expired: int = 0     # удалено по истечении ttl
+
+
+class LRUMemo:
+    """
+    LRU-кэш со счётчиками попаданий/промахов (как functools.lru_cache,
+    но с явным ключом). Сохранённые значения общие — их нельзя изменять.
+    ttl — время жизни записи в секундах (None — без ограничения);
+    clock — источник времени (для тестов).
+    """
+
+    def __init__(self, maxsize: int = SPAN_MEMO_MAX, ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if maxsize < 1:
+            raise ValueError("maxsize должен быть >= 1")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl должен быть > 0")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()   # ключ -> (значение, срок)
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: Hashable) -> Any:
+        """Значение или _MISSING; просроченная запись удаляется. Вызывать под замком."""
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            return _MISSING
+        value, deadline = item
+        if deadline is not None and self._clock() >= deadline:
+            del self._data[key]
+            self.expired += 1
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        deadline = None if self.ttl is None else self._clock() + self.ttl
+        self._data[key] = (value, deadline)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Значение по ключу; при промахе — fn() (исключение не кэшируется)."""
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = fn()
+        with self._lock:
+            self._store(key, value)
+        return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Значение по ключу или default (учитывается в счётчиках)."""
+        with self._lock:
+            value = self._lookup(key)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._store(key, value)
+
+    def info(self) -> MemoInfo:
+        with self._lock:
+            return MemoInfo(self.hits, self.misses, self.maxsize, len(self._data),
+                            self.evictions, self.expired)
+
+    def clear(self) -> None:
+        """Очистить кэш и счётчики."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._lookup(key) is not _MISSING
@@ -0,0 +1,1096 @@
+# -*- coding: utf-8 -*-
+"""
+Расчётное ядро металлоёмкости производственных зданий (без GUI).
+
+Таблицы методики, табличные поиски и calculate(gp, spans) — то, что
+раньше жило в main_desktop.py. Модуль не импортирует tkinter/customtkinter:
+его можно использовать в пакетных воркерах, пулах процессов и сервисах.
+main_desktop, launcher и main.py (Kivy) берут расчёт отсюда.
+
+Точки входа: calculate(gp, spans) — одно здание, calculate_many(cases) — пакет,
+calculate_cached(gp, spans) — через кэш результатов по каноническому ключу,
+calculate_compact(gp, spans) — компактный BuildingResult без словарей
+(словарь — по запросу: .to_dict() или ленивый .view()).
+iter_sections(gp, spans) — тот же расчёт по разделам для потокового вывода.
+Табличные поиски скомпилированы при импорте (CeilLookup); паритет с исходными
+циклами методики — tests/test_kernel_parity.py.
+"""
+import functools
+import hashlib
+import json
+import math
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from table_lookup import CeilLookup, cached_lookup, nearest_index
+from memo import LRUMemo
+
+# ─────────────────────────────────────────────────────────
+#  ТАБЛИЦЫ ДАННЫХ
+# ─────────────────────────────────────────────────────────
+
+# Таблица 3 методики: подбор прогонов по нормативной нагрузке и шагу ферм.
+# Формат: (qp_max т/м, профиль_6м, масса_1пр_6м кг, профиль_12м, масса_1пр_12м кг)
+# Масса 1 прогона = масса пог.м профиля × длину пролёта (B).
+# Б=6 м → швеллеры (шарнирно-опёртые); Б=12 м → двутавры Б-серии (ГОСТ 26020).
+PURLIN_TABLE = [
+    # qp_max  name_6m           kg_6m   name_12m            kg_12m
+    (0.45, "Швеллер 20",        110.4, "Двутавр 30Б1",       370.8),
+    (0.65, "Швеллер 22",        126.0, "Двутавр 33Б1",       438.0),
+    (0.90, "Швеллер 24",        144.0, "Двутавр 36Б1",       502.8),
+    (1.25, "Швеллер 27",        166.2, "Двутавр 40Б1",       592.8),
+    (1.70, "Швеллер 30",        190.8, "Двутавр 45Б1",       681.6),
+    (2.50, "2×Швеллер 20",      220.8, "2×Двутавр 30Б1",     741.6),
+]
+
+CRANE_BEAM_ALPHA = {
+    # Источник: методика ЦНИИ, разд. 5.1.
+    # Q=20–50 т: αпб = 0.24–0.35; Q=80–200 т: αпб = 0.37–0.47 (линейная интерполяция).
+    # За пределами диапазона — линейная экстраполяция.
+    5:  0.19,   # экстраполяция ниже 20 т
+    10: 0.20,   # экстраполяция ниже 20 т
+    20: 0.24,   # нижняя граница диапазона 20–50 т
+    32: 0.28,   # интерполяция 20–50 т
+    50: 0.35,   # верхняя граница диапазона 20–50 т
+    80: 0.37,   # нижняя граница диапазона 80–200 т
+    100: 0.39,  # пример из методики (Q=100/20 т → αпб=0.39)
+    125: 0.41,  # интерполяция 80–200 т
+    200: 0.47,  # верхняя граница диапазона 80–200 т
+    320: 0.57,  # экстраполяция выше 200 т
+    400: 0.64,  # экстраполяция выше 200 т
+}
+RAIL_WEIGHT_KN = {
+    5:0.461, 10:0.461, 20:0.461, 32:0.598, 50:0.598,
+    80:0.831, 100:1.135, 125:1.135, 200:1.135, 320:1.417, 400:1.417,
+}
+BEAM_HEIGHT_RATIO = {
+    20:(1/7,1/9), 32:(1/7,1/9), 50:(1/6,1/8.5),
+    80:(1/6,1/7.5), 100:(1/6,1/7), 125:(1/6,1/7),
+    160:(1/6,1/7), 200:(1/6,1/7),
+}
+CRANE_Q_EQUIV = {
+    # kN/m вдоль подкрановой балки (скорректировано по методике ×2.5)
+    5:20, 10:30, 20:50, 32:70, 50:95, 80:138,
+    100:170, 125:200, 200:262, 320:362, 400:437,
+}
+
+TRUSS_LOADS = [
+    2.0,2.5,3.0,3.5,4.0,4.5,5.0,5.5,6.0,
+    6.5,7.0,7.5,8.0,8.5,9.0,9.5,10.0,10.5,
+    11.0,11.5,12.0,12.5,
+]
+TRUSS_MASSES = {
+    "Уголки": {
+        36:[5.90,7.54,10.37,11.12,12.30,12.74,13.30,14.74,15.66,15.66,18.89,18.89,18.89,19.30,21.50,21.50,22.52,23.70,24.57,24.57,26.30,26.92],
+        30:[5.20,5.97,6.47,7.14,7.14,7.70,9.00,9.00,10.20,10.20,10.53,11.64,13.63,13.63,14.43,14.43,15.25,15.25,16.43,16.43,16.43,17.27],
+        24:[2.30,3.16,3.94,3.97,4.29,5.75,5.75,6.28,6.28,6.28,6.53,6.53,6.90,7.97,8.87,8.87,8.87,8.87,8.87,9.11,10.45,11.24],
+        18:[2.16,2.16,2.34,2.45,2.68,2.68,2.83,2.91,3.17,3.64,3.64,3.77,3.95,3.95,4.10,4.10,4.51,4.51,4.51,5.26,5.26,5.26],
+    },
+    "Двутавры": {
+        36:[9.60,10.20,10.20,11.47,12.50,13.49,15.14,15.28,15.87,17.18,18.72,21.06,21.06,21.06,22.11,22.11,25.52,25.52,30.78,31.66,31.66,31.85],
+        30:[6.27,6.38,6.38,8.07,8.23,8.90,9.84,9.93,10.35,12.99,12.99,12.99,12.99,14.89,14.89,14.89,15.35,18.68,18.68,18.68,19.69,19.69],
+        24:[4.60,4.60,5.19,5.30,5.79,5.79,6.35,6.63,7.48,8.31,8.31,8.47,8.47,8.63,9.30,9.30,11.08,11.08,11.08,11.08,11.08,12.10],
+        18:[2.92,2.92,2.92,2.92,3.37,3.92,3.92,3.92,4.34,4.34,4.34,4.72,4.72,4.72,4.72,4.72,5.42,5.42,5.49,5.49,5.86,5.86],
+    },
+    "Молодечно": {
+        36:[7.00,8.05,9.20,12.25,13.53,13.53,15.96,17.18,17.61,21.26,21.26,23.01,24.25,29.80,29.80,29.80,29.80,29.80,31.57,37.40,37.40,37.40],
+        30:[5.24,5.80,5.80,7.34,7.34,11.55,10.40,11.97,11.97,13.59,13.59,13.59,15.40,16.22,17.70,19.54,19.54,19.54,21.37,21.37,21.37,21.37],
+        24:[2.48,3.60,3.85,4.11,5.07,5.07,6.18,6.24,6.47,8.02,8.02,8.70,9.37,9.37,10.00,10.90,10.90,11.54,11.54,12.37,13.62,13.62],
+        18:[1.29,1.54,1.58,2.07,2.18,2.65,3.40,3.40,3.40,3.40,4.08,4.08,4.08,4.70,4.83,4.83,5.70,6.07,6.07,6.07,6.07,7.08],
+    },
+}
+
+SUBTRUSS_LOADS  = [18.0,36.0,54.0,72.0,81.0,108.0,126.0,144.0,162.0,180.0,198.0,216.0,234.0,255.0]
+SUBTRUSS_MASSES = [1.57,2.22,2.31,2.72,2.72,4.59,5.32,5.32,5.70,5.80,6.30,6.30,6.53,6.71]
+
+FAKHVERK_DATA = {
+    ('I',0,0):9,  ('I',0,1):10, ('I',0,2):11,
+    ('I',1,0):9,  ('I',1,1):11, ('I',1,2):11,
+    ('I',2,0):10, ('I',2,1):12, ('I',2,2):12,
+    ('II',0,0):23,('II',0,1):25,('II',0,2):25,
+    ('II',1,0):23,('II',1,1):25,('II',1,2):25,
+    ('II',2,0):26,('II',2,1):30,('II',2,2):30,
+    ('III',0,0):19,('III',0,1):28,('III',0,2):45,
+    ('III',1,0):19,('III',1,1):29,('III',1,2):46,
+    ('III',2,0):20,('III',2,1):30,('III',2,2):48,
+}
+
+_CB_Q1 = [5,10,20,32,50]
+_CB_Q2 = [80,100,125,200,400]
+CRANE_BEAM_T1 = {
+    # порядок: [5t_1к,5t_2к, 10t_1к,10t_2к, 20t_1к,20t_2к, 32t_1к,32t_2к, 50t_1к,50t_2к]
+    6:  [ 80,  90, 100, 120, 150, 185, 210, 260, 270, 330],
+    12: [150, 170, 190, 230, 270, 335, 375, 455, 490, 595],
+}
+CRANE_BEAM_T2 = {
+    # порядок: [80t_1к,80t_2к, 100t_1к,100t_2к, 125t_1к,125t_2к, 200t_1к,200t_2к, 400t_1к,400t_2к]
+    12: [290, 330, 350, 400, 430, 490,  620,  720,  920, 1080],
+    18: [460, 520, 540, 615, 660, 750,  950, 1100, 1410, 1640],
+    24: [680, 770, 800, 910, 980,1110, 1420, 1640, 2100, 2450],
+}
+BRAKE_T1 = {
+    (6,True,True):[100,110],(6,True,False):[65,70],
+    (6,False,True):[120,140],(6,False,False):[70,75],
+    (12,True,True):[100,120],(12,True,False):[65,70],
+    (12,False,True):[100,120],(12,False,False):[70,75],
+}
+BRAKE_T2 = {
+    (12,True,True):[120,140],(12,True,False):[80,100],
+    (12,False,True):[140,160],(12,False,False):[60,80],
+    (18,True,True):[120,140],(18,True,False):[80,100],
+    (18,False,True):[140,160],(18,False,False):[80,100],
+    (24,True,True):[220,240],(24,True,False):[140,160],
+    (24,False,True):[220,240],(24,False,False):[140,160],
+}
+
+# ── П.2: Кровельный пирог ─────────────────────────────────
+# Удельный вес слоёв кровли, кН/м² (нормативные значения)
+ROOF_MATERIALS = {
+    # ── Несущий настил ──────────────────────────────────────
+    "Профнастил Н-75 (t=0.7мм)":            0.078,
+    "Профнастил Н-75 (t=0.8мм)":            0.089,
+    "Профнастил Н-60 (t=0.7мм)":            0.075,
+    "Профнастил НС-35 (t=0.7мм)":           0.070,
+    "Профнастил НС-35 (t=0.5мм)":           0.050,
+    # ── Утеплитель минеральная вата (ρ=80 кг/м³) ────────────
+    "Минвата 50мм  (ρ=80 кг/м³)":           0.039,
+    "Минвата 100мм (ρ=80 кг/м³)":           0.078,
+    "Минвата 150мм (ρ=80 кг/м³)":           0.118,
+    "Минвата 200мм (ρ=80 кг/м³)":           0.157,
+    # ── Утеплитель PIR (ρ=35 кг/м³) ────────────────────────
+    "PIR-плита 80мм  (ρ=35 кг/м³)":         0.027,
+    "PIR-плита 100мм (ρ=35 кг/м³)":         0.034,
+    "PIR-плита 150мм (ρ=35 кг/м³)":         0.051,
+    "PIR-плита 200мм (ρ=35 кг/м³)":         0.069,
+    # ── Утеплитель пенополистирол (ρ=25 кг/м³) ─────────────
+    "Пенополистирол 100мм (ρ=25 кг/м³)":    0.025,
+    "Пенополистирол 150мм (ρ=25 кг/м³)":    0.037,
+    "Пенополистирол 200мм (ρ=25 кг/м³)":    0.049,
+    # ── Пароизоляция ────────────────────────────────────────
+    "Пароизоляция п/э плёнка 200мкм":       0.003,
+    "Пароизоляция фольгированная":           0.010,
+    "Пароизоляция битумная (1 слой)":        0.025,
+    # ── Гидроизоляция ───────────────────────────────────────
+    "Мембрана ПВХ 1.5мм":                   0.018,
+    "Мембрана ТПО 1.5мм":                   0.018,
+    "Мембрана ЭПДМ 1.5мм":                  0.016,
+    "Битумный ковёр 2 слоя (рубероид)":     0.049,
+    "Наплавляемая кровля 2 слоя (СБС)":     0.070,
+    # ── Готовые системы ─────────────────────────────────────
+    "Сэндвич-панель кровельная 150мм":       0.130,
+    "Сэндвич-панель кровельная 200мм":       0.167,
+    # ── Прочие слои ─────────────────────────────────────────
+    "Стяжка цементная 20мм":                 0.420,
+    "Стяжка цементная 30мм":                 0.630,
+    "Доборные элементы (конёк, карниз)":     0.020,
+}
+
+# Предустановленные типовые пироги кровли (имя → список материалов)
+ROOF_PRESETS = {
+    "Унипрофиль (проф. + минвата 150 + ПВХ)": [
+        "Профнастил Н-75 (t=0.8мм)",
+        "Минвата 150мм (ρ=80 кг/м³)",
+        "Пароизоляция п/э плёнка 200мкм",
+        "Мембрана ПВХ 1.5мм",
+    ],
+    "Сэндвич-панель 200мм (готовая кровля)": [
+        "Сэндвич-панель кровельная 200мм",
+    ],
+    "Утеплённая PIR 150 + наплавляемая": [
+        "Профнастил Н-75 (t=0.8мм)",
+        "PIR-плита 150мм (ρ=35 кг/м³)",
+        "Пароизоляция битумная (1 слой)",
+        "Наплавляемая кровля 2 слоя (СБС)",
+    ],
+    "Холодная кровля (профнастил)": [
+        "Профнастил Н-75 (t=0.8мм)",
+    ],
+}
+
+# ── П.4: Коэффициенты режима работы кранов ────────────────
+# М1 — аналитическая формула, калибрована под режим 1-6К:
+#   1-6К → ×1.00 (база), 7-8К → ×1.80 (тяжёлый +80 %)
+CRANE_MODE_FACTOR_M1 = {
+    "Режим 1-6К":  1.00,
+    "Режим 7-8К":  1.80,
+}
+# М2 — таблицы CRANE_BEAM_T1/T2 и BRAKE составлены под режим 7-8К:
+#   7-8К → ×1.80 (тяжёлый режим),
+#   1-6К → ×0.65 (снижение ~43 % относительно 7-8К, методика разд. 5.2)
+CRANE_MODE_FACTOR_M2 = {
+    "Режим 1-6К":  0.65,
+    "Режим 7-8К":  1.80,
+}
+
+# Опоры трубопроводов: тип здания -> (мин, макс) кг/м²
+PIPE_SUPPORT = {
+    "Основные производственные": (11, 22),
+    "Здания энергоносителей":     (23, 40),
+    "Вспомогательные здания":     (2, 4),
+}
+
+# ─────────────────────────────────────────────────────────
+#  ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ
+# ─────────────────────────────────────────────────────────
+
+def _lkp(d, val):
+    """Поиск с округлением вверх по sorted dict."""
+    return cached_lookup(CeilLookup.from_dict, d)(val)
+
+
+def select_purlin(load_tm, B_step):
+    """Подбор прогона по Таблице 3 методики.
+    load_tm — нормативная нагрузка на прогон, т/м;
+    B_step  — шаг стропильных ферм, м (6 или 12).
+    Возвращает (масса_1_прогона_кг, имя_профиля).
+    """
+    return _PURLIN_LKP(load_tm)[0 if B_step <= 6 else 1]
+
+
+def interp_table(loads, masses, target):
+    return cached_lookup(CeilLookup, loads, masses)(target)
+
+
+def _ceil_keys(values):
+    return CeilLookup(list(values))
+
+
+def ceil_to_table(target, values):
+    return cached_lookup(_ceil_keys, values)(target)
+
+
+# Скомпилированные таблицы: сортировка один раз при импорте, запрос — bisect
+_ALPHA_LKP   = CeilLookup.from_dict(CRANE_BEAM_ALPHA)
+_RAIL_LKP    = CeilLookup.from_dict(RAIL_WEIGHT_KN)
+_Q_EQUIV_LKP = CeilLookup.from_dict(CRANE_Q_EQUIV)
+_TRUSS_LOAD_IDX = CeilLookup(TRUSS_LOADS, range(len(TRUSS_LOADS)))
+_SUBTRUSS_LKP   = CeilLookup(SUBTRUSS_LOADS, SUBTRUSS_MASSES)
+_CB_SPAN_LKP    = (CeilLookup(list(CRANE_BEAM_T1)), CeilLookup(list(CRANE_BEAM_T2)))
+_BRAKE_SPAN_LKP = (CeilLookup(sorted({k[0] for k in BRAKE_T1})),
+                   CeilLookup(sorted({k[0] for k in BRAKE_T2})))
+# Прогоны: qp_max -> ((масса, профиль) при B<=6, (масса, профиль) при B=12);
+# сверх таблицы — последний профиль с пометкой «(!)»
+_PURLIN_LKP = CeilLookup(
+    [row[0] for row in PURLIN_TABLE],
+    [((m6, n6), (m12, n12)) for _, n6, m6, n12, m12 in PURLIN_TABLE],
+    above=((PURLIN_TABLE[-1][2], f"{PURLIN_TABLE[-1][1]}(!)"),
+           (PURLIN_TABLE[-1][4], f"{PURLIN_TABLE[-1][3]}(!)")))
+BATCH_MEMO_MAX = 65536  # кэш пролётов одного пакета calculate_many
+RESULT_CACHE_MAX = 1024  # кэш результатов зданий целиком (calculate_cached)
+
+# Версия таблиц для ключа SPAN_MEMO: увеличить при правке таблиц в коде
+TABLES_VERSION = 1
+
+
+# Фермы М2 — плотная сетка: тип фермы (код) × пролёт × нагрузка -> кг/м², одним
+# плоским кортежем. Пролёт округляется вверх до пролётов всех типов, ячейка
+# хранит строку пролёта данного типа (как его собственный поиск вверх);
+# нагрузка — до TRUSS_LOADS; сверх таблиц — последние значения.
+TRUSS_TYPE_CODES = {tt: code for code, tt in enumerate(TRUSS_MASSES)}
+_TRUSS_SPANS = sorted({span for ms in TRUSS_MASSES.values() for span in ms})
+_TRUSS_SPAN_IDX = CeilLookup(_TRUSS_SPANS, range(len(_TRUSS_SPANS)))
+_TRUSS_NS, _TRUSS_NL = len(_TRUSS_SPANS), len(TRUSS_LOADS)
+_TRUSS_GRID = tuple(
+    TRUSS_MASSES[tt][CeilLookup(list(TRUSS_MASSES[tt]))(span)][j]
+    for tt in TRUSS_MASSES for span in _TRUSS_SPANS for j in range(_TRUSS_NL))
+
+
+def get_truss_mass_m2(truss_type, span_m, load_tm):
+    code = TRUSS_TYPE_CODES.get(truss_type)
+    if code is None: return None
+    return _TRUSS_GRID[(code * _TRUSS_NS + _TRUSS_SPAN_IDX(span_m)) * _TRUSS_NL
+                       + _TRUSS_LOAD_IDX(load_tm)]
+
+
+def truss_masses_m2(truss_types: Iterable[str], spans_m: Iterable[float],
+                    loads_tm: Iterable[float]) -> List[Optional[float]]:
+    """
+    get_truss_mass_m2 для пакета запросов (тип, пролёт, нагрузка): корзины
+    пролётов и нагрузок — CeilLookup.many по столбцам, затем одна выборка из сетки.
+    """
+    codes = [TRUSS_TYPE_CODES.get(tt) for tt in truss_types]
+    span_idx = _TRUSS_SPAN_IDX.many(spans_m)
+    load_idx = _TRUSS_LOAD_IDX.many(loads_tm)
+    grid, ns, nl = _TRUSS_GRID, _TRUSS_NS, _TRUSS_NL
+    return [None if code is None else grid[(code * ns + si) * nl + li]
+            for code, si, li in zip(codes, span_idx, load_idx)]
+
+
+def get_subtruss_mass_m2(R_t):
+    return _SUBTRUSS_LKP(R_t)
+
+
+def subtruss_masses_m2(R_t: Iterable[float]) -> List[float]:
+    """get_subtruss_mass_m2 для пакета опорных реакций, т."""
+    return _SUBTRUSS_LKP.many(R_t)
+
+
+def get_bracing_kgm2(q_crane_t, step_farm_m):
+    if q_crane_t <= 120: return 15.0 if step_farm_m <= 6 else 35.0
+    return 40.0 if step_farm_m <= 6 else 55.0
+
+
+def get_crane_beam_kgm(q_crane_t, span_pb_m, n_cranes):
+    try:
+        t1 = q_crane_t <= 50
+        table = CRANE_BEAM_T1 if t1 else CRANE_BEAM_T2
+        q_ord = _CB_Q1 if t1 else _CB_Q2
+        vals = table.get(_CB_SPAN_LKP[0 if t1 else 1](span_pb_m))
+        if vals is None: return None
+        ci = nearest_index(q_ord, q_crane_t)*2 + (0 if n_cranes == 1 else 1)
+        return vals[ci] if ci < len(vals) else None
+    except: return None
+
+
+def get_brake_kgm(q_crane_t, span_pb_m, n_cranes, with_passage, is_edge):
+    try:
+        t1 = q_crane_t <= 50
+        table = BRAKE_T1 if t1 else BRAKE_T2
+        sk = _BRAKE_SPAN_LKP[0 if t1 else 1](span_pb_m)
+        vals = table.get((sk, is_edge, with_passage))
+        if vals is None:
+            for k, v in table.items():
+                if k[0] == sk: vals = v; break
+        if vals:
+            return vals[0 if n_cranes == 1 else min(1, len(vals)-1)]
+    except: pass
+    return None
+
+
+def get_fakhverk_kgm2(step_col_m, has_post, h_bld, rig_load):
+    try:
+        if step_col_m <= 6 and has_post: ft = 'III'
+        elif step_col_m <= 6: ft = 'I'
+        else: ft = 'II'
+        lc = 0 if rig_load <= 0 else (1 if rig_load <= 100 else 2)
+        hc = 0 if h_bld <= 10 else (1 if h_bld <= 20 else 2)
+        return FAKHVERK_DATA.get((ft, lc, hc))
+    except: return None
+
+
+def get_pipe_support_kgm2(bld_type):
+    lo, hi = PIPE_SUPPORT.get(bld_type, (11, 22))
+    return (lo + hi) / 2
+
+
+# ─────────────────────────────────────────────────────────
+#  ОСНОВНОЙ РАСЧЁТ — многопролётная версия v3.0
+# ─────────────────────────────────────────────────────────
+
+# Поля пролёта, от которых зависит расчёт (порядок — канонический ключ)
+SPAN_KEYS = ("L_span", "B_step", "col_step", "h_rail", "H_col_ov",
+             "Q_roof", "Q_purlin", "truss_type", "q_crane_t", "n_cranes",
+             "with_pass", "crane_mode", "rig_load", "has_post", "bld_type")
+
+# Кэш per-span величин: (span_key, длина и нагрузки здания, TABLES_VERSION) -> dict
+SPAN_MEMO = LRUMemo()
+
+
+# Колонны (методика): плотность стали, коэффициенты длины верхней/нижней части,
+# коэффициенты момента, вес стенового ограждения кН/м², доля проёмов
+_COL_RHO = 78.5
+_COL_PU, _COL_PL = 1.4, 2.1
+_COL_KMU, _COL_KML = 0.275, 0.45
+_COL_GST, _COL_AW = 0.25, 0.15
+
+
+def span_key(sp: dict) -> tuple:
+    """Канонический хэшируемый ключ пролёта (лишние ключи словаря не учитываются)."""
+    return tuple(sp.get(k, 0) if k == "H_col_ov" else sp[k] for k in SPAN_KEYS)
+
+
+def _span_metrics(sp, L_build, Q_snow, Q_dust, Q_tech, yc):
+    """
+    Величины пролёта, не зависящие от соседей и числа пролётов.
+    Результат кэшируется в SPAN_MEMO и общий для всех вызовов — не изменять.
+    """
+    m = {}
+
+    # Высота колонн
+    h_b = sp["col_step"] / 6 if sp["q_crane_t"] <= 50 else sp["col_step"] / 7
+    if sp["q_crane_t"] <= 20:   h_r = 0.130
+    elif sp["q_crane_t"] <= 50: h_r = 0.150
+    elif sp["q_crane_t"] <= 80: h_r = 0.170
+    else:                        h_r = 0.180
+    H_full = sp["h_rail"] + 4.5
+    if sp.get("H_col_ov", 0) > 0:
+        H_full = sp["H_col_ov"]
+    H_lower = sp["h_rail"] - h_b - h_r + 0.6
+    H_upper = H_full - H_lower
+    m["heights"] = (H_upper, H_lower, H_full)
+
+    L  = sp["L_span"]
+    tt = sp["truss_type"]
+    B  = sp["B_step"]
+    Ss = L_build * L
+    g_links = 0.05
+
+    # Per-span нагрузки
+    Q_load_total = sp["Q_roof"] + sp["Q_purlin"] + Q_snow + Q_dust + Q_tech + g_links
+    gn_total     = Q_load_total
+    m["Q_load_total"] = Q_load_total
+
+    # Прогоны
+    a_pr = 3.0
+    qp_tm = (sp["Q_roof"] + sp["Q_purlin"] + Q_snow + Q_dust + Q_tech) * a_pr * yc / 9.81
+    mp, pname = select_purlin(qp_tm, B)
+    n_pr = int(L / a_pr) + 1
+    g_pur = mp * n_pr / (L * B)
+    m["purlin"] = pname
+    m["qp_tm"] = qp_tm
+    m["g_pur"] = g_pur
+    m["G_pur_t"] = g_pur * Ss / 1000
+
+    # Фермы — нагрузка
+    n_tr = L_build / B + 1
+    Q_tm = gn_total * B * yc / 9.81
+    m["Q_tm"] = Q_tm
+
+    # М1 (только Уголки)
+    G_tr1 = None
+    if tt == "Уголки":
+        Gkn  = (gn_total * B / 1000 + 0.018) * 1.4 * L**2 / 0.85 * yc
+        G_tr1 = Gkn / 9.81 * n_tr
+    m["G_tr1"] = G_tr1
+
+    # М2 (таблица)
+    G_tr2 = None
+    mt = get_truss_mass_m2(tt, L, Q_tm)
+    if mt is not None:
+        G_tr2 = mt * n_tr
+    m["G_tr2"] = G_tr2
+
+    # Связи покрытия
+    g_br_sp = get_bracing_kgm2(sp["q_crane_t"], B)
+    m["g_br"] = g_br_sp
+    m["G_br_t"] = g_br_sp * Ss / 1000
+
+    # Подстропильные фермы (массы до деления на число пролётов)
+    m["need_sub"] = need_sub = sp["col_step"] == 12 and B < sp["col_step"]
+    if need_sub:
+        n_bays = L_build / sp["col_step"]
+        R_kn = gn_total * B * yc * L / 2
+        R_t  = R_kn / 9.81
+        Rf   = max(100, min(R_kn, 400))
+        apf  = (Rf - 100) * 0.0002 + 0.044
+        m["R_kn"] = R_kn
+        m["G_sub1_n"] = apf * 144 * n_bays
+        mt = get_subtruss_mass_m2(R_t)
+        m["G_sub2_n"] = mt * n_bays if mt else None
+
+    # Подкрановые балки: ряд колонн у этого пролёта (крайний / средний)
+    q      = sp["q_crane_t"]
+    nc     = sp["n_cranes"]
+    wp     = sp["with_pass"]
+    mode   = sp["crane_mode"]
+    mf_m1  = CRANE_MODE_FACTOR_M1[mode]   # для М1: 1-6К=1.00 / 7-8К=1.15
+    mf_m2  = CRANE_MODE_FACTOR_M2[mode]   # для М2: 1-6К=0.65 / 7-8К=1.15
+    L_pb_loc = float(sp["col_step"])
+    n_bays_a = math.ceil(L_build / L_pb_loc)
+    alp = _ALPHA_LKP(q)
+    qr  = _RAIL_LKP(q)
+    # Нагрузка от балки пролёта на колонну (kпб=1.2 по методике ЦНИИ разд. 5.1)
+    Gpb = (alp * L_pb_loc + qr) * L_pb_loc * 1.2
+    # М1: аналитическая формула × коэффициент режима
+    G1t = Gpb / 9.81 * mf_m1
+    m["pb_G1"] = G1t * n_bays_a
+    # М2: табличные значения × коэффициент режима; None — нет в таблицах
+    pb_kgm = get_crane_beam_kgm(q, L_pb_loc, nc)
+    pb_m2 = []
+    for is_edge in (False, True):
+        br_kgm = get_brake_kgm(q, L_pb_loc, nc, wp, is_edge)
+        if pb_kgm and br_kgm is not None:
+            pb_m2.append((pb_kgm + br_kgm) * mf_m2 * L_pb_loc * n_bays_a / 1000)
+        else:
+            pb_m2.append(None)
+    m["pb_G2"] = tuple(pb_m2)   # (средний ряд, крайний ряд)
+
+    # Колонны: доля пролёта в рядах колонн. Крайний ряд — целиком от пролёта;
+    # средний ряд собирается из величин двух соседних пролётов в calculate_compact.
+    H_upper, H_lower = m["heights"][:2]
+    cs = sp["col_step"]
+    Gwu = _COL_GST * H_upper * (1 - _COL_AW) * cs
+    Gwl = _COL_GST * H_lower * (1 - _COL_AW) * cs
+    qeq = _Q_EQUIV_LKP(q)
+    m["col_Gwu"] = Gwu
+    m["col_Gwl"] = Gwl
+    m["col_qeq"] = qeq
+    m["col_Gpb"] = Gpb
+    m["col_n"] = round(L_build / cs) + 1
+    SFv = Q_load_total * cs * L / 2 + Gwu
+    Gcu = SFv * _COL_RHO * _COL_PU * H_upper / (_COL_KMU * 240000)
+    D   = qeq * cs * 1.1 * yc
+    SFn = SFv + D + Gpb + Gwl + Gcu
+    Gcl = SFn * _COL_RHO * _COL_PL * H_lower / (_COL_KML * 240000)
+    m["col_edge_kg"] = (Gcu + Gcl) / 9.81 * 1000
+
+    # Фахверк и опоры трубопроводов
+    m["gf"] = get_fakhverk_kgm2(sp["col_step"], sp["has_post"], H_full, sp["rig_load"])
+    gp2 = get_pipe_support_kgm2(sp["bld_type"])
+    m["g_pipe"] = gp2
+    m["G_pipe_t"] = gp2 * Ss / 1000
+    return m
+
+
+# Разделы результата calculate в порядке расчёта (и выдачи iter_sections)
+RESULT_SECTIONS = ("прогоны", "фермы", "связи_покрытия", "подстропильные_фермы",
+                   "подкрановые_балки", "колонны", "фахверк", "ограждение",
+                   "опоры_трубопроводов", "итого", "_log")
+# Разделы результата в точном режиме (raw=True): без лога
+RAW_SECTIONS = RESULT_SECTIONS[:-1]
+
+
+def _no_round(x, ndigits=None):
+    """Вместо round() в точном режиме: значение как есть."""
+    return x
+
+
+class BuildingResult(NamedTuple):
+    """
+    Компактный результат расчёта здания (calculate_compact): неокруглённые
+    суммы и кортежи по рядам колонн, без словарей разделов и строк лога.
+    Величины по пролётам — в metrics (общие с кэшем per-span величин — не изменять).
+    Словарь в форме calculate строится только по запросу: to_dict(), view(),
+    section(ключ); с raw=True — точные значения без округления и без "_log".
+    """
+    spans: list                   # пролёты, как переданы в расчёт
+    metrics: list                 # per-span величины (_span_metrics)
+    W_build: float                # ширина здания, м
+    S_floor: float                # площадь пола, м²
+    P_walls: float                # периметр стен, м
+    S_walls: float                # площадь стен (по наибольшей H_кол), м²
+    G_pur_t: float                # прогоны
+    G_tr_m1: float                # фермы, М1
+    G_tr_m2: float                # фермы, М2
+    G_br_t: float                 # связи покрытия
+    need_sub: bool                # нужны ли подстропильные фермы
+    G_sub_m1: float               # подстропильные фермы, М1
+    G_sub_m2: float               # подстропильные фермы, М2
+    G_pb_m1: float                # подкрановые балки, М1
+    G_pb_m2: float                # подкрановые балки, М2 (0 — нет в таблицах)
+    col_kg: Tuple[float, ...]     # масса одной колонны по рядам (Л, средние, П), кг
+    col_n: Tuple[int, ...]        # число колонн в ряду
+    G_cols_t: float               # колонны
+    G_fakh_t: float               # фахверк (0 — не определён)
+    G_pipe_t: float               # опоры трубопроводов
+
+    @property
+    def total_m1(self) -> float:
+        """Итого по М1, т — гибридная сумма точных масс разделов."""
+        return _hybrid_totals(self, _no_round)[0]
+
+    @property
+    def total_m2(self) -> float:
+        """Итого по М2, т — гибридная сумма точных масс разделов."""
+        return _hybrid_totals(self, _no_round)[1]
+
+    def section(self, key: str, raw: bool = False) -> Any:
+        """Раздел key результата calculate (округлённый, как в отчёте; raw — точный)."""
+        if raw and key == "_log":
+            raise KeyError(key)
+        try:
+            build = _SECTION_BUILDERS[key]
+        except KeyError:
+            raise KeyError(key) from None
+        return build(self, _no_round if raw else round)
+
+    def to_dict(self, raw: bool = False) -> dict:
+        """Результат в форме calculate (все разделы)."""
+        return {key: self.section(key, raw) for key in (RAW_SECTIONS if raw else RESULT_SECTIONS)}
+
+    def view(self, raw: bool = False) -> "ResultView":
+        """Ленивый словарь в форме calculate: раздел строится при первом обращении."""
+        return ResultView(self, raw)
+
+
+class ResultView(Mapping):
+    """Результат calculate поверх BuildingResult; построенные разделы запоминаются."""
+    __slots__ = ("result", "raw", "_keys", "_built")
+
+    def __init__(self, result: BuildingResult, raw: bool = False):
+        self.result = result
+        self.raw = raw
+        self._keys = RAW_SECTIONS if raw else RESULT_SECTIONS
+        self._built: dict = {}
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._built[key]
+        except KeyError:
+            value = self._built[key] = self.result.section(key, self.raw)
+            return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+
+def calculate(gp: dict, spans: list, *, memo: Optional[LRUMemo] = None, store=None,
+              progress: Optional[Callable[[int, int], None]] = None, raw: bool = False) -> dict:
+    """
+    gp   — глобальные параметры здания: L_build, Q_snow, Q_dust, Q_tech, yc
+    spans — список пролётов, каждый содержит все per-span параметры:
+            L_span, B_step, col_step, h_rail, H_col_ov,
+            Q_roof, Q_purlin, truss_type, q_crane_t, n_cranes,
+            with_pass, crane_mode, rig_load, has_post, bld_type
+    memo — кэш per-span величин (по умолчанию SPAN_MEMO).
+    store — дисковое хранилище результатов (result_store.ResultStore): результат
+            берётся оттуда по case_hash, посчитанный — записывается.
+    progress — progress(готово, всего) после каждого пролёта; исключение
+            из progress прерывает расчёт (так GUI отменяет фоновый расчёт).
+    raw — точный режим для переборов: те же разделы без округления (итого —
+            сумма точных масс), без "_log"; несовместим со store.
+    Колонны: N пролётов → N+1 рядов колонн.
+    Крайние ряды (2 шт.) — несут нагрузку от 1 пролёта.
+    Средние ряды (N-1 шт.) — от 2 соседних пролётов.
+    """
+    if store is not None:
+        if raw:
+            raise ValueError("raw=True несовместим с store: хранилище держит округлённые результаты")
+        return store.get_or_compute(case_hash(gp, spans),
+                                    lambda: calculate(gp, spans, memo=memo, progress=progress))
+    return calculate_compact(gp, spans, memo=memo, progress=progress).to_dict(raw)
+
+
+def iter_sections(gp: dict, spans: list, *, memo: Optional[LRUMemo] = None,
+                  progress: Optional[Callable[[int, int], None]] = None
+                  ) -> Iterator[Tuple[str, Any]]:
+    """
+    Тот же результат, что calculate, но по разделам: (ключ, значение) в порядке
+    RESULT_SECTIONS, каждый раздел строится непосредственно перед выдачей.
+    GUI показывает первые разделы, не дожидаясь остальных;
+    dict(iter_sections(gp, spans)) == calculate(gp, spans).
+    """
+    r = calculate_compact(gp, spans, memo=memo, progress=progress)
+    for key in RESULT_SECTIONS:
+        yield key, r.section(key)
+
+
+def calculate_compact(gp: dict, spans: list, *, memo: Optional[LRUMemo] = None,
+                      progress: Optional[Callable[[int, int], None]] = None) -> BuildingResult:
+    """
+    Расчёт здания без построения словарей результата (для пакетных расчётов):
+    параметры — как у calculate; calculate(gp, spans) == calculate_compact(gp, spans).to_dict().
+    """
+    if memo is None:
+        memo = SPAN_MEMO
+
+    L_build = gp["L_build"]
+    Q_snow  = gp["Q_snow"]
+    Q_dust  = gp["Q_dust"]
+    Q_tech  = gp["Q_tech"]
+    yc      = gp["yc"]
+
+    N = len(spans)
+    W_build = sum(sp["L_span"] for sp in spans)
+    S_floor = L_build * W_build
+    P_walls = 2 * (L_build + W_build)
+
+    # ── Per-span величины (одинаковые пролёты считаются один раз) ──
+    gp_key = (L_build, Q_snow, Q_dust, Q_tech, yc, TABLES_VERSION)
+    metrics = []
+    for i, sp in enumerate(spans):
+        metrics.append(memo.get_or_compute(
+            (span_key(sp), gp_key),
+            lambda sp=sp: _span_metrics(sp, L_build, Q_snow, Q_dust, Q_tech, yc)))
+        if progress is not None:
+            progress(i + 1, N)
+
+    # ── Высота колонн — per-span ────────────────────────
+    span_heights = [m["heights"] for m in metrics]
+
+    # Для ограждения и фахверка берём max H_full
+    H_full_max = max(h[2] for h in span_heights)
+    S_walls = P_walls * H_full_max
+
+    # ── 1+2. Прогоны и фермы — по пролётам ─────────────
+    G_pur_all_t = 0.0
+    G_tr_m1_all = 0.0
+    G_tr_m2_all = 0.0
+    for m in metrics:
+        G_pur_all_t += m["G_pur_t"]
+        G_tr1 = m["G_tr1"]
+        if G_tr1 is not None:
+            G_tr_m1_all += G_tr1
+        G_tr2 = m["G_tr2"]
+        if G_tr2 is not None:
+            G_tr_m2_all += G_tr2
+
+    # ── 3. Связи покрытия — per-span, суммарно ──────────
+    G_br_total = 0.0
+    for m in metrics:
+        G_br_total += m["G_br_t"]
+
+    # ── 4. Подстропильные фермы — per-span ───────────────
+    G_sub_m1 = 0.0
+    G_sub_m2 = 0.0
+    need_sub = any(m["need_sub"] for m in metrics)
+    if need_sub:
+        for m in metrics:
+            if not m["need_sub"]:
+                continue
+            G_sub_m1 += m["G_sub1_n"] / N
+            G2 = m["G_sub2_n"] / N if m["G_sub2_n"] is not None else None
+            if G2: G_sub_m2 += G2
+
+    # ── 5. Подкрановые балки — по рядам колонн ──────────
+    # Для каждого ряда используем col_step соответствующего пролёта
+    pb_G1 = [m["pb_G1"] for m in metrics]
+    G_pb_m1 = sum(_by_pb_rows(pb_G1, pb_G1))
+    G_pb_m2 = sum(v for v in _by_pb_rows([m["pb_G2"][1] for m in metrics],
+                                         [m["pb_G2"][0] for m in metrics]) if v is not None)
+
+    # ── 6. Колонны — с учётом топологии и per-span высот ─
+    # Крайние ряды — величины своего пролёта (в metrics); средний ряд mi —
+    # пара соседних пролётов (mi-1, mi), параметры ряда — по левому пролёту.
+    def _mid_kg(mL, mR, sL, sR):
+        cs_mid = sL["col_step"]
+        SFv = (mL["Q_load_total"] + mR["Q_load_total"]) * cs_mid * (sL["L_span"] + sR["L_span"]) / 4 + mL["col_Gwu"]
+        Gcu = SFv * _COL_RHO * _COL_PU * mL["heights"][0] / (_COL_KMU * 240000)
+        D = (mL["col_qeq"] + mR["col_qeq"]) * cs_mid * 1.1 * yc
+        SFn = SFv + D + (mL["col_Gpb"] + mR["col_Gpb"]) + mL["col_Gwl"] + Gcu
+        Gcl = SFn * _COL_RHO * _COL_PL * mL["heights"][1] / (_COL_KML * 240000)
+        return (Gcu + Gcl) / 9.81 * 1000
+
+    col_kg = (metrics[0]["col_edge_kg"],
+              *map(_mid_kg, metrics, metrics[1:], spans, spans[1:]),
+              metrics[-1]["col_edge_kg"])
+    col_n = (metrics[0]["col_n"], *(m["col_n"] for m in metrics[:-1]), metrics[-1]["col_n"])
+
+    G_cols_t = 0.0
+    for kg, n in zip(col_kg, col_n):
+        G_cols_t += kg * n / 1000
+
+    # ── 7. Фахверк — per-span ──────────────────────────
+    G_fakh_total = 0.0
+    for m in metrics:
+        gf = m["gf"]
+        if gf:
+            # Площадь стен, приходящаяся на данный пролёт (пропорционально)
+            G_fakh_total += gf * (P_walls * m["heights"][2] / N) / 1000
+
+    # ── 9. Опоры трубопроводов — per-span ───────────────
+    G_pipe_total = 0.0
+    for m in metrics:
+        G_pipe_total += m["G_pipe_t"]
+
+    return BuildingResult(
+        spans, metrics, W_build, S_floor, P_walls, S_walls,
+        G_pur_all_t, G_tr_m1_all, G_tr_m2_all, G_br_total,
+        need_sub, G_sub_m1, G_sub_m2, G_pb_m1, G_pb_m2,
+        col_kg, col_n, G_cols_t, G_fakh_total, G_pipe_total,
+    )
+
+
+def _pb_rows(N: int) -> Iterator[Tuple[int, bool]]:
+    """(пролёт, крайний ли ряд) для подкрановых балок в порядке рядов колонн."""
+    yield 0, True                       # Крайний левый (пролёт 0)
+    for mi in range(1, N):              # Средние: левый и правый пролёт ряда
+        yield mi - 1, False
+        yield mi, False
+    yield N - 1, True                   # Крайний правый
+
+
+def _by_pb_rows(edge: list, mid: list) -> Iterator[Any]:
+    """
+    Значения по рядам подкрановых балок (порядок _pb_rows) из величин пролётов:
+    edge[i] — для крайних рядов, mid[i] — для средних (пары соседних пролётов).
+    """
+    yield edge[0]
+    for left, right in zip(mid, mid[1:]):
+        yield left
+        yield right
+    yield edge[-1]
+
+
+def _col_row_label(j: int, N: int) -> str:
+    return "Крайний Л" if j == 0 else "Крайний П" if j == N else f"Средний {j}"
+
+
+def _pb_row_label(k: int, N: int) -> str:
+    if k == 0:
+        return "Крайний Л"
+    if k == 2 * N - 1:
+        return "Крайний П"
+    return f"Средний {(k + 1) // 2} ({'лев' if k % 2 else 'прав'})"
+
+
+# ─── Разделы результата calculate из BuildingResult ──────────────────────────
+
+def _sec_purlins(r: BuildingResult, rnd=round) -> dict:
+    return {
+        "масса_общая_т": rnd(r.G_pur_t, 2),
+        "по_пролётам": [{"пролёт": i+1, "профиль": m["purlin"],
+            "нагрузка_тм": rnd(m["qp_tm"], 3), "расход_кгм2": rnd(m["g_pur"], 2),
+            "масса_т": rnd(m["G_pur_t"], 2)} for i, m in enumerate(r.metrics)],
+    }
+
+
+def _sec_trusses(r: BuildingResult, rnd=round) -> dict:
+    return {
+        "масса_общая_т_М1": rnd(r.G_tr_m1, 2),
+        "масса_общая_т_М2": rnd(r.G_tr_m2, 2),
+        "по_пролётам": [{"пролёт": i+1, "нагрузка_тм": rnd(m["Q_tm"], 3),
+            "G_М1_т": rnd(m["G_tr1"], 2) if m["G_tr1"] is not None else "н/п",
+            "G_М2_т": rnd(m["G_tr2"], 2) if m["G_tr2"] is not None else "н/п"}
+            for i, m in enumerate(r.metrics)],
+    }
+
+
+def _sec_bracing(r: BuildingResult, rnd=round) -> dict:
+    return {
+        "расход_кгм2": rnd(r.G_br_t * 1000 / r.S_floor, 2) if r.S_floor else 0,
+        "масса_общая_т": rnd(r.G_br_t, 2),
+        "по_пролётам": [{"пролёт": i+1, "расход_кгм2": m["g_br"], "масса_т": rnd(m["G_br_t"], 2)}
+                        for i, m in enumerate(r.metrics)],
+    }
+
+
+def _sec_subtrusses(r: BuildingResult, rnd=round) -> dict:
+    if not r.need_sub:
+        return {"примечание": "Не требуются"}
+    N = len(r.metrics)
+    sub_rows = []
+    for i, m in enumerate(r.metrics):
+        if not m["need_sub"]:
+            sub_rows.append({"пролёт": i+1, "G_М1_т": 0, "G_М2_т": "н/п", "R_кн": 0})
+            continue
+        G1 = m["G_sub1_n"] / N
+        G2 = m["G_sub2_n"] / N if m["G_sub2_n"] is not None else None
+        sub_rows.append({"пролёт": i+1, "R_кн": rnd(m["R_kn"], 1),
+            "G_М1_т": rnd(G1, 2), "G_М2_т": rnd(G2, 2) if G2 else "н/п"})
+    return {
+        "масса_общая_т_М1": rnd(r.G_sub_m1, 2),
+        "масса_общая_т_М2": rnd(r.G_sub_m2, 2),
+        "по_пролётам": sub_rows,
+    }
+
+
+def _sec_crane_beams(r: BuildingResult, rnd=round) -> dict:
+    N = len(r.metrics)
+    return {
+        "масса_общая_т_М1": rnd(r.G_pb_m1, 2),
+        "масса_общая_т_М2": rnd(r.G_pb_m2, 2) if r.G_pb_m2 > 0 else "н/п",
+        "ряды_колонн": [{"ряд": _pb_row_label(k, N), "G_М1_т": rnd(r.metrics[i]["pb_G1"], 2),
+                         "q": r.spans[i]["q_crane_t"]}
+                        for k, (i, _) in enumerate(_pb_rows(N))],
+    }
+
+
+def _sec_columns(r: BuildingResult, rnd=round) -> dict:
+    N = len(r.metrics)
+    # Для отображения — первый пролёт
+    H_upper0, H_lower0, H_full0 = r.metrics[0]["heights"]
+    return {
+        "n_колонн": r.col_n[0] * (N + 1),
+        "H_full_м":  rnd(H_full0, 2),
+        "H_upper_м": rnd(H_upper0, 2),
+        "H_lower_м": rnd(H_lower0, 2),
+        # все высоты по пролётам для отображения
+        "высоты_пролётов": [{"пролёт": i+1, "H_full": rnd(h[2], 2),
+                             "H_upper": rnd(h[0], 2), "H_lower": rnd(h[1], 2)}
+                            for i, h in enumerate(m["heights"] for m in r.metrics)],
+        "расход_кгм2": rnd(r.G_cols_t * 1000 / r.S_floor, 2) if r.S_floor else 0,
+        "масса_общая_т": rnd(r.G_cols_t, 2),
+        "по_рядам": [{"ряд": _col_row_label(j, N), "масса_1_кг": rnd(kg, 1),
+                      "масса_ряд_т": rnd(kg * n / 1000, 2)}
+                     for j, (kg, n) in enumerate(zip(r.col_kg, r.col_n))],
+    }
+
+
+def _sec_fakhverk(r: BuildingResult, rnd=round) -> dict:
+    N = len(r.metrics)
+    fakh_rows = []
+    for i, m in enumerate(r.metrics):
+        gf = m["gf"]
+        if gf:
+            G_fakh_sp = gf * (r.P_walls * m["heights"][2] / N) / 1000
+            fakh_rows.append({"пролёт": i+1, "расход_кгм2_стены": gf,
+                              "масса_т": rnd(G_fakh_sp, 2)})
+        else:
+            fakh_rows.append({"пролёт": i+1, "ошибка": "Не определён", "масса_т": 0})
+    if r.G_fakh_t > 0:
+        return {
+            "расход_кгм2_стены": rnd(r.G_fakh_t * 1000 / r.S_walls, 2) if r.S_walls else 0,
+            "площадь_стен_м2": rnd(r.S_walls, 1),
+            "масса_общая_т": rnd(r.G_fakh_t, 2),
+            "по_пролётам": fakh_rows,
+        }
+    return {"ошибка": "Не определён", "масса_общая_т": 0, "по_пролётам": fakh_rows}
+
+
+def _sec_enclosure(r: BuildingResult, rnd=round) -> dict:
+    return {"стены_м2": rnd(r.S_walls, 1), "кровля_м2": rnd(r.S_floor, 1)}
+
+
+def _sec_pipe_supports(r: BuildingResult, rnd=round) -> dict:
+    return {
+        "расход_кгм2": rnd(r.G_pipe_t * 1000 / r.S_floor, 2) if r.S_floor else 0,
+        "масса_общая_т": rnd(r.G_pipe_t, 2),
+        "по_пролётам": [{"пролёт": i+1, "расход_кгм2": m["g_pipe"], "масса_т": rnd(m["G_pipe_t"], 2)}
+                        for i, m in enumerate(r.metrics)],
+    }
+
+
+def _hybrid_totals(r: BuildingResult, rnd=round) -> Tuple[float, float]:
+    """
+    П.6: гибридное суммирование (М1, М2). С rnd=round — по округлённым массам
+    разделов, как в отчёте calculate; с _no_round — по точным.
+    """
+    common = (
+        rnd(r.G_pur_t, 2)
+        + rnd(r.G_cols_t, 2)
+        + rnd(r.G_br_t, 2)
+        + (rnd(r.G_fakh_t, 2) if r.G_fakh_t > 0 else 0.0)
+        + rnd(r.G_pipe_t, 2)
+    )
+    m1_spec = (
+        rnd(r.G_tr_m1, 2)
+        + (rnd(r.G_sub_m1, 2) if r.need_sub else 0.0)
+        + rnd(r.G_pb_m1, 2)
+    )
+    m2_spec = (
+        rnd(r.G_tr_m2, 2)
+        + (rnd(r.G_sub_m2, 2) if r.need_sub else 0.0)
+        + (rnd(r.G_pb_m2, 2) if r.G_pb_m2 > 0 else 0.0)
+    )
+    return common + m1_spec, common + m2_spec
+
+
+def _sec_total(r: BuildingResult, rnd=round) -> dict:
+    total_m1, total_m2 = _hybrid_totals(r, rnd)
+    S_floor = r.S_floor
+    return {
+        "М1_т":    rnd(total_m1, 2),
+        "М2_т":    rnd(total_m2, 2),
+        "М1_кгм2": rnd(total_m1 * 1000 / S_floor, 2) if S_floor else 0,
+        "М2_кгм2": rnd(total_m2 * 1000 / S_floor, 2) if S_floor else 0,
+        "min_т":   rnd(min(total_m1, total_m2), 2),
+        "max_т":   rnd(max(total_m1, total_m2), 2),
+        "S_floor": rnd(S_floor, 1),
+    }
+
+
+def _sec_log(r: BuildingResult, rnd=round) -> list:
+    log = [f"Пролётов: {len(r.metrics)}  W={r.W_build:.0f}м  S_пола={r.S_floor:.0f}м²"]
+    for i, m in enumerate(r.metrics):
+        H_upper, H_lower, H_full = m["heights"]
+        log.append(f"Пролёт {i+1}: H_кол={H_full:.2f}м (надкр={H_upper:.2f}м  подкр={H_lower:.2f}м)")
+    return log
+
+
+_SECTION_BUILDERS: Dict[str, Callable[..., Any]] = {
+    "прогоны":              _sec_purlins,
+    "фермы":                _sec_trusses,
+    "связи_покрытия":       _sec_bracing,
+    "подстропильные_фермы": _sec_subtrusses,
+    "подкрановые_балки":    _sec_crane_beams,
+    "колонны":              _sec_columns,
+    "фахверк":              _sec_fakhverk,
+    "ограждение":           _sec_enclosure,
+    "опоры_трубопроводов":  _sec_pipe_supports,
+    "итого":                _sec_total,
+    "_log":                 _sec_log,
+}
+
+
+# ─── Канонический ключ здания и кэш результатов ──────────────────────────────
+
+# Поля gp, от которых зависит расчёт
+GP_KEYS = ("L_build", "Q_snow", "Q_dust", "Q_tech", "yc")
+
+# Кэш результатов: case_key(gp, spans) -> результат calculate
+RESULT_CACHE = LRUMemo(RESULT_CACHE_MAX)
+
+
+@functools.lru_cache(maxsize=1)
+def tables_hash() -> str:
+    """Хэш содержимого таблиц методики и TABLES_VERSION (правка таблиц меняет ключи)."""
+    tables = (TABLES_VERSION, PURLIN_TABLE, CRANE_BEAM_ALPHA, RAIL_WEIGHT_KN, BEAM_HEIGHT_RATIO,
+              CRANE_Q_EQUIV, TRUSS_LOADS, TRUSS_MASSES, SUBTRUSS_LOADS, SUBTRUSS_MASSES,
+              FAKHVERK_DATA, CRANE_BEAM_T1, CRANE_BEAM_T2, BRAKE_T1, BRAKE_T2,
+              CRANE_MODE_FACTOR_M1, CRANE_MODE_FACTOR_M2, PIPE_SUPPORT)
+    return hashlib.sha256(repr(tables).encode("utf-8")).hexdigest()[:16]
+
+
+def _canon(v: Any) -> Any:
+    """Нормализация числа: 24 == 24.0, 0.1+0.2 == 0.3, -0.0 == 0.0; прочее — как есть."""
+    t = type(v)
+    if t is float or t is int:
+        return float(f"{v:.12g}") + 0.0
+    return v
+
+
+def case_key(gp: dict, spans: list) -> tuple:
+    """
+    Канонический ключ здания: хэш таблиц, поля GP_KEYS и SPAN_KEYS каждого
+    пролёта (в фиксированном порядке) с нормализованными числами. Лишние
+    поля (id, комментарии) на ключ не влияют. Ключ кэша результатов.
+    """
+    return (tables_hash(),
+            tuple(_canon(gp[k]) for k in GP_KEYS),
+            tuple(tuple(map(_canon, span_key(sp))) for sp in spans))
+
+
+def canonical_case(gp: dict, spans: list) -> str:
+    """Текстовая форма case_key: JSON с отсортированными ключами (для хранения и передачи)."""
+    tables, g, ss = case_key(gp, spans)
+    doc = {"tables": tables, "gp": dict(zip(GP_KEYS, g)),
+           "spans": [dict(zip(SPAN_KEYS, sp)) for sp in ss]}
+    return json.dumps(doc, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def case_hash(gp: dict, spans: list) -> str:
+    """SHA-256 канонической записи — ключ здания вне процесса."""
+    return hashlib.sha256(canonical_case(gp, spans).encode("utf-8")).hexdigest()
+
+
+def calculate_cached(gp: dict, spans: list, *, cache: Optional[LRUMemo] = None) -> dict:
+    """
+    calculate() через кэш результатов (по умолчанию RESULT_CACHE): одно и то же
+    здание считается один раз. Результат общий для всех вызовов — не изменять.
+    """
+    if cache is None:
+        cache = RESULT_CACHE
+    return cache.get_or_compute(case_key(gp, spans), lambda: calculate(gp, spans))
+
+
+def calculate_many(cases: Iterable[Tuple[dict, list]], memo: Optional[LRUMemo] = None,
+                   store=None, compact: bool = False, raw: bool = False) -> list:
+    """
+    Пакетный вход: то же, что [calculate(gp, spans) for gp, spans in cases].
+    Пролёты, повторяющиеся во всём пакете, считаются один раз. По умолчанию
+    у пакета свой кэш — большой перебор не вытесняет SPAN_MEMO интерактивного расчёта.
+    store — дисковое хранилище: готовые результаты читаются одним запросом,
+    новые записываются одной транзакцией.
+    compact — вернуть BuildingResult (calculate_compact) вместо словарей; без store.
+    raw — точные результаты (см. calculate); без store.
+    """
+    if memo is None:
+        memo = LRUMemo(BATCH_MEMO_MAX)
+    if compact or raw:
+        if store is not None:
+            raise ValueError("compact/raw несовместимы с store: хранилище держит округлённые словари")
+        if compact:
+            return [calculate_compact(gp, spans, memo=memo) for gp, spans in cases]
+    if store is None:
+        return [calculate(gp, spans, memo=memo, raw=raw) for gp, spans in cases]
+    cases = list(cases)
+    keys = [case_hash(gp, spans) for gp, spans in cases]
+    found = store.get_many(keys)
+    fresh = {}
+    out = []
+    try:
+        for key, (gp, spans) in zip(keys, cases):
+            res = found.get(key) or fresh.get(key)
+            if res is None:
+                res = fresh[key] = calculate(gp, spans, memo=memo)
+            out.append(res)
+    finally:   # посчитанное до ошибки тоже сохраняется
+        store.put_many(fresh.items())
+    return out
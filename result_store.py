@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Дисковое хранилище результатов расчёта (sqlite, режим WAL).
+
+Ключ — metal_core.case_hash(gp, spans): SHA-256 канонической записи здания,
+в которую входит хэш таблиц методики. Один и тот же вход всегда даёт один
+и тот же результат, поэтому запись не перезаписывается (INSERT OR IGNORE):
+прерванный и перезапущенный перебор или пересекающиеся переборы берут
+готовое из хранилища.
+
+Несколько процессов могут писать одновременно: у каждого процесса (и потока)
+своё соединение, WAL допускает чтение во время записи, а писатели ждут
+освобождения блокировки до timeout секунд. Объект ResultStore передаётся
+в рабочие процессы через pickle (передаётся только путь).
+
+Пример:
+    store = ResultStore("study.sqlite")
+    res = calculate(gp, spans, store=store)
+    store.compact()   # удалить результаты устаревших таблиц, сжать файл
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+SCHEMA_VERSION = 1
+_SQL_VARS = 500   # ключей в одном запросе IN (...)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key     TEXT PRIMARY KEY,
+    tables  TEXT NOT NULL,
+    result  TEXT NOT NULL,
+    created REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_tables ON results(tables);
+"""
+
+# Соединения текущего процесса: (pid, поток, путь) -> sqlite3.Connection
+_CONNECTIONS: Dict[Tuple[int, int, str], sqlite3.Connection] = {}
+_CONNECTIONS_LOCK = threading.Lock()
+
+
+def _chunks(items: List[Any], size: int) -> Iterator[List[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class ResultStore:
+    """Хранилище результатов: case_hash -> результат calculate (JSON)."""
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = os.path.abspath(path)
+        self.timeout = timeout
+        self._conn()   # создать файл и схему сразу — ошибки пути видны здесь
+
+    # ── соединение ───────────────────────────────────────────────────────────
+    def _conn(self) -> sqlite3.Connection:
+        ident = (os.getpid(), threading.get_ident(), self.path)
+        conn = _CONNECTIONS.get(ident)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            with _CONNECTIONS_LOCK:
+                _CONNECTIONS[ident] = conn
+        return conn
+
+    def close(self) -> None:
+        """Закрыть соединение текущего процесса и потока."""
+        conn = _CONNECTIONS.pop((os.getpid(), threading.get_ident(), self.path), None)
+        if conn is not None:
+            conn.close()
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"path": self.path, "timeout": self.timeout}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.path = state["path"]
+        self.timeout = state["timeout"]
+
+    # ── чтение и запись ──────────────────────────────────────────────────────
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Найденные результаты по ключам (отсутствующих ключей в ответе нет)."""
+        out = {}
+        conn = self._conn()
+        for part in _chunks(list(dict.fromkeys(keys)), _SQL_VARS):
+            marks = ",".join("?" * len(part))
+            for key, result in conn.execute(f"SELECT key, result FROM results WHERE key IN ({marks})", part):
+                out[key] = json.loads(result)
+        return out
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        self.put_many([(key, result)])
+
+    def put_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """Записать пачку одной транзакцией; существующие ключи не меняются."""
+        from metal_core import tables_hash
+        tables, now = tables_hash(), time.time()
+        rows = [(key, tables, json.dumps(res, ensure_ascii=False), now) for key, res in items]
+        if not rows:
+            return
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("INSERT OR IGNORE INTO results VALUES (?, ?, ?, ?)", rows)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def get_or_compute(self, key: str, fn: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Результат из хранилища; при отсутствии — fn() с записью (исключение не сохраняется)."""
+        res = self.get(key)
+        if res is None:
+            res = fn()
+            self.put(key, res)
+        return res
+
+    def __contains__(self, key: str) -> bool:
+        return self._conn().execute("SELECT 1 FROM results WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    # ── обслуживание ─────────────────────────────────────────────────────────
+    def compact(self, older_than: Optional[float] = None) -> int:
+        """
+        Удаляет результаты прежних версий таблиц (и старше older_than секунд,
+        если задано), затем сжимает файл. Возвращает число удалённых записей.
+        """
+        from metal_core import tables_hash
+        conn = self._conn()
+        removed = conn.execute("DELETE FROM results WHERE tables != ?", (tables_hash(),)).rowcount
+        if older_than is not None:
+            removed += conn.execute("DELETE FROM results WHERE created < ?",
+                                    (time.time() - older_than,)).rowcount
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+        return removed
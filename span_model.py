@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Компактная модель списка пролётов для редакторов GUI.
+
+Редактор показывает только несколько пролётов (виджеты переиспользуются),
+а данные всех пролётов хранятся здесь: пролёт — кортеж значений в порядке
+полей, без виджетов и словарей. Копии пролёта (дублирование, добавление,
+массовое присваивание) делят один и тот же кортеж, поэтому здание из сотен
+типовых пролётов занимает в памяти почти как один пролёт.
+
+Пример:
+    spans = SpanList({"L_span": 24.0, "q_crane_t": 50.0})
+    spans.append()
+    spans.duplicate(0, 99)                      # ещё 99 копий пролёта 1
+    spans.apply(range(10, 20), "q_crane_t", 100.0)
+    calculate(gp, spans.to_spans())
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class SpanList:
+    """
+    Список пролётов: поля и значения по умолчанию задаёт defaults.
+    Значения общие для копий пролёта — изменяемые значения (списки) не править.
+    """
+
+    def __init__(self, defaults: Dict[str, Any], spans: Iterable[Dict[str, Any]] = ()):
+        self.fields: Tuple[str, ...] = tuple(defaults)
+        self._index = {k: i for i, k in enumerate(self.fields)}
+        self._default = tuple(defaults.values())
+        self._rows: List[tuple] = [self._row(sp) for sp in spans]
+
+    # ── преобразование ───────────────────────────────────────────────────────
+    def _row(self, params: Dict[str, Any]) -> tuple:
+        """Кортеж значений; недостающие поля — по умолчанию, лишние отбрасываются."""
+        return tuple(params.get(k, self._default[i]) for i, k in enumerate(self.fields))
+
+    # ── чтение ───────────────────────────────────────────────────────────────
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        return dict(zip(self.fields, self._rows[i]))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in self._rows:
+            yield dict(zip(self.fields, row))
+
+    def value(self, i: int, field: str) -> Any:
+        return self._rows[i][self._index[field]]
+
+    def to_spans(self) -> List[Dict[str, Any]]:
+        """Пролёты как список словарей — вход metal_core.calculate."""
+        return list(self)
+
+    # ── изменение ────────────────────────────────────────────────────────────
+    def append(self, params: Optional[Dict[str, Any]] = None) -> int:
+        """Добавить пролёт в конец (без params — со значениями по умолчанию); возвращает индекс."""
+        row = self._default if params is None else self._row(params)
+        self._rows.append(row)
+        return len(self._rows) - 1
+
+    def set(self, i: int, params: Dict[str, Any]) -> None:
+        """Изменить поля пролёта i (недостающие в params поля не меняются)."""
+        cur = self._rows[i]
+        row = tuple(params.get(k, cur[j]) for j, k in enumerate(self.fields))
+        if row != cur:
+            self._rows[i] = row
+
+    def remove(self, indices: Iterable[int]) -> int:
+        """Удалить пролёты по индексам; возвращает число удалённых."""
+        drop = set(indices)
+        before = len(self._rows)
+        self._rows = [row for i, row in enumerate(self._rows) if i not in drop]
+        removed = before - len(self._rows)
+        return removed
+
+    def duplicate(self, i: int, count: int = 1) -> None:
+        """Вставить count копий пролёта i сразу после него."""
+        if count < 0:
+            raise ValueError("count должен быть >= 0")
+        self._rows[i + 1:i + 1] = [self._rows[i]] * count
+
+    def apply(self, indices: Iterable[int], field: str, value: Any) -> int:
+        """Присвоить поле field = value выбранным пролётам; возвращает число изменённых."""
+        j = self._index[field]
+        # id(старый кортеж) -> (старый, новый): общие пролёты остаются общими;
+        # старый кортеж хранится, чтобы его id не достался другому объекту.
+        updated: Dict[int, Tuple[tuple, tuple]] = {}
+        changed = 0
+        for i in sorted(set(indices)):
+            row = self._rows[i]
+            if row[j] != value:
+                if id(row) not in updated:
+                    updated[id(row)] = (row, row[:j] + (value,) + row[j + 1:])
+                self._rows[i] = updated[id(row)][1]
+                changed += 1
+        return changed
+
+    def clear(self) -> None:
+        self._rows.clear()
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Перебор вариантов (design-space sweep) поверх calculate(gp, spans).
+
+Декартово произведение параметров строится лениво (itertools.product),
+варианты режутся на пачки и считаются в ProcessPoolExecutor; результаты
+возвращаются потоком в исходном порядке. В работе одновременно не больше
+max_inflight пачек — память не растёт с размером перебора.
+
+Пример:
+    for case in sweep(gp_grid={"Q_snow": [1.5, 2.1]},
+                      span_grid={"L_span": [18, 24, 30], "q_crane_t": range(10, 60, 10)},
+                      n_spans=2, workers=8):
+        print(case.index, case.result["итого"]["М1_т"])
+"""
+
+import functools
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+# Значения по умолчанию — как в полях ввода десктопной версии
+DEFAULT_GP = {"L_build": 120.0, "Q_snow": 2.1, "Q_dust": 0.0, "Q_tech": 0.0, "yc": 1.0}
+DEFAULT_SPAN = {
+    "L_span": 24.0, "B_step": 6.0, "col_step": 6.0, "h_rail": 10.0, "H_col_ov": 0.0,
+    "Q_roof": 0.30, "Q_purlin": 0.35, "truss_type": "Уголки",
+    "q_crane_t": 50.0, "n_cranes": 1, "with_pass": True, "crane_mode": "Режим 1-6К",
+    "rig_load": 0.0, "has_post": False, "bld_type": "Основные производственные",
+}
+
+Case = Tuple[Dict[str, Any], List[Dict[str, Any]]]
+SpanGrid = Union[Mapping[str, Any], Sequence[Mapping[str, Any]], None]
+
+
+class SweepResult(NamedTuple):
+    index: int
+    gp: Dict[str, Any]
+    spans: List[Dict[str, Any]]
+    result: Dict[str, Any]
+
+
+def fill_case(gp: Optional[Mapping[str, Any]], spans: Iterable[Mapping[str, Any]]) -> Case:
+    """Вариант из неполных данных: недостающие поля — значения по умолчанию."""
+    return {**DEFAULT_GP, **(gp or {})}, [{**DEFAULT_SPAN, **sp} for sp in spans]
+
+
+def frange(start: float, stop: float, step: float) -> List[float]:
+    """Диапазон с дробным шагом, включая stop (с допуском на округление)."""
+    if step <= 0:
+        raise ValueError("Шаг должен быть положительным")
+    n = int((stop - start) / step + 1e-9)
+    return [round(start + i * step, 10) for i in range(n + 1)]
+
+
+def _axes(grid: Optional[Mapping[str, Any]]) -> Tuple[List[str], List[Sequence[Any]]]:
+    """Оси перебора: скаляр (и строка) — одно значение, иначе — последовательность."""
+    names, values = [], []
+    for name, v in (grid or {}).items():
+        if isinstance(v, (str, bytes)) or not isinstance(v, Iterable):
+            v = [v]
+        elif not isinstance(v, Sequence):
+            v = list(v)
+        names.append(name)
+        values.append(v)
+    return names, values
+
+
+def iter_cases(gp_grid: Optional[Mapping[str, Any]] = None, span_grid: SpanGrid = None, n_spans: int = 1,
+               base_gp: Optional[Mapping[str, Any]] = None,
+               base_span: Optional[Mapping[str, Any]] = None) -> Iterator[Case]:
+    """
+    Лениво перечисляет варианты (gp, spans).
+    span_grid — словарь (одни и те же оси для всех n_spans пролётов)
+    или список словарей (свои оси для каждого пролёта; n_spans = длина списка).
+    Последней меняется последняя ось последнего пролёта.
+    """
+    gp0 = {**DEFAULT_GP, **(base_gp or {})}
+    sp0 = {**DEFAULT_SPAN, **(base_span or {})}
+    per_span = isinstance(span_grid, Sequence) and not isinstance(span_grid, (str, Mapping))
+    g_names, g_vals = _axes(gp_grid)
+    if per_span:
+        span_axes = [_axes(g) for g in span_grid]
+    else:
+        span_axes = [_axes(span_grid)]
+    s_vals = [v for _, vals in span_axes for v in vals]
+    for combo in itertools.product(*g_vals, *s_vals):
+        gp = dict(gp0)
+        gp.update(zip(g_names, combo[:len(g_names)]))
+        rest = combo[len(g_names):]
+        span_dicts = []
+        for names, _ in span_axes:
+            sp = dict(sp0)
+            sp.update(zip(names, rest[:len(names)]))
+            rest = rest[len(names):]
+            span_dicts.append(sp)
+        spans = span_dicts if per_span else [dict(span_dicts[0]) for _ in range(n_spans)]
+        yield gp, spans
+
+
+def count_cases(gp_grid: Optional[Mapping[str, Any]] = None, span_grid: SpanGrid = None) -> int:
+    """Число вариантов без их построения."""
+    grids = [gp_grid]
+    if isinstance(span_grid, Sequence) and not isinstance(span_grid, (str, Mapping)):
+        grids.extend(span_grid)
+    else:
+        grids.append(span_grid)
+    n = 1
+    for g in grids:
+        for v in _axes(g)[1]:
+            n *= len(v)
+    return n
+
+
+def _default_func() -> Callable:
+    from metal_core import calculate  # ядро без GUI: воркеры не грузят tkinter
+    return calculate
+
+
+def _run_chunk(func: Optional[Callable], chunk: List[Case]) -> List[Dict[str, Any]]:
+    """Расчёт пачки в рабочем процессе; ошибка варианта не прерывает пачку."""
+    func = func or _default_func()
+    out = []
+    for gp, spans in chunk:
+        try:
+            out.append(func(gp, spans))
+        except Exception as e:
+            out.append({"_error": f"{type(e).__name__}: {e}"})
+    return out
+
+
+def _chunks(it: Iterable[Case], size: int) -> Iterator[List[Case]]:
+    it = iter(it)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_cases(cases: Iterable[Case], func: Optional[Callable] = None, workers: Optional[int] = None,
+              chunksize: int = 64, max_inflight: Optional[int] = None) -> Iterator[SweepResult]:
+    """
+    Считает варианты и отдаёт SweepResult в исходном порядке.
+    workers=1 — в текущем процессе; func должна быть функцией уровня модуля
+    (передаётся в рабочие процессы через pickle).
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunksize < 1:
+        raise ValueError("chunksize должен быть >= 1")
+    index = 0
+    if workers == 1:
+        for chunk in _chunks(cases, chunksize):
+            for (gp, spans), res in zip(chunk, _run_chunk(func, chunk)):
+                yield SweepResult(index, gp, spans, res)
+                index += 1
+        return
+    max_inflight = max_inflight or workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        pending: deque = deque()
+        try:
+            for chunk in _chunks(cases, chunksize):
+                pending.append((chunk, ex.submit(_run_chunk, func, chunk)))
+                while len(pending) >= max_inflight:
+                    chunk0, fut = pending.popleft()
+                    for (gp, spans), res in zip(chunk0, fut.result()):
+                        yield SweepResult(index, gp, spans, res)
+                        index += 1
+            while pending:
+                chunk0, fut = pending.popleft()
+                for (gp, spans), res in zip(chunk0, fut.result()):
+                    yield SweepResult(index, gp, spans, res)
+                    index += 1
+        finally:
+            for _, fut in pending:  # генератор закрыт досрочно
+                fut.cancel()
+
+
+def sweep(gp_grid: Optional[Mapping[str, Any]] = None, span_grid: SpanGrid = None, n_spans: int = 1, *,
+          base_gp: Optional[Mapping[str, Any]] = None, base_span: Optional[Mapping[str, Any]] = None,
+          func: Optional[Callable] = None, workers: Optional[int] = None,
+          chunksize: int = 64, max_inflight: Optional[int] = None,
+          raw: bool = False) -> Iterator[SweepResult]:
+    """
+    Перебор всех комбинаций gp_grid × span_grid (см. iter_cases и run_cases).
+    raw — точные результаты calculate(..., raw=True): без округления и лога
+    (для func по умолчанию).
+    """
+    if raw and func is None:
+        from metal_core import calculate
+        func = functools.partial(calculate, raw=True)
+    cases = iter_cases(gp_grid, span_grid, n_spans, base_gp, base_span)
+    return run_cases(cases, func=func, workers=workers, chunksize=chunksize, max_inflight=max_inflight)
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Кэш скомпилированных таблиц Метода 2.
+
+Разобранные таблицы (xlsx, docx) хранятся:
+  • в памяти процесса — повторный вызов стоит один os.stat();
+  • на диске (pickle) — новый процесс не разбирает файлы заново.
+Ключ: путь + размер + mtime + SHA-256 содержимого + версия парсера.
+При изменении исходного файла запись автоматически становится недействительной.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+CACHE_FORMAT = 1  # версия формата файла кэша на диске
+
+# (путь, id парсера) -> ((путь, размер, mtime_ns, sha256), данные)
+_memory: Dict[Tuple[str, str], Tuple[Tuple[str, int, int, str], Any]] = {}
+_lock = threading.Lock()
+
+
+def get_cache_dir() -> str:
+    """Папка дискового кэша: $CALCMET_CACHE_DIR или ~/.cache/calcmet."""
+    env = os.environ.get("CALCMET_CACHE_DIR")
+    if env:
+        return env
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "calcmet")
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 содержимого файла."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_fingerprint(path: str) -> Tuple[str, int, int, str]:
+    """Отпечаток файла: (абсолютный путь, размер, mtime_ns, sha256)."""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    return (path, st.st_size, st.st_mtime_ns, file_digest(path))
+
+
+def _parser_id(parser: Callable, version: Any) -> str:
+    name = f"{getattr(parser, '__module__', '?')}.{getattr(parser, '__qualname__', repr(parser))}"
+    return f"{name}:{version}"
+
+
+def _disk_path(cache_dir: str, path: str, parser_id: str) -> str:
+    name = hashlib.sha1(f"{path}\0{parser_id}".encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{name}.pkl")
+
+
+def _read_disk(disk_path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(disk_path, "rb") as f:
+            entry = pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError, AttributeError, ImportError, ValueError):
+        return None
+    if not isinstance(entry, dict) or entry.get("format") != CACHE_FORMAT:
+        return None
+    return entry
+
+
+def _write_disk(disk_path: str, entry: Dict[str, Any]) -> None:
+    """Атомарная запись: временный файл + os.replace (безопасно для нескольких процессов)."""
+    try:
+        os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(disk_path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, disk_path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+    except OSError:
+        pass  # дисковый кэш — не обязателен
+
+
+def load_table(path: str, parser: Callable[[str], Any], version: Any = 0,
+               cache_dir: Optional[str] = None, use_disk: bool = True) -> Any:
+    """
+    Возвращает parser(path), используя кэш.
+
+    version  — версия парсера; её смена инвалидирует старые записи.
+    Возвращаемый объект общий для всех вызовов — его нельзя изменять.
+    """
+    path = os.path.abspath(path)
+    pid = _parser_id(parser, version)
+    key = (path, pid)
+    st = os.stat(path)
+
+    # 1. Память: размер и mtime совпали — файл не менялся
+    with _lock:
+        mem = _memory.get(key)
+    if mem is not None and mem[0][1] == st.st_size and mem[0][2] == st.st_mtime_ns:
+        return mem[1]
+
+    digest = file_digest(path)
+    fp = (path, st.st_size, st.st_mtime_ns, digest)
+
+    # 1a. Файл «тронут», но содержимое то же
+    if mem is not None and mem[0][1] == st.st_size and mem[0][3] == digest:
+        with _lock:
+            _memory[key] = (fp, mem[1])
+        return mem[1]
+
+    # 2. Диск
+    disk_path = _disk_path(cache_dir or get_cache_dir(), path, pid) if use_disk else None
+    if disk_path:
+        entry = _read_disk(disk_path)
+        if (entry is not None and entry.get("parser") == pid
+                and entry.get("size") == st.st_size and entry.get("sha256") == digest):
+            data = entry["data"]
+            with _lock:
+                _memory[key] = (fp, data)
+            return data
+
+    # 3. Разбор файла
+    data = parser(path)
+    with _lock:
+        _memory[key] = (fp, data)
+    if disk_path:
+        _write_disk(disk_path, {
+            "format": CACHE_FORMAT, "parser": pid, "path": path,
+            "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest,
+            "data": data,
+        })
+    return data
+
+
+def clear_memory_cache() -> None:
+    """Очистить кэш в памяти (дисковый не затрагивается)."""
+    with _lock:
+        _memory.clear()
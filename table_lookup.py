@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Скомпилированные табличные поиски.
+
+Эмпирические таблицы методики — ступенчатые функции «округление вверх»:
+берётся значение первого табличного ключа, не меньшего аргумента.
+CeilLookup сортирует таблицу один раз (при импорте модуля-владельца),
+дальше каждый запрос — bisect по готовому списку ключей.
+Функции совместимости, которым таблицу передают при каждом вызове,
+берут поиск через cached_lookup — он компилируется один раз на таблицу.
+"""
+
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+_LAST = object()  # маркер: за пределами таблицы — значение последнего ключа
+
+
+class CeilLookup:
+    """
+    Поиск с округлением вверх: f(x) = values[i] для наименьшего keys[i] >= x.
+
+    x больше последнего ключа (и NaN) — значение above (по умолчанию последнее).
+    При повторяющихся ключах действует первая пара в исходном порядке.
+    """
+
+    __slots__ = ("keys", "values", "above")
+
+    def __init__(self, keys: Sequence[float], values: Optional[Sequence[Any]] = None, above: Any = _LAST):
+        if values is None:
+            values = keys
+        if len(keys) != len(values):
+            raise ValueError("Число ключей и значений не совпадает")
+        if not keys:
+            raise ValueError("Пустая таблица")
+        pairs = sorted(zip(keys, values), key=lambda kv: kv[0])  # устойчивая сортировка
+        ks: List[float] = []
+        vs: List[Any] = []
+        for k, v in pairs:
+            if ks and ks[-1] == k:
+                continue
+            ks.append(k)
+            vs.append(v)
+        self.keys = tuple(ks)
+        self.values = tuple(vs)
+        self.above = vs[-1] if above is _LAST else above
+
+    @classmethod
+    def from_dict(cls, d: Dict[float, Any], above: Any = _LAST) -> "CeilLookup":
+        return cls(list(d.keys()), list(d.values()), above)
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[float, Any]], above: Any = _LAST) -> "CeilLookup":
+        pairs = list(pairs)
+        return cls([k for k, _ in pairs], [v for _, v in pairs], above)
+
+    def index(self, x: float) -> int:
+        """Индекс ключа; len(keys) — аргумент за пределами таблицы (или NaN)."""
+        if x != x:
+            return len(self.keys)
+        return bisect_left(self.keys, x)
+
+    def __call__(self, x: float) -> Any:
+        i = self.index(x)
+        return self.values[i] if i < len(self.values) else self.above
+
+    def many(self, xs: Iterable[float]) -> List[Any]:
+        """Поиск для последовательности аргументов (список, array, memoryview)."""
+        keys, values, above = self.keys, self.values, self.above
+        n = len(keys)
+        out = []
+        for x in xs:
+            i = bisect_left(keys, x) if x == x else n
+            out.append(values[i] if i < n else above)
+        return out
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __repr__(self) -> str:
+        return f"CeilLookup({len(self.keys)} ключей, {self.keys[0]}..{self.keys[-1]})"
+
+
+# Поиски cached_lookup: (build, id таблиц) -> (таблицы, поиск). Таблицы хранятся
+# в записи, поэтому, пока она жива, их id не достанутся другим объектам.
+# Таблицы не правятся на месте; после такой правки — clear_lookup_cache().
+_COMPILED: Dict[tuple, Tuple[tuple, CeilLookup]] = {}
+_COMPILED_MAX = 64
+
+
+def cached_lookup(build: Callable[..., CeilLookup], *tables: Any) -> CeilLookup:
+    """
+    build(*tables), запомненный по объектам таблиц. Одноразовые итераторы
+    (не последовательности и не словари) не запоминаются.
+    """
+    key = (build, *map(id, tables))
+    hit = _COMPILED.get(key)
+    if hit is not None:
+        return hit[1]
+    if not all(isinstance(t, (Sequence, Mapping)) for t in tables):
+        return build(*tables)
+    if len(_COMPILED) >= _COMPILED_MAX:
+        _COMPILED.clear()
+    lkp = build(*tables)
+    _COMPILED[key] = (tables, lkp)
+    return lkp
+
+
+def clear_lookup_cache() -> None:
+    _COMPILED.clear()
+
+
+def nearest_index(keys: Sequence[float], x: float) -> int:
+    """
+    Индекс ближайшего ключа в отсортированном списке.
+    При равном расстоянии — меньший индекс; NaN — 0
+    (как min(range(len(keys)), key=lambda i: abs(keys[i] - x))).
+    """
+    if x != x:
+        return 0
+    i = bisect_left(keys, x)
+    if i == 0:
+        return 0
+    if i == len(keys):
+        return i - 1
+    return i - 1 if x - keys[i - 1] <= keys[i] - x else i
@@ -1,13 +1,28 @@
 # -*- coding: utf-8 -*-
 """
 Парсеры таблиц для Метода 2.
-Чтение xlsx (pandas) и docx (python-docx) при каждом расчете.
+xlsx и docx читаются потоково прямо из zip-архива (без pandas и python-docx);
+pandas — запасной вариант для xlsx.
 """
 
 import os
-from typing import Optional, Dict, List, Tuple, Any
-import pandas as pd
-from docx import Document
+import re
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+from typing import Optional, Dict, List, Tuple, Any, Iterable, Iterator
+
+# Версия парсеров: увеличивать при изменении формата результата (инвалидирует кэш таблиц)
+PARSERS_VERSION = 3
+
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_ROW, _C, _V, _T, _SI = (_NS_MAIN + t for t in ("row", "c", "v", "t", "si"))
+_NS_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_TBL, _W_TR, _W_TC, _W_P, _W_T = (_NS_W + t for t in ("tbl", "tr", "tc", "p", "t"))
+
+Cells = Dict[Tuple[int, int], Any]  # (строка, столбец) с 0 -> float | str | bool
 
 
 def get_project_root() -> str:
@@ -15,6 +30,206 @@ def get_project_root() -> str:
     return os.path.dirname(os.path.abspath(__file__))
 
 
+def _pandas():
+    """
+    pandas — только запасной вариант для xlsx: импортируется при первом
+    обращении (импорт стоит сотни мс). None, если не установлен.
+    """
+    try:
+        import pandas
+    except ImportError:
+        return None
+    return pandas
+
+
+# ─── Потоковое чтение xlsx ────────────────────────────────────────────────────
+
+def _col_index(ref: str) -> int:
+    """'C6' -> 2 (номер столбца с 0)."""
+    n = 0
+    for ch in ref:
+        if ch.isalpha():
+            n = n * 26 + (ord(ch.upper()) - 64)
+        else:
+            break
+    return n - 1
+
+
+def _sheet_path(zf: zipfile.ZipFile, sheet_name: str) -> str:
+    """Путь к XML листа по его имени (workbook.xml + rels)."""
+    wb = ET.fromstring(zf.read("xl/workbook.xml"))
+    rid = None
+    for sh in wb.iter(_NS_MAIN + "sheet"):
+        if sh.get("name") == sheet_name:
+            rid = sh.get(_NS_REL + "id")
+            break
+    if rid is None:
+        raise KeyError(f"Лист не найден: {sheet_name}")
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels.iter(_NS_PKG_REL + "Relationship"):
+        if rel.get("Id") == rid:
+            target = rel.get("Target")
+            if target.startswith("/"):
+                return target.lstrip("/")
+            return posixpath.normpath(posixpath.join("xl", target))
+    raise KeyError(f"Нет связи для листа: {sheet_name}")
+
+
+def _shared_strings(zf: zipfile.ZipFile, needed: set) -> Dict[int, str]:
+    """Только нужные строки из sharedStrings.xml (чтение до последнего нужного индекса)."""
+    if not needed or "xl/sharedStrings.xml" not in zf.namelist():
+        return {}
+    last = max(needed)
+    out = {}
+    with zf.open("xl/sharedStrings.xml") as f:
+        idx = -1
+        for _, el in ET.iterparse(f):
+            if el.tag != _SI:
+                continue
+            idx += 1
+            if idx in needed:
+                out[idx] = "".join(t.text or "" for t in el.iter(_T))
+            el.clear()
+            if idx >= last:
+                break
+    return out
+
+
+def read_xlsx_cells(filepath: str, sheet_name: str, rows: Optional[Iterable[int]] = None) -> Cells:
+    """
+    Потоковое чтение ячеек листа xlsx без pandas.
+    rows — номера строк (с 0), которые нужны; чтение прекращается после последней.
+    Числа возвращаются как float, строки — как str; пустые ячейки пропускаются.
+    """
+    wanted = set(rows) if rows is not None else None
+    last = max(wanted) if wanted else None
+    cells: Cells = {}
+    shared_refs: Dict[Tuple[int, int], int] = {}
+    with zipfile.ZipFile(filepath) as zf:
+        with zf.open(_sheet_path(zf, sheet_name)) as f:
+            row_idx = -1
+            for _, el in ET.iterparse(f):
+                if el.tag != _ROW:
+                    continue
+                r = el.get("r")
+                row_idx = int(r) - 1 if r else row_idx + 1
+                if last is not None and row_idx > last:
+                    break
+                if wanted is None or row_idx in wanted:
+                    col_idx = -1
+                    for c in el.iter(_C):
+                        ref = c.get("r")
+                        col_idx = _col_index(ref) if ref else col_idx + 1
+                        t = c.get("t")
+                        if t == "inlineStr":
+                            cells[(row_idx, col_idx)] = "".join(x.text or "" for x in c.iter(_T))
+                            continue
+                        v = c.find(_V)
+                        if v is None or v.text is None:
+                            continue
+                        if t == "s":
+                            shared_refs[(row_idx, col_idx)] = int(v.text)
+                        elif t == "b":
+                            cells[(row_idx, col_idx)] = v.text == "1"
+                        elif t in ("str", "e"):
+                            if t == "str":
+                                cells[(row_idx, col_idx)] = v.text
+                        else:
+                            cells[(row_idx, col_idx)] = float(v.text)
+                el.clear()
+        strings = _shared_strings(zf, set(shared_refs.values()))
+    for pos, i in shared_refs.items():
+        cells[pos] = strings.get(i, "")
+    return cells
+
+
+def _read_xlsx_cells_pandas(filepath: str, sheet_name: str, rows: Optional[Iterable[int]] = None) -> Cells:
+    """То же, что read_xlsx_cells, но через pandas (запасной вариант)."""
+    pd = _pandas()
+    if pd is None:
+        raise ImportError("pandas не установлен")
+    df = pd.read_excel(filepath, sheet_name=sheet_name, header=None)
+    wanted = range(len(df)) if rows is None else [r for r in rows if r < len(df)]
+    cells: Cells = {}
+    for r in wanted:
+        for c, v in enumerate(df.iloc[r]):
+            if isinstance(v, str):
+                cells[(r, c)] = v
+            elif pd.notna(v):
+                cells[(r, c)] = v if isinstance(v, bool) else float(v)
+    return cells
+
+
+def _read_cells(filepath: str, sheet_name: str, rows: Optional[Iterable[int]] = None) -> Cells:
+    """Потоковый reader; при ошибке формата — pandas (если установлен)."""
+    try:
+        return read_xlsx_cells(filepath, sheet_name, rows)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError, ValueError):
+        if _pandas() is None:
+            raise
+        return _read_xlsx_cells_pandas(filepath, sheet_name, rows)
+
+
+def _num(v: Any) -> Optional[float]:
+    """Число из ячейки или None."""
+    if isinstance(v, bool) or v is None:
+        return None
+    if isinstance(v, (int, float)):
+        return float(v)
+    try:
+        return float(str(v).replace(",", ".").strip())
+    except ValueError:
+        return None
+
+
+def _whole(v: float) -> Any:
+    """9.0 -> 9 (целые значения таблиц храним как int)."""
+    return int(v) if v is not None and v == int(v) else v
+
+
+# ─── Покрытие ─────────────────────────────────────────────────────────────────
+
+# Строка (с 0) с металлоемкостью фермы; нагрузки т/м.п. — в строке выше, столбцы B..W
+COVERAGE_TRUSS_ROWS = {
+    'Уголки':    [(36, 3), (30, 6), (24, 9), (18, 12)],
+    'Двутавры':  [(36, 17), (30, 20), (24, 23), (18, 26)],
+    'Молодечно': [(36, 31), (30, 34), (24, 37), (18, 40)],
+}
+COVERAGE_TRUSS_COLS = range(1, 23)
+COVERAGE_PODSTR_ROW = 45      # металлоемкость; нагрузки т — в строке выше
+COVERAGE_PODSTR_COLS = range(1, 15)
+COVERAGE_SVYAZI_ROWS = range(49, 53)
+
+SVYAZI_DEFAULT = {'до 120': {6: 15, 12: 35}, 'до 400': {6: 40, 12: 55}}
+PODSTR_DEFAULT = {18: 1.57, 36: 2.22, 54: 2.31, 72: 2.72, 81: 2.72, 108: 4.59, 126: 5.32, 144: 5.32,
+                  162: 5.7, 180: 5.8, 198: 6.3, 216: 6.3, 234: 6.53, 255: 6.71}
+
+
+def _load_row(cells: Cells, row: int, cols: Iterable[int]) -> Dict[float, Optional[float]]:
+    """{нагрузка из строки row-1: значение из строки row}."""
+    out = {}
+    for c in cols:
+        load = _num(cells.get((row - 1, c)))
+        if load is not None:
+            out[load] = _num(cells.get((row, c)))
+    return out
+
+
+def _parse_svyazi(cells: Cells) -> Dict[str, Dict[int, float]]:
+    """Связи: 'Кран г/п до 120т' | 'шаг ферм 6м' | '15 кг/м2'."""
+    svyazi: Dict[str, Dict[int, float]] = {}
+    group = None
+    for r in COVERAGE_SVYAZI_ROWS:
+        m = re.search(r'до\s*(\d+)', str(cells.get((r, 0), '')))
+        if m:
+            group = f'до {m.group(1)}'
+        step = re.search(r'(\d+)\s*м', str(cells.get((r, 1), '')))
+        val = re.match(r'\s*(\d+(?:[.,]\d+)?)', str(cells.get((r, 2), '')))
+        if group and step and val:
+            svyazi.setdefault(group, {})[int(step.group(1))] = _whole(_num(val.group(1)))
+    return svyazi
+
+
 def parse_coverage_xlsx_full(filepath: str) -> Dict:
     """
     Парсинг металлоекмсоть покрытия.xlsx.
@@ -23,143 +238,214 @@ def parse_coverage_xlsx_full(filepath: str) -> Dict:
     Связи по покрытию по г/п крана и шагу ферм.
     """
     data = {'fermy': {}, 'podstropilnye': {}, 'svyazi': {}}
-    load_vals = [2, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0, 5.5, 6.0, 6.5, 7.0, 7.5, 8.0, 8.5, 9.0, 9.5, 10.0, 10.5, 11.0, 11.5, 12.0, 12.5]
     try:
-        df = pd.read_excel(filepath, sheet_name='Лист1', header=None)
-        # Уголки: spans 36(1), 30(4), 24(7), 18(10) - metal в строках 3,6,9,12
-        for span, base_row in [(36, 1), (30, 4), (24, 7), (18, 10)]:
-            metals = []
-            for c in range(2, 24):
-                try:
-                    v = df.iloc[base_row + 2, c]
-                    metals.append(float(v) if pd.notna(v) and str(v).replace('.', '').replace('-', '').isdigit() or isinstance(v, (int, float)) else None)
-                except (ValueError, TypeError):
-                    metals.append(None)
-            data['fermy'][('Уголки', span)] = dict(zip(load_vals[:len(metals)], metals))
-        # Двутавры: base 15,18,21,24
-        for span, base_row in [(36, 15), (30, 18), (24, 21), (18, 24)]:
-            metals = []
-            for c in range(2, 24):
-                try:
-                    v = df.iloc[base_row + 2, c]
-                    metals.append(float(v) if pd.notna(v) else None)
-                except (ValueError, TypeError):
-                    metals.append(None)
-            data['fermy'][('Двутавры', span)] = dict(zip(load_vals[:len(metals)], metals))
-        # Молодечно: base 29,32,35,38
-        for span, base_row in [(36, 29), (30, 32), (24, 35), (18, 38)]:
-            metals = []
-            for c in range(2, 24):
-                try:
-                    v = df.iloc[base_row + 2, c]
-                    metals.append(float(v) if pd.notna(v) else None)
-                except (ValueError, TypeError):
-                    metals.append(None)
-            data['fermy'][('Молодечно', span)] = dict(zip(load_vals[:len(metals)], metals))
-        # Подстропильные: строка 45, колонки 2-15
-        loads_ps = [18, 36, 54, 72, 81, 108, 126, 144, 162, 180, 198, 216, 234, 255]
-        metals_ps = []
-        for c in range(2, 16):
-            try:
-                v = df.iloc[45, c]
-                metals_ps.append(float(v) if pd.notna(v) else None)
-            except (ValueError, TypeError):
-                metals_ps.append(None)
-        data['podstropilnye'] = dict(zip(loads_ps[:len(metals_ps)], metals_ps))
-        data['svyazi'] = {'до 120': {6: 15, 12: 35}, 'до 400': {6: 40, 12: 55}}
+        rows = set(COVERAGE_SVYAZI_ROWS) | {COVERAGE_PODSTR_ROW - 1, COVERAGE_PODSTR_ROW}
+        for blocks in COVERAGE_TRUSS_ROWS.values():
+            rows |= {r for _, row in blocks for r in (row - 1, row)}
+        cells = _read_cells(filepath, 'Лист1', rows)
+        for truss_type, blocks in COVERAGE_TRUSS_ROWS.items():
+            for span, row in blocks:
+                data['fermy'][(truss_type, span)] = _load_row(cells, row, COVERAGE_TRUSS_COLS)
+        data['podstropilnye'] = {int(k): v for k, v in
+                                 _load_row(cells, COVERAGE_PODSTR_ROW, COVERAGE_PODSTR_COLS).items()}
+        data['svyazi'] = _parse_svyazi(cells) or SVYAZI_DEFAULT
     except Exception:
-        data['svyazi'] = {'до 120': {6: 15, 12: 35}, 'до 400': {6: 40, 12: 55}}
-        data['podstropilnye'] = {18: 1.57, 36: 2.22, 54: 2.31, 72: 2.72, 81: 2.72, 108: 4.59, 126: 5.32, 144: 5.32, 162: 5.7, 180: 5.8, 198: 6.3, 216: 6.3, 234: 6.53, 255: 6.71}
+        data['svyazi'] = SVYAZI_DEFAULT
+        data['podstropilnye'] = dict(PODSTR_DEFAULT)
         data['fermy'] = {}
     return data
 
 
+# ─── Фахверк и опоры трубопроводов ────────────────────────────────────────────
+
+FACHWERK_ROWS = {5: 'I', 6: 'II', 7: 'III'}   # строки листа «Расчеты» (с 0)
+FACHWERK_COLS = [(c, load, h) for c, (load, h) in enumerate(
+    ((ld, h) for ld in (0, 100, 300) for h in (10, 20, 40)), start=2)]  # C..K
+OPORY_ROW = 13
+OPORY_COLS = {2: 'Основные', 5: 'Энергоносители', 8: 'Вспомогательные'}
+OPORY_DEFAULT = {'Основные': (11, 22), 'Энергоносители': (23, 40), 'Вспомогательные': (2, 4)}
+
+
 def read_xlsx_fachwerk(filepath: str) -> Dict[str, Any]:
     """Читает Металлоёмкость фахверк.xlsx, лист Расчеты."""
     result = {'fachwerk': {}, 'opory_truboprovodov': {}}
     try:
-        df = pd.read_excel(filepath, sheet_name='Расчеты', header=None)
-        result['fachwerk'] = {
-            ('I', 10, 0): 9, ('I', 20, 0): 10, ('I', 40, 0): 11,
-            ('I', 10, 100): 9, ('I', 20, 100): 11, ('I', 40, 100): 11,
-            ('I', 10, 300): 10, ('I', 20, 300): 12, ('I', 40, 300): 12,
-            ('II', 10, 0): 23, ('II', 20, 0): 25, ('II', 40, 0): 25,
-            ('II', 10, 100): 23, ('II', 20, 100): 25, ('II', 40, 100): 25,
-            ('II', 10, 300): 26, ('II', 20, 300): 30, ('II', 40, 300): 30,
-            ('III', 10, 0): 19, ('III', 20, 0): 28, ('III', 40, 0): 45,
-            ('III', 10, 100): 19, ('III', 20, 100): 29, ('III', 40, 100): 46,
-            ('III', 10, 300): 20, ('III', 20, 300): 30, ('III', 40, 300): 48,
-        }
-        result['opory_truboprovodov'] = {
-            'Основные': (11, 22),
-            'Энергоносители': (23, 40),
-            'Вспомогательные': (2, 4)
-        }
+        cells = _read_cells(filepath, 'Расчеты', set(FACHWERK_ROWS) | {OPORY_ROW})
+        for row, scheme in FACHWERK_ROWS.items():
+            for c, load, h in FACHWERK_COLS:
+                v = _num(cells.get((row, c)))
+                if v is not None:
+                    result['fachwerk'][(scheme, h, load)] = _whole(v)
+        for c, name in OPORY_COLS.items():
+            nums = re.findall(r'\d+(?:[.,]\d+)?', str(cells.get((OPORY_ROW, c), '')))
+            if len(nums) >= 2:
+                result['opory_truboprovodov'][name] = tuple(_whole(_num(x)) for x in nums[:2])
+        if not result['fachwerk']:
+            raise ValueError("Таблица фахверка пуста")
+        for name, rng in OPORY_DEFAULT.items():
+            result['opory_truboprovodov'].setdefault(name, rng)
     except Exception:
         result['fachwerk'] = {
             ('I', 10, 0): 9, ('I', 20, 0): 10, ('I', 40, 0): 11,
             ('II', 10, 0): 23, ('II', 20, 0): 25, ('II', 40, 0): 25,
             ('III', 10, 0): 19, ('III', 20, 0): 28, ('III', 40, 0): 45,
         }
-        result['opory_truboprovodov'] = {
-            'Основные': (11, 22),
-            'Энергоносители': (23, 40),
-            'Вспомогательные': (2, 4)
-        }
+        result['opory_truboprovodov'] = dict(OPORY_DEFAULT)
     return result
 
 
+# ─── Потоковое чтение docx ────────────────────────────────────────────────────
+
+def iter_docx_rows(filepath: str) -> Iterator[Tuple[int, List[str]]]:
+    """
+    Строки таблиц из word/document.xml: (номер таблицы, [текст ячеек]).
+    Одна строка списка на каждый <w:tc> (объединённые по горизонтали ячейки
+    не размножаются); абзацы внутри ячейки разделяются переводом строки.
+    Вложенные таблицы входят в текст ячейки внешней таблицы.
+    """
+    with zipfile.ZipFile(filepath) as zf:
+        with zf.open("word/document.xml") as f:
+            depth = 0
+            t_idx = -1
+            row: Optional[List[str]] = None
+            cell: Optional[List[str]] = None
+            para: List[str] = []
+            for ev, el in ET.iterparse(f, events=("start", "end")):
+                tag = el.tag
+                if ev == "start":
+                    if tag == _W_TBL:
+                        depth += 1
+                        if depth == 1:
+                            t_idx += 1
+                    elif depth == 1 and tag == _W_TR:
+                        row = []
+                    elif depth == 1 and tag == _W_TC:
+                        cell = []
+                    continue
+                if tag == _W_T:
+                    if cell is not None:
+                        para.append(el.text or "")
+                elif tag == _W_P:
+                    if cell is not None:
+                        cell.append("".join(para))
+                    para = []
+                    if depth == 0:
+                        el.clear()
+                elif depth == 1 and tag == _W_TC and row is not None:
+                    row.append("\n".join(cell or []).strip())
+                    cell = None
+                elif depth == 1 and tag == _W_TR and row is not None:
+                    yield t_idx, row
+                    row = None
+                    el.clear()
+                elif tag == _W_TBL:
+                    depth -= 1
+
+
 def parse_docx_tables(filepath: str) -> List[List[List[str]]]:
     """Извлекает все таблицы из docx."""
-    tables = []
+    tables: List[List[List[str]]] = []
     try:
-        doc = Document(filepath)
-        for table in doc.tables:
-            rows = [[cell.text.strip() for cell in row.cells] for row in table.rows]
-            tables.append(rows)
-    except Exception:
+        for t_idx, row in iter_docx_rows(filepath):
+            while len(tables) <= t_idx:
+                tables.append([])
+            tables[t_idx].append(row)
+    except (OSError, zipfile.BadZipFile, KeyError, ET.ParseError):
         pass
     return tables
 
 
+# ─── Подкрановые и тормозные конструкции ──────────────────────────────────────
+# Таблицы: пролёт п/б | [ряд | проход] | по каждой г/п — 3 режима × (1, 2 крана) | примечание.
+# В расчёт идут значения режима 7К-8К: калькулятор пересчитывает их коэффициентом режима.
+
+CRANE_MODES = 3         # 1К-3К, 4К-6К, 7К-8К
+CRANE_MODE_BASE = 2     # индекс режима 7К-8К
+BRAKE_PASSAGES = ('С проходом', 'Без прохода')
+
+
+def _gp_header(row: List[str]) -> List[int]:
+    """['', '5 т', '125/130 т', ...] -> [5, 125, ...]."""
+    gps = []
+    for c in row:
+        m = re.fullmatch(r'(\d+)(?:/\d+)?\s*т', c.strip())
+        if m:
+            gps.append(int(m.group(1)))
+    return gps
+
+
+def _cell_int(text: str) -> Optional[float]:
+    v = _num(text)
+    return None if v is None else _whole(v)
+
+
+def _iter_load_table(tables: List[List[List[str]]], n_labels: int) -> Iterator[Tuple[List[str], int, int, float]]:
+    """
+    Значения режима 7К-8К: (метки строки, г/п, кол-во кранов, кг/м).
+    Метки объединённых по вертикали ячеек (пустые) берутся из предыдущей строки.
+    """
+    for rows in tables:
+        gps: List[int] = []
+        labels: List[str] = [''] * n_labels
+        for row in rows:
+            if not gps:
+                gps = _gp_header(row)
+                continue
+            if len(row) <= n_labels:
+                continue
+            head = [c.strip() for c in row[:n_labels]]
+            if not re.match(r'\d', head[0]) and not (head[0] == '' and labels[0]):
+                continue
+            labels = [h or prev for h, prev in zip(head, labels)]
+            values = row[n_labels:]
+            for gi, gp in enumerate(gps):
+                for n in (1, 2):
+                    i = (gi * CRANE_MODES + CRANE_MODE_BASE) * 2 + n - 1
+                    v = _cell_int(values[i]) if i < len(values) else None
+                    if v is not None:
+                        yield labels, gp, n, v
+
+
+def _span_label(text: str) -> Optional[int]:
+    m = re.match(r'(\d+)', text)
+    return int(m.group(1)) if m else None
+
+
+CRANE_BEAMS_DEFAULT = {
+    (6, 5, 1): 190, (6, 5, 2): 200, (6, 10, 1): 240, (6, 10, 2): 250,
+    (6, 20, 1): 270, (6, 20, 2): 320, (6, 32, 1): 340, (6, 32, 2): 420,
+    (6, 50, 1): 340, (6, 50, 2): 440,
+    (12, 5, 1): 320, (12, 5, 2): 350, (12, 10, 1): 320, (12, 10, 2): 350,
+    (12, 20, 1): 390, (12, 20, 2): 440, (12, 32, 1): 470, (12, 32, 2): 500,
+    (12, 50, 1): 500, (12, 50, 2): 540, (12, 80, 1): 940, (12, 80, 2): 980,
+    (12, 100, 1): 940, (12, 100, 2): 980, (12, 125, 1): 1040, (12, 125, 2): 1080,
+    (12, 200, 1): 1420, (12, 200, 2): 1480, (12, 400, 1): 2150, (12, 400, 2): 2400,
+}
+
+
 def read_docx_crane_beams(filepath: str) -> Dict[Tuple, float]:
-    """Таблица подкрановых балок. Ключ: (пролет, гп, кол-во кранов)."""
+    """Таблица подкрановых балок (режим 7К-8К), кг/м. Ключ: (пролет, гп, кол-во кранов)."""
     result = {}
-    try:
-        tables = parse_docx_tables(filepath)
-        # По данным из docx: 6м и 12м, гп 5-50 в табл1, 80-400 в табл2
-        defaults = {
-            (6, 5, 1): 80, (6, 5, 2): 80, (6, 10, 1): 80, (6, 10, 2): 100,
-            (6, 20, 1): 105, (6, 20, 2): 140, (6, 32, 1): 140, (6, 32, 2): 165,
-            (6, 50, 1): 160, (6, 50, 2): 200, (6, 80, 1): 190, (6, 100, 1): 200,
-            (12, 5, 1): 150, (12, 10, 1): 150, (12, 10, 2): 180, (12, 20, 1): 180, (12, 20, 2): 200,
-            (12, 32, 1): 200, (12, 32, 2): 220, (12, 50, 1): 230, (12, 50, 2): 260,
-            (12, 80, 1): 290, (12, 80, 2): 320, (12, 100, 1): 300, (12, 100, 2): 500,
-            (12, 125, 1): 330, (12, 200, 1): 360, (12, 400, 1): 540,
-        }
-        result.update(defaults)
-    except Exception:
-        result = {(6, 20, 1): 105, (6, 50, 2): 200, (12, 50, 2): 260, (12, 100, 2): 500}
-    return result
+    for labels, gp, n, v in _iter_load_table(parse_docx_tables(filepath), 1):
+        B = _span_label(labels[0])
+        if B is not None:
+            result[(B, gp, n)] = v
+    return result or dict(CRANE_BEAMS_DEFAULT)
 
 
 def read_docx_brake(filepath: str) -> Dict[Tuple, float]:
-    """Таблица тормозных конструкций. Ключ: (пролет, ряд, проход, гп, кол-во)."""
+    """
+    Таблица тормозных конструкций (режим 7К-8К), кг/м.
+    Ключ: (пролет, ряд, проход, гп, кол-во). «-» (не применяется) — ключа нет.
+    """
     result = {}
-    try:
-        tables = parse_docx_tables(filepath)
-        defaults = {}
-        for B in [6, 12]:
-            for row_type in ['Крайний', 'Средний']:
-                for passage in ['С проходом', 'Без прохода']:
-                    base = 100 if passage == 'С проходом' else 65
-                    if row_type == 'Средний':
-                        base += 20 if passage == 'С проходом' else 5
-                    for gpr in [5, 10, 20, 32, 50, 80, 100, 125, 200, 400]:
-                        for n in [1, 2]:
-                            defaults[(B, row_type, passage, gpr, n)] = base + (10 if n == 2 else 0)
-        result.update(defaults)
-    except Exception:
-        result = {(6, 'Крайний', 'С проходом', 20, 1): 100, (6, 'Средний', 'С проходом', 20, 1): 120,
-                  (12, 'Крайний', 'Без прохода', 20, 1): 65, (12, 'Средний', 'С проходом', 100, 2): 140}
+    for labels, gp, n, v in _iter_load_table(parse_docx_tables(filepath), 3):
+        B = _span_label(labels[0])
+        row_type = labels[1].split()[0] if labels[1] else ''
+        passage = labels[2]
+        if B is not None and row_type in ('Крайний', 'Средний') and passage in BRAKE_PASSAGES:
+            result[(B, row_type, passage, gp, n)] = v
+    if not result:
+        result = {(6, 'Крайний', 'С проходом', 20, 1): 110, (6, 'Средний', 'С проходом', 20, 1): 140,
+                  (12, 'Крайний', 'Без прохода', 20, 1): 75, (12, 'Средний', 'С проходом', 100, 2): 240}
     return result
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 """
-Заглушки для GUI-модулей.
+Заглушки для GUI-модулей и отдельный дисковый кэш таблиц.
 
 main_desktop.py, estakada_pipe.py и estakada_elec.py импортируют customtkinter
 и tkinter на верхнем уровне.  Чтобы протестировать чистые расчётные функции без
@@ -9,12 +9,30 @@ main_desktop.py, estakada_pipe.py и estakada_elec.py импортируют cus
 
 Старый test_calculator.py импортирует calculator_logic (без GUI) — он не затронут:
 sys.modules.setdefault() не перезаписывает уже загруженный модуль.
+
+Кэш таблиц (table_cache) на время тестов — во временной папке: тесты не пишут
+в ~/.cache/calcmet и не зависят от того, что там лежит.
 """
 
+import os
+import shutil
 import sys
+import tempfile
 from unittest.mock import MagicMock
 
 
+# ── Дисковый кэш таблиц ───────────────────────────────────────────────────────
+# Через окружение, до импорта тестируемых модулей: его наследуют и рабочие
+# процессы пакетного расчёта.
+
+_CACHE_DIR = tempfile.mkdtemp(prefix="calcmet-test-cache-")
+os.environ["CALCMET_CACHE_DIR"] = _CACHE_DIR
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_CACHE_DIR, ignore_errors=True)
+
+
 # ── Базовый виджет-заглушка ───────────────────────────────────────────────────
 
 class _Widget:
@@ -26,6 +44,8 @@ class _Widget:
     # geometry / layout
     def grid(self, *a, **kw): pass
     def pack(self, *a, **kw): pass
+    def pack_forget(self): pass
+    def bind(self, *a, **kw): pass
     def grid_remove(self): pass
     def grid_forget(self): pass
     def columnconfigure(self, *a, **kw): pass
@@ -51,12 +71,18 @@ class _Var:
 
     def __init__(self, value=None):
         self._v = value
+        self._traces = []
 
     def get(self):
         return self._v
 
     def set(self, v):
         self._v = v
+        for cb in self._traces:
+            cb("", "", "write")
+
+    def trace_add(self, mode, cb):
+        self._traces.append(cb)
 
 
 # ── Сборка мок-модуля customtkinter ──────────────────────────────────────────
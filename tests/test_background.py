@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты фонового расчёта для GUI (background.py) и его подключения
+в десктопном окне (main_desktop.App, без реального Tk).
+
+Запуск: python -m pytest tests/test_background.py -v
+"""
+
+import sys
+import os
+import queue
+import threading
+import time
+from unittest.mock import MagicMock
+
+# conftest.py уже зарегистрировал заглушки customtkinter/tkinter.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from background import Cancelled, JobRunner, JobToken
+from metal_core import RESULT_SECTIONS, calculate
+from sweep import DEFAULT_GP, DEFAULT_SPAN
+
+
+def _pump(q, runner, timeout=5.0):
+    """Разбирает очередь «GUI-потока», пока у runner есть задача."""
+    deadline = time.monotonic() + timeout
+    while runner.busy or not q.empty():
+        try:
+            q.get(timeout=0.01)()
+        except queue.Empty:
+            pass
+        assert time.monotonic() < deadline, "задача не завершилась"
+
+
+class TestJobRunner:
+
+    def test_result_delivered_in_gui_thread(self):
+        q = queue.SimpleQueue()
+        runner = JobRunner(q.put)
+        got = []
+        runner.submit(lambda token: threading.current_thread().name,
+                      lambda res: got.append((res, threading.current_thread().name)))
+        _pump(q, runner)
+        [(worker, gui)] = got
+        assert worker.startswith("calc-job-")
+        assert gui == threading.current_thread().name
+
+    def test_new_submit_supersedes(self):
+        q = queue.SimpleQueue()
+        runner = JobRunner(q.put)
+        release = threading.Event()
+        got = []
+
+        def slow(token):
+            release.wait(5)
+            token.check()
+            return "старый"
+
+        first = runner.submit(slow, got.append)
+        runner.submit(lambda token: "новый", got.append)
+        assert first.cancelled
+        release.set()
+        _pump(q, runner)
+        time.sleep(0.05)
+        _pump(q, runner)
+        assert got == ["новый"]
+
+    def test_cancel_drops_callbacks(self):
+        q = queue.SimpleQueue()
+        runner = JobRunner(q.put)
+        started = threading.Event()
+        got = []
+
+        def job(token):
+            started.set()
+            while True:
+                token.progress(0, 1)
+                time.sleep(0.001)
+
+        runner.submit(job, got.append, on_progress=lambda d, t: got.append("прогресс"))
+        started.wait(5)
+        runner.cancel()
+        assert not runner.busy
+        time.sleep(0.05)
+        while not q.empty():
+            q.get()()
+        assert got == []
+
+    def test_error_and_progress(self):
+        q = queue.SimpleQueue()
+        runner = JobRunner(q.put)
+        events = []
+
+        def job(token):
+            token.progress(1, 2)
+            raise ValueError("плохие данные")
+
+        runner.submit(job, events.append, lambda e, tb: events.append((type(e), "ValueError" in tb)),
+                      lambda done, total: events.append((done, total)))
+        _pump(q, runner)
+        assert events == [(1, 2), (ValueError, True)]
+
+    def test_partials_before_done(self):
+        q = queue.SimpleQueue()
+        runner = JobRunner(q.put)
+        events = []
+
+        def job(token):
+            for part in ("а", "б"):
+                token.emit(part)
+            return "готово"
+
+        runner.submit(job, events.append, on_partial=lambda p: events.append(("часть", p)))
+        _pump(q, runner)
+        assert events == [("часть", "а"), ("часть", "б"), "готово"]
+
+    def test_token(self):
+        token = JobToken(1)
+        token.check()
+        token.cancel()
+        with pytest.raises(Cancelled):
+            token.progress(1, 1)
+
+
+class TestCalculateProgress:
+
+    def test_progress_per_span(self):
+        seen = []
+        spans = [dict(DEFAULT_SPAN, L_span=L) for L in (18.0, 24.0, 30.0)]
+        res = calculate(DEFAULT_GP, spans, progress=lambda d, t: seen.append((d, t)))
+        assert seen == [(1, 3), (2, 3), (3, 3)]
+        assert res == calculate(DEFAULT_GP, spans)
+
+    def test_exception_aborts(self):
+        def stop(done, total):
+            raise Cancelled()
+
+        with pytest.raises(Cancelled):
+            calculate(DEFAULT_GP, [DEFAULT_SPAN], progress=stop)
+
+
+class TestDesktopApp:
+
+    def _app(self):
+        from main_desktop import App, SPAN_DEFAULTS
+        from span_model import SpanList
+        app = App.__new__(App)          # без построения виджетов
+        app._last_results_text = ""
+        app._init_jobs()
+        for name in ("lbl_status", "progress", "btn_cancel", "btn_save", "txt"):
+            setattr(app, name, MagicMock())
+        app._spans = SpanList(SPAN_DEFAULTS, [DEFAULT_SPAN] * 3)
+        app._read_global_params = lambda: dict(DEFAULT_GP)
+        app._scheduled = []
+        app.after = lambda ms, fn: app._scheduled.append(fn)
+        return app
+
+    def _run_after_loop(self, app, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while app._scheduled:
+            app._scheduled.pop(0)()
+            time.sleep(0.005)
+            assert time.monotonic() < deadline
+
+    def test_calculate_in_background(self):
+        app = self._app()
+        app._on_calculate()
+        assert len(app._scheduled) == 1       # опрос очереди через after()
+        self._run_after_loop(app)
+        expected = app._format_results(DEFAULT_GP, [DEFAULT_SPAN] * 3,
+                                       calculate(DEFAULT_GP, [DEFAULT_SPAN] * 3))
+        assert app._last_results_text == expected
+        app.btn_save.configure.assert_called_with(state="normal")
+        app.progress.set.assert_called_with(1)
+
+    def test_double_click_single_pump(self):
+        app = self._app()
+        app._on_calculate()
+        app._on_calculate()
+        assert len(app._scheduled) == 1
+        self._run_after_loop(app)
+        assert app._last_results_text
+
+    def test_cancel(self):
+        app = self._app()
+        app._on_calculate()
+        app._on_cancel()
+        self._run_after_loop(app)
+        assert app._last_results_text == ""
+        app.btn_cancel.configure.assert_called_with(state="disabled")
+
+    def test_sections_streamed(self):
+        app = self._app()
+        inserted = []
+        app.txt.insert = lambda index, text: inserted.append((index, text))
+        app._on_calculate()
+        # шапка видна сразу, до первого раздела
+        assert "Пролёт 3:" in app._last_results_text and "H_кол=?м" in app._last_results_text
+        self._run_after_loop(app)
+        expected = app._format_results(DEFAULT_GP, [DEFAULT_SPAN] * 3,
+                                       calculate(DEFAULT_GP, [DEFAULT_SPAN] * 3))
+        assert app._last_results_text == expected
+        ends = [k for k, (index, _) in enumerate(inserted) if index == "end"]
+        assert len(ends) == len(RESULT_SECTIONS)
+        assert "1. ПРОГОНЫ" in inserted[ends[0]][1] and "Лог расчёта" in inserted[ends[-1]][1]
+        # в конце заменены только строки H_кол и ИТОГО вверху
+        patched = [text for _, text in inserted[ends[-1] + 1:]]
+        assert any("★ ОБЩАЯ" in t for t in patched)
+        assert sum(len(t) for t in patched) < len(expected) // 10
+
+    def test_clear_during_calculation(self):
+        app = self._app()
+        app._on_calculate()
+        app._on_clear()
+        self._run_after_loop(app)
+        assert app._last_results_text == ""
+        assert app._stream_prev is None
+        app.btn_save.configure.assert_called_with(state="disabled")
+        app.btn_cancel.configure.assert_called_with(state="disabled")
+
+    def test_cancel_restores_previous(self):
+        app = self._app()
+        app._on_calculate()
+        self._run_after_loop(app)
+        before = app._last_results_text
+        app._spans.set(0, {"L_span": 30.0})
+        app._on_calculate()
+        app._on_cancel()
+        self._run_after_loop(app)
+        assert app._last_results_text == before
+        app.btn_save.configure.assert_called_with(state="normal")
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты пакетного расчёта из командной строки (batch_cli.py).
+
+Запуск: python -m pytest tests/test_batch_cli.py -v
+"""
+
+import sys
+import os
+import io
+import csv
+import json
+
+# conftest.py уже зарегистрировал заглушки customtkinter/tkinter.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import batch_cli
+from batch_cli import iter_jsonl, iter_csv, evaluate_records, main
+from memo import LRUMemo
+from metal_core import calculate
+from sweep import DEFAULT_GP, DEFAULT_SPAN
+
+LOGIC_SPAN = dict(
+    span_L=30.0, truss_step_B=6.0, column_step=6.0, rail_level=10.0,
+    Q_snow=1.5, Q_dust=0.5, Q_roof=0.3, Q_purlin=0.2, yc=1.0,
+    truss_type='Уголки', crane_capacity=20.0, crane_count=1, crane_mode='1К-6К',
+    brake_path='С проходом', fachwerk_load=0.0, fachwerk_post=False, building_type='Основные',
+)
+
+
+def _jsonl(*records) -> str:
+    return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+
+
+def _run(tmp_path, text, *args, name="in.jsonl"):
+    src = tmp_path / name
+    src.write_text(text, encoding="utf-8")
+    out = tmp_path / "out.txt"
+    code = main([str(src), "-o", str(out), *args])
+    return code, out.read_text(encoding="utf-8")
+
+
+class TestReaders:
+
+    def test_jsonl_defaults_filled(self):
+        f = io.StringIO(_jsonl({"id": "A", "gp": {"Q_snow": 1.5}, "spans": [{"L_span": 18}]}))
+        [(rec_id, gp, spans)] = list(iter_jsonl(f))
+        assert rec_id == "A"
+        assert gp == {**DEFAULT_GP, "Q_snow": 1.5}
+        assert spans == [{**DEFAULT_SPAN, "L_span": 18}]
+
+    def test_jsonl_bad_line_isolated(self):
+        f = io.StringIO('{"spans": [{}]}\n\nне json\n{"gp": {}}\n')
+        recs = list(iter_jsonl(f))
+        assert [r[0] for r in recs] == [1, 3, 4]
+        assert "__error__" not in recs[0][1]
+        assert "__error__" in recs[1][1] and "__error__" in recs[2][1]
+
+    def test_csv_groups_by_id(self):
+        f = io.StringIO("id,L_build,L_span,with_pass\n"
+                        "A,60,24,да\nA,90,18,0\nB,,30,\n")
+        recs = list(iter_csv(f))
+        assert [r[0] for r in recs] == ["A", "B"]
+        _, gp, spans = recs[0]
+        assert gp["L_build"] == 60.0          # gp — из первой строки здания
+        assert [sp["L_span"] for sp in spans] == [24.0, 18.0]
+        assert [sp["with_pass"] for sp in spans] == [True, False]
+        assert recs[1][1]["L_build"] == DEFAULT_GP["L_build"]
+
+    def test_csv_without_id_one_building_per_row(self):
+        f = io.StringIO("L_span,n_cranes\n24,2\n18,1\n")
+        recs = list(iter_csv(f))
+        assert len(recs) == 2
+        assert recs[0][2][0]["n_cranes"] == 2 and isinstance(recs[0][2][0]["n_cranes"], int)
+
+    def test_csv_unknown_column_is_record_error(self):
+        f = io.StringIO("id,L_span,что_то\nA,24,1\nA,18,1\nB,24,\n")
+        recs = list(iter_csv(f))
+        assert [r[0] for r in recs] == ["A", "B"]
+        assert "__error__" in recs[0][1]
+        assert "__error__" not in recs[1][1]
+
+
+class TestEvaluate:
+
+    def test_matches_calculate(self):
+        spans = [{**DEFAULT_SPAN, "L_span": L} for L in (18, 24, 30)]
+        recs = [(i, DEFAULT_GP, [sp]) for i, sp in enumerate(spans)]
+        out = list(evaluate_records(iter(recs)))
+        assert [i for i, _ in out] == [0, 1, 2]
+        for (_, res), sp in zip(out, spans):
+            assert res == calculate(DEFAULT_GP, [sp])
+
+    def test_pool_preserves_ids(self):
+        recs = [(f"b{i}", DEFAULT_GP, [{**DEFAULT_SPAN, "L_span": 12 + i}]) for i in range(12)]
+        out = list(evaluate_records(iter(recs), workers=2, chunksize=3))
+        assert [i for i, _ in out] == [r[0] for r in recs]
+        assert out[5][1] == calculate(DEFAULT_GP, recs[5][2])
+
+    def test_logic_engine(self):
+        f = io.StringIO(_jsonl({"id": 1, "length": 60, "spans": [LOGIC_SPAN]}))
+        [(rec_id, res)] = list(evaluate_records(iter_jsonl(f, "logic"), engine="logic"))
+        assert rec_id == 1
+        assert "_error" not in res and res["_total_kg"] > 0
+
+    def test_cache_dedups_identical_buildings(self, monkeypatch):
+        calls = []
+        real = batch_cli._evaluate
+        monkeypatch.setattr(batch_cli, "_evaluate", lambda *a, **kw: calls.append(1) or real(*a, **kw))
+        a = (DEFAULT_GP, [DEFAULT_SPAN])
+        b = (DEFAULT_GP, [{**DEFAULT_SPAN, "L_span": 18.0}])
+        recs = [(i, *case) for i, case in enumerate([a, b, a, a, b, a])]
+        cache = LRUMemo(16)
+        out = list(evaluate_records(iter(recs), chunksize=2, cache=cache))
+        assert [i for i, _ in out] == list(range(6))
+        assert len(calls) == 2
+        assert out[3][1] == calculate(*a) and out[4][1] == calculate(*b)
+
+    def test_cache_duplicate_of_failed_building(self):
+        bad = (DEFAULT_GP, [{**DEFAULT_SPAN, "L_span": "не число"}])
+        recs = [(i, *bad) for i in range(3)]
+        out = list(evaluate_records(iter(recs), cache=LRUMemo(4)))
+        assert all("_error" in res for _, res in out)
+
+    def test_cache_duplicates_stream(self):
+        read = []
+
+        def recs():
+            for i in range(100_000):
+                read.append(i)
+                yield i, DEFAULT_GP, [DEFAULT_SPAN]
+
+        out = evaluate_records(recs(), chunksize=4, cache=LRUMemo(4))
+        first = next(out)
+        assert first == (0, calculate(DEFAULT_GP, [DEFAULT_SPAN]))
+        assert len(read) <= 2 * 4 + 1
+        rest = [i for i, _ in out]
+        assert rest == list(range(1, 100_000))
+
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError):
+            list(evaluate_records(iter([]), engine="gpu"))
+
+
+class TestMain:
+
+    def test_jsonl_to_jsonl(self, tmp_path):
+        code, text = _run(tmp_path, _jsonl(
+            {"id": "A", "spans": [{"L_span": 24}]},
+            {"id": "B", "spans": [{"L_span": 24}, {"L_span": 18}]}))
+        assert code == 0
+        lines = [json.loads(s) for s in text.splitlines()]
+        assert [r["id"] for r in lines] == ["A", "B"]
+        assert lines[0]["result"]["итого"] == calculate(DEFAULT_GP, [DEFAULT_SPAN])["итого"]
+
+    def test_csv_to_csv(self, tmp_path):
+        code, text = _run(tmp_path, "id,L_span\nA,24\nA,18\nB,30\n", "-f", "csv", "-j", "2",
+                          "--chunksize", "1", name="in.csv")
+        assert code == 0
+        rows = list(csv.DictReader(io.StringIO(text)))
+        assert [r["id"] for r in rows] == ["A", "B"]
+        assert rows[0]["error"] == ""
+        assert float(rows[1]["М1_т"]) > 0
+
+    def test_errors_reported_and_exit_code(self, tmp_path):
+        code, text = _run(tmp_path, _jsonl({"id": "ok", "spans": [{}]}) + "{oops\n")
+        assert code == 1
+        lines = [json.loads(s) for s in text.splitlines()]
+        assert "result" in lines[0]
+        assert lines[1]["id"] == 2 and "error" in lines[1]
+
+    def test_store_reused_on_rerun(self, tmp_path):
+        from result_store import ResultStore
+        store = str(tmp_path / "study.sqlite")
+        text = _jsonl(*({"id": i, "spans": [{"L_span": 12 + 6 * (i % 4)}]} for i in range(10)))
+        code1, out1 = _run(tmp_path, text, "--store", store, "-j", "2", "--chunksize", "2")
+        assert code1 == 0
+        assert len(ResultStore(store)) == 4
+        code2, out2 = _run(tmp_path, text, "--store", store, "--cache", "0")
+        assert code2 == 0 and out2 == out1
+
+    def test_stdin_stdout(self, monkeypatch, capsys):
+        monkeypatch.setattr(sys, "stdin", io.StringIO(_jsonl({"spans": [{}]})))
+        assert main(["-f", "csv"]) == 0
+        rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+        assert rows[0]["id"] == "1"
+
+    def test_bad_args(self, tmp_path):
+        assert main([str(tmp_path / "x.jsonl"), "--chunksize", "0"]) == 2
+
+    def test_bad_cache_ttl(self, tmp_path, capsys):
+        assert main([str(tmp_path / "x.jsonl"), "--cache-ttl", "0"]) == 2
+        assert "cache-ttl > 0" in capsys.readouterr().err
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты локального расчётного сервиса (calc_service.py) и данных эстакад
+без GUI (estakada_data.py).
+
+Запуск: python -m pytest tests/test_calc_service.py -v
+"""
+
+import sys
+import os
+import json
+import asyncio
+
+# conftest.py уже зарегистрировал заглушки customtkinter/tkinter.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from calc_service import CalcService, MicroBatcher
+from estakada_data import PIPE_CONFIGS, ELEC_CONFIGS, find_config, estakada_total_t
+from metal_core import calculate
+from sweep import DEFAULT_GP, DEFAULT_SPAN
+
+
+async def _request(reader, writer, method, path, payload=None, close=False):
+    body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+    head = f"{method} {path} HTTP/1.1\r\nHost: x\r\nContent-Length: {len(body)}\r\n"
+    if close:
+        head += "Connection: close\r\n"
+    writer.write(head.encode() + b"\r\n" + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    n = 0
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        k, _, v = line.decode().partition(":")
+        if k.lower() == "content-length":
+            n = int(v)
+    return status, json.loads(await reader.readexactly(n))
+
+
+def _with_service(scenario, **kwargs):
+    """Запускает сервис на свободном порту и выполняет scenario(service, call)."""
+    async def run():
+        service = CalcService(**kwargs)
+        await service.start(port=0)
+        conns = []
+
+        async def call(method, path, payload=None):
+            reader, writer = await asyncio.open_connection("127.0.0.1", service.port)
+            conns.append(writer)
+            return await _request(reader, writer, method, path, payload)
+        try:
+            return await scenario(service, call)
+        finally:
+            for w in conns:
+                w.close()
+            await service.close()
+    return asyncio.run(run())
+
+
+class TestEstakadaData:
+
+    def test_gui_modules_share_configs(self):
+        import estakada_pipe
+        import estakada_elec
+        assert estakada_pipe.CONFIGS is PIPE_CONFIGS
+        assert estakada_elec.CONFIGS is ELEC_CONFIGS
+
+    def test_find_config(self):
+        assert find_config("pipe", "3а")["num"] == "3а"
+        with pytest.raises(KeyError):
+            find_config("elec", "нет")
+
+    def test_total(self):
+        cfg = PIPE_CONFIGS[0]
+        assert estakada_total_t(cfg, 100) == pytest.approx(cfg["kg_m"] * 100)
+
+
+class TestMicroBatcher:
+
+    def test_concurrent_requests_coalesced(self):
+        seen = []
+
+        async def run(cases):
+            seen.append(len(cases))
+            return [{"n": gp} for gp, _ in cases]
+
+        async def scenario():
+            b = MicroBatcher(run, max_batch=8)
+            res = await asyncio.gather(*(b.submit((i, [])) for i in range(20)))
+            return b, res
+
+        b, res = asyncio.run(scenario())
+        assert [r["n"] for r in res] == list(range(20))
+        assert seen == [8, 8, 4]
+        assert (b.batches, b.cases) == (3, 20)
+
+    def test_waits_for_inflight_batch(self):
+        seen = []
+
+        async def run(cases):
+            seen.append(len(cases))
+            await asyncio.sleep(0.01)
+            return [{} for _ in cases]
+
+        async def scenario():
+            b = MicroBatcher(run, max_batch=64, max_inflight=1)
+            first = asyncio.ensure_future(b.submit((0, [])))
+            await asyncio.sleep(0.001)          # первая пачка в работе
+            rest = [asyncio.ensure_future(b.submit((i, []))) for i in range(5)]
+            await asyncio.gather(first, *rest)
+
+        asyncio.run(scenario())
+        assert seen == [1, 5]
+
+    def test_run_error_propagates(self):
+        async def run(cases):
+            raise RuntimeError("пул упал")
+
+        async def scenario():
+            return await MicroBatcher(run).submit((0, []))
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(scenario())
+
+
+class TestService:
+
+    def test_calculate_matches_core(self):
+        async def scenario(service, call):
+            return await call("POST", "/calculate", {"gp": {"Q_snow": 1.5}, "spans": [{"L_span": 18}]})
+
+        status, body = _with_service(scenario)
+        assert status == 200
+        expected = calculate({**DEFAULT_GP, "Q_snow": 1.5}, [{**DEFAULT_SPAN, "L_span": 18}])
+        assert body["result"] == json.loads(json.dumps(expected))
+
+    def test_keep_alive_and_batching(self):
+        async def scenario(service, call):
+            reader, writer = await asyncio.open_connection("127.0.0.1", service.port)
+            st1, _ = await _request(reader, writer, "GET", "/health")
+            st2, _ = await _request(reader, writer, "GET", "/health", close=True)
+            writer.close()
+            res = await asyncio.gather(*(call("POST", "/calculate", {"spans": [{"L_span": 12 + i}]})
+                                         for i in range(10)))
+            return st1, st2, res, service.batcher.batches
+
+        st1, st2, res, batches = _with_service(scenario)
+        assert st1 == st2 == 200
+        assert all(status == 200 for status, _ in res)
+        assert batches < 10
+
+    def test_batch_endpoint_order_and_errors(self):
+        cases = [{"spans": [{"L_span": L}]} for L in (18, 24, 30)]
+        cases.insert(1, {"spans": [{"L_span": "не число"}]})
+
+        async def scenario(service, call):
+            return await call("POST", "/batch", {"cases": cases})
+
+        status, body = _with_service(scenario, max_batch=2)
+        assert status == 200
+        results = body["results"]
+        assert len(results) == 4
+        assert "error" in results[1]
+        assert results[3]["result"]["итого"] == json.loads(json.dumps(
+            calculate(DEFAULT_GP, [{**DEFAULT_SPAN, "L_span": 30}])["итого"]))
+
+    def test_estakada_endpoints(self):
+        async def scenario(service, call):
+            return [await call("GET", "/estakada/elec"),
+                    await call("POST", "/estakada/pipe", {"num": "1", "length": 100}),
+                    await call("POST", "/estakada/pipe", {"num": "нет", "length": 100}),
+                    await call("POST", "/estakada/pipe", {"num": "1", "length": 0})]
+
+        (s1, b1), (s2, b2), (s3, _), (s4, _) = _with_service(scenario)
+        assert s1 == 200 and len(b1["configs"]) == len(ELEC_CONFIGS)
+        assert s2 == 200 and b2["total_t"] == pytest.approx(PIPE_CONFIGS[0]["kg_m"] * 100)
+        assert (s3, s4) == (404, 400)
+
+    def test_bad_requests(self):
+        async def scenario(service, call):
+            reader, writer = await asyncio.open_connection("127.0.0.1", service.port)
+            writer.write(b"POST /calculate HTTP/1.1\r\nContent-Length: 3\r\n\r\n{x}")
+            bad_json = await reader.readline()
+            writer.close()
+            return [bad_json,
+                    await call("POST", "/calculate", {"gp": {}}),
+                    await call("GET", "/calculate"),
+                    await call("GET", "/nowhere")]
+
+        bad_json, (s2, _), (s3, _), (s4, _) = _with_service(scenario)
+        assert b" 400 " in bad_json
+        assert (s2, s3, s4) == (400, 405, 404)
+
+    def test_prewarmed_pool(self):
+        async def scenario(service, call):
+            res = await asyncio.gather(*(call("POST", "/calculate", {"spans": [{"L_span": 24}]})
+                                         for _ in range(6)))
+            health = await call("GET", "/health")
+            return res, health
+
+        res, (status, health) = _with_service(scenario, workers=2)
+        assert all(s == 200 for s, _ in res)
+        assert status == 200 and health["workers"] == 2 and health["cases"] == 6
@@ -8,11 +8,13 @@
 import pytest
 import sys
 import os
+from array import array
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from calculator_logic import (
-    CalculatorLogic, InputParams, SpanParams,
+    CalculatorLogic, InputParams, SpanParams, SpanBatch, SPAN_FIELDS, span_key,
+    IncrementalCalculator, SPAN_STAGES,
     _get_alpha_pb, _get_q_rail, _interpolate_table,
     PROGON_6M, PROGON_12M, H_CRANE, A_GAP, H_F, H_SH,
 )
@@ -410,3 +412,289 @@ class TestIntegration:
         _, span_res = results['_spans'][0]
         pf = span_res.get('Подстропильные фермы', {})
         assert pf.get('method', -1) == 0
+
+
+# ── 7. Пакетный расчёт ───────────────────────────────────────────────────────
+
+class TestCalculateMany:
+    def _variants(self):
+        out = []
+        for L in (18.0, 24.0, 30.0):
+            for Q in (20, 50, 100):
+                for mode in ('1К-6К', '7К-8К'):
+                    sp = make_span(span_L=L, crane_capacity=Q, crane_mode=mode,
+                                   truss_type='Двутавры', column_step=12.0)
+                    out.append(InputParams(length=60.0, spans=[sp, make_span()]))
+        return out
+
+    def test_matches_single_calculate(self):
+        """Результаты пакета совпадают с поштучным calculate()."""
+        params = self._variants()
+        calc = CalculatorLogic()
+        batch = calc.calculate_many(params)
+        single = [CalculatorLogic().calculate(p) for p in params]
+        assert batch == single
+
+    def test_tables_loaded_once(self, monkeypatch):
+        calc = CalculatorLogic()
+        calls = []
+        orig = calc._load_tables
+        monkeypatch.setattr(calc, '_load_tables', lambda: (calls.append(1), orig())[1])
+        calc.calculate_many(self._variants())
+        assert len(calls) == 1
+
+    def test_duplicate_spans_computed_once(self, monkeypatch):
+        calc = CalculatorLogic()
+        calls = []
+        orig = calc._calc_span
+        monkeypatch.setattr(calc, '_calc_span', lambda sp, length: (calls.append(1), orig(sp, length))[1])
+        params = [InputParams(length=60.0, spans=[make_span(), make_span()]) for _ in range(10)]
+        calc.calculate_many(params)
+        assert len(calls) == 1
+
+    def test_results_independent(self):
+        """Одинаковые пролёты в разных зданиях не разделяют dict результатов."""
+        params = [InputParams(length=60.0, spans=[make_span()]) for _ in range(2)]
+        r1, r2 = make_calc().calculate_many(params)
+        r1['_spans'][0][1]['Прогоны']['total_kg'] = -1
+        assert r2['_spans'][0][1]['Прогоны']['total_kg'] > 0
+
+    def test_error_isolated(self):
+        """Ошибка в одном здании не прерывает пакет."""
+        bad = InputParams(length=60.0, spans=[make_span(truss_step_B=0.0)])
+        good = InputParams(length=60.0, spans=[make_span()])
+        r_bad, r_good = make_calc().calculate_many([bad, good])
+        assert '_error' in r_bad
+        assert '_error' not in r_good
+
+    def test_accepts_generator(self):
+        res = make_calc().calculate_many(InputParams(60.0, [make_span()]) for _ in range(3))
+        assert len(res) == 3
+
+
+# ── 8. Столбцовое представление пролётов ─────────────────────────────────────
+
+class TestSpanBatch:
+    def _spans(self):
+        return [make_span(span_L=L, truss_type=t, crane_mode=m)
+                for L in (18.0, 24.0) for t in ('Уголки', 'Двутавры') for m in ('1К-6К', '7К-8К')]
+
+    def test_roundtrip(self):
+        spans = self._spans()
+        assert SpanBatch.from_spans(spans).to_spans() == spans
+
+    def test_categorical_strings(self):
+        b = SpanBatch.from_spans(self._spans())
+        assert b.categories['truss_type'] == ['Уголки', 'Двутавры']
+        assert list(b.column('truss_type')) == [0, 0, 1, 1] * 2
+        assert b.values('crane_mode')[:2] == ['1К-6К', '7К-8К']
+
+    def test_getitem(self):
+        spans = self._spans()
+        b = SpanBatch.from_spans(spans)
+        assert b[3] == spans[3]
+        assert b[-1] == spans[-1]
+        with pytest.raises(IndexError):
+            b[len(spans)]
+
+    def test_zero_copy_buffer(self):
+        """Буфер формата 'd' не копируется."""
+        spans = self._spans()
+        data = {f: SpanBatch.from_spans(spans).values(f) for f in SPAN_FIELDS}
+        data['span_L'] = array('d', [sp.span_L for sp in spans])
+        b = SpanBatch.from_columns(data)
+        assert b.column('span_L').obj is data['span_L']
+        data['span_L'][0] = 36.0
+        assert b[0].span_L == 36.0
+
+    def test_zero_copy_native_int_and_bool(self):
+        """int64 ('l') и bool ('?') — форматы numpy — тоже без копирования."""
+        spans = self._spans()
+        data = {f: SpanBatch.from_spans(spans).values(f) for f in SPAN_FIELDS}
+        if array('l').itemsize != 8:
+            pytest.skip("long не 8 байт")
+        data['crane_count'] = array('l', [sp.crane_count for sp in spans])
+        data['fachwerk_post'] = memoryview(bytearray(len(spans))).cast('?')
+        b = SpanBatch.from_columns(data)
+        assert b.column('crane_count').obj is data['crane_count']
+        assert b.column('fachwerk_post').obj is data['fachwerk_post'].obj
+        data['crane_count'][0] = 2
+        data['fachwerk_post'][1] = True
+        assert b[0].crane_count == 2
+        assert b[1].fachwerk_post is True
+        assert b.to_spans()[2] == spans[2]
+
+    def test_integer_valued_float_column(self):
+        spans = self._spans()
+        data = {f: SpanBatch.from_spans(spans).values(f) for f in SPAN_FIELDS}
+        data['crane_count'] = array('d', [float(sp.crane_count) for sp in spans])
+        assert SpanBatch.from_columns(data).to_spans() == spans
+        data['crane_count'] = [1.5] * len(spans)
+        with pytest.raises(ValueError):
+            SpanBatch.from_columns(data)
+
+    def test_missing_column(self):
+        with pytest.raises(KeyError):
+            SpanBatch.from_columns({'span_L': [18.0]})
+
+    def test_unequal_lengths(self):
+        data = {f: SpanBatch.from_spans(self._spans()).values(f) for f in SPAN_FIELDS}
+        data['yc'] = data['yc'][:-1]
+        with pytest.raises(ValueError):
+            SpanBatch.from_columns(data)
+
+    def test_from_table_pandas(self):
+        pd = pytest.importorskip('pandas')
+        spans = self._spans()
+        df = pd.DataFrame([span_key(sp) for sp in spans], columns=list(SPAN_FIELDS))
+        assert SpanBatch.from_table(df).to_spans() == spans
+
+    def test_groups(self):
+        spans = [make_span(), make_span(span_L=18.0), make_span()]
+        assert sorted(SpanBatch.from_spans(spans).groups().values()) == [[0, 2], [1]]
+
+    def test_calc_span_batch_matches(self):
+        spans = self._spans() + self._spans()[:2]
+        calc = CalculatorLogic()
+        batch_res = calc.calc_span_batch(SpanBatch.from_spans(spans), 60.0)
+        assert batch_res == [calc._calc_span(sp, 60.0) for sp in spans]
+
+
+# ── 9. Инкрементальный пересчёт ──────────────────────────────────────────────
+
+def _recomputed(inc, slot=0):
+    return {name for s, name in inc.last_recomputed if s == slot}
+
+
+class TestIncremental:
+    def _building(self, **kw):
+        return InputParams(length=60.0, spans=[make_span(column_step=12.0, **kw), make_span()])
+
+    def test_matches_full_calculate(self):
+        inc = IncrementalCalculator()
+        p = self._building(truss_type='Двутавры')
+        assert inc.calculate(p) == CalculatorLogic().calculate(p)
+
+    def test_no_change_no_recompute(self):
+        inc = IncrementalCalculator()
+        inc.calculate(self._building())
+        inc.calculate(self._building())
+        assert inc.last_recomputed == []
+
+    def test_crane_mode_touches_beams_and_columns(self):
+        inc = IncrementalCalculator()
+        inc.calculate(self._building(crane_mode='1К-6К'))
+        res = inc.calculate(self._building(crane_mode='7К-8К'))
+        assert _recomputed(inc) == {'podkranovye', 'columns'}
+        assert _recomputed(inc, 1) == set()
+        assert res == CalculatorLogic().calculate(self._building(crane_mode='7К-8К'))
+
+    def test_snow_skips_crane_beams(self):
+        inc = IncrementalCalculator()
+        inc.calculate(self._building())
+        inc.calculate(self._building(Q_snow=2.4))
+        assert _recomputed(inc) == {'progony', 'fermy', 'loads', 'podstropilnye', 'columns'}
+
+    def test_length_recomputes_all(self):
+        inc = IncrementalCalculator()
+        inc.calculate(self._building())
+        p = self._building()
+        p.length = 72.0
+        inc.calculate(p)
+        assert _recomputed(inc) == {n.name for n in SPAN_STAGES}
+
+    def test_table_change_recomputes_dependents(self):
+        inc = IncrementalCalculator(make_calc())
+        sp = make_span(column_step=12.0)
+        inc.calc_span(0, sp, 60.0)
+        inc.calc._crane_beams = {(12, 20, 1): 300}
+        inc.calc_span(0, sp, 60.0)
+        assert _recomputed(inc) == {'podkranovye', 'columns'}
+
+    def test_removed_spans_dropped(self):
+        inc = IncrementalCalculator()
+        inc.calculate(self._building())
+        inc.calculate(InputParams(length=60.0, spans=[make_span(column_step=12.0)]))
+        assert set(inc._slots) == {0}
+
+    def test_stage_fields_complete(self):
+        """Изменение поля меняет только узлы, у которых оно объявлено (с учётом предков)."""
+        calc = CalculatorLogic()
+        calc._load_tables()
+        nodes = {n.name: n for n in SPAN_STAGES}
+
+        def closure(name):
+            node = nodes[name]
+            out = set(node.fields)
+            for d in node.deps:
+                out |= closure(d)
+            return out
+
+        def run(sp):
+            out = {}
+            for node in SPAN_STAGES:
+                out[node.name] = node.func(calc, sp, 60.0, out)
+            return out
+
+        base = make_span(column_step=12.0, truss_type='Двутавры', crane_capacity=50)
+        changes = dict(span_L=24.0, truss_step_B=12.0, column_step=6.0, rail_level=14.0,
+                       Q_snow=2.4, Q_dust=0.9, Q_roof=0.6, Q_purlin=0.5, yc=1.1,
+                       truss_type='Молодечно', crane_capacity=125, crane_count=2,
+                       crane_mode='7К-8К', brake_path='Без прохода',
+                       fachwerk_load=300.0, fachwerk_post=True, building_type='Вспомогательные')
+        r0 = run(base)
+        for field, value in changes.items():
+            r1 = run(make_span(**{**{f: getattr(base, f) for f in SPAN_FIELDS}, field: value}))
+            for name in nodes:
+                if r1[name] != r0[name]:
+                    assert field in closure(name), f"{name} зависит от {field}"
+
+
+# ── Кэш пролётов (span_memo) ─────────────────────────────────────────────────
+
+class TestSpanMemo:
+
+    def test_identical_spans_computed_once(self, monkeypatch):
+        calc = CalculatorLogic()
+        calls = []
+        orig = calc._calc_span
+        monkeypatch.setattr(calc, '_calc_span', lambda sp, length: (calls.append(1), orig(sp, length))[1])
+        p = InputParams(length=60.0, spans=[make_span() for _ in range(12)])
+        res = calc.calculate(p)
+        assert len(calls) == 1
+        assert calc.span_memo.info().hits == 11
+        assert res == make_calc().calculate(p)
+
+    def test_key_includes_length(self):
+        calc = CalculatorLogic()
+        r60 = calc.calculate(InputParams(length=60.0, spans=[make_span()]))
+        r72 = calc.calculate(InputParams(length=72.0, spans=[make_span()]))
+        assert calc.span_memo.info().misses == 2
+        assert r60['_spans'][0][1] != r72['_spans'][0][1]
+
+    def test_table_change_invalidates(self, monkeypatch):
+        """Замена таблицы — новая версия, закэшированный результат не используется."""
+        calc = CalculatorLogic()
+        p = InputParams(length=60.0, spans=[make_span(column_step=12.0)])
+        calc.calculate(p)
+        v = calc.table_version()
+        monkeypatch.setattr(calc, '_load_tables', lambda: None)
+        calc._crane_beams = {}
+        res = calc.calculate(p)
+        assert calc.table_version() == v + 1
+        assert calc.span_memo.info().misses == 2
+        assert 'method2_total_kg' not in res['_spans'][0][1]['Подкрановые балки']
+
+    def test_cached_result_not_shared(self):
+        calc = CalculatorLogic()
+        p = InputParams(length=60.0, spans=[make_span()])
+        r1 = calc.calculate(p)
+        r1['_spans'][0][1]['Прогоны']['total_kg'] = -1
+        r2 = calc.calculate(p)
+        assert r2['_spans'][0][1]['Прогоны']['total_kg'] > 0
+
+    def test_bounded(self):
+        calc = CalculatorLogic(memo_size=2)
+        for L in (12.0, 18.0, 24.0, 30.0):
+            calc.calculate(InputParams(length=60.0, spans=[make_span(span_L=L)]))
+        assert calc.span_memo.info().currsize == 2
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Паритет расчётного ядра (metal_core.py):
+  • скомпилированные табличные поиски == исходные линейные циклы методики;
+  • пакетный calculate_many == поштучный calculate;
+  • main.py (Kivy) и main_desktop.py не держат своих копий таблиц и расчёта.
+
+Запуск: python -m pytest tests/test_kernel_parity.py -v
+"""
+
+import sys
+import os
+import ast
+import itertools
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pytest
+
+import metal_core as core
+from memo import LRUMemo
+from sweep import DEFAULT_GP, DEFAULT_SPAN
+
+NAN = float("nan")
+INF = float("inf")
+
+
+# ─── Эталон: исходные реализации (линейный поиск) ────────────────────────────
+
+def _ref_ceil(target, values):
+    for v in sorted(values):
+        if target <= v: return v
+    return sorted(values)[-1]
+
+
+def _ref_interp(loads, masses, target):
+    for i, ld in enumerate(loads):
+        if target <= ld: return masses[i]
+    return masses[-1]
+
+
+def _ref_lkp(d, val):
+    for k in sorted(d):
+        if val <= k: return d[k]
+    return d[sorted(d)[-1]]
+
+
+def _ref_select_purlin(load_tm, B_step):
+    use_6 = (B_step <= 6)
+    for max_l, n6, m6, n12, m12 in core.PURLIN_TABLE:
+        if load_tm <= max_l:
+            return (m6, n6) if use_6 else (m12, n12)
+    _, n6, m6, n12, m12 = core.PURLIN_TABLE[-1]
+    return (m6, f"{n6}(!)") if use_6 else (m12, f"{n12}(!)")
+
+
+def _ref_truss(truss_type, span_m, load_tm):
+    spans = sorted(core.TRUSS_MASSES.get(truss_type, {}).keys())
+    if not spans: return None
+    ms = core.TRUSS_MASSES[truss_type].get(_ref_ceil(span_m, spans))
+    if ms is None: return None
+    return _ref_interp(core.TRUSS_LOADS, ms, load_tm)
+
+
+def _ref_subtruss(R_t):
+    return _ref_interp(core.SUBTRUSS_LOADS, core.SUBTRUSS_MASSES, _ref_ceil(R_t, core.SUBTRUSS_LOADS))
+
+
+def _ref_crane_beam(q, span, n):
+    table = core.CRANE_BEAM_T1 if q <= 50 else core.CRANE_BEAM_T2
+    q_ord = core._CB_Q1 if q <= 50 else core._CB_Q2
+    vals = table.get(_ref_ceil(span, sorted(table.keys())))
+    if vals is None: return None
+    qi = min(range(len(q_ord)), key=lambda i: abs(q_ord[i] - q))
+    ci = qi * 2 + (0 if n == 1 else 1)
+    return vals[ci] if ci < len(vals) else None
+
+
+def _ref_brake(q, span, n, wp, edge):
+    table = core.BRAKE_T1 if q <= 50 else core.BRAKE_T2
+    sk = _ref_ceil(span, sorted({k[0] for k in table}))
+    vals = table.get((sk, edge, wp))
+    if vals is None:
+        vals = next((v for k, v in table.items() if k[0] == sk), None)
+    if vals:
+        return vals[0 if n == 1 else min(1, len(vals) - 1)]
+    return None
+
+
+def _same(a, b):
+    return a == b or (a != a and b != b)
+
+
+# Сетка аргументов: узлы таблиц, середины, края, NaN и бесконечности
+LOADS = [x / 20 for x in range(-10, 300)] + [NAN, INF, -INF]
+SPANS = [0, 3, 6, 9, 12, 15, 17.9, 18, 18.1, 20, 24, 30, 36, 37, 48, NAN]
+CRANES = [0, 5, 7.5, 10, 15, 20, 26, 32, 41, 50, 50.5, 65, 80, 90, 100, 112.5,
+          125, 160, 200, 300, 400, 450, NAN]
+
+
+class TestLookupParity:
+
+    @pytest.mark.parametrize("table", [core.CRANE_BEAM_ALPHA, core.RAIL_WEIGHT_KN, core.CRANE_Q_EQUIV])
+    def test_lkp(self, table):
+        for q in CRANES + LOADS:
+            assert _same(core._lkp(table, q), _ref_lkp(table, q)), q
+
+    def test_compiled_crane_tables(self):
+        for q in CRANES:
+            assert core._ALPHA_LKP(q) == _ref_lkp(core.CRANE_BEAM_ALPHA, q)
+            assert core._RAIL_LKP(q) == _ref_lkp(core.RAIL_WEIGHT_KN, q)
+            assert core._Q_EQUIV_LKP(q) == _ref_lkp(core.CRANE_Q_EQUIV, q)
+
+    def test_select_purlin(self):
+        for load, B in itertools.product(LOADS, (3, 6, 12)):
+            assert core.select_purlin(load, B) == _ref_select_purlin(load, B), (load, B)
+
+    def test_truss(self):
+        for tt in list(core.TRUSS_MASSES) + ["Неизвестный"]:
+            for span, load in itertools.product(SPANS, LOADS[::3]):
+                assert core.get_truss_mass_m2(tt, span, load) == _ref_truss(tt, span, load), (tt, span, load)
+
+    def test_truss_batch(self):
+        cases = list(itertools.product(list(core.TRUSS_MASSES) + ["Неизвестный"], SPANS, LOADS[::3]))
+        got = core.truss_masses_m2(*zip(*cases))
+        assert got == [_ref_truss(*c) for c in cases]
+        assert core.truss_masses_m2([], [], []) == []
+
+    def test_subtruss(self):
+        for R in [x * 2.5 for x in range(-4, 120)] + [NAN, INF]:
+            assert core.get_subtruss_mass_m2(R) == _ref_subtruss(R), R
+
+    def test_subtruss_batch(self):
+        Rs = [x * 2.5 for x in range(-4, 120)] + [NAN, INF]
+        assert core.subtruss_masses_m2(Rs) == [_ref_subtruss(R) for R in Rs]
+
+    def test_crane_beam_and_brake(self):
+        for q, span, n in itertools.product(CRANES, SPANS, (1, 2, 3)):
+            assert core.get_crane_beam_kgm(q, span, n) == _ref_crane_beam(q, span, n), (q, span, n)
+            for wp, edge in itertools.product((True, False), (True, False)):
+                assert core.get_brake_kgm(q, span, n, wp, edge) == _ref_brake(q, span, n, wp, edge)
+
+    def test_helpers(self):
+        for t in LOADS[::5]:
+            assert _same(core.ceil_to_table(t, core.SUBTRUSS_LOADS), _ref_ceil(t, core.SUBTRUSS_LOADS))
+            assert core.interp_table(core.TRUSS_LOADS, range(22), t) == _ref_interp(core.TRUSS_LOADS, range(22), t)
+
+
+# ─── Пакетный вход == поштучный ──────────────────────────────────────────────
+
+def _cases():
+    out = []
+    for L, q, cs, mode, tt in itertools.product((18.0, 30.0), (10.0, 80.0, 400.0), (6.0, 12.0),
+                                                ("Режим 1-6К", "Режим 7-8К"), ("Уголки", "Молодечно")):
+        spans = [dict(DEFAULT_SPAN, L_span=L, q_crane_t=q, col_step=cs, crane_mode=mode, truss_type=tt),
+                 dict(DEFAULT_SPAN, L_span=24.0, q_crane_t=q / 2, has_post=True, rig_load=150.0),
+                 dict(DEFAULT_SPAN, L_span=L, q_crane_t=q, col_step=cs, crane_mode=mode, truss_type=tt)]
+        out.append((dict(DEFAULT_GP, L_build=96.0 if cs == 12 else 120.0), spans))
+    return out
+
+
+class TestBatchParity:
+
+    def test_matches_scalar(self):
+        cases = _cases()
+        core.SPAN_MEMO.clear()
+        scalar = [core.calculate(gp, spans) for gp, spans in cases]
+        assert core.calculate_many(cases) == scalar
+
+    def test_uncached_matches(self):
+        """Результат не зависит от состояния кэша."""
+        cases = _cases()
+        fresh = [core.calculate(gp, spans, memo=LRUMemo(1)) for gp, spans in cases]
+        assert core.calculate_many(cases) == fresh
+
+    def test_batch_memo_isolated(self):
+        core.SPAN_MEMO.clear()
+        memo = LRUMemo()
+        core.calculate_many(_cases(), memo=memo)
+        assert core.SPAN_MEMO.info().currsize == 0
+        assert memo.info().hits > 0
+
+    def test_accepts_generator(self):
+        cases = _cases()[:3]
+        assert core.calculate_many(iter(cases)) == [core.calculate(gp, sp) for gp, sp in cases]
+
+
+# ─── Фронтенды не держат копий ядра ──────────────────────────────────────────
+
+def _module_defs(path):
+    """Имена функций и присваиваний верхнего уровня + импорты из metal_core."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    defs, imported = set(), set()
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef):
+            defs.add(node.name)
+        elif isinstance(node, ast.Assign):
+            defs.update(t.id for t in node.targets if isinstance(t, ast.Name))
+        elif isinstance(node, ast.ImportFrom) and node.module == "metal_core":
+            imported.update(a.name for a in node.names)
+    return defs, imported
+
+
+KERNEL_NAMES = {"calculate", "select_purlin", "get_truss_mass_m2", "get_crane_beam_kgm",
+                "get_brake_kgm", "PURLIN_TABLE", "TRUSS_MASSES", "CRANE_BEAM_T1", "BRAKE_T1"}
+
+
+@pytest.mark.parametrize("front", ["main.py", "main_desktop.py"])
+def test_front_end_uses_core(front):
+    defs, imported = _module_defs(os.path.join(ROOT, front))
+    assert not defs & KERNEL_NAMES, f"{front} переопределяет {sorted(defs & KERNEL_NAMES)}"
+    assert "calculate" in imported
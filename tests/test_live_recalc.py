@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты живого пересчёта в десктопном окне (main_desktop.App, без реального Tk):
+отложенный пересчёт после правок, частичное обновление текста результатов.
+
+Запуск: python -m pytest tests/test_live_recalc.py -v
+"""
+
+import sys
+import os
+import random
+import time
+from unittest.mock import MagicMock
+
+# conftest.py уже зарегистрировал заглушки customtkinter/tkinter.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main_desktop import App, LIVE_DEBOUNCE_MS, SPAN_DEFAULTS, text_patch
+from metal_core import calculate
+from span_model import SpanList
+from sweep import DEFAULT_GP, DEFAULT_SPAN
+
+
+def _apply(old, patch):
+    for start, end, middle in reversed(patch):
+        old = old[:start] + middle + old[end:]
+    return old
+
+
+class TestTextPatch:
+
+    def test_identical(self):
+        assert text_patch("a\nb", "a\nb") == []
+
+    def test_changed_lines_only(self):
+        old = "шапка\nпролёт 1: 10\nпролёт 2: 10\nитого: 20"
+        new = "шапка\nпролёт 1: 12\nпролёт 2: 10\nитого: 22"
+        patch = text_patch(old, new)
+        assert [m for _, _, m in patch] == ["пролёт 1: 12", "итого: 22"]
+        assert [old[s:e] for s, e, _ in patch] == ["пролёт 1: 10", "итого: 20"]
+
+    def test_edges(self):
+        for old, new in [("", "a"), ("a", ""), ("a", "a\nb"), ("a\nb", "a"),
+                         ("a\nb", "a\nX\nb"), ("a\nX\nb", "a\nb"), ("x\na", "a"),
+                         ("a\n", "a\n\n"), ("\n", ""), ("a\nb\n", "b\n")]:
+            assert _apply(old, text_patch(old, new)) == new, (old, new)
+
+    def test_random(self):
+        rnd = random.Random(7)
+        for _ in range(500):
+            old = "\n".join(rnd.choice("ab ") * rnd.randint(0, 2) for _ in range(rnd.randint(0, 6)))
+            new = "\n".join(rnd.choice("ab ") * rnd.randint(0, 2) for _ in range(rnd.randint(0, 6)))
+            assert _apply(old, text_patch(old, new)) == new, (old, new)
+
+
+class TestLiveRecalc:
+
+    def _app(self, spans):
+        app = App.__new__(App)          # без построения виджетов
+        app._last_results_text = ""
+        app._init_jobs()
+        app._init_live()
+        app._live_var = MagicMock(get=lambda: True)
+        for name in ("lbl_status", "progress", "btn_cancel", "btn_save", "txt"):
+            setattr(app, name, MagicMock())
+        app._spans = SpanList(SPAN_DEFAULTS, spans)
+        app._read_global_params = lambda: dict(DEFAULT_GP)
+        app._timers = {}
+
+        def after(ms, fn):
+            tid = object()
+            app._timers[tid] = (ms, fn)
+            return tid
+
+        app.after = after
+        app.after_cancel = lambda tid: app._timers.pop(tid)
+        return app
+
+    def test_debounce(self):
+        app = self._app([DEFAULT_SPAN])
+        for _ in range(5):
+            app._on_input_changed()
+        assert len(app._timers) == 1        # правки подряд — один пересчёт
+        [(ms, fn)] = app._timers.values()
+        assert ms == LIVE_DEBOUNCE_MS
+        fn()
+        assert app._last_results_text == app._format_results(
+            DEFAULT_GP, [DEFAULT_SPAN], calculate(DEFAULT_GP, [DEFAULT_SPAN]))
+        app.btn_save.configure.assert_called_with(state="normal")
+
+    def test_disabled(self):
+        app = self._app([DEFAULT_SPAN])
+        app._live_var = MagicMock(get=lambda: False)
+        app._on_input_changed()
+        assert app._timers == {}
+
+    def test_only_changed_text_replaced(self):
+        spans = [dict(DEFAULT_SPAN, L_span=18.0 + 6 * (i % 3)) for i in range(12)]
+        app = self._app(spans)
+        app._live_recalc()
+        before = app._last_results_text
+        app.txt.reset_mock()
+
+        app._spans.set(5, {"h_rail": spans[5]["h_rail"] + 1})
+        app._live_recalc()
+        after = app._last_results_text
+        assert after != before
+        patch = text_patch(before, after)
+        assert app.txt.delete.call_count == app.txt.insert.call_count == len(patch)
+        start, end, middle = patch[0]       # правки — с конца текста
+        app.txt.insert.assert_called_with(f"1.0 + {start} chars", middle)
+        assert sum(len(m) for _, _, m in patch) < len(after) // 10
+
+        app.txt.reset_mock()
+        app._live_recalc()                  # данные не менялись — окно не трогается
+        app.txt.delete.assert_not_called()
+
+    def test_bad_input_ignored(self):
+        app = self._app([DEFAULT_SPAN])
+        app._live_recalc()
+        text = app._last_results_text
+        app._spans.to_spans = lambda: int("")
+        app._live_recalc()
+        assert app._last_results_text == text
+
+    def test_within_frame_for_dozens_of_spans(self):
+        spans = [dict(DEFAULT_SPAN, L_span=18.0 + 6 * (i % 4), q_crane_t=[10, 20, 50, 100][i % 4])
+                 for i in range(40)]
+        app = self._app(spans)
+        app._live_recalc()
+        best = float("inf")
+        for k in range(5):
+            app._spans.set(17, {"h_rail": 9.0 + k})
+            t = time.perf_counter()
+            app._live_recalc()
+            best = min(best, time.perf_counter() - t)
+        assert best < 0.016
@@ -39,6 +39,8 @@ from main_desktop import (
     get_fakhverk_kgm2,
     get_pipe_support_kgm2,
     calculate,
+    span_key,
+    SPAN_MEMO,
     PURLIN_TABLE,
     ROOF_MATERIALS,
     ROOF_PRESETS,
@@ -760,6 +762,39 @@ class TestCalculateMultiSpan:
         assert "_log" in res
 
 
+class TestSpanMemo:
+    """Кэш per-span величин (SPAN_MEMO)."""
+
+    def setup_method(self):
+        SPAN_MEMO.clear()
+
+    def test_identical_spans_hit(self):
+        res = calculate(_gp(), [_sp() for _ in range(12)])
+        info = SPAN_MEMO.info()
+        assert (info.misses, info.hits) == (1, 11)
+        assert len(res["прогоны"]["по_пролётам"]) == 12
+
+    def test_repeat_matches_fresh(self):
+        spans = [_sp(col_step=12.0, q_crane_t=80.0), _sp(L_span=30.0)]
+        first = calculate(_gp(), spans)
+        assert calculate(_gp(), spans) == first
+        assert SPAN_MEMO.info().hits == 2
+
+    def test_global_params_in_key(self):
+        calculate(_gp(L_build=60.0), [_sp()])
+        res = calculate(_gp(L_build=72.0), [_sp()])
+        assert SPAN_MEMO.info().misses == 2
+        assert res["итого"]["S_floor"] == pytest.approx(72.0 * 24.0)
+
+    def test_span_key_canonical(self):
+        """Лишние ключи не влияют; H_col_ov по умолчанию 0."""
+        sp = _sp()
+        extra = dict(sp, comment="пролёт А")
+        no_ov = {k: v for k, v in sp.items() if k != "H_col_ov"}
+        assert span_key(extra) == span_key(sp) == span_key(dict(no_ov, H_col_ov=0))
+        hash(span_key(sp))
+
+
 class TestCalculateColumnHeights:
     """Высоты колонн через полный расчёт."""
 
@@ -924,3 +959,21 @@ class TestEtalonBlok4CraneBeamM2:
         kgm1 = get_crane_beam_kgm(20, 6, 1)
         kgm2 = get_crane_beam_kgm(20, 6, 2)
         assert kgm2 > kgm1
+
+
+class TestRawReport:
+    """Отчёт по точному результату (calculate(raw=True)) округляется при выводе."""
+
+    def test_rounded_on_display(self):
+        import re
+        from main_desktop import App
+        app = App.__new__(App)
+        spans = [_sp(L_span=18.0, col_step=12.0), _sp(q_crane_t=100.0)]
+        raw_text = app._format_results(_gp(), spans, calculate(_gp(), spans, raw=True))
+        text = app._format_results(_gp(), spans, calculate(_gp(), spans))
+        assert not re.search(r"\d\.\d{4,}", raw_text)
+        assert "Лог расчёта" not in raw_text
+        # разделы 1–9 совпадают; итоги могут отличаться в последнем знаке
+        start = text.index("1. ПРОГОНЫ")
+        end = text.index("ИТОГО ПО КАРКАСУ")
+        assert raw_text[raw_text.index("1. ПРОГОНЫ"):raw_text.index("ИТОГО ПО КАРКАСУ")] == text[start:end]
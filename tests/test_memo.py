@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты для LRU-кэша результатов пролётов (memo.py).
+
+Запуск: python -m pytest tests/test_memo.py -v
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from memo import LRUMemo, MemoInfo
+
+
+class TestLRUMemo:
+
+    def test_hit_and_miss_counters(self):
+        memo = LRUMemo(4)
+        calls = []
+        for _ in range(3):
+            assert memo.get_or_compute("a", lambda: calls.append(1) or 42) == 42
+        assert len(calls) == 1
+        assert memo.info() == MemoInfo(hits=2, misses=1, maxsize=4, currsize=1)
+
+    def test_evicts_least_recently_used(self):
+        memo = LRUMemo(2)
+        memo.get_or_compute(1, lambda: "x")
+        memo.get_or_compute(2, lambda: "y")
+        memo.get_or_compute(1, lambda: "x")     # 1 — недавно использован
+        memo.get_or_compute(3, lambda: "z")     # вытесняет 2
+        assert 1 in memo and 3 in memo
+        assert 2 not in memo
+        assert len(memo) == 2
+
+    def test_exception_not_cached(self):
+        memo = LRUMemo(2)
+
+        def boom():
+            raise ValueError("ошибка")
+
+        with pytest.raises(ValueError):
+            memo.get_or_compute("k", boom)
+        assert "k" not in memo
+        assert memo.get_or_compute("k", lambda: 1) == 1
+        assert memo.info().misses == 2
+
+    def test_clear(self):
+        memo = LRUMemo(2)
+        memo.get_or_compute("k", lambda: 1)
+        memo.get_or_compute("k", lambda: 1)
+        memo.clear()
+        assert memo.info() == MemoInfo(0, 0, 2, 0)
+
+    def test_unhashable_key(self):
+        with pytest.raises(TypeError):
+            LRUMemo().get_or_compute(["список"], lambda: 1)
+
+    def test_maxsize_validated(self):
+        with pytest.raises(ValueError):
+            LRUMemo(0)
+
+
+class TestTTLAndStats:
+
+    def test_ttl_expires(self):
+        now = [0.0]
+        memo = LRUMemo(4, ttl=10, clock=lambda: now[0])
+        memo.put("k", 1)
+        now[0] = 9.9
+        assert memo.get("k") == 1
+        now[0] = 10.0
+        assert "k" not in memo
+        assert memo.get_or_compute("k", lambda: 2) == 2
+        info = memo.info()
+        assert info.expired == 1 and info.currsize == 1
+
+    def test_eviction_counter(self):
+        memo = LRUMemo(2)
+        for k in range(5):
+            memo.put(k, k)
+        assert memo.info().evictions == 3
+        memo.clear()
+        assert memo.info() == MemoInfo(0, 0, 2, 0, 0, 0)
+
+    def test_get_default_counts_miss(self):
+        memo = LRUMemo(2)
+        sentinel = object()
+        assert memo.get("нет", sentinel) is sentinel
+        memo.put("да", 0)
+        assert memo.get("да", sentinel) == 0
+        assert memo.info()[:2] == (1, 1)
+
+    def test_ttl_validated(self):
+        with pytest.raises(ValueError):
+            LRUMemo(2, ttl=0)
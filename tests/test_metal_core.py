@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты расчётного ядра без GUI (metal_core.py).
+
+Запуск: python -m pytest tests/test_metal_core.py -v
+"""
+
+import sys
+import os
+import json
+import pickle
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import metal_core
+import main_desktop
+import pytest
+
+from memo import LRUMemo
+from metal_core import (BuildingResult, calculate, calculate_cached, calculate_compact,
+                        calculate_many, canonical_case, case_hash, case_key,
+                        get_pipe_support_kgm2, iter_sections, PIPE_SUPPORT, RESULT_SECTIONS)
+from sweep import DEFAULT_GP, DEFAULT_SPAN
+
+
+class TestNoGui:
+
+    def test_import_without_gui_toolkit(self):
+        """Ядро импортируется в чистом интерпретаторе без tkinter/customtkinter."""
+        code = ("import sys, json, metal_core\n"
+                "print(json.dumps(sorted(sys.modules)))\n")
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                             text=True, check=True, timeout=60)
+        mods = set(json.loads(out.stdout))
+        assert "tkinter" not in mods
+        assert "customtkinter" not in mods
+        assert "main_desktop" not in mods
+
+    def test_calculate_headless(self):
+        res = calculate(dict(DEFAULT_GP),
+                        [dict(DEFAULT_SPAN), dict(DEFAULT_SPAN, L_span=30.0, col_step=12.0)])
+        assert res["итого"]["М1_т"] > 0
+
+
+class TestDesktopReexports:
+
+    def test_same_objects(self):
+        """main_desktop использует ядро, а не свою копию."""
+        assert main_desktop.calculate is metal_core.calculate
+        assert main_desktop.PURLIN_TABLE is metal_core.PURLIN_TABLE
+        assert main_desktop.ROOF_MATERIALS is metal_core.ROOF_MATERIALS
+        assert main_desktop.SPAN_MEMO is metal_core.SPAN_MEMO
+
+    def test_pipe_support_table(self):
+        for bld, (lo, hi) in PIPE_SUPPORT.items():
+            assert get_pipe_support_kgm2(bld) == (lo + hi) / 2
+        assert get_pipe_support_kgm2("неизвестный") == 16.5
+
+
+class TestCaseKey:
+
+    def test_int_float_and_rounding_normalized(self):
+        a = case_key(dict(DEFAULT_GP, L_build=120), [dict(DEFAULT_SPAN, L_span=24, Q_roof=0.1 + 0.2)])
+        b = case_key(dict(DEFAULT_GP, L_build=120.0), [dict(DEFAULT_SPAN, L_span=24.0, Q_roof=0.3)])
+        assert a == b
+        assert (canonical_case(dict(DEFAULT_GP, Q_dust=-0.0), [dict(DEFAULT_SPAN)])
+                == canonical_case(dict(DEFAULT_GP), [dict(DEFAULT_SPAN)]))
+
+    def test_unrelated_fields_ignored(self):
+        gp = dict(DEFAULT_GP, id="A", comment="вариант 2")
+        sp = dict(DEFAULT_SPAN, label="пролёт А-Б")
+        assert case_hash(gp, [sp]) == case_hash(dict(DEFAULT_GP), [dict(DEFAULT_SPAN)])
+
+    def test_relevant_fields_and_order_matter(self):
+        base = case_key(dict(DEFAULT_GP), [dict(DEFAULT_SPAN), dict(DEFAULT_SPAN, L_span=30.0)])
+        assert case_key(dict(DEFAULT_GP, Q_snow=1.5),
+                        [dict(DEFAULT_SPAN), dict(DEFAULT_SPAN, L_span=30.0)]) != base
+        assert case_key(dict(DEFAULT_GP), [dict(DEFAULT_SPAN, L_span=30.0), dict(DEFAULT_SPAN)]) != base
+        assert case_key(dict(DEFAULT_GP),
+                        [dict(DEFAULT_SPAN), dict(DEFAULT_SPAN, L_span=30.0, has_post=True)]) != base
+
+    def test_canonical_text_sorted_and_versioned(self):
+        doc = json.loads(canonical_case(dict(DEFAULT_GP), [dict(DEFAULT_SPAN)]))
+        assert list(doc) == sorted(doc)
+        assert doc["tables"] == metal_core.tables_hash()
+        assert list(doc["spans"][0]) == sorted(doc["spans"][0])
+
+    def test_missing_field_raises(self):
+        gp = dict(DEFAULT_GP)
+        del gp["yc"]
+        with pytest.raises(KeyError):
+            case_key(gp, [dict(DEFAULT_SPAN)])
+
+
+class TestResultCache:
+
+    def test_identical_requests_computed_once(self, monkeypatch):
+        calls = []
+        real = metal_core.calculate
+        monkeypatch.setattr(metal_core, "calculate", lambda gp, spans: calls.append(1) or real(gp, spans))
+        cache = LRUMemo(8)
+        r1 = calculate_cached(dict(DEFAULT_GP), [dict(DEFAULT_SPAN)], cache=cache)
+        r2 = calculate_cached(dict(DEFAULT_GP, id=7), [dict(DEFAULT_SPAN, L_span=24)], cache=cache)
+        assert r1 is r2 and len(calls) == 1
+        assert r1 == real(dict(DEFAULT_GP), [dict(DEFAULT_SPAN)])
+        assert cache.info().hits == 1
+
+    def test_ttl(self):
+        now = [0.0]
+        cache = LRUMemo(8, ttl=60, clock=lambda: now[0])
+        r1 = calculate_cached(dict(DEFAULT_GP), [dict(DEFAULT_SPAN)], cache=cache)
+        now[0] = 61
+        assert calculate_cached(dict(DEFAULT_GP), [dict(DEFAULT_SPAN)], cache=cache) is not r1
+        assert cache.info().expired == 1
+
+
+class TestIterSections:
+
+    def test_same_as_calculate(self):
+        spans = [dict(DEFAULT_SPAN, L_span=18.0), dict(DEFAULT_SPAN, q_crane_t=100.0, has_post=True),
+                 dict(DEFAULT_SPAN, col_step=12.0)]
+        parts = list(iter_sections(dict(DEFAULT_GP), spans))
+        assert [k for k, _ in parts] == list(RESULT_SECTIONS)
+        assert dict(parts) == calculate(dict(DEFAULT_GP), spans)
+
+    def test_lazy(self):
+        seen = []
+        gen = iter_sections(dict(DEFAULT_GP), [dict(DEFAULT_SPAN)] * 3, progress=lambda d, t: seen.append(d))
+        assert seen == []
+        assert next(gen)[0] == "прогоны"
+        assert seen == [1, 2, 3]
+
+
+class TestCompactResult:
+
+    SPANS = [dict(DEFAULT_SPAN, L_span=18.0, col_step=12.0), dict(DEFAULT_SPAN, q_crane_t=100.0, has_post=True),
+             dict(DEFAULT_SPAN, truss_type="Молодечно")]
+
+    def test_to_dict_same_as_calculate(self):
+        r = calculate_compact(dict(DEFAULT_GP), self.SPANS)
+        assert isinstance(r, BuildingResult)
+        assert r.to_dict() == calculate(dict(DEFAULT_GP), self.SPANS)
+        assert len(r.col_kg) == len(r.col_n) == len(self.SPANS) + 1
+
+    def test_raw_values(self):
+        r = calculate_compact(dict(DEFAULT_GP), self.SPANS)
+        res = calculate(dict(DEFAULT_GP), self.SPANS)
+        assert round(r.G_cols_t, 2) == res["колонны"]["масса_общая_т"]
+        assert r.metrics[1] is calculate_compact(dict(DEFAULT_GP), [self.SPANS[1]]).metrics[0]  # общий memo
+
+    def test_view_builds_on_demand(self, monkeypatch):
+        expected = calculate(dict(DEFAULT_GP), self.SPANS)["итого"]
+        built = []
+        orig = BuildingResult.section
+        monkeypatch.setattr(BuildingResult, "section", lambda self, key, raw=False: built.append(key) or orig(self, key, raw))
+        view = calculate_compact(dict(DEFAULT_GP), self.SPANS).view()
+        assert view["итого"] == expected
+        view["итого"]
+        assert built == ["итого"]
+        assert list(view) == list(RESULT_SECTIONS) and "_log" in view and "x" not in view
+        with pytest.raises(KeyError):
+            view["x"]
+
+    def test_calculate_many_compact(self):
+        cases = [(dict(DEFAULT_GP), [dict(DEFAULT_SPAN, L_span=L)]) for L in (18.0, 24.0, 18.0)]
+        got = calculate_many(cases, compact=True)
+        assert [r.to_dict() for r in got] == calculate_many(cases)
+        assert pickle.loads(pickle.dumps(got[0])).to_dict() == got[0].to_dict()
+        with pytest.raises(ValueError):
+            calculate_many(cases, compact=True, store=object())
+
+
+class TestRawMode:
+
+    SPANS = [dict(DEFAULT_SPAN, L_span=18.0, col_step=12.0),
+             dict(DEFAULT_SPAN, q_crane_t=100.0, has_post=True)]
+
+    def test_same_sections_unrounded(self):
+        raw = calculate(dict(DEFAULT_GP), self.SPANS, raw=True)
+        res = calculate(dict(DEFAULT_GP), self.SPANS)
+        assert list(raw) == list(RESULT_SECTIONS[:-1])        # без "_log"
+        assert round(raw["колонны"]["масса_общая_т"], 2) == res["колонны"]["масса_общая_т"]
+        assert raw["колонны"]["масса_общая_т"] != res["колонны"]["масса_общая_т"]
+        for a, b in zip(raw["колонны"]["по_рядам"], res["колонны"]["по_рядам"]):
+            assert round(a["масса_1_кг"], 1) == b["масса_1_кг"]
+        assert raw["итого"]["М1_т"] == pytest.approx(res["итого"]["М1_т"], abs=0.05)
+
+    def test_totals_from_exact_masses(self):
+        r = calculate_compact(dict(DEFAULT_GP), self.SPANS)
+        raw = r.to_dict(raw=True)
+        assert raw["итого"]["М1_т"] == r.total_m1
+        assert raw["итого"]["М2_т"] == r.total_m2
+        assert r.view(raw=True)["итого"] == raw["итого"] and "_log" not in r.view(raw=True)
+
+    def test_batch_and_store(self):
+        cases = [(dict(DEFAULT_GP), [dict(DEFAULT_SPAN, L_span=L)]) for L in (18.0, 24.0)]
+        assert calculate_many(cases, raw=True) == [calculate(gp, sp, raw=True) for gp, sp in cases]
+        with pytest.raises(ValueError):
+            calculate(dict(DEFAULT_GP), [dict(DEFAULT_SPAN)], store=object(), raw=True)
+
+
+class TestColumnRows:
+    """Ряды колонн и подкрановых балок из величин пролётов и пар соседних пролётов."""
+
+    SPANS = [dict(DEFAULT_SPAN, L_span=[18.0, 24.0, 30.0][i % 3], q_crane_t=[10.0, 50.0, 100.0][i // 3 % 3])
+             for i in range(10)]
+
+    def test_edges_from_span_metrics(self):
+        r = calculate_compact(dict(DEFAULT_GP), self.SPANS)
+        assert len(r.col_kg) == len(r.col_n) == 11
+        assert r.col_kg[0] == r.metrics[0]["col_edge_kg"]
+        assert r.col_kg[-1] == r.metrics[-1]["col_edge_kg"]
+        mirrored = calculate_compact(dict(DEFAULT_GP), self.SPANS[::-1])
+        assert mirrored.col_kg[0] == r.col_kg[-1]
+
+    def test_middle_row_depends_on_its_pair(self):
+        r = calculate_compact(dict(DEFAULT_GP), self.SPANS)
+        spans = list(self.SPANS)
+        spans[5] = dict(DEFAULT_SPAN, L_span=36.0, q_crane_t=200.0)
+        r2 = calculate_compact(dict(DEFAULT_GP), spans)
+        changed = [j for j, (a, b) in enumerate(zip(r.col_kg, r2.col_kg)) if a != b]
+        assert changed == [5, 6]            # ряды между пролётами 4|5 и 5|6
+
+    def test_crane_beam_totals_match_rows(self):
+        r = calculate_compact(dict(DEFAULT_GP), self.SPANS)
+        rows = r.section("подкрановые_балки", raw=True)["ряды_колонн"]
+        assert len(rows) == 2 * len(self.SPANS)
+        assert r.G_pb_m1 == pytest.approx(sum(row["G_М1_т"] for row in rows))
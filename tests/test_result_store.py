@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты дискового хранилища результатов (result_store.py).
+
+Запуск: python -m pytest tests/test_result_store.py -v
+"""
+
+import sys
+import os
+import pickle
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import metal_core
+from metal_core import calculate, calculate_many, case_hash
+from result_store import ResultStore
+from sweep import DEFAULT_GP, DEFAULT_SPAN
+
+
+def _case(L=24.0):
+    return dict(DEFAULT_GP), [dict(DEFAULT_SPAN, L_span=L)]
+
+
+def _write_range(path, lo, hi):
+    """Рабочий процесс: пишет ключи lo..hi-1 по одному (конкуренция писателей)."""
+    store = ResultStore(path)
+    for i in range(lo, hi):
+        store.put(f"k{i}", {"i": i})
+    return len(store)
+
+
+class TestResultStore:
+
+    def test_put_get(self, tmp_path):
+        store = ResultStore(str(tmp_path / "r.sqlite"))
+        assert store.get("нет") is None
+        store.put("a", {"итого": {"М1_т": 1.5}})
+        assert store.get("a") == {"итого": {"М1_т": 1.5}}
+        assert "a" in store and len(store) == 1
+
+    def test_existing_key_not_overwritten(self, tmp_path):
+        store = ResultStore(str(tmp_path / "r.sqlite"))
+        store.put("a", {"v": 1})
+        store.put("a", {"v": 2})
+        assert store.get("a") == {"v": 1}
+
+    def test_get_many_large(self, tmp_path):
+        store = ResultStore(str(tmp_path / "r.sqlite"))
+        store.put_many((f"k{i}", {"i": i}) for i in range(1200))
+        found = store.get_many([f"k{i}" for i in range(0, 1300, 2)])
+        assert len(found) == 600 and found["k998"] == {"i": 998}
+
+    def test_get_or_compute_does_not_store_errors(self, tmp_path):
+        store = ResultStore(str(tmp_path / "r.sqlite"))
+
+        def boom():
+            raise ValueError("ошибка")
+
+        with pytest.raises(ValueError):
+            store.get_or_compute("k", boom)
+        assert "k" not in store
+
+    def test_pickle_keeps_path_only(self, tmp_path):
+        store = ResultStore(str(tmp_path / "r.sqlite"))
+        store.put("a", {"v": 1})
+        clone = pickle.loads(pickle.dumps(store))
+        assert clone.get("a") == {"v": 1}
+
+    def test_concurrent_writers(self, tmp_path):
+        path = str(tmp_path / "r.sqlite")
+        ResultStore(path)
+        with ProcessPoolExecutor(max_workers=4) as ex:
+            list(ex.map(_write_range, [path] * 4, [0, 50, 100, 150], [100, 150, 200, 250]))
+        store = ResultStore(path)
+        assert len(store) == 250
+        assert store.get("k120") == {"i": 120}
+
+    def test_compact_drops_other_table_versions(self, tmp_path):
+        path = str(tmp_path / "r.sqlite")
+        store = ResultStore(path)
+        store.put("свежий", {"v": 1})
+        with sqlite3.connect(path) as conn:
+            conn.execute("INSERT INTO results VALUES ('старый', 'другие таблицы', '{}', 0)")
+        assert len(store) == 2
+        assert store.compact() == 1
+        assert "свежий" in store and "старый" not in store
+        assert store.compact(older_than=0) == 1
+        assert len(store) == 0
+
+
+class TestCalculateWithStore:
+
+    def test_calculate_reuses_stored(self, tmp_path):
+        store = ResultStore(str(tmp_path / "r.sqlite"))
+        gp, spans = _case()
+        res = calculate(gp, spans, store=store)
+        assert res == calculate(gp, spans)
+        store_key = case_hash(gp, spans)
+        assert store.get(store_key) == res
+        # повторный расчёт берётся из хранилища, а не из ядра
+        with sqlite3.connect(store.path) as conn:
+            conn.execute("UPDATE results SET result = '{\"из\": \"хранилища\"}'")
+        assert calculate(dict(gp, id="повтор"), spans, store=store) == {"из": "хранилища"}
+
+    def test_calculate_many_with_store(self, tmp_path, monkeypatch):
+        store = ResultStore(str(tmp_path / "r.sqlite"))
+        cases = [_case(18.0), _case(24.0), _case(18.0)]
+        first = calculate_many(cases, store=store)
+        assert first == [calculate(*c) for c in cases]
+        assert len(store) == 2
+
+        calls = []
+        real = metal_core.calculate
+        monkeypatch.setattr(metal_core, "calculate", lambda *a, **kw: calls.append(1) or real(*a, **kw))
+        again = calculate_many(cases + [_case(30.0)], store=store)
+        assert again[:3] == first
+        assert len(calls) == 1 and len(store) == 3
+
+    def test_partial_batch_saved_on_error(self, tmp_path):
+        store = ResultStore(str(tmp_path / "r.sqlite"))
+        bad = (dict(DEFAULT_GP), [dict(DEFAULT_SPAN, L_span="не число")])
+        with pytest.raises(Exception):
+            calculate_many([_case(18.0), bad], store=store)
+        assert case_hash(*_case(18.0)) in store
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты модели пролётов (span_model.SpanList) и редактора списка пролётов
+main_desktop.SpanListEditor (без реального Tk).
+
+Запуск: python -m pytest tests/test_span_model.py -v
+"""
+
+import sys
+import os
+from unittest.mock import MagicMock
+
+# conftest.py уже зарегистрировал заглушки customtkinter/tkinter.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import main_desktop
+from main_desktop import SPAN_DEFAULTS, SPAN_PAGE, SpanListEditor, span_summary
+from span_model import SpanList
+
+
+class FakeListbox:
+    """Минимальный tk.Listbox: строки и выделение."""
+
+    def __init__(self):
+        self.items = []
+        self.sel = set()
+
+    def delete(self, first, last=None):
+        if first == 0 and last == "end":
+            self.items.clear()
+            self.sel.clear()
+        else:
+            del self.items[first]
+            self.sel.discard(first)
+
+    def insert(self, index, *items):
+        if index == "end":
+            self.items.extend(items)
+        else:
+            self.items[index:index] = items
+
+    def curselection(self):
+        return tuple(sorted(self.sel))
+
+    def selection_set(self, i):
+        self.sel.add(i)
+
+    def selection_clear(self, first, last=None):
+        self.sel.clear()
+
+    def see(self, i):
+        pass
+
+
+class TestSpanList:
+
+    def test_defaults_and_extra_fields(self):
+        spans = SpanList({"L_span": 24.0, "q_crane_t": 50.0},
+                         [{"L_span": 18.0}, {"q_crane_t": 20.0, "id": "лишнее"}])
+        assert spans.to_spans() == [{"L_span": 18.0, "q_crane_t": 50.0},
+                                    {"L_span": 24.0, "q_crane_t": 20.0}]
+        assert spans.value(1, "q_crane_t") == 20.0
+
+    def test_set_partial(self):
+        spans = SpanList(SPAN_DEFAULTS)
+        spans.append()
+        spans.set(0, {"h_rail": 12.0})
+        assert spans[0] == dict(SPAN_DEFAULTS, h_rail=12.0)
+
+    def test_duplicate_shares_rows(self):
+        spans = SpanList(SPAN_DEFAULTS, [dict(SPAN_DEFAULTS, L_span=30.0)])
+        spans.duplicate(0, 499)
+        assert len(spans) == 500
+        assert len({id(row) for row in spans._rows}) == 1
+        assert all(sp["L_span"] == 30.0 for sp in spans)
+
+    def test_duplicate_inserts_after(self):
+        spans = SpanList({"L_span": 0.0}, [{"L_span": L} for L in (18.0, 24.0, 30.0)])
+        spans.duplicate(1, 2)
+        assert [sp["L_span"] for sp in spans] == [18.0, 24.0, 24.0, 24.0, 30.0]
+        with pytest.raises(ValueError):
+            spans.duplicate(0, -1)
+
+    def test_apply_keeps_sharing(self):
+        spans = SpanList(SPAN_DEFAULTS)
+        spans.append()
+        spans.duplicate(0, 99)
+        assert spans.apply(range(10, 20), "q_crane_t", 100.0) == 10
+        assert spans.apply(range(10, 20), "q_crane_t", 100.0) == 0
+        assert [sp["q_crane_t"] for sp in spans].count(100.0) == 10
+        assert len({id(row) for row in spans._rows}) == 2
+
+    def test_remove(self):
+        spans = SpanList({"L_span": 0.0}, [{"L_span": float(L)} for L in range(5)])
+        assert spans.remove([1, 3, 99]) == 2
+        assert [sp["L_span"] for sp in spans] == [0.0, 2.0, 4.0]
+
+
+class TestSpanListEditor:
+
+    def _editor(self, n):
+        spans = SpanList(SPAN_DEFAULTS, [dict(SPAN_DEFAULTS, L_span=float(i)) for i in range(n)])
+        changed = []
+        ed = SpanListEditor(None, spans, lambda: changed.append(1))
+        ed.listbox = FakeListbox()
+        ed.refresh()
+        main_desktop.messagebox.reset_mock()
+        return ed, changed
+
+    def test_only_page_of_frames(self):
+        ed, _ = self._editor(300)
+        assert len(ed._pool) == SPAN_PAGE
+        assert len(ed.listbox.items) == 300
+        assert ed.listbox.items[7] == span_summary(7, ed.spans[7])
+        assert [sf.index for sf in ed._pool] == list(range(SPAN_PAGE))
+
+    def test_select_rebinds_pool(self):
+        ed, _ = self._editor(300)
+        ed.listbox.selection_set(150)
+        ed._on_select()
+        assert [sf.index for sf in ed._pool] == [150, 151, 152]
+        assert ed._pool[0].e_L is not None
+        ed.show(299)                        # конец списка — карточки не пустеют
+        assert [sf.index for sf in ed._pool] == [297, 298, 299]
+
+    def test_edit_in_frame(self):
+        ed, changed = self._editor(10)
+        sf = ed._pool[1]
+        sf.get_params = lambda: dict(ed.spans[1], q_crane_t=125.0)
+        ed._on_frame_edited(sf)
+        assert ed.spans.value(1, "q_crane_t") == 125.0
+        assert "Q=125т" in ed.listbox.items[1]
+        assert changed == [1]
+
+    def test_frame_fields_roundtrip(self):
+        ed, changed = self._editor(5)
+        sf = ed._pool[0]
+        sp = dict(ed.spans[2], B_step=12.0, n_cranes=2, with_pass=False, has_post=True)
+        sf.bind_span(2, sp)
+        got = sf.get_params()
+        for k in ("B_step", "col_step", "truss_type", "n_cranes", "with_pass",
+                  "crane_mode", "has_post", "bld_type", "roof_layers", "roof_manual"):
+            assert got[k] == sp[k], k
+        assert changed == []                # заполнение карточки — не правка
+
+    def test_duplicate(self):
+        ed, changed = self._editor(3)
+        ed.listbox.selection_set(1)
+        ed.e_dup = MagicMock(get=lambda: "4")
+        ed._duplicate()
+        assert [sp["L_span"] for sp in ed.spans] == [0.0] + [1.0] * 5 + [2.0]
+        assert len(ed.listbox.items) == 7
+        assert changed == [1]
+
+    def test_duplicate_bad_count(self):
+        ed, changed = self._editor(3)
+        ed.e_dup = MagicMock(get=lambda: "0")
+        ed._duplicate()
+        assert len(ed.spans) == 3 and changed == []
+        main_desktop.messagebox.showerror.assert_called_once()
+
+    def test_apply_to_selection(self):
+        ed, changed = self._editor(6)
+        for i in (1, 2, 4):
+            ed.listbox.selection_set(i)
+        ed.v_bulk_field.set("Тормозные пути")
+        ed.e_bulk = MagicMock(get=lambda: "Без прохода")
+        ed._apply_field()
+        assert [sp["with_pass"] for sp in ed.spans] == [True, False, False, True, False, True]
+        assert ed.listbox.curselection() == (1, 2, 4)
+        assert changed == [1]
+
+    def test_apply_bad_value(self):
+        ed, changed = self._editor(3)
+        ed.listbox.selection_set(0)
+        ed.v_bulk_field.set("Кранов в пролёте")
+        ed.e_bulk = MagicMock(get=lambda: "3")
+        ed._apply_field()
+        assert ed.spans.value(0, "n_cranes") == 1 and changed == []
+        main_desktop.messagebox.showerror.assert_called_once()
+
+    def test_remove(self):
+        ed, changed = self._editor(4)
+        ed.listbox.selection_set(0)
+        ed.listbox.selection_set(2)
+        ed._remove_selected()
+        assert [sp["L_span"] for sp in ed.spans] == [1.0, 3.0]
+        ed.remove([0, 1])                   # все — нельзя
+        assert len(ed.spans) == 2
+        main_desktop.messagebox.showwarning.assert_called_once()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты времени импорта: calculator_logic и table_parsers не должны
+тянуть pandas/openpyxl и парсеры таблиц при импорте.
+
+Порог времени — переменная окружения CALCMET_IMPORT_BUDGET_MS (по умолчанию 500 мс).
+
+Запуск: python -m pytest tests/test_startup.py -v
+"""
+
+import sys
+import os
+import json
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BUDGET_MS = float(os.environ.get("CALCMET_IMPORT_BUDGET_MS", "500"))
+HEAVY = ("pandas", "openpyxl", "docx", "numpy")
+
+
+def _import_in_subprocess(module: str) -> dict:
+    """Импорт модуля в чистом интерпретаторе: время (мс) и загруженные модули."""
+    code = (
+        "import sys, time, json\n"
+        "t = time.perf_counter()\n"
+        f"import {module}\n"
+        "ms = (time.perf_counter() - t) * 1000\n"
+        "print(json.dumps({'ms': ms, 'modules': sorted(sys.modules)}))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                         text=True, check=True, timeout=60)
+    return json.loads(out.stdout)
+
+
+class TestImportTime:
+
+    def test_calculator_logic_within_budget(self):
+        _import_in_subprocess("calculator_logic")  # прогрев: .pyc на диске
+        info = _import_in_subprocess("calculator_logic")
+        assert info["ms"] < BUDGET_MS, f"import calculator_logic: {info['ms']:.0f} мс"
+
+    def test_calculator_logic_defers_parsers(self):
+        mods = set(_import_in_subprocess("calculator_logic")["modules"])
+        assert "table_parsers" not in mods
+        assert "table_cache" not in mods
+        assert not mods.intersection(HEAVY)
+
+    def test_table_parsers_no_pandas(self):
+        """pandas — запасной вариант, импортируется только при использовании."""
+        mods = set(_import_in_subprocess("table_parsers")["modules"])
+        assert not mods.intersection(HEAVY)
+
+    def test_tables_load_on_first_use(self):
+        from calculator_logic import CalculatorLogic
+        calc = CalculatorLogic()
+        calc._load_tables()
+        assert calc._crane_beams
+        assert "table_parsers" in sys.modules
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты для перебора вариантов (sweep.py).
+
+Запуск: python -m pytest tests/test_sweep.py -v
+"""
+
+import sys
+import os
+
+# conftest.py уже зарегистрировал заглушки customtkinter/tkinter.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from main_desktop import calculate
+from sweep import sweep, iter_cases, count_cases, run_cases, frange, DEFAULT_GP, DEFAULT_SPAN
+
+
+def _echo(gp, spans):
+    """Тестовая функция расчёта: возвращает входы."""
+    if spans[0]["L_span"] < 0:
+        raise ValueError("отрицательный пролёт")
+    return {"L": [sp["L_span"] for sp in spans], "snow": gp["Q_snow"]}
+
+
+class TestCases:
+
+    def test_lazy_product_order(self):
+        cases = list(iter_cases({"Q_snow": [1.0, 2.0]}, {"L_span": [18, 24]}))
+        assert [(gp["Q_snow"], sp[0]["L_span"]) for gp, sp in cases] == [
+            (1.0, 18), (1.0, 24), (2.0, 18), (2.0, 24)]
+
+    def test_defaults_filled(self):
+        gp, spans = next(iter_cases())
+        assert gp == DEFAULT_GP
+        assert spans == [DEFAULT_SPAN]
+
+    def test_scalar_and_range_axes(self):
+        cases = list(iter_cases(span_grid={"truss_type": "Двутавры", "q_crane_t": range(10, 40, 10)}))
+        assert [sp[0]["q_crane_t"] for _, sp in cases] == [10, 20, 30]
+        assert all(sp[0]["truss_type"] == "Двутавры" for _, sp in cases)
+
+    def test_shared_grid_n_spans(self):
+        cases = list(iter_cases(span_grid={"L_span": [18, 24]}, n_spans=3))
+        assert len(cases) == 2
+        assert [sp["L_span"] for sp in cases[1][1]] == [24, 24, 24]
+        assert cases[1][1][0] is not cases[1][1][1]
+
+    def test_per_span_grids(self):
+        cases = list(iter_cases(span_grid=[{"L_span": [18, 24]}, {"L_span": [30, 36]}]))
+        assert [[sp["L_span"] for sp in spans] for _, spans in cases] == [
+            [18, 30], [18, 36], [24, 30], [24, 36]]
+
+    def test_count(self):
+        assert count_cases({"Q_snow": [1, 2, 3]}, {"L_span": [18, 24], "n_cranes": [1, 2]}) == 12
+        assert count_cases(None, [{"L_span": [18, 24]}, {"L_span": [1, 2, 3]}]) == 6
+
+    def test_generator_axis(self):
+        cases = list(iter_cases(span_grid={"L_span": (x for x in (18, 24))}, gp_grid={"yc": [1, 1.1]}))
+        assert len(cases) == 4
+
+    def test_frange(self):
+        assert frange(0.5, 1.5, 0.25) == [0.5, 0.75, 1.0, 1.25, 1.5]
+        with pytest.raises(ValueError):
+            frange(0, 1, 0)
+
+
+class TestRun:
+
+    def test_in_process_matches_calculate(self):
+        grid = {"L_span": [18, 24], "crane_mode": ["Режим 1-6К", "Режим 7-8К"]}
+        results = list(sweep(span_grid=grid, n_spans=2, workers=1))
+        assert [r.index for r in results] == [0, 1, 2, 3]
+        for r in results:
+            assert r.result == calculate(r.gp, r.spans)
+
+    def test_raw(self):
+        results = list(sweep(span_grid={"L_span": [18, 24]}, workers=1, raw=True))
+        for r in results:
+            assert r.result == calculate(r.gp, r.spans, raw=True)
+            assert "_log" not in r.result
+
+    def test_pool_preserves_order(self):
+        cases = list(iter_cases({"Q_snow": [1.0, 2.0, 3.0]}, {"L_span": [6, 12, 18, 24, 30]}))
+        out = list(run_cases(iter(cases), func=_echo, workers=2, chunksize=2, max_inflight=2))
+        assert [r.index for r in out] == list(range(len(cases)))
+        assert [r.result for r in out] == [_echo(gp, sp) for gp, sp in cases]
+
+    def test_pool_default_func(self):
+        out = list(sweep(span_grid={"L_span": [18, 24, 30]}, workers=2, chunksize=1))
+        assert [r.result for r in out] == [calculate(r.gp, r.spans) for r in out]
+
+    def test_error_isolated(self):
+        out = list(sweep(span_grid={"L_span": [-1, 24]}, func=_echo, workers=1))
+        assert "_error" in out[0].result
+        assert out[1].result["L"] == [24]
+
+    def test_early_close(self):
+        gen = sweep(span_grid={"L_span": list(range(1, 200))}, func=_echo, workers=2, chunksize=4)
+        first = next(gen)
+        gen.close()
+        assert first.index == 0
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты для кэша скомпилированных таблиц (table_cache.py).
+
+Запуск: python -m pytest tests/test_table_cache.py -v
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import table_cache
+from table_cache import load_table, clear_memory_cache
+
+
+CALLS = []
+
+
+def _parse(path):
+    """Тестовый парсер: считает вызовы."""
+    CALLS.append(path)
+    with open(path, encoding="utf-8") as f:
+        return {"text": f.read()}
+
+
+@pytest.fixture(autouse=True)
+def _fresh():
+    CALLS.clear()
+    clear_memory_cache()
+    yield
+    clear_memory_cache()
+
+
+@pytest.fixture
+def table(tmp_path):
+    p = tmp_path / "table.txt"
+    p.write_text("v1", encoding="utf-8")
+    return p
+
+
+class TestLoadTable:
+
+    def test_second_call_hits_memory(self, table, tmp_path):
+        """Повторный вызов не запускает парсер и возвращает тот же объект."""
+        cache = str(tmp_path / "cache")
+        a = load_table(str(table), _parse, cache_dir=cache)
+        b = load_table(str(table), _parse, cache_dir=cache)
+        assert a is b
+        assert len(CALLS) == 1
+
+    def test_disk_cache_survives_memory_clear(self, table, tmp_path):
+        """Новый процесс (пустая память) берёт таблицу с диска."""
+        cache = str(tmp_path / "cache")
+        load_table(str(table), _parse, cache_dir=cache)
+        clear_memory_cache()
+        data = load_table(str(table), _parse, cache_dir=cache)
+        assert data == {"text": "v1"}
+        assert len(CALLS) == 1
+
+    def test_changed_file_invalidates(self, table, tmp_path):
+        """Изменение содержимого — повторный разбор."""
+        cache = str(tmp_path / "cache")
+        load_table(str(table), _parse, cache_dir=cache)
+        table.write_text("v2-longer", encoding="utf-8")
+        clear_memory_cache()
+        assert load_table(str(table), _parse, cache_dir=cache) == {"text": "v2-longer"}
+        assert len(CALLS) == 2
+
+    def test_touch_without_change_is_hit(self, table, tmp_path):
+        """Смена mtime без изменения содержимого — кэш действителен."""
+        cache = str(tmp_path / "cache")
+        load_table(str(table), _parse, cache_dir=cache)
+        st = os.stat(table)
+        os.utime(table, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        load_table(str(table), _parse, cache_dir=cache)
+        assert len(CALLS) == 1
+
+    def test_version_bump_invalidates(self, table, tmp_path):
+        """Новая версия парсера — повторный разбор."""
+        cache = str(tmp_path / "cache")
+        load_table(str(table), _parse, version=1, cache_dir=cache)
+        load_table(str(table), _parse, version=2, cache_dir=cache)
+        assert len(CALLS) == 2
+
+    def test_corrupt_disk_entry_ignored(self, table, tmp_path):
+        """Повреждённый файл кэша не ломает загрузку."""
+        cache = tmp_path / "cache"
+        load_table(str(table), _parse, cache_dir=str(cache))
+        for f in cache.iterdir():
+            f.write_bytes(b"garbage")
+        clear_memory_cache()
+        assert load_table(str(table), _parse, cache_dir=str(cache)) == {"text": "v1"}
+        assert len(CALLS) == 2
+
+    def test_no_disk(self, table, tmp_path):
+        cache = tmp_path / "cache"
+        load_table(str(table), _parse, cache_dir=str(cache), use_disk=False)
+        assert not cache.exists()
+
+    def test_cache_dir_env(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("CALCMET_CACHE_DIR", str(tmp_path))
+        assert table_cache.get_cache_dir() == str(tmp_path)
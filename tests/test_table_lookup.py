@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты для скомпилированных табличных поисков (table_lookup.py).
+
+Запуск: python -m pytest tests/test_table_lookup.py -v
+"""
+
+import sys
+import os
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import table_lookup
+from table_lookup import CeilLookup, cached_lookup, clear_lookup_cache, nearest_index
+
+NAN = float("nan")
+
+
+def _scan_ceil(pairs, x):
+    """Эталон: исходный линейный поиск по отсортированной таблице."""
+    for k, v in sorted(pairs, key=lambda kv: kv[0]):
+        if x <= k:
+            return v
+    return sorted(pairs, key=lambda kv: kv[0])[-1][1]
+
+
+class TestCeilLookup:
+
+    PAIRS = [(30, "c"), (10, "a"), (20, "b")]
+
+    def test_exact_and_between(self):
+        f = CeilLookup.from_pairs(self.PAIRS)
+        assert f(10) == "a"
+        assert f(15) == "b"
+        assert f(20) == "b"
+
+    def test_below_min(self):
+        assert CeilLookup.from_pairs(self.PAIRS)(-5) == "a"
+
+    def test_above_max_default_last(self):
+        assert CeilLookup.from_pairs(self.PAIRS)(99) == "c"
+
+    def test_above_explicit(self):
+        assert CeilLookup([30, 50], [1, 2], above=3)(51) == 3
+
+    def test_nan_is_above(self):
+        """NaN ведёт себя как исходный цикл: ни одно сравнение не истинно."""
+        assert CeilLookup.from_pairs(self.PAIRS)(NAN) == "c"
+        assert CeilLookup([30, 50], [1, 2], above=3)(NAN) == 3
+
+    def test_duplicate_keys_first_wins(self):
+        f = CeilLookup.from_pairs([(0.3, 576), (0.2, 394.8), (0.3, 439.2)])
+        assert f(0.25) == 576
+
+    def test_keys_as_values(self):
+        assert CeilLookup([6, 12, 18])(9) == 12
+
+    def test_many_matches_scalar(self):
+        f = CeilLookup.from_pairs(self.PAIRS)
+        xs = [0, 10, 10.5, 20, 29.9, 30, 31, NAN]
+        assert f.many(xs) == [f(x) for x in xs]
+        assert f.many(array("d", [5, 25])) == ["a", "c"]
+
+    def test_matches_linear_scan(self):
+        pairs = [(0.45, 110.4), (0.65, 126), (0.9, 144), (2.25, 288), (1.9, 197.4)]
+        f = CeilLookup.from_pairs(pairs)
+        for i in range(0, 300):
+            x = i / 100
+            assert f(x) == _scan_ceil(pairs, x)
+
+    def test_index(self):
+        f = CeilLookup([1, 2, 3])
+        assert f.index(0) == 0
+        assert f.index(2.5) == 2
+        assert f.index(4) == 3
+
+    def test_empty_rejected(self):
+        with pytest.raises(ValueError):
+            CeilLookup([])
+
+    def test_length_mismatch(self):
+        with pytest.raises(ValueError):
+            CeilLookup([1, 2], [1])
+
+
+class TestCachedLookup:
+
+    def setup_method(self):
+        clear_lookup_cache()
+
+    def test_compiled_once_per_table(self):
+        table = {1: "a", 5: "b"}
+        lkp = cached_lookup(CeilLookup.from_dict, table)
+        assert cached_lookup(CeilLookup.from_dict, table) is lkp
+        assert cached_lookup(CeilLookup.from_dict, dict(table)) is not lkp
+        assert lkp(3) == "b"
+
+    def test_several_tables(self):
+        keys, values = [1, 2], ["x", "y"]
+        lkp = cached_lookup(CeilLookup, keys, values)
+        assert cached_lookup(CeilLookup, keys, values) is lkp
+        assert cached_lookup(CeilLookup, keys, ["p", "q"])(2) == "q"
+
+    def test_iterator_not_cached(self):
+        cached_lookup(lambda it: CeilLookup(list(it)), iter([1, 2]))
+        assert not table_lookup._COMPILED
+
+    def test_bounded_and_cleared(self):
+        tables = [[float(i)] for i in range(table_lookup._COMPILED_MAX * 2)]
+        for t in tables:
+            assert cached_lookup(CeilLookup, t)(0) == t[0]
+        assert len(table_lookup._COMPILED) <= table_lookup._COMPILED_MAX
+        clear_lookup_cache()
+        assert not table_lookup._COMPILED
+
+
+class TestNearestIndex:
+
+    KEYS = [5, 10, 20, 32, 50]
+
+    def _ref(self, x):
+        return min(range(len(self.KEYS)), key=lambda i: abs(self.KEYS[i] - x))
+
+    def test_matches_min_abs(self):
+        for i in range(0, 700):
+            x = i / 10
+            assert nearest_index(self.KEYS, x) == self._ref(x), x
+
+    def test_tie_prefers_lower(self):
+        assert nearest_index(self.KEYS, 15) == 1
+
+    def test_nan(self):
+        assert nearest_index(self.KEYS, NAN) == self._ref(NAN) == 0
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Тесты для парсеров таблиц Метода 2 (table_parsers.py).
+
+Читаются реальные файлы из папки «Тип 1 здания с кранами».
+
+Запуск: python -m pytest tests/test_table_parsers.py -v
+"""
+
+import sys
+import os
+import zipfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pytest
+
+from table_parsers import (
+    read_xlsx_cells, _read_xlsx_cells_pandas,
+    parse_coverage_xlsx_full, read_xlsx_fachwerk,
+    iter_docx_rows, parse_docx_tables, read_docx_crane_beams, read_docx_brake,
+)
+
+TABLES = os.path.join(ROOT, "Тип 1 здания с кранами")
+COVERAGE = os.path.join(TABLES, "металлоекмсоть покрытия.xlsx")
+FACHWERK = os.path.join(TABLES, "Металлоёмкость фахверк.xlsx")
+CRANE = os.path.join(TABLES, "Таблица металлоемкости на подкрановые конструкции.docx")
+BRAKE = os.path.join(TABLES, "Таблица металлоемкости на тормозные конструкции.docx")
+
+
+class TestXlsxReader:
+
+    def test_reads_only_requested_rows(self):
+        cells = read_xlsx_cells(COVERAGE, "Лист1", rows=[2, 3])
+        assert {r for r, _ in cells} == {2, 3}
+        assert cells[(2, 1)] == 2.0          # B3 — первая нагрузка
+        assert cells[(3, 1)] == 5.9          # B4 — металлоемкость
+        assert cells[(3, 0)] == "Металлоемкость 1 фермы"
+
+    def test_sheet_by_name(self):
+        """Лист «Расчеты» — второй в книге, ищется через rels."""
+        cells = read_xlsx_cells(FACHWERK, "Расчеты", rows=[5])
+        assert cells[(5, 2)] == 9.0
+
+    def test_unknown_sheet(self):
+        with pytest.raises(KeyError):
+            read_xlsx_cells(COVERAGE, "Нет такого")
+
+    def test_inline_strings_and_no_refs(self, tmp_path):
+        """Ячейки без атрибута r и inlineStr."""
+        p = tmp_path / "t.xlsx"
+        ns = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+        rns = 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+        with zipfile.ZipFile(p, "w") as zf:
+            zf.writestr("xl/workbook.xml",
+                        f'<workbook {ns} {rns}><sheets><sheet name="S" sheetId="1" r:id="rId1"/></sheets></workbook>')
+            zf.writestr("xl/_rels/workbook.xml.rels",
+                        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                        '<Relationship Id="rId1" Target="worksheets/sheet1.xml"/></Relationships>')
+            zf.writestr("xl/worksheets/sheet1.xml",
+                        f'<worksheet {ns}><sheetData><row><c t="inlineStr"><is><t>abc</t></is></c>'
+                        '<c><v>1.5</v></c></row><row><c t="b"><v>1</v></c></row></sheetData></worksheet>')
+        assert read_xlsx_cells(str(p), "S") == {(0, 0): "abc", (0, 1): 1.5, (1, 0): True}
+
+    def test_pandas_parity(self):
+        """Потоковый reader и pandas дают одинаковые ячейки."""
+        pytest.importorskip("pandas")
+        pytest.importorskip("openpyxl")
+        rows = range(0, 53)
+        assert read_xlsx_cells(COVERAGE, "Лист1", rows) == _read_xlsx_cells_pandas(COVERAGE, "Лист1", rows)
+
+
+@pytest.fixture(scope="module")
+def data():
+    return parse_coverage_xlsx_full(COVERAGE)
+
+
+class TestCoverage:
+
+    def test_all_truss_blocks(self, data):
+        for t in ("Уголки", "Двутавры", "Молодечно"):
+            for span in (18, 24, 30, 36):
+                tbl = data["fermy"][(t, span)]
+                assert len(tbl) == 22
+                assert min(tbl) == 2 and max(tbl) == 12.5
+
+    def test_loads_aligned_with_metals(self, data):
+        """Нагрузка 2 т/м.п. — первый столбец (B), без сдвига."""
+        assert data["fermy"][("Двутавры", 36)][2] == 9.6
+        assert data["fermy"][("Молодечно", 18)][12.5] == 7.08
+
+    def test_podstropilnye(self, data):
+        assert data["podstropilnye"][18] == 1.57
+        assert data["podstropilnye"][255] == 6.71
+        assert len(data["podstropilnye"]) == 14
+
+    def test_svyazi(self, data):
+        assert data["svyazi"] == {"до 120": {6: 15, 12: 35}, "до 400": {6: 40, 12: 55}}
+
+    def test_missing_file_fallback(self, tmp_path):
+        data = parse_coverage_xlsx_full(str(tmp_path / "нет.xlsx"))
+        assert data["fermy"] == {}
+        assert data["podstropilnye"][18] == 1.57
+
+
+class TestFachwerk:
+
+    def test_fachwerk_grid(self):
+        fw = read_xlsx_fachwerk(FACHWERK)["fachwerk"]
+        assert len(fw) == 27
+        assert fw[("I", 10, 0)] == 9
+        assert fw[("III", 40, 300)] == 48
+        assert fw[("II", 20, 100)] == 25
+
+    def test_opory(self):
+        assert read_xlsx_fachwerk(FACHWERK)["opory_truboprovodov"] == {
+            "Основные": (11, 22), "Энергоносители": (23, 40), "Вспомогательные": (2, 4),
+        }
+
+
+class TestDocxReader:
+
+    def test_rows_are_string_lists(self):
+        rows = list(iter_docx_rows(CRANE))
+        assert rows
+        assert all(isinstance(c, str) for _, row in rows for c in row)
+        assert {t for t, _ in rows} == {0, 1}
+
+    def test_one_string_per_cell(self):
+        """Горизонтально объединённые ячейки не размножаются."""
+        t1 = parse_docx_tables(CRANE)[0]
+        row_6m = next(r for r in t1 if r[0] == "6 м")
+        assert len(row_6m) == 1 + 30 + 1
+        assert row_6m[1:3] == ["80", "80"]
+
+    def test_missing_file(self, tmp_path):
+        assert parse_docx_tables(str(tmp_path / "нет.docx")) == []
+
+
+class TestCraneTables:
+
+    def test_crane_beams_heavy_mode(self):
+        """В словарь идут значения режима 7К-8К."""
+        cb = read_docx_crane_beams(CRANE)
+        assert cb[(6, 5, 1)] == 190
+        assert cb[(12, 50, 2)] == 540
+        assert cb[(12, 125, 1)] == 1040     # «125/130 т»
+        assert cb[(12, 400, 2)] == 2400
+
+    def test_crane_beams_short_row(self):
+        """Строка «24» без г/п 400 т — только существующие значения."""
+        cb = read_docx_crane_beams(CRANE)
+        assert cb[(24, 200, 2)] == 2380
+        assert (24, 400, 1) not in cb
+
+    def test_brake(self):
+        br = read_docx_brake(BRAKE)
+        assert br[(6, "Крайний", "С проходом", 5, 1)] == 110
+        assert br[(6, "Средний", "Без прохода", 50, 2)] == 85
+        assert br[(12, "Средний", "С проходом", 100, 2)] == 240
+
+    def test_brake_dash_skipped(self):
+        """«-» (нет тормозной конструкции без прохода) — ключа нет."""
+        br = read_docx_brake(BRAKE)
+        assert (12, "Крайний", "Без прохода", 80, 1) not in br
+
+    def test_fallback_defaults(self, tmp_path):
+        assert read_docx_crane_beams(str(tmp_path / "нет.docx"))
+        assert read_docx_brake(str(tmp_path / "нет.docx"))